@@ -0,0 +1,66 @@
+import { readFileSync, existsSync } from "fs";
+import { gzipSync } from "zlib";
+import { fileURLToPath } from "url";
+import { dirname, resolve } from "path";
+
+/**
+ * Bundle size budget check - run after `npm run build`
+ *
+ * Sums the JavaScript the landing page loads before any navigation (the entry
+ * script plus its modulepreload links in dist/index.html) and fails if it is over
+ * the budget in bundle-budget.json, or if a chunk that should only load on demand
+ * (e.g. @react-pdf/renderer) is part of it.
+ */
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = dirname(__filename);
+const root = resolve(__dirname, "..");
+const distDir = resolve(root, "dist");
+
+const budget = JSON.parse(readFileSync(resolve(root, "bundle-budget.json"), "utf8"));
+
+if (!existsSync(resolve(distDir, "index.html"))) {
+  console.error("❌ dist/index.html not found - run `npm run build` first");
+  process.exit(1);
+}
+
+const html = readFileSync(resolve(distDir, "index.html"), "utf8");
+const initialScripts = [
+  ...html.matchAll(/<script[^>]+type="module"[^>]+src="([^"]+)"/g),
+  ...html.matchAll(/<link[^>]+rel="modulepreload"[^>]+href="([^"]+)"/g),
+].map((match) => match[1]);
+
+const kb = (bytes) => bytes / 1024;
+let rawBytes = 0;
+let gzipBytes = 0;
+
+console.log("=== Landing page initial JavaScript ===\n");
+for (const src of initialScripts) {
+  const contents = readFileSync(resolve(distDir, `.${src}`));
+  const gzipped = gzipSync(contents, { level: 9 }).length;
+  rawBytes += contents.length;
+  gzipBytes += gzipped;
+  console.log(`  ${src.padEnd(48)} ${kb(contents.length).toFixed(1).padStart(8)} KB  (${kb(gzipped).toFixed(1)} KB gzip)`);
+}
+console.log(`\n  Total: ${kb(rawBytes).toFixed(1)} KB (${kb(gzipBytes).toFixed(1)} KB gzip)`);
+console.log(`  Budget: ${budget.landing.maxInitialJsKb} KB (${budget.landing.maxInitialJsGzipKb} KB gzip)\n`);
+
+const failures = [];
+if (kb(rawBytes) > budget.landing.maxInitialJsKb) {
+  failures.push(`initial JS is ${kb(rawBytes).toFixed(1)} KB, budget ${budget.landing.maxInitialJsKb} KB`);
+}
+if (kb(gzipBytes) > budget.landing.maxInitialJsGzipKb) {
+  failures.push(`initial JS is ${kb(gzipBytes).toFixed(1)} KB gzip, budget ${budget.landing.maxInitialJsGzipKb} KB`);
+}
+for (const name of budget.lazyOnlyChunks) {
+  const eager = initialScripts.filter((src) => src.includes(name));
+  if (eager.length > 0) {
+    failures.push(`${name} should be lazy-loaded but is in the initial bundle (${eager.join(", ")})`);
+  }
+}
+
+if (failures.length > 0) {
+  failures.forEach((failure) => console.error(`❌ ${failure}`));
+  process.exit(1);
+}
+console.log("✅ Landing page bundle is within budget");
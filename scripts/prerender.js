@@ -0,0 +1,91 @@
+import { readFileSync, writeFileSync, mkdirSync, existsSync } from "fs";
+import { fileURLToPath, pathToFileURL } from "url";
+import { dirname, resolve } from "path";
+
+/**
+ * Prerender public pages - run after the client and SSR builds (`npm run build`)
+ *
+ * Renders each route below with src/entry-server.tsx and writes the markup into
+ * the built index.html as dist/<route>/index.html, so the landing, pricing, legal
+ * and blog pages paint before any JavaScript runs; main.tsx then hydrates them.
+ * The untouched shell is kept as dist/app.html for every other route (the SPA
+ * fallback in netlify.toml).
+ */
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = dirname(__filename);
+const root = resolve(__dirname, "..");
+const distDir = resolve(root, "dist");
+const serverEntry = resolve(root, "dist-ssr", "entry-server.js");
+
+// Public routes with no per-user content; keep in sync with src/App.tsx and the
+// cache headers in netlify.toml
+const PRERENDER_ROUTES = [
+  "/",
+  "/pricing",
+  "/privacy",
+  "/terms",
+  "/blog",
+  "/blog/estimate-guide",
+  "/blog/pricing-guide",
+  "/blog/template-comparison",
+];
+
+/**
+ * Drop tags from the shell's <head> that the page sets itself through Helmet,
+ * so crawlers see one title/description/canonical per page
+ */
+function mergeHead(template, head) {
+  let html = template;
+  if (head.includes("<title")) {
+    html = html.replace(/<title>[\s\S]*?<\/title>\s*/, "");
+  }
+  for (const [, attribute, value] of head.matchAll(/<meta[^>]*\b(name|property)="([^"]+)"/g)) {
+    const escaped = value.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
+    html = html.replace(new RegExp(`\\s*<meta ${attribute}="${escaped}"[^>]*>`, "g"), "");
+  }
+  if (head.includes('rel="canonical"')) {
+    html = html.replace(/\s*<link rel="canonical"[^>]*>/, "");
+  }
+  return html.replace("</head>", `  ${head}\n  </head>`);
+}
+
+function outputPath(route) {
+  return route === "/" ? resolve(distDir, "index.html") : resolve(distDir, `.${route}`, "index.html");
+}
+
+async function main() {
+  if (!existsSync(resolve(distDir, "index.html")) || !existsSync(serverEntry)) {
+    console.error("❌ dist/index.html or dist-ssr/entry-server.js not found - run the client and SSR builds first");
+    process.exit(1);
+  }
+
+  const template = readFileSync(resolve(distDir, "index.html"), "utf8");
+  if (!template.includes('<div id="root"></div>')) {
+    console.error("❌ dist/index.html is already prerendered - rebuild before prerendering again");
+    process.exit(1);
+  }
+  writeFileSync(resolve(distDir, "app.html"), template);
+
+  const { render } = await import(pathToFileURL(serverEntry).href);
+
+  console.log("=== Prerendering public pages ===\n");
+  for (const route of PRERENDER_ROUTES) {
+    const started = performance.now();
+    const { html, head } = await render(route);
+    const page = mergeHead(template, head).replace('<div id="root"></div>', `<div id="root">${html}</div>`);
+
+    const file = outputPath(route);
+    mkdirSync(dirname(file), { recursive: true });
+    writeFileSync(file, page);
+    console.log(
+      `  ${route.padEnd(28)} ${(Buffer.byteLength(page) / 1024).toFixed(1).padStart(7)} KB  (${(performance.now() - started).toFixed(0)}ms)`
+    );
+  }
+  console.log(`\n✅ Prerendered ${PRERENDER_ROUTES.length} pages`);
+}
+
+main().catch((error) => {
+  console.error("❌ Prerender failed:", error);
+  process.exit(1);
+});
@@ -0,0 +1,132 @@
+import { sql, type SQL } from "drizzle-orm";
+
+/**
+ * estimate_monthly_rollups - per-user, per-month estimate analytics
+ *
+ * A row trigger on estimates applies each write as a delta: the old version of
+ * the estimate is subtracted from its month and the new version added, so the
+ * rollups stay current without rescanning. rebuild_estimate_rollups() recomputes
+ * them from estimates for repair or after a backfill.
+ *
+ * Line item mix uses quantity x unit price in cents (before discount), matching
+ * estimate_items; total_cents is the sum of estimates.total (after discount).
+ */
+
+export const ANALYTICS_ROLLUP_STATEMENTS: SQL[] = [
+  sql`
+    CREATE TABLE IF NOT EXISTS estimate_monthly_rollups (
+      user_id TEXT NOT NULL,
+      month DATE NOT NULL,
+      estimate_count INTEGER DEFAULT 0 NOT NULL,
+      total_cents BIGINT DEFAULT 0 NOT NULL,
+      labor_cents BIGINT DEFAULT 0 NOT NULL,
+      material_cents BIGINT DEFAULT 0 NOT NULL,
+      equipment_cents BIGINT DEFAULT 0 NOT NULL,
+      updated_at TIMESTAMP DEFAULT NOW() NOT NULL,
+      PRIMARY KEY (user_id, month)
+    );
+  `,
+  // Add (sign = 1) or remove (sign = -1) one estimate's contribution to its month
+  sql.raw(`
+    CREATE OR REPLACE FUNCTION apply_estimate_rollup(
+      p_user_id TEXT, p_created_at TIMESTAMP, p_items JSONB, p_total INTEGER, p_sign INTEGER
+    ) RETURNS void AS $$
+    BEGIN
+      INSERT INTO estimate_monthly_rollups AS r
+        (user_id, month, estimate_count, total_cents, labor_cents, material_cents, equipment_cents, updated_at)
+      SELECT
+        p_user_id,
+        date_trunc('month', p_created_at)::date,
+        p_sign,
+        p_sign * p_total,
+        p_sign * coalesce(sum(line_cents) FILTER (WHERE type = 'labor'), 0),
+        p_sign * coalesce(sum(line_cents) FILTER (WHERE type = 'material'), 0),
+        p_sign * coalesce(sum(line_cents) FILTER (WHERE type = 'equipment'), 0),
+        NOW()
+      FROM (
+        SELECT
+          item->>'type' AS type,
+          round((item->>'quantity')::numeric * round((item->>'unitPrice')::numeric * 100)) AS line_cents
+        FROM jsonb_array_elements(p_items) AS item
+      ) AS lines
+      ON CONFLICT (user_id, month) DO UPDATE SET
+        estimate_count = r.estimate_count + EXCLUDED.estimate_count,
+        total_cents = r.total_cents + EXCLUDED.total_cents,
+        labor_cents = r.labor_cents + EXCLUDED.labor_cents,
+        material_cents = r.material_cents + EXCLUDED.material_cents,
+        equipment_cents = r.equipment_cents + EXCLUDED.equipment_cents,
+        updated_at = NOW();
+    END;
+    $$ LANGUAGE plpgsql;
+  `),
+  sql.raw(`
+    CREATE OR REPLACE FUNCTION sync_estimate_rollups() RETURNS trigger AS $$
+    BEGIN
+      IF TG_OP = 'UPDATE' AND OLD.deleted_at IS NULL THEN
+        PERFORM apply_estimate_rollup(OLD.user_id, OLD.created_at, OLD.items, OLD.total, -1);
+      END IF;
+      IF NEW.deleted_at IS NULL THEN
+        PERFORM apply_estimate_rollup(NEW.user_id, NEW.created_at, NEW.items, NEW.total, 1);
+      END IF;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+  `),
+  // Recompute rollups from estimates - for one user, or everyone when p_user_id is NULL
+  sql.raw(`
+    CREATE OR REPLACE FUNCTION rebuild_estimate_rollups(p_user_id TEXT) RETURNS void AS $$
+    BEGIN
+      DELETE FROM estimate_monthly_rollups WHERE p_user_id IS NULL OR user_id = p_user_id;
+
+      INSERT INTO estimate_monthly_rollups
+        (user_id, month, estimate_count, total_cents, labor_cents, material_cents, equipment_cents, updated_at)
+      SELECT
+        e.user_id,
+        date_trunc('month', e.created_at)::date,
+        count(*),
+        sum(e.total),
+        sum(mix.labor_cents),
+        sum(mix.material_cents),
+        sum(mix.equipment_cents),
+        NOW()
+      FROM estimates e
+      CROSS JOIN LATERAL (
+        SELECT
+          coalesce(sum(line_cents) FILTER (WHERE type = 'labor'), 0) AS labor_cents,
+          coalesce(sum(line_cents) FILTER (WHERE type = 'material'), 0) AS material_cents,
+          coalesce(sum(line_cents) FILTER (WHERE type = 'equipment'), 0) AS equipment_cents
+        FROM (
+          SELECT
+            item->>'type' AS type,
+            round((item->>'quantity')::numeric * round((item->>'unitPrice')::numeric * 100)) AS line_cents
+          FROM jsonb_array_elements(e.items) AS item
+        ) AS lines
+      ) AS mix
+      WHERE e.deleted_at IS NULL AND (p_user_id IS NULL OR e.user_id = p_user_id)
+      GROUP BY 1, 2;
+    END;
+    $$ LANGUAGE plpgsql;
+  `),
+  sql`DROP TRIGGER IF EXISTS estimates_sync_rollups ON estimates`,
+  sql`
+    CREATE TRIGGER estimates_sync_rollups
+    AFTER INSERT OR UPDATE OF items, total, deleted_at, created_at, user_id ON estimates
+    FOR EACH ROW EXECUTE FUNCTION sync_estimate_rollups()
+  `,
+];
+
+/**
+ * Create the rollup table, functions and trigger (idempotent)
+ */
+export async function installAnalyticsRollups(db: { execute: (query: SQL) => Promise<unknown> }): Promise<void> {
+  for (const statement of ANALYTICS_ROLLUP_STATEMENTS) {
+    await db.execute(statement);
+  }
+}
+
+/**
+ * Recompute rollups from estimates for one user, or all users when userId is null
+ */
+export function rebuildAnalyticsRollups(userId: string | null): SQL {
+  return sql`SELECT rebuild_estimate_rollups(${userId}::text)`;
+}
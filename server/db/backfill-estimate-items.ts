@@ -0,0 +1,57 @@
+// Load environment variables first
+import * as dotenv from "dotenv";
+dotenv.config();
+
+/**
+ * Backfill estimate_items from existing estimates
+ *
+ * Installs the estimate_items table and sync trigger, then walks estimates in id
+ * order, rebuilding line items one chunk at a time so neither the script nor the
+ * database has to hold the whole table. Safe to re-run; each chunk replaces its
+ * own rows. New writes are covered by the trigger as soon as it is installed.
+ */
+
+import { db } from "./index";
+import { sql } from "drizzle-orm";
+import { installEstimateItemsSync, rebuildEstimateItemsRange } from "./estimate-items";
+
+const CHUNK_SIZE = 1000;
+
+async function backfillEstimateItems() {
+  console.log("🔧 Backfilling estimate_items...\n");
+
+  try {
+    console.log("1. Installing estimate_items table and sync trigger...");
+    await installEstimateItemsSync(db);
+    console.log("✅ Installed\n");
+
+    console.log("2. Rebuilding line items...");
+    let lastId = 0;
+    let estimatesProcessed = 0;
+
+    for (;;) {
+      // Upper bound of the next chunk of estimate ids
+      const result = await db.execute(sql`
+        SELECT max(id) AS up_to, count(*)::int AS count
+        FROM (SELECT id FROM estimates WHERE id > ${lastId} ORDER BY id LIMIT ${CHUNK_SIZE}) AS chunk
+      `);
+      const { up_to: upTo, count } = result.rows[0] as { up_to: number | null; count: number };
+      if (!upTo) break;
+
+      await db.execute(rebuildEstimateItemsRange(lastId, upTo));
+      lastId = upTo;
+      estimatesProcessed += count;
+      console.log(`   ${estimatesProcessed.toLocaleString()} estimates processed (up to id ${upTo})`);
+    }
+
+    const totals = await db.execute(sql`SELECT count(*)::int AS count FROM estimate_items`);
+    console.log(`\n✅ Backfill complete: ${(totals.rows[0] as { count: number }).count.toLocaleString()} line items`);
+    process.exit(0);
+  } catch (error) {
+    console.error("\n❌ Backfill failed:");
+    console.error(error);
+    process.exit(1);
+  }
+}
+
+backfillEstimateItems();
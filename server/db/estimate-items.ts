@@ -0,0 +1,89 @@
+import { sql, type SQL } from "drizzle-orm";
+
+/**
+ * estimate_items - line items normalized out of estimates.items
+ *
+ * A row-level trigger on estimates rebuilds an estimate's line items whenever it
+ * is inserted, its items change or it is soft-deleted. Doing this in the database
+ * keeps every write path (single create/update, batch, CSV import) in sync within
+ * the same statement, which neon-http can't otherwise guarantee without
+ * interactive transactions.
+ */
+
+// Column list, values and item expansion shared by the trigger and the backfill
+const ITEM_COLUMNS = `estimate_id, user_id, position, description, type, quantity, unit_price_cents, estimate_created_at`;
+const itemValues = (estimate: string) => `
+  ${estimate}.id,
+  ${estimate}.user_id,
+  (item.ordinality - 1)::integer,
+  item.value->>'description',
+  item.value->>'type',
+  (item.value->>'quantity')::numeric,
+  round((item.value->>'unitPrice')::numeric * 100)::integer,
+  ${estimate}.created_at`;
+const itemsOf = (estimate: string) => `jsonb_array_elements(${estimate}.items) WITH ORDINALITY AS item(value, ordinality)`;
+
+export const ESTIMATE_ITEMS_STATEMENTS: SQL[] = [
+  sql`
+    CREATE TABLE IF NOT EXISTS estimate_items (
+      id SERIAL PRIMARY KEY,
+      estimate_id INTEGER NOT NULL REFERENCES estimates(id) ON DELETE CASCADE,
+      user_id TEXT NOT NULL,
+      position INTEGER NOT NULL,
+      description TEXT NOT NULL,
+      type VARCHAR(20) NOT NULL,
+      quantity NUMERIC(12, 3) NOT NULL,
+      unit_price_cents INTEGER NOT NULL,
+      estimate_created_at TIMESTAMP NOT NULL
+    );
+  `,
+  sql`CREATE INDEX IF NOT EXISTS estimate_items_user_type_idx ON estimate_items (user_id, type, estimate_created_at)`,
+  sql`CREATE INDEX IF NOT EXISTS estimate_items_estimate_id_idx ON estimate_items (estimate_id)`,
+  sql.raw(`
+    CREATE OR REPLACE FUNCTION sync_estimate_items() RETURNS trigger AS $$
+    BEGIN
+      IF TG_OP = 'UPDATE' THEN
+        DELETE FROM estimate_items WHERE estimate_id = NEW.id;
+      END IF;
+      IF NEW.deleted_at IS NULL THEN
+        INSERT INTO estimate_items (${ITEM_COLUMNS})
+        SELECT ${itemValues("NEW")}
+        FROM ${itemsOf("NEW")};
+      END IF;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+  `),
+  sql`DROP TRIGGER IF EXISTS estimates_sync_items ON estimates`,
+  sql`
+    CREATE TRIGGER estimates_sync_items
+    AFTER INSERT OR UPDATE OF items, deleted_at, user_id ON estimates
+    FOR EACH ROW EXECUTE FUNCTION sync_estimate_items()
+  `,
+];
+
+/**
+ * Create the table, indexes and sync trigger (idempotent)
+ */
+export async function installEstimateItemsSync(db: { execute: (query: SQL) => Promise<unknown> }): Promise<void> {
+  for (const statement of ESTIMATE_ITEMS_STATEMENTS) {
+    await db.execute(statement);
+  }
+}
+
+/**
+ * Rebuild line items for estimates with ids in (afterId, upToId] in one statement
+ * Safe to re-run: existing rows for the range are replaced.
+ */
+export function rebuildEstimateItemsRange(afterId: number, upToId: number): SQL {
+  return sql`
+    WITH removed AS (
+      DELETE FROM estimate_items WHERE estimate_id > ${afterId} AND estimate_id <= ${upToId}
+    )
+    INSERT INTO estimate_items (${sql.raw(ITEM_COLUMNS)})
+    SELECT ${sql.raw(itemValues("e"))}
+    FROM estimates e
+    CROSS JOIN LATERAL ${sql.raw(itemsOf("e"))}
+    WHERE e.id > ${afterId} AND e.id <= ${upToId} AND e.deleted_at IS NULL
+  `;
+}
@@ -0,0 +1,165 @@
+import { sql, type SQL } from "drizzle-orm";
+
+/**
+ * estimate_revisions - immutable history of every estimate version
+ *
+ * A row trigger on estimates records a revision whenever the quoted content
+ * (title, client details, line items or total) changes. Most revisions store only
+ * a JSON Patch (RFC 6902) against the previous version; every
+ * ESTIMATE_REVISION_SNAPSHOT_INTERVAL-th revision, and any revision whose patch
+ * would be bigger than the document itself, stores the full document instead.
+ * Rebuilding a version therefore reads one snapshot plus fewer than
+ * ESTIMATE_REVISION_SNAPSHOT_INTERVAL patches (see server/lib/estimate-revisions.ts).
+ *
+ * Like estimate_items, doing this in the database covers every write path
+ * (single update, batch, CSV import) within the same statement.
+ *
+ * Patches are kept small by diffing line items field by field: changing one
+ * unit price stores a single `replace /items/3/unitPrice` operation.
+ * estimateRevisionPatch() in server/lib/estimate-revisions.ts produces the same
+ * operations for the diff endpoint.
+ */
+
+export const ESTIMATE_REVISION_SNAPSHOT_INTERVAL = 10;
+
+// Top-level fields of a revision document, in patch order (items are diffed separately)
+export const ESTIMATE_REVISION_FIELDS = ["title", "clientName", "clientPhone", "clientAddress", "total"] as const;
+
+const FIELD_ARRAY = `ARRAY[${ESTIMATE_REVISION_FIELDS.map((field) => `'${field}'`).join(", ")}]`;
+
+export const ESTIMATE_REVISIONS_STATEMENTS: SQL[] = [
+  sql`
+    CREATE TABLE IF NOT EXISTS estimate_revisions (
+      estimate_id INTEGER NOT NULL REFERENCES estimates(id) ON DELETE CASCADE,
+      revision INTEGER NOT NULL,
+      kind VARCHAR(10) NOT NULL,
+      data JSONB NOT NULL,
+      created_at TIMESTAMP DEFAULT NOW() NOT NULL,
+      PRIMARY KEY (estimate_id, revision)
+    );
+  `,
+  sql.raw(`
+    CREATE OR REPLACE FUNCTION estimate_revision_document(
+      p_title TEXT, p_client_name TEXT, p_client_phone TEXT, p_client_address TEXT, p_items JSONB, p_total INTEGER
+    ) RETURNS jsonb AS $$
+      SELECT jsonb_build_object(
+        'title', p_title,
+        'clientName', p_client_name,
+        'clientPhone', p_client_phone,
+        'clientAddress', p_client_address,
+        'items', p_items,
+        'total', p_total
+      );
+    $$ LANGUAGE sql IMMUTABLE;
+  `),
+  // JSON Patch from one revision document to the next
+  sql.raw(`
+    CREATE OR REPLACE FUNCTION estimate_revision_patch(p_old JSONB, p_new JSONB) RETURNS jsonb AS $$
+    DECLARE
+      ops JSONB := '[]'::jsonb;
+      field TEXT;
+      old_items JSONB := coalesce(p_old->'items', '[]'::jsonb);
+      new_items JSONB := coalesce(p_new->'items', '[]'::jsonb);
+      old_len INTEGER := jsonb_array_length(old_items);
+      new_len INTEGER := jsonb_array_length(new_items);
+      old_item JSONB;
+      new_item JSONB;
+      item_path TEXT;
+      i INTEGER;
+    BEGIN
+      FOREACH field IN ARRAY ${FIELD_ARRAY} LOOP
+        IF (p_old->field) IS DISTINCT FROM (p_new->field) THEN
+          ops := ops || jsonb_build_array(jsonb_build_object('op', 'replace', 'path', '/' || field, 'value', p_new->field));
+        END IF;
+      END LOOP;
+
+      FOR i IN 0 .. least(old_len, new_len) - 1 LOOP
+        old_item := old_items->i;
+        new_item := new_items->i;
+        CONTINUE WHEN old_item = new_item;
+        item_path := '/items/' || i;
+        IF jsonb_typeof(old_item) = 'object' AND jsonb_typeof(new_item) = 'object' THEN
+          -- Field by field, in byte order of the keys; keys are escaped per RFC 6901
+          SELECT ops || coalesce(jsonb_agg(
+            CASE
+              WHEN n.key IS NULL THEN jsonb_build_object('op', 'remove', 'path', item_path || '/' || replace(replace(o.key, '~', '~0'), '/', '~1'))
+              WHEN o.key IS NULL THEN jsonb_build_object('op', 'add', 'path', item_path || '/' || replace(replace(n.key, '~', '~0'), '/', '~1'), 'value', n.value)
+              ELSE jsonb_build_object('op', 'replace', 'path', item_path || '/' || replace(replace(n.key, '~', '~0'), '/', '~1'), 'value', n.value)
+            END
+            ORDER BY coalesce(n.key, o.key) COLLATE "C"
+          ), '[]'::jsonb)
+          INTO ops
+          FROM jsonb_each(old_item) o
+          FULL JOIN jsonb_each(new_item) n ON n.key = o.key
+          WHERE o.value IS DISTINCT FROM n.value;
+        ELSE
+          ops := ops || jsonb_build_array(jsonb_build_object('op', 'replace', 'path', item_path, 'value', new_item));
+        END IF;
+      END LOOP;
+
+      FOR i IN old_len .. new_len - 1 LOOP
+        ops := ops || jsonb_build_array(jsonb_build_object('op', 'add', 'path', '/items/' || i, 'value', new_items->i));
+      END LOOP;
+      FOR i IN REVERSE old_len - 1 .. new_len LOOP
+        ops := ops || jsonb_build_array(jsonb_build_object('op', 'remove', 'path', '/items/' || i));
+      END LOOP;
+
+      RETURN ops;
+    END;
+    $$ LANGUAGE plpgsql IMMUTABLE;
+  `),
+  sql.raw(`
+    CREATE OR REPLACE FUNCTION record_estimate_revision() RETURNS trigger AS $$
+    DECLARE
+      old_doc JSONB;
+      new_doc JSONB := estimate_revision_document(NEW.title, NEW.client_name, NEW.client_phone, NEW.client_address, NEW.items, NEW.total);
+      patch JSONB;
+      last_revision INTEGER;
+    BEGIN
+      IF TG_OP = 'INSERT' THEN
+        INSERT INTO estimate_revisions (estimate_id, revision, kind, data, created_at)
+        VALUES (NEW.id, 1, 'snapshot', new_doc, NEW.updated_at);
+        RETURN NULL;
+      END IF;
+
+      old_doc := estimate_revision_document(OLD.title, OLD.client_name, OLD.client_phone, OLD.client_address, OLD.items, OLD.total);
+      IF old_doc = new_doc THEN
+        RETURN NULL;
+      END IF;
+
+      SELECT max(revision) INTO last_revision FROM estimate_revisions WHERE estimate_id = NEW.id;
+      IF last_revision IS NULL THEN
+        -- Estimate predates revision history: keep the version being replaced first
+        INSERT INTO estimate_revisions (estimate_id, revision, kind, data, created_at)
+        VALUES (NEW.id, 1, 'snapshot', old_doc, OLD.updated_at);
+        last_revision := 1;
+      END IF;
+
+      patch := estimate_revision_patch(old_doc, new_doc);
+      IF last_revision % ${ESTIMATE_REVISION_SNAPSHOT_INTERVAL} = 0 OR octet_length(patch::text) >= octet_length(new_doc::text) THEN
+        INSERT INTO estimate_revisions (estimate_id, revision, kind, data, created_at)
+        VALUES (NEW.id, last_revision + 1, 'snapshot', new_doc, NEW.updated_at);
+      ELSE
+        INSERT INTO estimate_revisions (estimate_id, revision, kind, data, created_at)
+        VALUES (NEW.id, last_revision + 1, 'delta', patch, NEW.updated_at);
+      END IF;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+  `),
+  sql`DROP TRIGGER IF EXISTS estimates_record_revision ON estimates`,
+  sql`
+    CREATE TRIGGER estimates_record_revision
+    AFTER INSERT OR UPDATE OF title, client_name, client_phone, client_address, items, total ON estimates
+    FOR EACH ROW EXECUTE FUNCTION record_estimate_revision()
+  `,
+];
+
+/**
+ * Create the table, functions and trigger (idempotent)
+ */
+export async function installEstimateRevisions(db: { execute: (query: SQL) => Promise<unknown> }): Promise<void> {
+  for (const statement of ESTIMATE_REVISIONS_STATEMENTS) {
+    await db.execute(statement);
+  }
+}
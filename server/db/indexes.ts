@@ -0,0 +1,49 @@
+import { sql, type SQL } from "drizzle-orm";
+
+/**
+ * Estimate search expressions
+ *
+ * The query in server/lib/estimate-search.ts must use exactly these expressions
+ * for Postgres to match them to the GIN indexes below.
+ */
+const ITEM_DESCRIPTIONS = `coalesce(jsonb_path_query_array(items, '$[*].description')::text, '')`;
+
+// Plain text for trigram (fuzzy / typo tolerant) matching
+export const ESTIMATE_SEARCH_TEXT = `(coalesce(title, '') || ' ' || coalesce(client_name, '') || ' ' || coalesce(client_phone, '') || ' ' || coalesce(client_address, '') || ' ' || ${ITEM_DESCRIPTIONS})`;
+
+// Weighted full-text document: title/client outrank address, which outranks line items
+export const ESTIMATE_SEARCH_DOCUMENT = `(setweight(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(client_name, '')), 'A') || setweight(to_tsvector('simple', coalesce(client_address, '') || ' ' || coalesce(client_phone, '')), 'B') || setweight(to_tsvector('simple', ${ITEM_DESCRIPTIONS}), 'C'))`;
+
+/**
+ * Secondary indexes for the app tables
+ *
+ * These mirror the index definitions in schema.ts so databases set up with
+ * `npm run db:setup` (rather than drizzle-kit) get them too. Every statement is
+ * idempotent.
+ */
+export const INDEX_STATEMENTS: SQL[] = [
+  sql`CREATE EXTENSION IF NOT EXISTS pg_trgm`,
+  sql`CREATE INDEX IF NOT EXISTS estimates_user_created_idx ON estimates (user_id, created_at)`,
+  sql`CREATE INDEX IF NOT EXISTS estimates_user_updated_idx ON estimates (user_id, updated_at, id)`,
+  sql.raw(`CREATE INDEX IF NOT EXISTS estimates_search_document_idx ON estimates USING gin (${ESTIMATE_SEARCH_DOCUMENT})`),
+  sql.raw(`CREATE INDEX IF NOT EXISTS estimates_search_trgm_idx ON estimates USING gin (${ESTIMATE_SEARCH_TEXT} gin_trgm_ops)`),
+  // Templates may not exist yet on databases that were set up before the feature
+  sql`
+    DO $$
+    BEGIN
+      IF to_regclass('public.templates') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS templates_user_id_idx ON templates (user_id);
+      END IF;
+    END
+    $$;
+  `,
+];
+
+/**
+ * Create all secondary indexes using any Drizzle database (neon-http or node-postgres)
+ */
+export async function createIndexes(db: { execute: (query: SQL) => Promise<unknown> }): Promise<void> {
+  for (const statement of INDEX_STATEMENTS) {
+    await db.execute(statement);
+  }
+}
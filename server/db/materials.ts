@@ -0,0 +1,49 @@
+import { sql, type SQL } from "drizzle-orm";
+
+/**
+ * materials - per-user price catalog behind line item autocomplete
+ *
+ * One row per distinct item name (case-insensitive) per user. Rows are created
+ * from the catalog API and learned from saved estimates, so a price typed once is
+ * offered on every later estimate.
+ *
+ * Indexes for the autocomplete query in server/lib/materials-catalog.ts:
+ * - materials_user_name_idx: unique (user_id, lower(name)) with text_pattern_ops,
+ *   which serves both the upsert conflict target and `lower(name) LIKE 'prefix%'`
+ * - materials_name_trgm_idx: trigrams on lower(name) for substring and typo matches
+ * - materials_user_recent_idx: the most recently used items per user (cache loads)
+ */
+
+// Expression shared by the indexes and the autocomplete query; they must match exactly
+export const MATERIAL_NAME_KEY = `lower(name)`;
+
+export const MATERIALS_STATEMENTS: SQL[] = [
+  sql`CREATE EXTENSION IF NOT EXISTS pg_trgm`,
+  sql`
+    CREATE TABLE IF NOT EXISTS materials (
+      id SERIAL PRIMARY KEY,
+      user_id TEXT NOT NULL,
+      name VARCHAR(255) NOT NULL,
+      type VARCHAR(20) NOT NULL,
+      unit_price_cents INTEGER NOT NULL,
+      use_count INTEGER DEFAULT 0 NOT NULL,
+      last_used_at TIMESTAMP DEFAULT NOW() NOT NULL,
+      created_at TIMESTAMP DEFAULT NOW() NOT NULL,
+      updated_at TIMESTAMP DEFAULT NOW() NOT NULL
+    );
+  `,
+  sql.raw(
+    `CREATE UNIQUE INDEX IF NOT EXISTS materials_user_name_idx ON materials (user_id, ${MATERIAL_NAME_KEY} text_pattern_ops)`
+  ),
+  sql.raw(`CREATE INDEX IF NOT EXISTS materials_name_trgm_idx ON materials USING gin (${MATERIAL_NAME_KEY} gin_trgm_ops)`),
+  sql`CREATE INDEX IF NOT EXISTS materials_user_recent_idx ON materials (user_id, last_used_at)`,
+];
+
+/**
+ * Create the table and its indexes (idempotent)
+ */
+export async function installMaterialsCatalog(db: { execute: (query: SQL) => Promise<unknown> }): Promise<void> {
+  for (const statement of MATERIALS_STATEMENTS) {
+    await db.execute(statement);
+  }
+}
@@ -0,0 +1,64 @@
+import { and, desc, eq, isNull, sql } from "drizzle-orm";
+import { db } from "./index";
+import { estimates, settings, user } from "./schema";
+
+/**
+ * Prepared statements for the queries run on almost every request
+ *
+ * A query built inline (`db.select().from(...).where(...)`) allocates the builder
+ * chain and serializes it to SQL on every call. These are built and serialized
+ * once, when the module loads; a call only binds its parameters. Results have the
+ * same shape as the inline queries they replace (arrays of full rows).
+ *
+ * Measured by `npm run bench:queries` (server/query-benchmark.ts).
+ */
+
+/**
+ * A user row by ID - subscription checks and usage tracking
+ * Params: { userId }
+ */
+export const selectUserById = db
+  .select()
+  .from(user)
+  .where(eq(user.id, sql.placeholder("userId")))
+  .limit(1)
+  .prepare("select_user_by_id");
+
+/**
+ * A user's settings row (none until first saved)
+ * Params: { userId }
+ */
+export const selectSettingsByUser = db
+  .select()
+  .from(settings)
+  .where(eq(settings.userId, sql.placeholder("userId")))
+  .limit(1)
+  .prepare("select_settings_by_user");
+
+/**
+ * One live estimate, only if it belongs to the user
+ * Params: { estimateId, userId }
+ */
+export const selectEstimateForUser = db
+  .select()
+  .from(estimates)
+  .where(
+    and(
+      eq(estimates.id, sql.placeholder("estimateId")),
+      eq(estimates.userId, sql.placeholder("userId")),
+      isNull(estimates.deletedAt)
+    )
+  )
+  .limit(1)
+  .prepare("select_estimate_for_user");
+
+/**
+ * A user's live estimates, newest first
+ * Params: { userId }
+ */
+export const selectEstimatesByUser = db
+  .select()
+  .from(estimates)
+  .where(and(eq(estimates.userId, sql.placeholder("userId")), isNull(estimates.deletedAt)))
+  .orderBy(desc(estimates.createdAt))
+  .prepare("select_estimates_by_user");
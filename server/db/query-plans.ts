@@ -0,0 +1,317 @@
+// Load environment variables first
+import * as dotenv from "dotenv";
+dotenv.config();
+
+/**
+ * Query plan regression suite
+ *
+ * Seeds a local Postgres with millions of estimates, then runs EXPLAIN ANALYZE on
+ * the hot queries from server/index.ts and fails if any of them falls back to a
+ * sequential scan or a search query exceeds its latency budget.
+ *
+ * Uses node-postgres against BENCH_DATABASE_URL (a local scratch database - never
+ * point this at production). Row counts can be tuned with BENCH_ESTIMATE_ROWS and
+ * BENCH_USERS.
+ *
+ *   BENCH_DATABASE_URL=postgres://localhost/roofing_bench npm run db:query-plans
+ */
+
+import { Pool } from "pg";
+import { drizzle } from "drizzle-orm/node-postgres";
+import { and, asc, desc, eq, gt, isNull, or, sql } from "drizzle-orm";
+import { estimates, materials, settings, templates } from "./schema";
+import { createIndexes, ESTIMATE_SEARCH_DOCUMENT, ESTIMATE_SEARCH_TEXT } from "./indexes";
+import { installMaterialsCatalog, MATERIAL_NAME_KEY } from "./materials";
+
+const connectionString = process.env.BENCH_DATABASE_URL;
+const ESTIMATE_ROWS = Number(process.env.BENCH_ESTIMATE_ROWS || 2_000_000);
+const USERS = Number(process.env.BENCH_USERS || 20_000);
+const TEMPLATES_PER_USER = 5;
+const MATERIALS_PER_USER = 20;
+const SEARCH_LATENCY_BUDGET_MS = 50;
+
+if (!connectionString) {
+  console.error("❌ BENCH_DATABASE_URL environment variable is not set");
+  process.exit(1);
+}
+
+const pool = new Pool({ connectionString });
+const db = drizzle(pool);
+
+type PlanNode = {
+  "Node Type": string;
+  "Relation Name"?: string;
+  "Index Name"?: string;
+  Plans?: PlanNode[];
+};
+
+/**
+ * Create the app tables (same DDL as setup.ts) plus indexes
+ */
+async function createTables() {
+  await db.execute(sql`
+    CREATE TABLE IF NOT EXISTS estimates (
+      id SERIAL PRIMARY KEY,
+      user_id TEXT NOT NULL,
+      title VARCHAR(255) NOT NULL,
+      client_name VARCHAR(255) NOT NULL,
+      client_phone VARCHAR(50),
+      client_address TEXT,
+      items JSONB NOT NULL,
+      total INTEGER NOT NULL,
+      created_at TIMESTAMP DEFAULT NOW() NOT NULL,
+      updated_at TIMESTAMP DEFAULT NOW() NOT NULL,
+      deleted_at TIMESTAMP
+    );
+  `);
+  await db.execute(sql`
+    CREATE TABLE IF NOT EXISTS templates (
+      id SERIAL PRIMARY KEY,
+      user_id TEXT NOT NULL,
+      name VARCHAR(255) NOT NULL,
+      equipment_cost INTEGER NOT NULL,
+      materials_cost INTEGER NOT NULL,
+      labor_hours INTEGER NOT NULL,
+      labor_rate INTEGER NOT NULL,
+      discount_percent INTEGER DEFAULT 0 NOT NULL,
+      created_at TIMESTAMP DEFAULT NOW() NOT NULL,
+      updated_at TIMESTAMP DEFAULT NOW() NOT NULL
+    );
+  `);
+  await db.execute(sql`
+    CREATE TABLE IF NOT EXISTS settings (
+      id SERIAL PRIMARY KEY,
+      user_id TEXT NOT NULL UNIQUE,
+      company_logo VARCHAR(500),
+      company_name VARCHAR(255),
+      pdf_template VARCHAR(500),
+      created_at TIMESTAMP DEFAULT NOW() NOT NULL,
+      updated_at TIMESTAMP DEFAULT NOW() NOT NULL
+    );
+  `);
+  await createIndexes(db);
+  await installMaterialsCatalog(db);
+}
+
+/**
+ * Seed rows with generate_series so millions of rows load in seconds
+ * Skipped when the tables already hold enough data from a previous run.
+ */
+async function seed() {
+  await seedMaterials();
+
+  const { rows } = await pool.query("SELECT count(*)::int AS count FROM estimates");
+  if (rows[0].count >= ESTIMATE_ROWS) {
+    console.log(`   Reusing ${rows[0].count.toLocaleString()} existing estimates`);
+    return;
+  }
+
+  console.log(`   Seeding ${ESTIMATE_ROWS.toLocaleString()} estimates for ${USERS.toLocaleString()} users...`);
+  await pool.query("TRUNCATE estimates, templates, settings RESTART IDENTITY");
+  await pool.query(
+    `INSERT INTO estimates (user_id, title, client_name, client_address, items, total, created_at, updated_at, deleted_at)
+     SELECT
+       'bench-user-' || (n % $2),
+       'Estimate ' || n,
+       'Client ' || n,
+       n || ' Main St',
+       '[{"description":"Shingles","quantity":10,"unitPrice":30,"type":"material"}]'::jsonb,
+       30000,
+       NOW() - (n || ' seconds')::interval,
+       NOW() - (n || ' seconds')::interval,
+       CASE WHEN n % 20 = 0 THEN NOW() ELSE NULL END
+     FROM generate_series(1, $1) AS n`,
+    [ESTIMATE_ROWS, USERS]
+  );
+  await pool.query(
+    `INSERT INTO templates (user_id, name, equipment_cost, materials_cost, labor_hours, labor_rate)
+     SELECT 'bench-user-' || (n % $1), 'Template ' || n, 10000, 50000, 8, 7500
+     FROM generate_series(1, $1 * $2) AS n`,
+    [USERS, TEMPLATES_PER_USER]
+  );
+  await pool.query(
+    `INSERT INTO settings (user_id, company_name)
+     SELECT 'bench-user-' || n, 'Company ' || n
+     FROM generate_series(0, $1 - 1) AS n`,
+    [USERS]
+  );
+  await pool.query("ANALYZE estimates; ANALYZE templates; ANALYZE settings;");
+}
+
+/**
+ * Materials catalog rows, seeded separately so older bench databases pick them up
+ */
+async function seedMaterials() {
+  const { rows } = await pool.query("SELECT count(*)::int AS count FROM materials");
+  if (rows[0].count >= USERS * MATERIALS_PER_USER) {
+    return;
+  }
+
+  console.log(`   Seeding ${(USERS * MATERIALS_PER_USER).toLocaleString()} catalog materials...`);
+  await pool.query("TRUNCATE materials RESTART IDENTITY");
+  await pool.query(
+    `INSERT INTO materials (user_id, name, type, unit_price_cents, use_count, last_used_at)
+     SELECT
+       'bench-user-' || (n % $1),
+       (ARRAY['Architectural shingles', 'Drip edge', 'Ice and water shield', 'Ridge vent', 'Step flashing'])[1 + n % 5] || ' ' || n,
+       'material',
+       1000 + n % 9000,
+       n % 50,
+       NOW() - (n || ' seconds')::interval
+     FROM generate_series(1, $1 * $2) AS n`,
+    [USERS, MATERIALS_PER_USER]
+  );
+  await pool.query("ANALYZE materials;");
+}
+
+/**
+ * The hot queries, built the same way server/index.ts and server/lib build them
+ */
+function hotQueries(userId: string) {
+  const since = new Date(Date.now() - 24 * 60 * 60 * 1000);
+
+  return {
+    "GET /api/estimates (list)": db
+      .select()
+      .from(estimates)
+      .where(and(eq(estimates.userId, userId), isNull(estimates.deletedAt)))
+      .orderBy(desc(estimates.createdAt)),
+    "GET /api/estimates/:id (ownership check)": db
+      .select()
+      .from(estimates)
+      .where(and(eq(estimates.id, 12345), eq(estimates.userId, userId), isNull(estimates.deletedAt)))
+      .limit(1),
+    "GET /api/estimates/changes": db
+      .select()
+      .from(estimates)
+      .where(
+        and(
+          eq(estimates.userId, userId),
+          or(gt(estimates.updatedAt, since), and(eq(estimates.updatedAt, since), gt(estimates.id, 0)))
+        )
+      )
+      .orderBy(asc(estimates.updatedAt), asc(estimates.id))
+      .limit(501),
+    "GET /api/estimates/export (chunk)": db
+      .select()
+      .from(estimates)
+      .where(and(eq(estimates.userId, userId), isNull(estimates.deletedAt), gt(estimates.id, 0)))
+      .orderBy(asc(estimates.id))
+      .limit(500),
+    "GET /api/estimates/search (prefix)": searchQuery(userId, "client 4"),
+    "GET /api/estimates/search (typo)": searchQuery(userId, "Cleint"),
+    "GET /api/templates": db
+      .select()
+      .from(templates)
+      .where(eq(templates.userId, userId))
+      .orderBy(desc(templates.createdAt)),
+    "POST /api/templates (limit check)": db.select().from(templates).where(eq(templates.userId, userId)),
+    "GET /api/settings": db.select().from(settings).where(eq(settings.userId, userId)).limit(1),
+    "GET /api/materials/autocomplete (cache load)": db
+      .select()
+      .from(materials)
+      .where(eq(materials.userId, userId))
+      .orderBy(desc(materials.lastUsedAt))
+      .limit(501),
+    "GET /api/materials/autocomplete (prefix)": materialsQuery(userId, "drip"),
+    "GET /api/materials/autocomplete (typo)": materialsQuery(userId, "shingels"),
+  };
+}
+
+/**
+ * Same shape as the database fallback in server/lib/materials-catalog.ts
+ */
+function materialsQuery(userId: string, key: string) {
+  const nameKey = sql.raw(MATERIAL_NAME_KEY);
+  const prefixMatch = sql`${nameKey} LIKE ${`${key}%`}`;
+
+  return db
+    .select()
+    .from(materials)
+    .where(and(eq(materials.userId, userId), or(prefixMatch, sql`${key} <% ${nameKey}`)))
+    .orderBy(desc(prefixMatch), desc(sql`word_similarity(${key}, ${nameKey})`), desc(materials.useCount))
+    .limit(8);
+}
+
+/**
+ * Same shape as searchEstimates() in server/lib/estimate-search.ts
+ */
+function searchQuery(userId: string, text: string) {
+  const tsQuery = text.toLowerCase().split(/[^\p{L}\p{N}]+/u).filter(Boolean).map((word) => `${word}:*`).join(" & ");
+  const searchDocument = sql.raw(ESTIMATE_SEARCH_DOCUMENT);
+  const searchText = sql.raw(ESTIMATE_SEARCH_TEXT);
+
+  return db
+    .select()
+    .from(estimates)
+    .where(
+      and(
+        eq(estimates.userId, userId),
+        isNull(estimates.deletedAt),
+        or(sql`${searchDocument} @@ to_tsquery('simple', ${tsQuery})`, sql`${text} <% ${searchText}`)
+      )
+    )
+    .orderBy(
+      desc(sql`ts_rank(${searchDocument}, to_tsquery('simple', ${tsQuery})) + word_similarity(${text}, ${searchText})`),
+      desc(estimates.createdAt)
+    )
+    .limit(50);
+}
+
+function findSeqScans(node: PlanNode, found: string[] = []): string[] {
+  if (node["Node Type"] === "Seq Scan") {
+    found.push(node["Relation Name"] || "unknown");
+  }
+  node.Plans?.forEach((child) => findSeqScans(child, found));
+  return found;
+}
+
+async function runQueryPlans() {
+  console.log("🔬 Query plan regression suite\n");
+
+  let failures = 0;
+
+  try {
+    console.log("1. Preparing tables...");
+    await createTables();
+    await seed();
+    console.log("✅ Data ready\n");
+
+    console.log("2. Running EXPLAIN ANALYZE on hot queries...");
+    const queries = hotQueries("bench-user-42");
+
+    for (const [name, query] of Object.entries(queries)) {
+      const { sql: text, params } = query.toSQL();
+      const { rows } = await pool.query(`EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ${text}`, params);
+      const [{ Plan: plan, "Execution Time": executionTime }] = rows[0]["QUERY PLAN"];
+      const seqScans = findSeqScans(plan);
+
+      if (seqScans.length > 0) {
+        failures++;
+        console.error(`❌ ${name}: sequential scan on ${seqScans.join(", ")} (${executionTime.toFixed(2)}ms)`);
+      } else if (/\/search|\/autocomplete/.test(name) && executionTime > SEARCH_LATENCY_BUDGET_MS) {
+        failures++;
+        console.error(`❌ ${name}: ${executionTime.toFixed(2)}ms exceeds the ${SEARCH_LATENCY_BUDGET_MS}ms budget`);
+      } else {
+        const indexName = plan["Index Name"] || plan.Plans?.[0]?.["Index Name"] || plan["Node Type"];
+        console.log(`✅ ${name}: ${executionTime.toFixed(2)}ms via ${indexName}`);
+      }
+    }
+  } catch (error) {
+    console.error("\n❌ Query plan suite failed:");
+    console.error(error);
+    await pool.end();
+    process.exit(1);
+  }
+
+  await pool.end();
+
+  if (failures > 0) {
+    console.error(`\n❌ ${failures} hot ${failures === 1 ? "query" : "queries"} failed the plan checks`);
+    process.exit(1);
+  }
+  console.log("\n✅ All hot queries use indexes");
+  process.exit(0);
+}
+
+runQueryPlans();
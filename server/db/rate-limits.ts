@@ -0,0 +1,56 @@
+import { sql, type SQL } from "drizzle-orm";
+
+/**
+ * rate_limit_buckets - token buckets shared by every server instance
+ *
+ * Only used when RATE_LIMIT_BACKEND=postgres (see server/lib/rate-limit.ts);
+ * the default in-memory buckets need no tables. take_rate_limit_tokens() refills
+ * and spends a bucket in one round trip: the upsert locks the row, so concurrent
+ * requests for the same key are applied one after the other.
+ *
+ * A bucket left alone long enough to refill completely is the same as a missing
+ * one, so idle rows can be deleted at any time without changing any decision.
+ */
+
+export const RATE_LIMIT_STATEMENTS: SQL[] = [
+  sql`
+    CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+      key TEXT PRIMARY KEY,
+      tokens DOUBLE PRECISION NOT NULL,
+      updated_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
+    );
+  `,
+  sql`CREATE INDEX IF NOT EXISTS rate_limit_buckets_updated_at_idx ON rate_limit_buckets (updated_at)`,
+  sql.raw(`
+    CREATE OR REPLACE FUNCTION take_rate_limit_tokens(
+      p_key TEXT, p_capacity DOUBLE PRECISION, p_refill_per_second DOUBLE PRECISION, p_cost DOUBLE PRECISION
+    ) RETURNS TABLE (allowed BOOLEAN, remaining DOUBLE PRECISION) AS $$
+    DECLARE
+      available DOUBLE PRECISION;
+    BEGIN
+      INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at)
+      VALUES (p_key, p_capacity, clock_timestamp())
+      ON CONFLICT (key) DO UPDATE SET
+        tokens = least(p_capacity, b.tokens + extract(epoch FROM clock_timestamp() - b.updated_at) * p_refill_per_second),
+        updated_at = clock_timestamp()
+      RETURNING b.tokens INTO available;
+
+      IF available >= p_cost THEN
+        UPDATE rate_limit_buckets SET tokens = available - p_cost WHERE key = p_key;
+        RETURN QUERY SELECT true, available - p_cost;
+      ELSE
+        RETURN QUERY SELECT false, available;
+      END IF;
+    END;
+    $$ LANGUAGE plpgsql;
+  `),
+];
+
+/**
+ * Create the table and function (idempotent)
+ */
+export async function installRateLimits(db: { execute: (query: SQL) => Promise<unknown> }): Promise<void> {
+  for (const statement of RATE_LIMIT_STATEMENTS) {
+    await db.execute(statement);
+  }
+}
@@ -0,0 +1,39 @@
+// Load environment variables first
+import * as dotenv from "dotenv";
+dotenv.config();
+
+/**
+ * Rebuild analytics rollups from estimates
+ *
+ * Installs the rollup table, functions and trigger, then recomputes every user's
+ * monthly rollups in one statement. Pass a user ID to rebuild just that user:
+ *
+ *   npm run db:rebuild-analytics -- <userId>
+ */
+
+import { db } from "./index";
+import { sql } from "drizzle-orm";
+import { installAnalyticsRollups, rebuildAnalyticsRollups } from "./analytics-rollups";
+
+async function rebuildAnalytics() {
+  const userId = process.argv[2] || null;
+  console.log(`🔧 Rebuilding analytics rollups${userId ? ` for ${userId}` : " for all users"}...\n`);
+
+  try {
+    console.log("1. Installing rollup table and sync trigger...");
+    await installAnalyticsRollups(db);
+    console.log("✅ Installed\n");
+
+    console.log("2. Recomputing rollups...");
+    await db.execute(rebuildAnalyticsRollups(userId));
+    const result = await db.execute(sql`SELECT count(*)::int AS count FROM estimate_monthly_rollups`);
+    console.log(`✅ Rebuild complete: ${(result.rows[0] as { count: number }).count.toLocaleString()} monthly rollups`);
+    process.exit(0);
+  } catch (error) {
+    console.error("\n❌ Rebuild failed:");
+    console.error(error);
+    process.exit(1);
+  }
+}
+
+rebuildAnalytics();
@@ -6,10 +6,18 @@ import {
   timestamp,
   serial,
   integer,
+  bigint,
+  numeric,
+  date,
   boolean,
+  doublePrecision,
   index,
+  uniqueIndex,
+  primaryKey,
 } from "drizzle-orm/pg-core";
-import { relations } from "drizzle-orm";
+import { relations, sql } from "drizzle-orm";
+import { ESTIMATE_SEARCH_DOCUMENT, ESTIMATE_SEARCH_TEXT } from "./indexes";
+import { MATERIAL_NAME_KEY } from "./materials";
 
 // Better-Auth tables (generated by Better-Auth CLI)
 export const user = pgTable("user", {
@@ -114,45 +122,154 @@ export const accountRelations = relations(account, ({ one }) => ({
 }));
 
 // Estimate table
-export const estimates = pgTable("estimates", {
-  id: serial("id").primaryKey(),
-  userId: text("user_id").notNull(), // References Better-Auth's user.id
-  title: varchar("title", { length: 255 }).notNull(),
-  clientName: varchar("client_name", { length: 255 }).notNull(),
-  clientPhone: varchar("client_phone", { length: 50 }),
-  clientAddress: text("client_address"),
-  items: jsonb("items").notNull().$type<
-    Array<{
-      description: string;
-      quantity: number;
-      unitPrice: number;
-      type: "labor" | "material" | "equipment";
-    }>
-  >(),
-  total: integer("total").notNull(), // Stored in cents
-  createdAt: timestamp("created_at").defaultNow().notNull(),
-  updatedAt: timestamp("updated_at").defaultNow().notNull(),
-});
+export const estimates = pgTable(
+  "estimates",
+  {
+    id: serial("id").primaryKey(),
+    userId: text("user_id").notNull(), // References Better-Auth's user.id
+    title: varchar("title", { length: 255 }).notNull(),
+    clientName: varchar("client_name", { length: 255 }).notNull(),
+    clientPhone: varchar("client_phone", { length: 50 }),
+    clientAddress: text("client_address"),
+    items: jsonb("items").notNull().$type<
+      Array<{
+        description: string;
+        quantity: number;
+        unitPrice: number;
+        type: "labor" | "material" | "equipment";
+      }>
+    >(),
+    total: integer("total").notNull(), // Stored in cents
+    createdAt: timestamp("created_at").defaultNow().notNull(),
+    updatedAt: timestamp("updated_at").defaultNow().notNull(),
+    deletedAt: timestamp("deleted_at"), // Soft-delete tombstone for the change feed
+  },
+  (table) => [
+    // Estimate list (newest first) and per-user lookups
+    index("estimates_user_created_idx").on(table.userId, table.createdAt),
+    // Change feed keyset: (updated_at, id) after the client's cursor
+    index("estimates_user_updated_idx").on(table.userId, table.updatedAt, table.id),
+    // Search: ranked full-text with prefix matching, plus trigrams for typos (needs pg_trgm)
+    index("estimates_search_document_idx").using("gin", sql.raw(ESTIMATE_SEARCH_DOCUMENT)),
+    index("estimates_search_trgm_idx").using("gin", sql.raw(`${ESTIMATE_SEARCH_TEXT} gin_trgm_ops`)),
+  ]
+);
+
+// Line items normalized out of estimates.items for aggregate queries
+// Maintained by a database trigger on estimates (see server/db/estimate-items.ts)
+export const estimateItems = pgTable(
+  "estimate_items",
+  {
+    id: serial("id").primaryKey(),
+    estimateId: integer("estimate_id")
+      .notNull()
+      .references(() => estimates.id, { onDelete: "cascade" }),
+    userId: text("user_id").notNull(),
+    position: integer("position").notNull(), // Index within estimates.items
+    description: text("description").notNull(),
+    type: varchar("type", { length: 20 }).notNull().$type<"labor" | "material" | "equipment">(),
+    quantity: numeric("quantity", { precision: 12, scale: 3 }).notNull(),
+    unitPriceCents: integer("unit_price_cents").notNull(), // Stored in cents
+    estimateCreatedAt: timestamp("estimate_created_at").notNull(), // Copied from the estimate for date-range aggregates
+  },
+  (table) => [
+    index("estimate_items_user_type_idx").on(table.userId, table.type, table.estimateCreatedAt),
+    index("estimate_items_estimate_id_idx").on(table.estimateId),
+  ]
+);
+
+// Immutable estimate history: snapshots plus JSON Patch deltas, written by a
+// database trigger on estimates (see server/db/estimate-revisions.ts)
+export const estimateRevisions = pgTable(
+  "estimate_revisions",
+  {
+    estimateId: integer("estimate_id")
+      .notNull()
+      .references(() => estimates.id, { onDelete: "cascade" }),
+    revision: integer("revision").notNull(), // 1 for the estimate as created
+    kind: varchar("kind", { length: 10 }).notNull().$type<"snapshot" | "delta">(),
+    data: jsonb("data").notNull(), // Full document for snapshots, JSON Patch operations for deltas
+    createdAt: timestamp("created_at").defaultNow().notNull(),
+  },
+  (table) => [primaryKey({ columns: [table.estimateId, table.revision] })]
+);
+
+// Token buckets for the shared rate limiter backend (RATE_LIMIT_BACKEND=postgres);
+// spent through take_rate_limit_tokens() in server/db/rate-limits.ts
+export const rateLimitBuckets = pgTable(
+  "rate_limit_buckets",
+  {
+    key: text("key").primaryKey(), // "<policy>:user:<id>" or "<policy>:ip:<address>"
+    tokens: doublePrecision("tokens").notNull(),
+    updatedAt: timestamp("updated_at", { withTimezone: true }).defaultNow().notNull(),
+  },
+  (table) => [index("rate_limit_buckets_updated_at_idx").on(table.updatedAt)]
+);
+
+// Per-user monthly analytics, updated incrementally by a trigger on estimates
+// (see server/db/analytics-rollups.ts)
+export const estimateMonthlyRollups = pgTable(
+  "estimate_monthly_rollups",
+  {
+    userId: text("user_id").notNull(),
+    month: date("month", { mode: "string" }).notNull(), // First day of the month (YYYY-MM-01)
+    estimateCount: integer("estimate_count").default(0).notNull(),
+    totalCents: bigint("total_cents", { mode: "number" }).default(0).notNull(), // Sum of estimate totals
+    laborCents: bigint("labor_cents", { mode: "number" }).default(0).notNull(), // Line item value by type
+    materialCents: bigint("material_cents", { mode: "number" }).default(0).notNull(),
+    equipmentCents: bigint("equipment_cents", { mode: "number" }).default(0).notNull(),
+    updatedAt: timestamp("updated_at").defaultNow().notNull(),
+  },
+  (table) => [primaryKey({ columns: [table.userId, table.month] })]
+);
 
 // Templates table for saved estimate templates (paid users only)
-export const templates = pgTable("templates", {
-  id: serial("id").primaryKey(),
-  userId: text("user_id").notNull(), // References Better-Auth's user.id
-  name: varchar("name", { length: 255 }).notNull(),
-  equipmentCost: integer("equipment_cost").notNull(), // Stored in cents
-  materialsCost: integer("materials_cost").notNull(), // Stored in cents
-  laborHours: integer("labor_hours").notNull(),
-  laborRate: integer("labor_rate").notNull(), // Stored in cents per hour
-  discountPercent: integer("discount_percent").default(0).notNull(),
-  createdAt: timestamp("created_at").defaultNow().notNull(),
-  updatedAt: timestamp("updated_at").defaultNow().notNull(),
-});
+export const templates = pgTable(
+  "templates",
+  {
+    id: serial("id").primaryKey(),
+    userId: text("user_id").notNull(), // References Better-Auth's user.id
+    name: varchar("name", { length: 255 }).notNull(),
+    equipmentCost: integer("equipment_cost").notNull(), // Stored in cents
+    materialsCost: integer("materials_cost").notNull(), // Stored in cents
+    laborHours: integer("labor_hours").notNull(),
+    laborRate: integer("labor_rate").notNull(), // Stored in cents per hour
+    discountPercent: integer("discount_percent").default(0).notNull(),
+    createdAt: timestamp("created_at").defaultNow().notNull(),
+    updatedAt: timestamp("updated_at").defaultNow().notNull(),
+  },
+  (table) => [index("templates_user_id_idx").on(table.userId)]
+);
+
+// Materials price catalog for line item autocomplete (see server/db/materials.ts)
+export const materials = pgTable(
+  "materials",
+  {
+    id: serial("id").primaryKey(),
+    userId: text("user_id").notNull(), // References Better-Auth's user.id
+    name: varchar("name", { length: 255 }).notNull(),
+    type: varchar("type", { length: 20 }).notNull().$type<"labor" | "material" | "equipment">(),
+    unitPriceCents: integer("unit_price_cents").notNull(), // Stored in cents
+    useCount: integer("use_count").default(0).notNull(), // Saved estimates that included this item
+    lastUsedAt: timestamp("last_used_at").defaultNow().notNull(),
+    createdAt: timestamp("created_at").defaultNow().notNull(),
+    updatedAt: timestamp("updated_at").defaultNow().notNull(),
+  },
+  (table) => [
+    // Unique name per user, and prefix matching (LIKE 'abc%') for autocomplete
+    uniqueIndex("materials_user_name_idx").on(table.userId, sql.raw(`${MATERIAL_NAME_KEY} text_pattern_ops`)),
+    // Substring and typo matches (needs pg_trgm)
+    index("materials_name_trgm_idx").using("gin", sql.raw(`${MATERIAL_NAME_KEY} gin_trgm_ops`)),
+    index("materials_user_recent_idx").on(table.userId, table.lastUsedAt),
+  ]
+);
 
 // Settings table (can be merged into users, but keeping separate for clarity)
 export const settings = pgTable("settings", {
   id: serial("id").primaryKey(),
   userId: text("user_id").notNull().unique(), // References Better-Auth's user.id
-  companyLogo: varchar("company_logo", { length: 500 }),
+  companyLogo: varchar("company_logo", { length: 500 }), // Normalized PNG/JPEG sized for the PDF header
+  companyLogoThumbnail: varchar("company_logo_thumbnail", { length: 500 }), // Small WebP for the settings page
   companyName: varchar("company_name", { length: 255 }),
   pdfTemplate: varchar("pdf_template", { length: 500 }), // Path to PDF template file
   createdAt: timestamp("created_at").defaultNow().notNull(),
@@ -183,7 +300,12 @@ export const templatesRelations = relations(templates, ({ one }) => ({
 
 export type Estimate = typeof estimates.$inferSelect;
 export type NewEstimate = typeof estimates.$inferInsert;
+export type EstimateItemRow = typeof estimateItems.$inferSelect;
+export type EstimateRevision = typeof estimateRevisions.$inferSelect;
+export type EstimateMonthlyRollup = typeof estimateMonthlyRollups.$inferSelect;
 export type Settings = typeof settings.$inferSelect;
 export type NewSettings = typeof settings.$inferInsert;
+export type Material = typeof materials.$inferSelect;
+export type NewMaterial = typeof materials.$inferInsert;
 export type Template = typeof templates.$inferSelect;
 export type NewTemplate = typeof templates.$inferInsert;
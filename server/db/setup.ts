@@ -13,6 +13,13 @@ dotenv.config();
 import { db } from "./index";
 import { estimates, settings } from "./schema";
 import { sql } from "drizzle-orm";
+import { createIndexes } from "./indexes";
+import { installEstimateItemsSync } from "./estimate-items";
+import { installAnalyticsRollups } from "./analytics-rollups";
+import { installMaterialsCatalog } from "./materials";
+import { installEstimateRevisions } from "./estimate-revisions";
+import { installRateLimits } from "./rate-limits";
+import { installUploadReleases } from "./upload-releases";
 
 async function setupDatabase() {
   console.log("🔧 Setting up database...\n");
@@ -36,9 +43,12 @@ async function setupDatabase() {
         items JSONB NOT NULL,
         total INTEGER NOT NULL,
         created_at TIMESTAMP DEFAULT NOW() NOT NULL,
-        updated_at TIMESTAMP DEFAULT NOW() NOT NULL
+        updated_at TIMESTAMP DEFAULT NOW() NOT NULL,
+        deleted_at TIMESTAMP
       );
     `);
+    // Older databases were created before soft deletes existed
+    await db.execute(sql`ALTER TABLE estimates ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP;`);
     console.log("✅ Estimates table created/verified\n");
 
     // Create settings table if it doesn't exist
@@ -53,10 +63,47 @@ async function setupDatabase() {
         updated_at TIMESTAMP DEFAULT NOW() NOT NULL
       );
     `);
+    // Logo thumbnails were added with upload-time logo normalization
+    await db.execute(sql`ALTER TABLE settings ADD COLUMN IF NOT EXISTS company_logo_thumbnail VARCHAR(500);`);
     console.log("✅ Settings table created/verified\n");
 
+    // Create indexes for the per-user queries
+    console.log("4. Creating indexes...");
+    await createIndexes(db);
+    console.log("✅ Indexes created/verified\n");
+
+    // Normalized line items, kept in sync with estimates.items by a trigger
+    console.log("5. Creating estimate_items table and sync trigger...");
+    await installEstimateItemsSync(db);
+    console.log("✅ estimate_items created/verified (run db:backfill-items for existing estimates)\n");
+
+    // Monthly analytics rollups, updated incrementally by a trigger
+    console.log("6. Creating analytics rollups and sync trigger...");
+    await installAnalyticsRollups(db);
+    console.log("✅ Analytics rollups created/verified (run db:rebuild-analytics for existing estimates)\n");
+
+    // Per-user price catalog for line item autocomplete
+    console.log("7. Creating materials catalog...");
+    await installMaterialsCatalog(db);
+    console.log("✅ Materials catalog created/verified\n");
+
+    // Revision history, recorded by a trigger on every content change
+    console.log("8. Creating estimate revisions and trigger...");
+    await installEstimateRevisions(db);
+    console.log("✅ Estimate revisions created/verified\n");
+
+    // Shared token buckets, used when RATE_LIMIT_BACKEND=postgres
+    console.log("9. Creating rate limit buckets...");
+    await installRateLimits(db);
+    console.log("✅ Rate limit buckets created/verified\n");
+
+    // Replaced uploads, deleted by a sweep once unreferenced for a grace period
+    console.log("10. Creating upload releases...");
+    await installUploadReleases(db);
+    console.log("✅ Upload releases created/verified\n");
+
     // Verify tables exist
-    console.log("4. Verifying tables...");
+    console.log("11. Verifying tables...");
     const tables = await db.execute(sql`
       SELECT table_name 
       FROM information_schema.tables 
@@ -0,0 +1,32 @@
+import { sql, type SQL } from "drizzle-orm";
+
+/**
+ * upload_releases - uploads waiting to be deleted once nothing references them
+ *
+ * Blobs are content-addressed and shared by every settings row with identical
+ * bytes, so a replaced upload can't be deleted as soon as its last settings row
+ * lets go of it: another request may have stored the same bytes and not yet
+ * written its own settings row. releaseUploadedFiles() (server/lib/file-upload.ts)
+ * records the key here instead, storing the same bytes again removes the row,
+ * and the sweep deletes a blob only after it has been released for the grace
+ * period and is still unreferenced.
+ */
+
+export const UPLOAD_RELEASE_STATEMENTS: SQL[] = [
+  sql`
+    CREATE TABLE IF NOT EXISTS upload_releases (
+      key TEXT PRIMARY KEY,
+      released_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
+    );
+  `,
+  sql`CREATE INDEX IF NOT EXISTS upload_releases_released_at_idx ON upload_releases (released_at)`,
+];
+
+/**
+ * Create the table (idempotent)
+ */
+export async function installUploadReleases(db: { execute: (query: SQL) => Promise<unknown> }): Promise<void> {
+  for (const statement of UPLOAD_RELEASE_STATEMENTS) {
+    await db.execute(statement);
+  }
+}
@@ -5,12 +5,21 @@ dotenv.config();
 import { Hono } from "hono";
 import { cors } from "hono/cors";
 import { logger } from "hono/logger";
+import { stream, streamSSE } from "hono/streaming";
 import Stripe from "stripe";
 import { auth } from "./lib/auth";
 import { sessionMiddleware, requireAuth, requireSubscription, type HonoContext } from "./lib/middleware";
+import { rateLimit, loadShedding } from "./lib/rate-limit";
+import { compression } from "./lib/compression";
 import { db } from "./db";
 import * as schema from "./db/schema";
-import { eq, and, desc } from "drizzle-orm";
+import {
+  selectUserById,
+  selectSettingsByUser,
+  selectEstimateForUser,
+  selectEstimatesByUser,
+} from "./db/queries";
+import { eq, and, desc, isNull } from "drizzle-orm";
 import { sendWelcomeEmail, sendSubscriptionConfirmationEmail } from "./lib/email-service";
 import {
   createEstimateSchema,
@@ -18,9 +27,56 @@ import {
   calculateTotal,
   updateSettingsSchema,
   createTemplateSchema,
+  estimateBatchSchema,
+  roofMeasurementSchema,
+  materialSchema,
 } from "./lib/validations";
-import { saveUploadedFile, deleteUploadedFile, FILE_UPLOAD_CONFIG } from "./lib/file-upload";
+import {
+  saveUploadedStream,
+  saveLogoStream,
+  releaseUploadedFiles,
+  SETTINGS_UPLOAD_RULES,
+  SETTINGS_MAX_BODY_BYTES,
+  uploadKeyFromUrl,
+  uploadContentType,
+} from "./lib/file-upload";
+import { getBlobStorage } from "./lib/blob-storage";
+import { parseMultipart, MultipartError } from "./lib/multipart";
 import { generateEstimatePDF } from "./lib/pdf-generator";
+import {
+  cursorFor,
+  decodeCursor,
+  getEstimateChanges,
+  purgeExpiredTombstones,
+  tombstoneHorizon,
+} from "./lib/estimate-sync";
+import { applyEstimateBatch, buildEstimateUpdate } from "./lib/estimate-batch";
+import { canCreateEstimate, incrementEstimateUsage } from "./lib/usage-tracking";
+import { importEstimatesFromCsv, ImportFormatError } from "./lib/estimate-import";
+import { exportEstimates, EXPORT_CONTENT_TYPES, type ExportFormat } from "./lib/estimate-export";
+import { searchEstimates, SEARCH_RESULT_LIMIT } from "./lib/estimate-search";
+import { getLineItemSummary } from "./lib/estimate-aggregates";
+import { getAnalytics, DEFAULT_ANALYTICS_MONTHS, MAX_ANALYTICS_MONTHS } from "./lib/analytics";
+import { rebuildAnalyticsRollups } from "./db/analytics-rollups";
+import { quoteScenarios, QuoteValidationError, MAX_QUOTE_SCENARIOS, TIER_MULTIPLIERS } from "./lib/quoting";
+import { measureRoof } from "./lib/roof-measurement";
+import { ownsEstimate, listRevisions, getRevision, estimateRevisionPatch } from "./lib/estimate-revisions";
+import {
+  autocompleteMaterials,
+  listMaterials,
+  saveMaterial,
+  rememberMaterials,
+  deleteMaterial,
+  MATERIALS_CATALOG_CONFIG,
+} from "./lib/materials-catalog";
+import {
+  onSubscriptionChange,
+  publishSubscriptionChange,
+  readSubscriptionState,
+  toSubscriptionChange,
+  SUBSCRIPTION_EVENTS_CONFIG,
+  type SubscriptionChange,
+} from "./lib/subscription-events";
 
 // Detect production/serverless environment
 const isProduction = process.env.NODE_ENV === "production";
@@ -31,6 +87,9 @@ const app = new Hono<HonoContext>();
 // In production, this integrates with Netlify's logging system
 app.use("*", logger());
 
+// Response compression - gzip/brotli for JSON, CSV and uncompressed PDFs (never event streams)
+app.use("*", compression());
+
 // CORS middleware - support multiple origins for dev and production
 const frontendUrl = process.env.FRONTEND_URL || "http://localhost:8085";
 const allowedOrigins = [
@@ -55,10 +114,20 @@ app.use(
     },
     allowMethods: ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allowHeaders: ["Content-Type", "Authorization", "stripe-signature"],
+    // Let the frontend see when to retry rate limited and shed requests
+    exposeHeaders: ["Retry-After", "RateLimit-Limit", "RateLimit-Remaining"],
     credentials: true,
   })
 );
 
+// Load shedding - turns low-priority work away with 503 when too many requests are in flight
+// After CORS so browsers can read the response
+app.use("/api/*", loadShedding());
+
+// Password sign-in and sign-up are rate limited per IP before they reach Better-Auth
+app.use("/api/auth/sign-in/*", rateLimit("auth"));
+app.use("/api/auth/sign-up/*", rateLimit("auth"));
+
 // Better-Auth routes - must be registered before session middleware
 // Better-Auth handles its own authentication, so it shouldn't go through session middleware
 // Using app.on() with specific methods as per Better-Auth documentation
@@ -266,6 +335,7 @@ app.post("/api/webhooks/stripe", async (c) => {
           }
 
           console.log(`✅ Updated subscription for user: ${updatedUser.id} (${updatedUser.email}) - Tier: ${subscriptionTier}`);
+          publishSubscriptionChange(toSubscriptionChange(updatedUser));
 
           // Send subscription confirmation email (non-blocking)
           // Only send for paid tiers (monthly/annual)
@@ -338,6 +408,7 @@ app.post("/api/webhooks/stripe", async (c) => {
           }
 
           console.log(`✅ Created subscription for user: ${updatedUser.id} (${updatedUser.email}) - Tier: ${subscriptionTier}`);
+          publishSubscriptionChange(toSubscriptionChange(updatedUser));
 
           // Send subscription confirmation email (non-blocking)
           // Only send for paid tiers (monthly/annual)
@@ -420,6 +491,7 @@ app.post("/api/webhooks/stripe", async (c) => {
           }
 
           console.log(`✅ Updated subscription for user: ${updatedUser.id} (${updatedUser.email}) - Tier: ${subscriptionTier}, Status: ${subscriptionStatus}`);
+          publishSubscriptionChange(toSubscriptionChange(updatedUser));
           
           return c.json({ 
             received: true,
@@ -474,6 +546,7 @@ app.post("/api/webhooks/stripe", async (c) => {
           }
 
           console.log(`✅ Cancelled subscription for user: ${updatedUser.id} (${updatedUser.email})`);
+          publishSubscriptionChange(toSubscriptionChange(updatedUser));
           
           return c.json({ 
             received: true,
@@ -505,10 +578,33 @@ app.post("/api/webhooks/stripe", async (c) => {
   }
 });
 
-// Note: Static files (uploads) are served differently in production vs development
-// - Development: Served by the dev server through Vite proxy or directly
-// - Production: Served by Netlify CDN from the dist directory
-// File uploads in production should use cloud storage (S3, Cloudinary, etc.) for persistence
+/**
+ * GET /uploads/:key - Serve an uploaded file from blob storage
+ * Keys are content hashes, so responses are cacheable forever.
+ */
+app.get("/uploads/:key", async (c) => {
+  const key = uploadKeyFromUrl(`/uploads/${c.req.param("key")}`);
+  const contentType = key ? uploadContentType(key) : undefined;
+  if (!key || !contentType) {
+    return c.json({ error: "Not found" }, 404);
+  }
+
+  try {
+    const data = await getBlobStorage().get(key);
+    if (!data) {
+      return c.json({ error: "Not found" }, 404);
+    }
+    c.header("Content-Type", contentType);
+    c.header("Content-Length", data.length.toString());
+    c.header("Cache-Control", "public, max-age=31536000, immutable");
+    c.header("X-Content-Type-Options", "nosniff");
+    return c.body(data);
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error serving upload: ${errorMessage}`, error);
+    return c.json({ error: "Failed to read file" }, 500);
+  }
+});
 
 // Session middleware - extracts user/session from Better-Auth
 // Applied after auth routes so auth endpoints don't require session
@@ -555,6 +651,7 @@ app.get("/api/protected", async (c) => {
 
 /**
  * GET /api/estimates - List all estimates for the authenticated user
+ * Also returns a cursor that can be passed to /api/estimates/changes
  */
 app.get("/api/estimates", requireAuth, requireSubscription, async (c) => {
   try {
@@ -563,13 +660,9 @@ app.get("/api/estimates", requireAuth, requireSubscription, async (c) => {
       return c.json({ error: "Unauthorized" }, 401);
     }
 
-    const estimates = await db
-      .select()
-      .from(schema.estimates)
-      .where(eq(schema.estimates.userId, user.id))
-      .orderBy(desc(schema.estimates.createdAt));
+    const estimates = await selectEstimatesByUser.execute({ userId: user.id });
 
-    return c.json({ estimates });
+    return c.json({ estimates, cursor: cursorFor(estimates) });
   } catch (error) {
     const errorMessage = error instanceof Error ? error.message : "Unknown error";
     console.error(`❌ Error fetching estimates: ${errorMessage}`, error);
@@ -622,6 +715,9 @@ app.post("/api/estimates", requireAuth, requireSubscription, async (c) => {
       } as any)
       .returning();
 
+    // Offer these prices in line item autocomplete next time
+    await rememberMaterials(user.id, data.items);
+
     return c.json({ estimate: newEstimate }, 201);
   } catch (error) {
     const errorMessage = error instanceof Error ? error.message : "Unknown error";
@@ -630,6 +726,134 @@ app.post("/api/estimates", requireAuth, requireSubscription, async (c) => {
   }
 });
 
+/**
+ * GET /api/estimates/changes?since=<cursor> - Incremental change feed
+ * Returns estimates created or updated after the cursor plus the IDs of deleted ones.
+ * Clients whose cursor is older than the tombstone retention window must resync.
+ */
+app.get("/api/estimates/changes", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const since = c.req.query("since");
+    if (!since) {
+      return c.json({ error: "Missing since cursor" }, 400);
+    }
+
+    const cursor = decodeCursor(since);
+    if (!cursor) {
+      return c.json({ error: "Invalid since cursor" }, 400);
+    }
+
+    // Tombstones before the horizon may have been purged, so deltas would be incomplete
+    if (cursor.syncedAt < tombstoneHorizon()) {
+      return c.json({ resync: true, changes: [], deleted: [], cursor: null, hasMore: false });
+    }
+
+    const feed = await getEstimateChanges(user.id, cursor);
+
+    return c.json({ resync: false, ...feed });
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error fetching estimate changes: ${errorMessage}`, error);
+    return c.json({ error: "Failed to fetch estimate changes" }, 500);
+  }
+});
+
+/**
+ * GET /api/estimates/search?q=<text>&limit=<n> - Search estimates
+ * Matches title, client name, phone, address and line item descriptions. Words
+ * match as prefixes and small typos are tolerated; results are ranked best first.
+ */
+app.get("/api/estimates/search", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const query = c.req.query("q")?.trim();
+    if (!query) {
+      return c.json({ error: "Missing search query" }, 400);
+    }
+
+    // Clamped to 1..SEARCH_RESULT_LIMIT; a negative or fractional LIMIT would fail the query
+    const requested = Math.floor(Number(c.req.query("limit"))) || SEARCH_RESULT_LIMIT;
+    const limit = Math.max(1, Math.min(requested, SEARCH_RESULT_LIMIT));
+    const estimates = await searchEstimates(user.id, query, limit);
+
+    return c.json({ estimates });
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error searching estimates: ${errorMessage}`, error);
+    return c.json({ error: "Failed to search estimates" }, 500);
+  }
+});
+
+/**
+ * GET /api/estimates/line-items/summary?from=<ISO date>&to=<ISO date> - Line item totals
+ * Quantity and value per item type (labor, material, equipment) for estimates
+ * created in the range, plus average labor hours per estimate.
+ */
+app.get("/api/estimates/line-items/summary", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const from = c.req.query("from") ? new Date(c.req.query("from")!) : undefined;
+    const to = c.req.query("to") ? new Date(c.req.query("to")!) : undefined;
+    if ((from && isNaN(from.getTime())) || (to && isNaN(to.getTime()))) {
+      return c.json({ error: "Invalid date range" }, 400);
+    }
+
+    const summary = await getLineItemSummary(user.id, { from, to });
+
+    return c.json({ summary });
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error fetching line item summary: ${errorMessage}`, error);
+    return c.json({ error: "Failed to fetch line item summary" }, 500);
+  }
+});
+
+/**
+ * GET /api/estimates/export?format=csv|ndjson - Export all estimates
+ * CSV has one row per line item; NDJSON has one estimate per line. The export is
+ * streamed as estimates are read in chunks, so it works for any number of estimates.
+ */
+app.get("/api/estimates/export", requireAuth, requireSubscription, async (c) => {
+  const user = c.get("user");
+  if (!user) {
+    return c.json({ error: "Unauthorized" }, 401);
+  }
+
+  const format = (c.req.query("format") || "csv") as ExportFormat;
+  if (!Object.hasOwn(EXPORT_CONTENT_TYPES, format)) {
+    return c.json({ error: "Invalid format. Use csv or ndjson" }, 400);
+  }
+
+  const date = new Date().toISOString().slice(0, 10);
+  c.header("Content-Type", EXPORT_CONTENT_TYPES[format]);
+  c.header("Content-Disposition", `attachment; filename="estimates_${date}.${format}"`);
+  return stream(
+    c,
+    async (output) => {
+      await exportEstimates(user.id, format, async (text) => {
+        await output.write(text);
+      });
+    },
+    async (error) => {
+      // Headers are already sent, so the best we can do is log and cut the stream short
+      console.error(`❌ Error exporting estimates: ${error.message}`, error);
+    }
+  );
+});
+
 /**
  * GET /api/estimates/:id - Get a single estimate by ID
  */
@@ -646,16 +870,7 @@ app.get("/api/estimates/:id", requireAuth, requireSubscription, async (c) => {
     }
 
     // Fetch estimate and verify ownership
-    const [estimate] = await db
-      .select()
-      .from(schema.estimates)
-      .where(
-        and(
-          eq(schema.estimates.id, estimateId),
-          eq(schema.estimates.userId, user.id)
-        )
-      )
-      .limit(1);
+    const [estimate] = await selectEstimateForUser.execute({ estimateId, userId: user.id });
 
     if (!estimate) {
       return c.json({ error: "Estimate not found" }, 404);
@@ -684,22 +899,6 @@ app.put("/api/estimates/:id", requireAuth, requireSubscription, async (c) => {
       return c.json({ error: "Invalid estimate ID" }, 400);
     }
 
-    // Check if estimate exists and belongs to user
-    const [existingEstimate] = await db
-      .select()
-      .from(schema.estimates)
-      .where(
-        and(
-          eq(schema.estimates.id, estimateId),
-          eq(schema.estimates.userId, user.id)
-        )
-      )
-      .limit(1);
-
-    if (!existingEstimate) {
-      return c.json({ error: "Estimate not found" }, 404);
-    }
-
     // Parse and validate request body
     const body = await c.req.json();
     const validationResult = updateEstimateSchema.safeParse(body);
@@ -716,47 +915,49 @@ app.put("/api/estimates/:id", requireAuth, requireSubscription, async (c) => {
 
     const data = validationResult.data;
 
-    // Prepare update object
-    const updateData: any = {
-      updatedAt: new Date(),
-    };
+    // Current items are only needed to recalculate the total for a discount-only change;
+    // otherwise the ownership check happens in the UPDATE itself
+    let currentItems: typeof schema.estimates.$inferSelect.items | undefined;
+    if (data.items === undefined && data.discountPercent !== undefined) {
+      const [existingEstimate] = await db
+        .select({ items: schema.estimates.items })
+        .from(schema.estimates)
+        .where(
+          and(
+            eq(schema.estimates.id, estimateId),
+            eq(schema.estimates.userId, user.id),
+            isNull(schema.estimates.deletedAt)
+          )
+        )
+        .limit(1);
 
-    if (data.title !== undefined) {
-      updateData.title = data.title;
-    }
-    if (data.clientName !== undefined) {
-      updateData.clientName = data.clientName;
-    }
-    if (data.clientPhone !== undefined) {
-      updateData.clientPhone = data.clientPhone;
-    }
-    if (data.clientAddress !== undefined) {
-      updateData.clientAddress = data.clientAddress;
-    }
-    if (data.items !== undefined) {
-      updateData.items = data.items;
-    }
-    
-    // Recalculate total if items or discount changed
-    if (data.items !== undefined || data.discountPercent !== undefined) {
-      // Use new items if provided, otherwise we need to get current items
-      const itemsForCalc = data.items || existingEstimate.items;
-      const discountForCalc = data.discountPercent ?? 0;
-      updateData.total = Math.round(calculateTotal(itemsForCalc, discountForCalc) * 100);
+      if (!existingEstimate) {
+        return c.json({ error: "Estimate not found" }, 404);
+      }
+      currentItems = existingEstimate.items;
     }
 
     // Update estimate
     const [updatedEstimate] = await db
       .update(schema.estimates)
-      .set(updateData)
+      .set(buildEstimateUpdate(data, currentItems) as any)
       .where(
         and(
           eq(schema.estimates.id, estimateId),
-          eq(schema.estimates.userId, user.id)
+          eq(schema.estimates.userId, user.id),
+          isNull(schema.estimates.deletedAt)
         )
       )
       .returning();
 
+    if (!updatedEstimate) {
+      return c.json({ error: "Estimate not found" }, 404);
+    }
+
+    if (data.items) {
+      await rememberMaterials(user.id, data.items);
+    }
+
     return c.json({ estimate: updatedEstimate });
   } catch (error) {
     const errorMessage = error instanceof Error ? error.message : "Unknown error";
@@ -767,6 +968,7 @@ app.put("/api/estimates/:id", requireAuth, requireSubscription, async (c) => {
 
 /**
  * DELETE /api/estimates/:id - Delete an estimate
+ * Soft-deletes the row so the change feed can report the deletion as a tombstone
  */
 app.delete("/api/estimates/:id", requireAuth, requireSubscription, async (c) => {
   try {
@@ -780,31 +982,26 @@ app.delete("/api/estimates/:id", requireAuth, requireSubscription, async (c) =>
       return c.json({ error: "Invalid estimate ID" }, 400);
     }
 
-    // Check if estimate exists and belongs to user
-    const [existingEstimate] = await db
-      .select()
-      .from(schema.estimates)
+    // Mark estimate as deleted (tombstone) - the WHERE clause doubles as the ownership check
+    const now = new Date();
+    const [deletedEstimate] = await db
+      .update(schema.estimates)
+      .set({ deletedAt: now, updatedAt: now } as any)
       .where(
         and(
           eq(schema.estimates.id, estimateId),
-          eq(schema.estimates.userId, user.id)
+          eq(schema.estimates.userId, user.id),
+          isNull(schema.estimates.deletedAt)
         )
       )
-      .limit(1);
+      .returning({ id: schema.estimates.id });
 
-    if (!existingEstimate) {
+    if (!deletedEstimate) {
       return c.json({ error: "Estimate not found" }, 404);
     }
 
-    // Delete estimate
-    await db
-      .delete(schema.estimates)
-      .where(
-        and(
-          eq(schema.estimates.id, estimateId),
-          eq(schema.estimates.userId, user.id)
-        )
-      );
+    // Clean up old tombstones (non-blocking)
+    purgeExpiredTombstones(user.id);
 
     return c.json({ message: "Estimate deleted successfully" });
   } catch (error) {
@@ -814,6 +1011,371 @@ app.delete("/api/estimates/:id", requireAuth, requireSubscription, async (c) =>
   }
 });
 
+/**
+ * GET /api/estimates/:id/revisions - Revision history of an estimate, oldest first
+ * Every saved change to the title, client details, line items or total is a revision.
+ */
+app.get("/api/estimates/:id/revisions", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const estimateId = parseInt(c.req.param("id"));
+    if (isNaN(estimateId)) {
+      return c.json({ error: "Invalid estimate ID" }, 400);
+    }
+    if (!(await ownsEstimate(user.id, estimateId))) {
+      return c.json({ error: "Estimate not found" }, 404);
+    }
+
+    const revisions = await listRevisions(estimateId);
+    return c.json({ revisions });
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error fetching revisions: ${errorMessage}`, error);
+    return c.json({ error: "Failed to fetch revisions" }, 500);
+  }
+});
+
+/**
+ * GET /api/estimates/:id/revisions/diff?from=<n>&to=<n> - JSON Patch (RFC 6902) from one revision to another
+ */
+app.get("/api/estimates/:id/revisions/diff", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const estimateId = parseInt(c.req.param("id"));
+    const from = parseInt(c.req.query("from") || "");
+    const to = parseInt(c.req.query("to") || "");
+    if (isNaN(estimateId)) {
+      return c.json({ error: "Invalid estimate ID" }, 400);
+    }
+    if (isNaN(from) || isNaN(to) || from < 1 || to < 1) {
+      return c.json({ error: "from and to must be revision numbers" }, 400);
+    }
+    if (!(await ownsEstimate(user.id, estimateId))) {
+      return c.json({ error: "Estimate not found" }, 404);
+    }
+
+    const [fromRevision, toRevision] = await Promise.all([getRevision(estimateId, from), getRevision(estimateId, to)]);
+    if (!fromRevision || !toRevision) {
+      return c.json({ error: "Revision not found" }, 404);
+    }
+
+    return c.json({ from, to, patch: estimateRevisionPatch(fromRevision.estimate, toRevision.estimate) });
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error diffing revisions: ${errorMessage}`, error);
+    return c.json({ error: "Failed to diff revisions" }, 500);
+  }
+});
+
+/**
+ * GET /api/estimates/:id/revisions/:revision - An estimate as it was at one revision
+ */
+app.get("/api/estimates/:id/revisions/:revision", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const estimateId = parseInt(c.req.param("id"));
+    const revisionNumber = parseInt(c.req.param("revision"));
+    if (isNaN(estimateId)) {
+      return c.json({ error: "Invalid estimate ID" }, 400);
+    }
+    if (isNaN(revisionNumber) || revisionNumber < 1) {
+      return c.json({ error: "Invalid revision number" }, 400);
+    }
+    if (!(await ownsEstimate(user.id, estimateId))) {
+      return c.json({ error: "Estimate not found" }, 404);
+    }
+
+    const revision = await getRevision(estimateId, revisionNumber);
+    if (!revision) {
+      return c.json({ error: "Revision not found" }, 404);
+    }
+
+    return c.json(revision);
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error fetching revision: ${errorMessage}`, error);
+    return c.json({ error: "Failed to fetch revision" }, 500);
+  }
+});
+
+/**
+ * POST /api/estimates/batch - Apply many estimate mutations in one request
+ * Used for bulk imports and to replay changes queued while offline. Ownership is
+ * checked with one query and all writes run in a single transaction. Updates carry
+ * the updatedAt the client last saw; if the estimate changed since, the item reports a conflict.
+ * Request body: { operations: [{ op: "create", clientId, data } | { op: "update", id, baseUpdatedAt, data } | { op: "delete", id }] }
+ */
+app.post("/api/estimates/batch", requireAuth, rateLimit("batch"), requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const body = await c.req.json();
+    const validationResult = estimateBatchSchema.safeParse(body);
+
+    if (!validationResult.success) {
+      return c.json(
+        {
+          error: "Validation failed",
+          details: validationResult.error.errors,
+        },
+        400
+      );
+    }
+
+    // Creates count against the free tier's monthly limit, same as single creates
+    const subscriptionTier = (user as any).subscriptionTier || "free";
+    const operations = validationResult.data.operations;
+    let maxCreates: number | undefined;
+    if (subscriptionTier === "free" && operations.some((operation) => operation.op === "create")) {
+      const usage = await canCreateEstimate(user.id, subscriptionTier);
+      maxCreates = usage.allowed ? Math.max(0, usage.limit - usage.currentUsage) : 0;
+    }
+
+    const results = await applyEstimateBatch(user.id, operations, { maxCreates });
+
+    const created = results.filter((result) => result.status === "created").length;
+    if (created > 0 && subscriptionTier === "free") {
+      const usage = await incrementEstimateUsage(user.id, subscriptionTier, created);
+      if (!usage.success) {
+        console.error(`❌ Error recording batch estimate usage: ${usage.error}`);
+      }
+    }
+
+    // Offer the saved prices in line item autocomplete, as single creates and updates do
+    const savedItems = results.flatMap((result, index) => {
+      if (result.status === "created") {
+        return result.estimate.items;
+      }
+      // Updates only count when they replaced the items
+      const operation = operations[index];
+      const data = "data" in operation ? operation.data : null;
+      if (result.status === "updated" && typeof data === "object" && data !== null && "items" in data) {
+        return result.estimate.items;
+      }
+      return [];
+    });
+    await rememberMaterials(user.id, savedItems);
+
+    if (results.some((result) => result.status === "deleted")) {
+      // Clean up old tombstones (non-blocking)
+      purgeExpiredTombstones(user.id);
+    }
+
+    return c.json({ results });
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error applying estimate batch: ${errorMessage}`, error);
+    return c.json({ error: "Failed to apply estimate batch" }, 500);
+  }
+});
+
+/**
+ * POST /api/estimates/import - Import historic estimates from a CSV file
+ * The body is the raw CSV (one row per line item, rows sharing estimate_id or
+ * title + client name form one estimate). The file is parsed as it streams in and
+ * inserted in batches; the response is NDJSON with progress, per-row errors and a
+ * final "done" summary.
+ */
+app.post("/api/estimates/import", requireAuth, rateLimit("import"), requireSubscription, async (c) => {
+  const user = c.get("user");
+  if (!user) {
+    return c.json({ error: "Unauthorized" }, 401);
+  }
+
+  // Bulk import bypasses the free tier estimate limit, so it's paid only
+  const subscriptionTier = (user as any).subscriptionTier || "free";
+  if (subscriptionTier === "free") {
+    return c.json(
+      { error: "Estimate import is only available for paid users", requiresUpgrade: true },
+      403
+    );
+  }
+
+  const contentType = (c.req.header("Content-Type") || "").toLowerCase();
+  if (contentType.includes("spreadsheetml") || contentType.includes("ms-excel")) {
+    return c.json({ error: "Excel files are not supported. Save the sheet as CSV and upload that instead." }, 415);
+  }
+
+  const body = c.req.raw.body;
+  if (!body) {
+    return c.json({ error: "Request body is empty" }, 400);
+  }
+
+  c.header("Content-Type", "application/x-ndjson");
+  return stream(c, async (output) => {
+    const emit = async (event: unknown) => {
+      await output.write(JSON.stringify(event) + "\n");
+    };
+
+    try {
+      await importEstimatesFromCsv(user.id, body, emit);
+    } catch (error) {
+      const errorMessage = error instanceof Error ? error.message : "Unknown error";
+      if (error instanceof ImportFormatError) {
+        await emit({ type: "aborted", error: errorMessage });
+        return;
+      }
+      console.error(`❌ Error importing estimates: ${errorMessage}`, error);
+      await emit({ type: "aborted", error: "Failed to import estimates" });
+    }
+  });
+});
+
+// ============================================================================
+// Quoting API Routes
+// ============================================================================
+
+/**
+ * POST /api/quotes/batch - Price many job scenarios at every service tier
+ * Request body: { scenarios: [{ equipmentCost, materialsCost, laborHours, laborRate, discountPercent }] }
+ * (dollars, hours and percent; missing values count as 0). Prices come back in
+ * exact cents, in the same order as the scenarios.
+ */
+app.post("/api/quotes/batch", requireAuth, rateLimit("quotes"), async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const body = await c.req.json().catch(() => null);
+    const scenarios = body?.scenarios;
+    if (!Array.isArray(scenarios) || scenarios.length === 0) {
+      return c.json(
+        {
+          error: "Validation failed",
+          details: [{ path: ["scenarios"], message: "At least one scenario is required" }],
+        },
+        400
+      );
+    }
+    if (scenarios.length > MAX_QUOTE_SCENARIOS) {
+      return c.json(
+        {
+          error: "Validation failed",
+          details: [{ path: ["scenarios"], message: `At most ${MAX_QUOTE_SCENARIOS} scenarios per request` }],
+        },
+        400
+      );
+    }
+
+    const quotes = quoteScenarios(scenarios);
+    return c.json({ tiers: TIER_MULTIPLIERS, quotes });
+  } catch (error) {
+    if (error instanceof QuoteValidationError) {
+      return c.json({ error: "Validation failed", details: error.details }, 400);
+    }
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error quoting scenarios: ${errorMessage}`, error);
+    return c.json({ error: "Failed to quote scenarios" }, 500);
+  }
+});
+
+// ============================================================================
+// Roof Measurement API Routes
+// ============================================================================
+
+/**
+ * POST /api/roof/measure - Squares and material quantities for a roof
+ * Request body: { planes: [{ footprintArea, pitch, label? }], roofStyle?, wastePercent?, prices? }
+ * (footprint in sq ft, pitch as rise per 12" of run, prices in dollars per unit).
+ * The response's lineItems can be added to an estimate as-is.
+ */
+app.post("/api/roof/measure", requireAuth, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const body = await c.req.json().catch(() => null);
+    const validationResult = roofMeasurementSchema.safeParse(body);
+
+    if (!validationResult.success) {
+      return c.json(
+        {
+          error: "Validation failed",
+          details: validationResult.error.errors,
+        },
+        400
+      );
+    }
+
+    return c.json(measureRoof(validationResult.data));
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error measuring roof: ${errorMessage}`, error);
+    return c.json({ error: "Failed to measure roof" }, 500);
+  }
+});
+
+// ============================================================================
+// Analytics API Routes
+// ============================================================================
+
+/**
+ * GET /api/analytics?months=<n> - Monthly estimate analytics
+ * Estimate count, quoted value, average ticket and labor/material/equipment mix
+ * per month, read from incrementally maintained rollups.
+ */
+app.get("/api/analytics", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const months = Number(c.req.query("months") || DEFAULT_ANALYTICS_MONTHS);
+    if (!Number.isInteger(months) || months < 1 || months > MAX_ANALYTICS_MONTHS) {
+      return c.json({ error: `months must be between 1 and ${MAX_ANALYTICS_MONTHS}` }, 400);
+    }
+
+    const analytics = await getAnalytics(user.id, months);
+
+    return c.json({ analytics });
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error fetching analytics: ${errorMessage}`, error);
+    return c.json({ error: "Failed to fetch analytics" }, 500);
+  }
+});
+
+/**
+ * POST /api/analytics/rebuild - Recompute the user's rollups from their estimates
+ */
+app.post("/api/analytics/rebuild", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    await db.execute(rebuildAnalyticsRollups(user.id));
+    const analytics = await getAnalytics(user.id);
+
+    return c.json({ analytics });
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error rebuilding analytics: ${errorMessage}`, error);
+    return c.json({ error: "Failed to rebuild analytics" }, 500);
+  }
+});
+
 // ============================================================================
 // User Settings API Routes (Task #6)
 // ============================================================================
@@ -829,11 +1391,7 @@ app.get("/api/settings", requireAuth, requireSubscription, async (c) => {
     }
 
     // Fetch user settings, create default if doesn't exist
-    let [userSettings] = await db
-      .select()
-      .from(schema.settings)
-      .where(eq(schema.settings.userId, user.id))
-      .limit(1);
+    let [userSettings] = await selectSettingsByUser.execute({ userId: user.id });
 
     // If settings don't exist, create default settings
     if (!userSettings) {
@@ -843,6 +1401,7 @@ app.get("/api/settings", requireAuth, requireSubscription, async (c) => {
           userId: user.id,
           companyName: null,
           companyLogo: null,
+          companyLogoThumbnail: null,
           pdfTemplate: null,
           createdAt: new Date(),
           updatedAt: new Date(),
@@ -862,7 +1421,7 @@ app.get("/api/settings", requireAuth, requireSubscription, async (c) => {
  * PUT /api/settings - Update user settings
  * Supports both JSON (for companyName) and multipart/form-data (for logo upload)
  */
-app.put("/api/settings", requireAuth, requireSubscription, async (c) => {
+app.put("/api/settings", requireAuth, rateLimit("settings"), requireSubscription, async (c) => {
   try {
     const user = c.get("user");
     if (!user) {
@@ -872,11 +1431,7 @@ app.put("/api/settings", requireAuth, requireSubscription, async (c) => {
     const contentType = c.req.header("content-type") || "";
 
     // Check if settings exist
-    const [existingSettings] = await db
-      .select()
-      .from(schema.settings)
-      .where(eq(schema.settings.userId, user.id))
-      .limit(1);
+    const [existingSettings] = await selectSettingsByUser.execute({ userId: user.id });
 
     // Prepare update object
     const updateData: any = {
@@ -884,10 +1439,8 @@ app.put("/api/settings", requireAuth, requireSubscription, async (c) => {
     };
 
     let companyName: string | undefined;
-    let logoFile: File | null = null;
-    let logoUrl: string | undefined;
-    let pdfTemplateFile: File | null = null;
-    let pdfTemplateUrl: string | undefined;
+    // Previous files, released once the settings row no longer points at them
+    const replacedUploads: Array<string | null | undefined> = [];
 
     // Handle multipart/form-data (file upload) or application/x-www-form-urlencoded
     // Check if it's form data (multipart or urlencoded)
@@ -895,35 +1448,53 @@ app.put("/api/settings", requireAuth, requireSubscription, async (c) => {
                        contentType.includes("application/x-www-form-urlencoded");
     
     if (isFormData) {
-      const formData = await c.req.formData();
+      // Stream file parts straight to storage; limits are enforced as bytes arrive,
+      // so oversized or mistyped uploads are rejected without buffering them
+      let formData;
+      try {
+        formData = await parseMultipart(c.req.raw, {
+          maxBodyBytes: SETTINGS_MAX_BODY_BYTES,
+          files: SETTINGS_UPLOAD_RULES,
+          onFile: async ({ field, mimeType, stream }) => {
+            if (field === "companyLogo") {
+              return saveLogoStream(stream);
+            }
+            return { pdfTemplateUrl: await saveUploadedStream(stream, mimeType) };
+          },
+          // Another part was rejected after this file was stored
+          onDiscard: (stored) => releaseUploadedFiles(Object.values(stored)),
+        });
+      } catch (uploadError) {
+        const errorMessage = uploadError instanceof Error ? uploadError.message : "Unknown upload error";
+        console.error(`❌ Error uploading settings files: ${errorMessage}`);
+        const status = uploadError instanceof MultipartError ? uploadError.status : 400;
+        // The rest of the body is not read; don't keep the connection around for it
+        c.header("Connection", "close");
+        return c.json({ error: "File upload failed", details: errorMessage }, status);
+      }
       
+      const logo = formData.files.companyLogo as { logoUrl: string; thumbnailUrl: string } | undefined;
+      const template = formData.files.pdfTemplate as { pdfTemplateUrl: string } | undefined;
+      // Files are already stored; drop them again if the rest of the request is invalid
+      const discardUploads = () => releaseUploadedFiles([logo?.logoUrl, logo?.thumbnailUrl, template?.pdfTemplateUrl]);
+
       // Extract company name from form data
-      const nameField = formData.get("companyName");
-      if (nameField && typeof nameField === "string") {
+      const nameField = formData.fields.companyName;
+      if (nameField) {
         companyName = nameField.trim() || undefined;
       }
 
-      // Extract logo file from form data
-      const fileField = formData.get("companyLogo");
-      if (fileField && fileField instanceof File) {
-        logoFile = fileField;
-      }
-
-      // Extract PDF template file from form data
-      const templateField = formData.get("pdfTemplate");
-      if (templateField && templateField instanceof File) {
-        pdfTemplateFile = templateField;
-      }
-
       // Validate company name if provided
       if (companyName !== undefined) {
         if (companyName.length === 0) {
+          await discardUploads();
           return c.json(
             { error: "Validation failed", details: [{ path: ["companyName"], message: "Company name cannot be empty" }] },
             400
           );
         }
         if (companyName.length > 255) {
+          await discardUploads();
           return c.json(
             { error: "Validation failed", details: [{ path: ["companyName"], message: "Company name must be 255 characters or less" }] },
             400
@@ -932,48 +1503,22 @@ app.put("/api/settings", requireAuth, requireSubscription, async (c) => {
         updateData.companyName = companyName;
       }
 
-      // Handle logo file upload
-      if (logoFile) {
-        try {
-          // Save uploaded file and get URL
-          logoUrl = await saveUploadedFile(logoFile, user.id);
-          
-          // Delete old logo file if it exists
-          if (existingSettings?.companyLogo) {
-            await deleteUploadedFile(existingSettings.companyLogo);
-          }
-          
-          updateData.companyLogo = logoUrl;
-        } catch (uploadError) {
-          const errorMessage = uploadError instanceof Error ? uploadError.message : "Unknown upload error";
-          console.error(`❌ Error uploading logo file: ${errorMessage}`, uploadError);
-          return c.json(
-            { error: "File upload failed", details: errorMessage },
-            400
-          );
-        }
+      // Uploaded logo (normalized PDF variant + thumbnail)
+      if (logo) {
+        replacedUploads.push(existingSettings?.companyLogo, existingSettings?.companyLogoThumbnail);
+        updateData.companyLogo = logo.logoUrl;
+        updateData.companyLogoThumbnail = logo.thumbnailUrl;
+      } else if (formData.fields.companyLogo === "") {
+        // Empty companyLogo field removes the logo
+        replacedUploads.push(existingSettings?.companyLogo, existingSettings?.companyLogoThumbnail);
+        updateData.companyLogo = null;
+        updateData.companyLogoThumbnail = null;
       }
 
-      // Handle PDF template file upload
-      if (pdfTemplateFile) {
-        try {
-          // Save uploaded PDF template and get URL
-          pdfTemplateUrl = await saveUploadedFile(pdfTemplateFile, user.id, true);
-          
-          // Delete old template file if it exists
-          if (existingSettings?.pdfTemplate) {
-            await deleteUploadedFile(existingSettings.pdfTemplate);
-          }
-          
-          updateData.pdfTemplate = pdfTemplateUrl;
-        } catch (uploadError) {
-          const errorMessage = uploadError instanceof Error ? uploadError.message : "Unknown upload error";
-          console.error(`❌ Error uploading PDF template file: ${errorMessage}`, uploadError);
-          return c.json(
-            { error: "PDF template upload failed", details: errorMessage },
-            400
-          );
-        }
+      // Uploaded PDF template
+      if (template) {
+        replacedUploads.push(existingSettings?.pdfTemplate);
+        updateData.pdfTemplate = template.pdfTemplateUrl;
       }
     } else {
       // Handle JSON body (for companyName or logo URL updates)
@@ -998,11 +1543,9 @@ app.put("/api/settings", requireAuth, requireSubscription, async (c) => {
       if (data.companyLogo !== undefined) {
         // If updating logo URL directly (e.g., removing logo by setting to null)
         if (data.companyLogo === null || data.companyLogo === "") {
-          // Delete old logo file if it exists
-          if (existingSettings?.companyLogo) {
-            await deleteUploadedFile(existingSettings.companyLogo);
-          }
+          replacedUploads.push(existingSettings?.companyLogo, existingSettings?.companyLogoThumbnail);
           updateData.companyLogo = null;
+          updateData.companyLogoThumbnail = null;
         } else {
           updateData.companyLogo = data.companyLogo;
         }
@@ -1039,12 +1582,17 @@ app.put("/api/settings", requireAuth, requireSubscription, async (c) => {
           userId: user.id,
           companyName: updateData.companyName || null,
           companyLogo: updateData.companyLogo || null,
+          companyLogoThumbnail: updateData.companyLogoThumbnail || null,
+          pdfTemplate: updateData.pdfTemplate || null,
           createdAt: new Date(),
           updatedAt: new Date(),
         } as any)
         .returning();
     }
 
+    // Delete old files (after the write, so a failed update never loses the current ones)
+    await releaseUploadedFiles(replacedUploads);
+
     return c.json({ settings: updatedSettings });
   } catch (error) {
     const errorMessage = error instanceof Error ? error.message : "Unknown error";
@@ -1101,11 +1649,7 @@ app.get("/api/subscription/status", requireAuth, async (c) => {
     }
 
     // Fetch fresh user data directly from database to ensure we have latest subscription info
-    const [freshUser] = await db
-      .select()
-      .from(schema.user)
-      .where(eq(schema.user.id, sessionUser.id))
-      .limit(1);
+    const [freshUser] = await selectUserById.execute({ userId: sessionUser.id });
 
     if (!freshUser) {
       return c.json({ error: "User not found" }, 404);
@@ -1140,6 +1684,97 @@ app.get("/api/subscription/status", requireAuth, async (c) => {
   }
 });
 
+/**
+ * GET /api/subscription/events - Stream subscription status changes (server-sent events)
+ * Sends the current status, then each change as soon as it's committed (e.g. by the
+ * Stripe webhook). Ends once the subscription is active, or after
+ * SUBSCRIPTION_EVENTS_CONFIG.MAX_STREAM_MS, after which the browser reconnects.
+ */
+app.get("/api/subscription/events", requireAuth, async (c) => {
+  const user = c.get("user");
+  if (!user) {
+    return c.json({ error: "Unauthorized" }, 401);
+  }
+
+  return streamSSE(
+    c,
+    async (sse) => {
+      const pending: SubscriptionChange[] = [];
+      let wake: (() => void) | null = null;
+      let closed = false;
+      let lastSent: string | null = null;
+      let active = false;
+
+      // Listen before the first read so a change committed in between isn't missed
+      const unsubscribe = onSubscriptionChange(user.id, (change) => {
+        pending.push(change);
+        wake?.();
+      });
+      sse.onAbort(() => {
+        closed = true;
+        wake?.();
+      });
+
+      const send = async (change: SubscriptionChange) => {
+        const data = JSON.stringify({
+          subscriptionStatus: change.subscriptionStatus,
+          subscriptionTier: change.subscriptionTier,
+          isActive: change.isActive,
+        });
+        active = change.isActive;
+        if (data === lastSent) {
+          await sse.write(": keep-alive\n\n");
+          return;
+        }
+        lastSent = data;
+        await sse.writeSSE({ event: "status", data, retry: SUBSCRIPTION_EVENTS_CONFIG.RETRY_MS });
+      };
+
+      const deadline = Date.now() + SUBSCRIPTION_EVENTS_CONFIG.MAX_STREAM_MS;
+      try {
+        const current = await readSubscriptionState(user.id);
+        if (!current) {
+          return;
+        }
+        await send(current);
+
+        while (!active && !closed && Date.now() < deadline) {
+          if (pending.length === 0) {
+            await new Promise<void>((resolve) => {
+              const timer = setTimeout(
+                resolve,
+                Math.min(SUBSCRIPTION_EVENTS_CONFIG.RECHECK_INTERVAL_MS, deadline - Date.now())
+              );
+              wake = () => {
+                clearTimeout(timer);
+                resolve();
+              };
+            });
+            wake = null;
+          }
+          if (closed) {
+            break;
+          }
+
+          const pushed = pending.shift();
+          // Nothing pushed: re-check in case the change was committed on another instance
+          const change = pushed ?? (await readSubscriptionState(user.id));
+          if (!change) {
+            break;
+          }
+          await send(change);
+        }
+      } finally {
+        unsubscribe();
+      }
+    },
+    async (error) => {
+      const errorMessage = error instanceof Error ? error.message : "Unknown error";
+      console.error(`❌ Error streaming subscription events: ${errorMessage}`, error);
+    }
+  );
+});
+
 /**
  * POST /api/usage/increment - Increment estimate usage counter
  * Only increments for Free tier users, enforces monthly limits
@@ -1153,8 +1788,6 @@ app.post("/api/usage/increment", requireAuth, async (c) => {
 
     const subscriptionTier = (user as any).subscriptionTier || "free";
 
-    // Import usage tracking utilities
-    const { incrementEstimateUsage } = await import("./lib/usage-tracking");
     const result = await incrementEstimateUsage(user.id, subscriptionTier);
 
     if (!result.success) {
@@ -1195,8 +1828,6 @@ app.get("/api/usage/check", requireAuth, async (c) => {
 
     const subscriptionTier = (user as any).subscriptionTier || "free";
 
-    // Import usage tracking utilities
-    const { canCreateEstimate } = await import("./lib/usage-tracking");
     const result = await canCreateEstimate(user.id, subscriptionTier);
 
     return c.json({
@@ -1306,6 +1937,7 @@ app.post("/api/subscription/verify", requireAuth, async (c) => {
             } as any)
             .where(eq(schema.user.id, user.id))
             .returning();
+          publishSubscriptionChange(toSubscriptionChange(updatedUser));
 
           return c.json({
             message: "Subscription verified and activated",
@@ -1380,6 +2012,7 @@ app.post("/api/subscription/verify", requireAuth, async (c) => {
             .set(updateData)
             .where(eq(schema.user.id, user.id))
             .returning();
+          publishSubscriptionChange(toSubscriptionChange(updatedUser));
 
           return c.json({
             message: "Subscription verified and activated from recent payment",
@@ -1422,9 +2055,11 @@ app.post("/api/subscription/verify", requireAuth, async (c) => {
 
 /**
  * POST /api/pdf/generate - Generate PDF from estimate
- * Request body: { estimateId: number }
+ * Request body: { estimateId: number, compact?: boolean }
+ * Compact output (the default) is smaller for email attachments; pass compact: false
+ * for the previous layout of the file. Free tier PDFs carry a watermark.
  */
-app.post("/api/pdf/generate", requireAuth, requireSubscription, async (c) => {
+app.post("/api/pdf/generate", requireAuth, rateLimit("pdf"), requireSubscription, async (c) => {
   try {
     const user = c.get("user");
     if (!user) {
@@ -1440,30 +2075,21 @@ app.post("/api/pdf/generate", requireAuth, requireSubscription, async (c) => {
     }
 
     // Fetch estimate and verify ownership
-    const [estimate] = await db
-      .select()
-      .from(schema.estimates)
-      .where(
-        and(
-          eq(schema.estimates.id, estimateId),
-          eq(schema.estimates.userId, user.id)
-        )
-      )
-      .limit(1);
+    const [estimate] = await selectEstimateForUser.execute({ estimateId, userId: user.id });
 
     if (!estimate) {
       return c.json({ error: "Estimate not found" }, 404);
     }
 
     // Fetch user settings
-    const [userSettings] = await db
-      .select()
-      .from(schema.settings)
-      .where(eq(schema.settings.userId, user.id))
-      .limit(1);
+    const [userSettings] = await selectSettingsByUser.execute({ userId: user.id });
 
     // Generate PDF
-    const pdfBytes = await generateEstimatePDF(estimate, userSettings || null);
+    const subscriptionTier = (user as any).subscriptionTier || "free";
+    const pdfBytes = await generateEstimatePDF(estimate, userSettings || null, {
+      compact: body.compact !== false,
+      watermark: subscriptionTier === "free",
+    });
 
     // Generate filename
     const sanitizedTitle = estimate.title.replace(/[^a-z0-9]/gi, "_").toLowerCase();
@@ -1671,6 +2297,116 @@ app.delete("/api/templates/:id", requireAuth, async (c) => {
   }
 });
 
+// ============================================================================
+// Materials Catalog API Routes
+// ============================================================================
+
+/**
+ * GET /api/materials/autocomplete?q=<text>&limit=<n> - Catalog suggestions for a line item
+ * Served from an in-memory cache of the user's recent items; an empty q returns the most recent.
+ */
+app.get("/api/materials/autocomplete", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const limitParam = c.req.query("limit");
+    const limit = limitParam ? parseInt(limitParam) : MATERIALS_CATALOG_CONFIG.DEFAULT_SUGGESTIONS;
+    if (isNaN(limit) || limit < 1 || limit > MATERIALS_CATALOG_CONFIG.MAX_SUGGESTIONS) {
+      return c.json({ error: `limit must be between 1 and ${MATERIALS_CATALOG_CONFIG.MAX_SUGGESTIONS}` }, 400);
+    }
+
+    const result = await autocompleteMaterials(user.id, c.req.query("q") || "", limit);
+    return c.json(result);
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error fetching material suggestions: ${errorMessage}`, error);
+    return c.json({ error: "Failed to fetch material suggestions" }, 500);
+  }
+});
+
+/**
+ * GET /api/materials - List the user's materials catalog
+ */
+app.get("/api/materials", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const materials = await listMaterials(user.id);
+    return c.json({ materials });
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error fetching materials: ${errorMessage}`, error);
+    return c.json({ error: "Failed to fetch materials" }, 500);
+  }
+});
+
+/**
+ * POST /api/materials - Add a catalog item, or update the item with the same name
+ * Request body: { name, type, unitPrice } (unit price in dollars)
+ */
+app.post("/api/materials", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const body = await c.req.json().catch(() => null);
+    const validationResult = materialSchema.safeParse(body);
+
+    if (!validationResult.success) {
+      return c.json(
+        {
+          error: "Validation failed",
+          details: validationResult.error.errors,
+        },
+        400
+      );
+    }
+
+    const material = await saveMaterial(user.id, validationResult.data);
+    return c.json({ material }, 201);
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error saving material: ${errorMessage}`, error);
+    return c.json({ error: "Failed to save material" }, 500);
+  }
+});
+
+/**
+ * DELETE /api/materials/:id - Remove a catalog item
+ */
+app.delete("/api/materials/:id", requireAuth, requireSubscription, async (c) => {
+  try {
+    const user = c.get("user");
+    if (!user) {
+      return c.json({ error: "Unauthorized" }, 401);
+    }
+
+    const materialId = parseInt(c.req.param("id"));
+    if (isNaN(materialId)) {
+      return c.json({ error: "Invalid material ID" }, 400);
+    }
+
+    const deleted = await deleteMaterial(user.id, materialId);
+    if (!deleted) {
+      return c.json({ error: "Material not found" }, 404);
+    }
+
+    return c.json({ message: "Material deleted successfully" });
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.error(`❌ Error deleting material: ${errorMessage}`, error);
+    return c.json({ error: "Failed to delete material" }, 500);
+  }
+});
+
 // Test helper endpoint - disabled in production for security
 // Routes are always registered (to avoid router issues) but return 404 in production
 app.get("/api/test/activate-subscription", requireAuth, async (c) => {
@@ -1699,6 +2435,7 @@ app.get("/api/test/activate-subscription", requireAuth, async (c) => {
       } as any)
       .where(eq(schema.user.id, user.id))
       .returning();
+    publishSubscriptionChange(toSubscriptionChange(updatedUser));
 
     return c.json({ 
       message: `Subscription activated for testing (${validTier})`,
@@ -1740,6 +2477,7 @@ app.post("/api/test/activate-subscription", requireAuth, async (c) => {
       } as any)
       .where(eq(schema.user.id, user.id))
       .returning();
+    publishSubscriptionChange(toSubscriptionChange(updatedUser));
 
     return c.json({ 
       message: `Subscription activated for testing (${validTier})`,
@@ -1761,19 +2499,13 @@ export default app;
 // In production, the app is exported for Netlify Functions and this block doesn't run
 if (!isProduction) {
   // Use dynamic import for @hono/node-server to prevent bundling issues in serverless
+  // Uploads are served by GET /uploads/:key in every environment
   import("@hono/node-server").then(({ serve }) => {
-    import("@hono/node-server/serve-static").then(({ serveStatic }) => {
-      // Note: In serverless, static files are served by the CDN, not the function
-      // This is only for local development
-      const staticApp = new Hono();
-      staticApp.use("/uploads/*", serveStatic({ root: "./public" }));
-      
-      const port = Number(process.env.PORT) || 3001;
-      console.log(`🚀 Server running on http://localhost:${port}`);
-      serve({
-        fetch: app.fetch,
-        port,
-      });
+    const port = Number(process.env.PORT) || 3001;
+    console.log(`🚀 Server running on http://localhost:${port}`);
+    serve({
+      fetch: app.fetch,
+      port,
     });
   });
 }
@@ -0,0 +1,84 @@
+import { db } from "../db";
+import { estimateMonthlyRollups } from "../db/schema";
+import { and, asc, eq, gte } from "drizzle-orm";
+
+/**
+ * Business analytics served from estimate_monthly_rollups
+ *
+ * Reads at most `months` rollup rows by primary key, so the cost doesn't grow
+ * with the number of estimates.
+ */
+
+export const DEFAULT_ANALYTICS_MONTHS = 12;
+export const MAX_ANALYTICS_MONTHS = 36;
+
+export type MonthlyAnalytics = {
+  month: string; // YYYY-MM
+  estimateCount: number;
+  totalCents: number;
+  averageTicketCents: number;
+  mix: { laborCents: number; materialCents: number; equipmentCents: number };
+};
+
+export type AnalyticsSummary = {
+  months: MonthlyAnalytics[];
+  totals: Omit<MonthlyAnalytics, "month">;
+};
+
+/**
+ * First day of the month `monthsBack - 1` months before the current one (UTC)
+ */
+function startMonth(monthsBack: number): string {
+  const now = new Date();
+  const start = new Date(Date.UTC(now.getUTCFullYear(), now.getUTCMonth() - (monthsBack - 1), 1));
+  return start.toISOString().slice(0, 10);
+}
+
+function toMonthlyAnalytics(
+  month: string,
+  row: { estimateCount: number; totalCents: number; laborCents: number; materialCents: number; equipmentCents: number }
+): MonthlyAnalytics {
+  return {
+    month,
+    estimateCount: row.estimateCount,
+    totalCents: row.totalCents,
+    averageTicketCents: row.estimateCount > 0 ? Math.round(row.totalCents / row.estimateCount) : 0,
+    mix: { laborCents: row.laborCents, materialCents: row.materialCents, equipmentCents: row.equipmentCents },
+  };
+}
+
+/**
+ * Monthly analytics for the last `months` months (including the current one)
+ * Months without estimates are included with zeros so charts have a continuous axis.
+ */
+export async function getAnalytics(userId: string, months: number = DEFAULT_ANALYTICS_MONTHS): Promise<AnalyticsSummary> {
+  const from = startMonth(months);
+
+  const rows = await db
+    .select()
+    .from(estimateMonthlyRollups)
+    .where(and(eq(estimateMonthlyRollups.userId, userId), gte(estimateMonthlyRollups.month, from)))
+    .orderBy(asc(estimateMonthlyRollups.month));
+
+  const byMonth = new Map(rows.map((row) => [row.month.slice(0, 7), row]));
+  const empty = { estimateCount: 0, totalCents: 0, laborCents: 0, materialCents: 0, equipmentCents: 0 };
+  const totals = { ...empty };
+
+  const result: MonthlyAnalytics[] = [];
+  const cursor = new Date(`${from}T00:00:00Z`);
+  for (let i = 0; i < months; i++) {
+    const month = cursor.toISOString().slice(0, 7);
+    const row = byMonth.get(month) ?? empty;
+    result.push(toMonthlyAnalytics(month, row));
+
+    totals.estimateCount += row.estimateCount;
+    totals.totalCents += row.totalCents;
+    totals.laborCents += row.laborCents;
+    totals.materialCents += row.materialCents;
+    totals.equipmentCents += row.equipmentCents;
+    cursor.setUTCMonth(cursor.getUTCMonth() + 1);
+  }
+
+  const { month: _month, ...summaryTotals } = toMonthlyAnalytics("", totals);
+  return { months: result, totals: summaryTotals };
+}
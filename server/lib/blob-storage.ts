@@ -0,0 +1,396 @@
+// Load environment variables first
+import * as dotenv from "dotenv";
+dotenv.config();
+
+import { createHash, randomBytes } from "crypto";
+import { createWriteStream, existsSync } from "fs";
+import { mkdir, readFile, rename, unlink } from "fs/promises";
+import path from "path";
+import { PassThrough, Readable, Transform } from "stream";
+import { pipeline } from "stream/promises";
+import {
+  CopyObjectCommand,
+  DeleteObjectCommand,
+  GetObjectCommand,
+  HeadObjectCommand,
+  PutObjectCommand,
+  S3Client,
+} from "@aws-sdk/client-s3";
+import { Upload } from "@aws-sdk/lib-storage";
+
+/**
+ * Blob storage for uploaded files
+ *
+ * Blobs are named by the SHA-256 of their contents (`<hash><ext>`), so uploading
+ * identical bytes twice - the same logo from two accounts, or the same template
+ * re-uploaded - stores a single object. Keys are immutable, which lets reads be
+ * cached in-process and served with long-lived cache headers.
+ *
+ * Backends:
+ * - local (default): files under public/uploads
+ * - s3: any S3-compatible service (AWS S3, Cloudflare R2, MinIO for local testing)
+ */
+
+export const BLOB_STORAGE_CONFIG = {
+  BACKEND: (process.env.STORAGE_BACKEND || "local") as "local" | "s3",
+  LOCAL_DIR: process.env.STORAGE_LOCAL_DIR || path.join(process.cwd(), "public", "uploads"),
+  S3_BUCKET: process.env.S3_BUCKET || "",
+  S3_REGION: process.env.S3_REGION || "us-east-1",
+  // Set for S3-compatible services, e.g. http://localhost:9000 for MinIO
+  S3_ENDPOINT: process.env.S3_ENDPOINT || undefined,
+  S3_FORCE_PATH_STYLE: process.env.S3_FORCE_PATH_STYLE === "true",
+  // In-process read cache budget; keys are content hashes so entries never go stale
+  READ_CACHE_MAX_BYTES: 32 * 1024 * 1024,
+};
+
+// Content-hash keys plus legacy `<timestamp>-<random><ext>` names; never a path
+const BLOB_KEY_PATTERN = /^[a-zA-Z0-9._-]+$/;
+
+export type BlobBody = ReadableStream<Uint8Array> | Readable | Uint8Array;
+
+export type PutBlobOptions = {
+  extension: string; // Including the dot, e.g. ".png"
+  contentType: string;
+  maxBytes?: number; // Abort the write once the body exceeds this many bytes
+};
+
+export type StoredBlob = {
+  key: string;
+  size: number;
+  deduplicated: boolean; // True when identical bytes were already stored
+};
+
+export interface BlobStorage {
+  /** Store a body under its content-hash key, streaming when given a stream */
+  put(body: BlobBody, options: PutBlobOptions): Promise<StoredBlob>;
+  /** Read a blob, or null if it doesn't exist */
+  get(key: string): Promise<Buffer | null>;
+  delete(key: string): Promise<void>;
+}
+
+/**
+ * Thrown when a streamed body exceeds PutBlobOptions.maxBytes
+ */
+export class BlobTooLargeError extends Error {
+  constructor(public maxBytes: number) {
+    super(`File size exceeds maximum allowed size of ${maxBytes / 1024 / 1024}MB`);
+    this.name = "BlobTooLargeError";
+  }
+}
+
+function assertValidKey(key: string): void {
+  if (!BLOB_KEY_PATTERN.test(key)) {
+    throw new Error(`Invalid blob key: ${key}`);
+  }
+}
+
+function contentKey(hash: string, extension: string): string {
+  return `${hash}${extension.toLowerCase()}`;
+}
+
+/**
+ * Pass-through stream that hashes and counts bytes, failing past maxBytes
+ */
+function hashingStream(maxBytes?: number): Transform & { digest: () => string; bytes: () => number } {
+  const hash = createHash("sha256");
+  let size = 0;
+  const stream = new Transform({
+    transform(chunk: Buffer, _encoding, callback) {
+      size += chunk.length;
+      if (maxBytes !== undefined && size > maxBytes) {
+        callback(new BlobTooLargeError(maxBytes));
+        return;
+      }
+      hash.update(chunk);
+      callback(null, chunk);
+    },
+  });
+  return Object.assign(stream, { digest: () => hash.digest("hex"), bytes: () => size });
+}
+
+function toNodeStream(body: ReadableStream<Uint8Array> | Readable): Readable {
+  return body instanceof Readable ? body : Readable.fromWeb(body as any);
+}
+
+/**
+ * Local disk backend - streams into a temp file, then renames to the content key
+ */
+export class LocalBlobStorage implements BlobStorage {
+  constructor(private dir: string) {}
+
+  private async ensureDir(): Promise<void> {
+    if (!existsSync(this.dir)) {
+      await mkdir(this.dir, { recursive: true });
+    }
+  }
+
+  async put(body: BlobBody, options: PutBlobOptions): Promise<StoredBlob> {
+    await this.ensureDir();
+
+    if (body instanceof Uint8Array) {
+      if (options.maxBytes !== undefined && body.byteLength > options.maxBytes) {
+        throw new BlobTooLargeError(options.maxBytes);
+      }
+      const key = contentKey(createHash("sha256").update(body).digest("hex"), options.extension);
+      const filePath = path.join(this.dir, key);
+      if (existsSync(filePath)) {
+        return { key, size: body.byteLength, deduplicated: true };
+      }
+      const tempPath = path.join(this.dir, `.tmp-${randomBytes(8).toString("hex")}`);
+      await pipeline(Readable.from([body]), createWriteStream(tempPath));
+      await rename(tempPath, filePath);
+      return { key, size: body.byteLength, deduplicated: false };
+    }
+
+    const tempPath = path.join(this.dir, `.tmp-${randomBytes(8).toString("hex")}`);
+    const hasher = hashingStream(options.maxBytes);
+    try {
+      await pipeline(toNodeStream(body), hasher, createWriteStream(tempPath));
+    } catch (error) {
+      await unlink(tempPath).catch(() => {});
+      throw error;
+    }
+
+    const key = contentKey(hasher.digest(), options.extension);
+    const filePath = path.join(this.dir, key);
+    if (existsSync(filePath)) {
+      await unlink(tempPath);
+      return { key, size: hasher.bytes(), deduplicated: true };
+    }
+    await rename(tempPath, filePath);
+    return { key, size: hasher.bytes(), deduplicated: false };
+  }
+
+  async get(key: string): Promise<Buffer | null> {
+    assertValidKey(key);
+    try {
+      return await readFile(path.join(this.dir, key));
+    } catch (error: any) {
+      if (error?.code === "ENOENT") {
+        return null;
+      }
+      throw error;
+    }
+  }
+
+  async delete(key: string): Promise<void> {
+    assertValidKey(key);
+    try {
+      await unlink(path.join(this.dir, key));
+    } catch (error: any) {
+      if (error?.code !== "ENOENT") {
+        throw error;
+      }
+    }
+  }
+}
+
+/**
+ * S3-compatible backend
+ *
+ * The content hash is only known once a stream has been read, so streamed bodies
+ * are uploaded (multipart) under a temporary key and then copied server-side to
+ * the content key - or dropped if that key already exists.
+ */
+export class S3BlobStorage implements BlobStorage {
+  constructor(private client: S3Client, private bucket: string) {}
+
+  private async exists(key: string): Promise<boolean> {
+    try {
+      await this.client.send(new HeadObjectCommand({ Bucket: this.bucket, Key: key }));
+      return true;
+    } catch (error: any) {
+      if (error?.name === "NotFound" || error?.$metadata?.httpStatusCode === 404) {
+        return false;
+      }
+      throw error;
+    }
+  }
+
+  async put(body: BlobBody, options: PutBlobOptions): Promise<StoredBlob> {
+    const cacheControl = "public, max-age=31536000, immutable";
+
+    if (body instanceof Uint8Array) {
+      if (options.maxBytes !== undefined && body.byteLength > options.maxBytes) {
+        throw new BlobTooLargeError(options.maxBytes);
+      }
+      const key = contentKey(createHash("sha256").update(body).digest("hex"), options.extension);
+      if (await this.exists(key)) {
+        return { key, size: body.byteLength, deduplicated: true };
+      }
+      await this.client.send(
+        new PutObjectCommand({
+          Bucket: this.bucket,
+          Key: key,
+          Body: body,
+          ContentType: options.contentType,
+          CacheControl: cacheControl,
+        })
+      );
+      return { key, size: body.byteLength, deduplicated: false };
+    }
+
+    const tempKey = `tmp/${Date.now()}-${randomBytes(8).toString("hex")}`;
+    const hasher = hashingStream(options.maxBytes);
+    const passThrough = new PassThrough();
+    const upload = new Upload({
+      client: this.client,
+      params: { Bucket: this.bucket, Key: tempKey, Body: passThrough, ContentType: options.contentType },
+    });
+
+    try {
+      await Promise.all([pipeline(toNodeStream(body), hasher, passThrough), upload.done()]);
+    } catch (error) {
+      await upload.abort().catch(() => {});
+      await this.delete(tempKey).catch(() => {});
+      throw error;
+    }
+
+    const key = contentKey(hasher.digest(), options.extension);
+    const deduplicated = await this.exists(key);
+    if (!deduplicated) {
+      await this.client.send(
+        new CopyObjectCommand({
+          Bucket: this.bucket,
+          Key: key,
+          CopySource: `${this.bucket}/${tempKey}`,
+          ContentType: options.contentType,
+          CacheControl: cacheControl,
+          MetadataDirective: "REPLACE",
+        })
+      );
+    }
+    await this.delete(tempKey);
+    return { key, size: hasher.bytes(), deduplicated };
+  }
+
+  async get(key: string): Promise<Buffer | null> {
+    assertValidKey(key);
+    try {
+      const response = await this.client.send(new GetObjectCommand({ Bucket: this.bucket, Key: key }));
+      if (!response.Body) {
+        return null;
+      }
+      return Buffer.from(await response.Body.transformToByteArray());
+    } catch (error: any) {
+      if (error?.name === "NoSuchKey" || error?.$metadata?.httpStatusCode === 404) {
+        return null;
+      }
+      throw error;
+    }
+  }
+
+  async delete(key: string): Promise<void> {
+    await this.client.send(new DeleteObjectCommand({ Bucket: this.bucket, Key: key }));
+  }
+}
+
+/**
+ * Wraps a backend with an in-process LRU cache of blob contents
+ * Safe without invalidation because a key's bytes never change; deletes evict.
+ */
+export class CachedBlobStorage implements BlobStorage {
+  private cache = new Map<string, Buffer>();
+  private cachedBytes = 0;
+  // Reads in flight, so concurrent misses for one key share a single backend get
+  private pending = new Map<string, Promise<Buffer | null>>();
+
+  constructor(private backend: BlobStorage, private maxBytes: number) {}
+
+  put(body: BlobBody, options: PutBlobOptions): Promise<StoredBlob> {
+    return this.backend.put(body, options);
+  }
+
+  async get(key: string): Promise<Buffer | null> {
+    const cached = this.cache.get(key);
+    if (cached) {
+      // Re-insert to mark as most recently used
+      this.cache.delete(key);
+      this.cache.set(key, cached);
+      return cached;
+    }
+
+    const inFlight = this.pending.get(key);
+    if (inFlight) {
+      return inFlight;
+    }
+
+    const load = this.backend.get(key).then(
+      (data) => {
+        // Only cache if this load is still current (a delete drops it)
+        if (this.pending.get(key) === load) {
+          this.pending.delete(key);
+          if (data) this.remember(key, data);
+        }
+        return data;
+      },
+      (error) => {
+        if (this.pending.get(key) === load) this.pending.delete(key);
+        throw error;
+      }
+    );
+    this.pending.set(key, load);
+    return load;
+  }
+
+  async delete(key: string): Promise<void> {
+    this.pending.delete(key);
+    const cached = this.cache.get(key);
+    if (cached) {
+      this.cache.delete(key);
+      this.cachedBytes -= cached.length;
+    }
+    await this.backend.delete(key);
+  }
+
+  /**
+   * Add a blob to the cache, evicting least recently used entries over the byte budget
+   */
+  private remember(key: string, data: Buffer): void {
+    if (data.length > this.maxBytes || this.cache.has(key)) {
+      return;
+    }
+    this.cache.set(key, data);
+    this.cachedBytes += data.length;
+    for (const [oldestKey, oldest] of this.cache) {
+      if (this.cachedBytes <= this.maxBytes) break;
+      this.cache.delete(oldestKey);
+      this.cachedBytes -= oldest.length;
+    }
+  }
+}
+
+let storage: BlobStorage | null = null;
+
+/**
+ * Get the configured blob storage (created on first use)
+ */
+export function getBlobStorage(): BlobStorage {
+  if (storage) {
+    return storage;
+  }
+
+  let backend: BlobStorage;
+  if (BLOB_STORAGE_CONFIG.BACKEND === "s3") {
+    if (!BLOB_STORAGE_CONFIG.S3_BUCKET) {
+      throw new Error("S3_BUCKET is required when STORAGE_BACKEND=s3");
+    }
+    // Credentials come from S3_ACCESS_KEY_ID/S3_SECRET_ACCESS_KEY, or the default AWS chain
+    const credentials =
+      process.env.S3_ACCESS_KEY_ID && process.env.S3_SECRET_ACCESS_KEY
+        ? { accessKeyId: process.env.S3_ACCESS_KEY_ID, secretAccessKey: process.env.S3_SECRET_ACCESS_KEY }
+        : undefined;
+    const client = new S3Client({
+      region: BLOB_STORAGE_CONFIG.S3_REGION,
+      endpoint: BLOB_STORAGE_CONFIG.S3_ENDPOINT,
+      forcePathStyle: BLOB_STORAGE_CONFIG.S3_FORCE_PATH_STYLE,
+      credentials,
+    });
+    backend = new S3BlobStorage(client, BLOB_STORAGE_CONFIG.S3_BUCKET);
+  } else {
+    backend = new LocalBlobStorage(BLOB_STORAGE_CONFIG.LOCAL_DIR);
+  }
+
+  storage = new CachedBlobStorage(backend, BLOB_STORAGE_CONFIG.READ_CACHE_MAX_BYTES);
+  return storage;
+}
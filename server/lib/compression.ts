@@ -0,0 +1,228 @@
+import type { Context, Next } from "hono";
+import { Readable } from "stream";
+import { promisify } from "util";
+import { brotliCompress, constants as zlib, createBrotliCompress, createGzip, gzip, type BrotliOptions } from "zlib";
+
+/**
+ * Response compression (gzip or brotli, negotiated from Accept-Encoding)
+ *
+ * Bodies smaller than THRESHOLD_BYTES go out as they are: below that the
+ * encoding overhead and the extra CPU outweigh the bytes saved. Streamed bodies
+ * (CSV/NDJSON export, import progress) are recognised from their headers and
+ * compressed from the first byte, flushing after every chunk the route writes, so
+ * clients see each chunk as it happens instead of after the first THRESHOLD_BYTES.
+ *
+ * Never compressed:
+ * - text/event-stream: events must reach the browser one by one, and a buffering
+ *   encoder would hold them back (GET /api/subscription/events)
+ * - formats that are compressed already (images), and PDFs written with object
+ *   streams - pdf-lib's default output, whose objects and page content are Flate
+ *   encoded already, so a second pass costs CPU and saves next to nothing
+ * - responses marked Cache-Control: no-transform, or already content-encoded
+ */
+
+export const COMPRESSION_CONFIG = {
+  THRESHOLD_BYTES: 1024,
+  GZIP_LEVEL: 6,
+  // Quality 11 is meant for static assets; 4-5 compresses better than gzip at similar speed
+  BROTLI_QUALITY: 4,
+  COMPRESSIBLE_TYPES: /^(text\/|application\/(json|x-ndjson|javascript|xml|pdf)|image\/svg\+xml)/i,
+  // Written by routes as they go (exports, import progress); never held back to measure their size
+  STREAMED_TYPES: /^(application\/x-ndjson|text\/csv)/i,
+};
+
+export type ContentEncoding = "br" | "gzip";
+
+const gzipAsync = promisify(gzip);
+const brotliAsync = promisify(brotliCompress);
+
+/**
+ * Pick an encoding from an Accept-Encoding header, or null for identity
+ * Highest q-value wins; brotli is preferred when they tie.
+ */
+export function negotiateEncoding(acceptEncoding: string | undefined): ContentEncoding | null {
+  if (!acceptEncoding) {
+    return null;
+  }
+
+  const weights = new Map<string, number>();
+  for (const part of acceptEncoding.split(",")) {
+    const [name, ...params] = part.trim().toLowerCase().split(";");
+    if (!name) continue;
+    const q = params.map((param) => param.trim()).find((param) => param.startsWith("q="));
+    const weight = q ? Number(q.slice(2)) : 1;
+    weights.set(name, Number.isFinite(weight) ? weight : 0);
+  }
+
+  const weightOf = (encoding: ContentEncoding) => weights.get(encoding) ?? weights.get("*") ?? 0;
+  const br = weightOf("br");
+  const gz = weightOf("gzip");
+  if (br <= 0 && gz <= 0) {
+    return null;
+  }
+  return br >= gz ? "br" : "gzip";
+}
+
+const OBJECT_STREAM_MARKER = "/ObjStm";
+
+/**
+ * Whether a PDF was written with object streams (and so is Flate compressed throughout)
+ */
+export function pdfUsesObjectStreams(bytes: Uint8Array): boolean {
+  return Buffer.from(bytes.buffer, bytes.byteOffset, bytes.byteLength).includes(OBJECT_STREAM_MARKER, 0, "latin1");
+}
+
+function brotliOptions(sizeHint?: number): BrotliOptions {
+  return {
+    params: {
+      [zlib.BROTLI_PARAM_QUALITY]: COMPRESSION_CONFIG.BROTLI_QUALITY,
+      [zlib.BROTLI_PARAM_MODE]: zlib.BROTLI_MODE_TEXT,
+      ...(sizeHint ? { [zlib.BROTLI_PARAM_SIZE_HINT]: sizeHint } : {}),
+    },
+  };
+}
+
+/**
+ * Compress a whole body at once (on the libuv thread pool)
+ */
+export async function compressBuffer(bytes: Uint8Array, encoding: ContentEncoding): Promise<Buffer> {
+  return encoding === "br"
+    ? brotliAsync(bytes, brotliOptions(bytes.byteLength))
+    : gzipAsync(bytes, { level: COMPRESSION_CONFIG.GZIP_LEVEL });
+}
+
+/**
+ * Compress a stream, flushing after every chunk
+ */
+function compressStream(chunks: AsyncIterable<Uint8Array>, encoding: ContentEncoding): ReadableStream<Uint8Array> {
+  const compressor =
+    encoding === "br"
+      ? createBrotliCompress({ ...brotliOptions(), flush: zlib.BROTLI_OPERATION_FLUSH })
+      : createGzip({ level: COMPRESSION_CONFIG.GZIP_LEVEL, flush: zlib.Z_SYNC_FLUSH });
+  const source = Readable.from(chunks);
+  source.on("error", (error) => compressor.destroy(error));
+  compressor.on("close", () => source.destroy());
+  source.pipe(compressor);
+  return Readable.toWeb(compressor) as unknown as ReadableStream<Uint8Array>;
+}
+
+async function* replay(head: Uint8Array[], reader: ReadableStreamDefaultReader<Uint8Array>) {
+  try {
+    yield* head;
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) return;
+      yield value;
+    }
+  } finally {
+    // Stops the route's stream when the client goes away mid-response
+    reader.cancel().catch(() => {});
+  }
+}
+
+function concat(chunks: Uint8Array[], length: number): Uint8Array {
+  if (chunks.length === 1) return chunks[0];
+  const bytes = new Uint8Array(length);
+  let offset = 0;
+  for (const chunk of chunks) {
+    bytes.set(chunk, offset);
+    offset += chunk.byteLength;
+  }
+  return bytes;
+}
+
+/**
+ * Compression middleware; register before the routes so it sees their finished responses
+ */
+export function compression() {
+  return async (c: Context, next: Next) => {
+    await next();
+
+    const res = c.res;
+    const contentType = res.headers.get("Content-Type") || "";
+    if (
+      !res.body ||
+      c.req.method === "HEAD" ||
+      res.status === 204 ||
+      res.status === 206 ||
+      res.status === 304 ||
+      res.headers.has("Content-Encoding") ||
+      /\bno-transform\b/i.test(res.headers.get("Cache-Control") || "") ||
+      /^text\/event-stream/i.test(contentType) ||
+      !COMPRESSION_CONFIG.COMPRESSIBLE_TYPES.test(contentType)
+    ) {
+      return;
+    }
+
+    // From here on the representation depends on the request's Accept-Encoding
+    res.headers.append("Vary", "Accept-Encoding");
+    const encoding = negotiateEncoding(c.req.header("Accept-Encoding"));
+    const declaredLength = Number(res.headers.get("Content-Length") ?? NaN);
+    if (!encoding || declaredLength < COMPRESSION_CONFIG.THRESHOLD_BYTES) {
+      return;
+    }
+
+    const setBody = (body: Uint8Array | ReadableStream<Uint8Array>, encoded: boolean) => {
+      // Removed from the original too: Hono copies its headers onto the replacement
+      res.headers.delete("Content-Length");
+      if (encoded) {
+        res.headers.set("Content-Encoding", encoding);
+        const etag = res.headers.get("ETag");
+        if (etag && !etag.startsWith("W/")) {
+          res.headers.set("ETag", `W/${etag}`);
+        }
+      }
+      if (body instanceof Uint8Array) {
+        res.headers.set("Content-Length", String(body.byteLength));
+      }
+      c.res = new Response(body, res);
+    };
+
+    if (/^application\/pdf/i.test(contentType)) {
+      // PDFs are built in memory anyway; look at the whole file before deciding
+      const bytes = new Uint8Array(await res.arrayBuffer());
+      if (bytes.byteLength < COMPRESSION_CONFIG.THRESHOLD_BYTES || pdfUsesObjectStreams(bytes)) {
+        setBody(bytes, false);
+      } else {
+        setBody(await compressBuffer(bytes, encoding), true);
+      }
+      return;
+    }
+
+    // Streamed bodies: decided from the headers alone, so the first chunk isn't held back
+    const reader = res.body.getReader();
+    if (
+      COMPRESSION_CONFIG.STREAMED_TYPES.test(contentType) ||
+      /\bchunked\b/i.test(res.headers.get("Transfer-Encoding") || "")
+    ) {
+      setBody(compressStream(replay([], reader), encoding), true);
+      return;
+    }
+
+    // Anything else was built in memory: read up to the threshold, so short bodies go
+    // out as they are and larger ones are compressed in one go (or as they stream)
+    const head: Uint8Array[] = [];
+    let headLength = 0;
+    let ended = false;
+    while (headLength < COMPRESSION_CONFIG.THRESHOLD_BYTES) {
+      const { done, value } = await reader.read();
+      if (done) {
+        ended = true;
+        break;
+      }
+      head.push(value);
+      headLength += value.byteLength;
+    }
+
+    if (ended) {
+      const bytes = concat(head, headLength);
+      if (headLength < COMPRESSION_CONFIG.THRESHOLD_BYTES) {
+        setBody(bytes, false);
+      } else {
+        setBody(await compressBuffer(bytes, encoding), true);
+      }
+      return;
+    }
+    setBody(compressStream(replay(head, reader), encoding), true);
+  };
+}
@@ -0,0 +1,83 @@
+import { db } from "../db";
+import { estimateItems } from "../db/schema";
+import { and, eq, gte, lt, sql, type SQL } from "drizzle-orm";
+
+/**
+ * Line item aggregates over the normalized estimate_items table
+ *
+ * Each function answers with a single SQL query served by the
+ * (user_id, type, estimate_created_at) index instead of loading estimates.
+ */
+
+export type ItemType = "labor" | "material" | "equipment";
+
+export type DateRange = { from?: Date; to?: Date };
+
+export type LineItemTypeSummary = {
+  itemCount: number;
+  estimateCount: number;
+  quantity: number;
+  totalCents: number; // Line item value (quantity x unit price), before estimate discounts
+};
+
+export type LineItemSummary = {
+  estimateCount: number;
+  totalCents: number;
+  byType: Record<ItemType, LineItemTypeSummary>;
+  averageLaborHoursPerEstimate: number;
+};
+
+const emptyTypeSummary = (): LineItemTypeSummary => ({ itemCount: 0, estimateCount: 0, quantity: 0, totalCents: 0 });
+
+function rangeConditions(userId: string, range: DateRange): SQL[] {
+  const conditions = [eq(estimateItems.userId, userId)];
+  if (range.from) conditions.push(gte(estimateItems.estimateCreatedAt, range.from));
+  if (range.to) conditions.push(lt(estimateItems.estimateCreatedAt, range.to));
+  return conditions;
+}
+
+/**
+ * Spend and quantity per item type, plus overall totals, for a date range
+ * Uses GROUP BY ROLLUP so the per-type rows and the overall row come from one query.
+ */
+export async function getLineItemSummary(userId: string, range: DateRange = {}): Promise<LineItemSummary> {
+  const rows = await db
+    .select({
+      type: estimateItems.type,
+      itemCount: sql<number>`count(*)::int`,
+      estimateCount: sql<number>`count(DISTINCT ${estimateItems.estimateId})::int`,
+      quantity: sql<number>`coalesce(sum(${estimateItems.quantity}), 0)::float8`,
+      totalCents: sql<number>`coalesce(round(sum(${estimateItems.quantity} * ${estimateItems.unitPriceCents})), 0)::float8`,
+    })
+    .from(estimateItems)
+    .where(and(...rangeConditions(userId, range)))
+    .groupBy(sql`ROLLUP (${estimateItems.type})`);
+
+  const summary: LineItemSummary = {
+    estimateCount: 0,
+    totalCents: 0,
+    byType: { labor: emptyTypeSummary(), material: emptyTypeSummary(), equipment: emptyTypeSummary() },
+    averageLaborHoursPerEstimate: 0,
+  };
+
+  for (const row of rows) {
+    if (row.type === null) {
+      summary.estimateCount = row.estimateCount;
+      summary.totalCents = row.totalCents;
+    } else if (row.type in summary.byType) {
+      summary.byType[row.type] = {
+        itemCount: row.itemCount,
+        estimateCount: row.estimateCount,
+        quantity: row.quantity,
+        totalCents: row.totalCents,
+      };
+    }
+  }
+
+  if (summary.estimateCount > 0) {
+    summary.averageLaborHoursPerEstimate =
+      Math.round((summary.byType.labor.quantity / summary.estimateCount) * 100) / 100;
+  }
+
+  return summary;
+}
@@ -0,0 +1,255 @@
+import { db } from "../db";
+import { estimates } from "../db/schema";
+import { and, eq, inArray, isNull, sql } from "drizzle-orm";
+import type { BatchItem } from "drizzle-orm/batch";
+import type { Estimate } from "../db/schema";
+import {
+  createEstimateSchema,
+  updateEstimateSchema,
+  calculateTotal,
+  type EstimateBatchOperation,
+  type CreateEstimateInput,
+  type UpdateEstimateInput,
+} from "./validations";
+
+/**
+ * Batch estimate mutations - applies many creates/updates/deletes in one request
+ *
+ * Ownership of every referenced estimate is checked with a single
+ * `WHERE id IN (...) AND user_id = ...` query, and all writes are sent as one
+ * neon-http batch, which runs as a single transaction.
+ */
+
+export type EstimateBatchResult =
+  | { op: "create"; clientId: string; status: "created"; estimate: Estimate }
+  | { op: "create"; clientId: string; status: "invalid"; details: unknown }
+  | { op: "update"; id: number; status: "updated" | "conflict"; estimate: Estimate }
+  | { op: "update"; id: number; status: "invalid" | "not_found"; details?: unknown }
+  | { op: "delete"; id: number; status: "deleted" }
+  | { op: "delete"; id: number; status: "invalid" | "not_found"; details?: unknown };
+
+/**
+ * Build the column updates for a validated estimate patch
+ * `currentItems` is only needed when the discount changes without new items.
+ */
+export function buildEstimateUpdate(
+  data: UpdateEstimateInput,
+  currentItems?: CreateEstimateInput["items"]
+): Record<string, unknown> {
+  const updateData: Record<string, unknown> = {
+    updatedAt: new Date(),
+  };
+
+  if (data.title !== undefined) {
+    updateData.title = data.title;
+  }
+  if (data.clientName !== undefined) {
+    updateData.clientName = data.clientName;
+  }
+  if (data.clientPhone !== undefined) {
+    updateData.clientPhone = data.clientPhone;
+  }
+  if (data.clientAddress !== undefined) {
+    updateData.clientAddress = data.clientAddress;
+  }
+  if (data.items !== undefined) {
+    updateData.items = data.items;
+  }
+
+  // Recalculate total if items or discount changed
+  const itemsForCalc = data.items || currentItems;
+  if (itemsForCalc && (data.items !== undefined || data.discountPercent !== undefined)) {
+    updateData.total = Math.round(calculateTotal(itemsForCalc, data.discountPercent ?? 0) * 100);
+  }
+
+  return updateData;
+}
+
+/**
+ * Apply a list of create/update/delete operations for a user
+ * Returns one result per operation, in the same order as the input.
+ * `maxCreates` caps how many creates are applied (the free tier's remaining
+ * monthly estimates); valid creates past it are reported as invalid.
+ */
+export async function applyEstimateBatch(
+  userId: string,
+  operations: EstimateBatchOperation[],
+  options: { maxCreates?: number } = {}
+): Promise<EstimateBatchResult[]> {
+  const results: Array<EstimateBatchResult | null> = operations.map(() => null);
+
+  const creates: Array<{ index: number; clientId: string; data: CreateEstimateInput }> = [];
+  const updates: Array<{ index: number; id: number; baseUpdatedAt: string; data: UpdateEstimateInput }> = [];
+  const deletes: Array<{ index: number; id: number }> = [];
+
+  // 1. Validate payloads and reject estimates referenced more than once
+  const seenIds = new Set<number>();
+  operations.forEach((operation, index) => {
+    if (operation.op === "create") {
+      const validationResult = createEstimateSchema.safeParse(operation.data);
+      if (!validationResult.success) {
+        results[index] = { op: "create", clientId: operation.clientId, status: "invalid", details: validationResult.error.errors };
+      } else {
+        creates.push({ index, clientId: operation.clientId, data: validationResult.data });
+      }
+      return;
+    }
+
+    if (seenIds.has(operation.id)) {
+      results[index] = {
+        op: operation.op,
+        id: operation.id,
+        status: "invalid",
+        details: [{ path: ["id"], message: "Estimate appears more than once in this batch" }],
+      };
+      return;
+    }
+    seenIds.add(operation.id);
+
+    if (operation.op === "delete") {
+      deletes.push({ index, id: operation.id });
+      return;
+    }
+
+    const validationResult = updateEstimateSchema.safeParse(operation.data);
+    if (!validationResult.success) {
+      results[index] = { op: "update", id: operation.id, status: "invalid", details: validationResult.error.errors };
+    } else {
+      updates.push({ index, id: operation.id, baseUpdatedAt: operation.baseUpdatedAt, data: validationResult.data });
+    }
+  });
+
+  if (options.maxCreates !== undefined && creates.length > options.maxCreates) {
+    for (const { index, clientId } of creates.splice(Math.max(0, options.maxCreates))) {
+      results[index] = {
+        op: "create",
+        clientId,
+        status: "invalid",
+        details: [{ path: [], message: "Monthly estimate limit reached. Upgrade to continue." }],
+      };
+    }
+  }
+
+  // 2. Check ownership of every referenced estimate with one query
+  const referencedIds = [...updates.map((u) => u.id), ...deletes.map((d) => d.id)];
+  const owned = new Map<number, Estimate>();
+  if (referencedIds.length > 0) {
+    const rows = await db
+      .select()
+      .from(estimates)
+      .where(
+        and(
+          inArray(estimates.id, referencedIds),
+          eq(estimates.userId, userId),
+          isNull(estimates.deletedAt)
+        )
+      );
+    rows.forEach((row) => owned.set(row.id, row));
+  }
+
+  // 3. Build the write statements
+  const queries: BatchItem<"pg">[] = [];
+  const handlers: Array<(rows: any) => void> = [];
+
+  if (creates.length > 0) {
+    // createdAt/updatedAt come from the column defaults, so every row shares the statement's NOW()
+    queries.push(
+      db
+        .insert(estimates)
+        .values(
+          creates.map(({ data }) => ({
+            userId,
+            title: data.title,
+            clientName: data.clientName,
+            clientPhone: data.clientPhone,
+            clientAddress: data.clientAddress,
+            items: data.items,
+            total: Math.round(calculateTotal(data.items, data.discountPercent || 0) * 100),
+          })) as any
+        )
+        .returning()
+    );
+    handlers.push((rows: Estimate[]) => {
+      // Serial IDs are assigned in VALUES order
+      const inserted = [...rows].sort((a, b) => a.id - b.id);
+      creates.forEach((create, i) => {
+        results[create.index] = { op: "create", clientId: create.clientId, status: "created", estimate: inserted[i] };
+      });
+    });
+  }
+
+  for (const update of updates) {
+    const existing = owned.get(update.id);
+    if (!existing) {
+      results[update.index] = { op: "update", id: update.id, status: "not_found" };
+      continue;
+    }
+
+    // The client edited an older version - report the current row instead of overwriting it
+    if (existing.updatedAt.getTime() !== new Date(update.baseUpdatedAt).getTime()) {
+      results[update.index] = { op: "update", id: update.id, status: "conflict", estimate: existing };
+      continue;
+    }
+
+    queries.push(
+      db
+        .update(estimates)
+        .set(buildEstimateUpdate(update.data, existing.items) as any)
+        .where(
+          and(
+            eq(estimates.id, update.id),
+            eq(estimates.userId, userId),
+            isNull(estimates.deletedAt),
+            // Guard against a concurrent write since the ownership check
+            sql`date_trunc('milliseconds', ${estimates.updatedAt}) = ${existing.updatedAt.toISOString()}::timestamp`
+          )
+        )
+        .returning()
+    );
+    handlers.push(([row]: Estimate[]) => {
+      results[update.index] = row
+        ? { op: "update", id: update.id, status: "updated", estimate: row }
+        : { op: "update", id: update.id, status: "conflict", estimate: existing };
+    });
+  }
+
+  const deletable = deletes.filter((d) => owned.has(d.id));
+  deletes
+    .filter((d) => !owned.has(d.id))
+    .forEach((d) => {
+      results[d.index] = { op: "delete", id: d.id, status: "not_found" };
+    });
+
+  if (deletable.length > 0) {
+    const now = new Date();
+    queries.push(
+      db
+        .update(estimates)
+        .set({ deletedAt: now, updatedAt: now } as any)
+        .where(
+          and(
+            inArray(estimates.id, deletable.map((d) => d.id)),
+            eq(estimates.userId, userId),
+            isNull(estimates.deletedAt)
+          )
+        )
+        .returning({ id: estimates.id })
+    );
+    handlers.push((rows: Array<{ id: number }>) => {
+      const deletedIds = new Set(rows.map((row) => row.id));
+      deletable.forEach((d) => {
+        results[d.index] = deletedIds.has(d.id)
+          ? { op: "delete", id: d.id, status: "deleted" }
+          : { op: "delete", id: d.id, status: "not_found" };
+      });
+    });
+  }
+
+  // 4. Apply all writes in one round trip / transaction
+  if (queries.length > 0) {
+    const batchResults = await db.batch(queries as [BatchItem<"pg">, ...BatchItem<"pg">[]]);
+    batchResults.forEach((rows, i) => handlers[i](rows));
+  }
+
+  return results as EstimateBatchResult[];
+}
@@ -0,0 +1,154 @@
+/**
+ * CSV helpers for estimate import/export
+ *
+ * Estimates are represented one row per line item. Rows that belong to the same
+ * estimate share an `estimate_id` (or, when importing spreadsheets without IDs,
+ * the same title and client name on consecutive rows).
+ */
+
+export const ESTIMATE_CSV_COLUMNS = [
+  "estimate_id",
+  "title",
+  "client_name",
+  "client_phone",
+  "client_address",
+  "discount_percent",
+  "created_at",
+  "total",
+  "item_description",
+  "item_type",
+  "item_quantity",
+  "item_unit_price",
+] as const;
+
+export type EstimateCsvColumn = (typeof ESTIMATE_CSV_COLUMNS)[number];
+
+/**
+ * Normalize a header cell so "Client Name", "clientName" and "client_name" all match
+ */
+export function normalizeCsvHeader(header: string): string {
+  return header
+    .trim()
+    .replace(/([a-z0-9])([A-Z])/g, "$1_$2")
+    .toLowerCase()
+    .replace(/[^a-z0-9]+/g, "_")
+    .replace(/^_|_$/g, "");
+}
+
+/**
+ * Incremental RFC 4180 CSV parser
+ * Feed it text chunks as they arrive; it returns the records completed so far and
+ * keeps only the current partial record in memory.
+ */
+export class CsvRowParser {
+  private field = "";
+  private record: string[] = [];
+  private inQuotes = false;
+  private pendingQuote = false; // Saw a quote inside a quoted field; next char decides
+  private pendingCR = false;
+  private atStart = true;
+
+  push(chunk: string): string[][] {
+    const records: string[][] = [];
+
+    for (let i = 0; i < chunk.length; i++) {
+      const ch = chunk[i];
+
+      // Strip a UTF-8 byte order mark at the very start of the input
+      if (this.atStart) {
+        this.atStart = false;
+        if (ch === "\uFEFF") continue;
+      }
+
+      if (this.pendingCR) {
+        this.pendingCR = false;
+        if (ch === "\n") continue;
+      }
+
+      if (this.pendingQuote) {
+        this.pendingQuote = false;
+        if (ch === '"') {
+          this.field += '"';
+          continue;
+        }
+        this.inQuotes = false;
+      }
+
+      if (this.inQuotes) {
+        if (ch === '"') {
+          this.pendingQuote = true;
+        } else {
+          this.field += ch;
+        }
+        continue;
+      }
+
+      if (ch === '"' && this.field.length === 0) {
+        this.inQuotes = true;
+      } else if (ch === ",") {
+        this.record.push(this.field);
+        this.field = "";
+      } else if (ch === "\n" || ch === "\r") {
+        if (ch === "\r") this.pendingCR = true;
+        this.record.push(this.field);
+        this.field = "";
+        records.push(this.record);
+        this.record = [];
+      } else {
+        this.field += ch;
+      }
+    }
+
+    return records;
+  }
+
+  /**
+   * Return the final record if the input didn't end with a newline
+   */
+  flush(): string[][] {
+    if (this.pendingQuote) {
+      this.pendingQuote = false;
+      this.inQuotes = false;
+    }
+    if (this.field.length === 0 && this.record.length === 0) {
+      return [];
+    }
+    this.record.push(this.field);
+    this.field = "";
+    const record = this.record;
+    this.record = [];
+    return [record];
+  }
+}
+
+// Text cells starting with these are evaluated as formulas when the file is opened in a spreadsheet
+const FORMULA_PREFIX = /^[=+\-@\t\r]/;
+
+/**
+ * Escape a single CSV value
+ * Text that a spreadsheet would run as a formula is prefixed with ' so it shows as text.
+ */
+export function escapeCsvValue(value: unknown): string {
+  if (value === null || value === undefined) {
+    return "";
+  }
+  let text = value instanceof Date ? value.toISOString() : String(value);
+  if (typeof value === "string" && FORMULA_PREFIX.test(text)) {
+    text = `'${text}`;
+  }
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+/**
+ * Undo escapeCsvValue's formula prefix on an imported text cell
+ */
+export function unescapeCsvText(value: string): string {
+  return value.startsWith("'") && FORMULA_PREFIX.test(value.slice(1)) ? value.slice(1) : value;
+}
+
+/**
+ * Serialize one CSV line (including the trailing newline)
+ */
+export function toCsvLine(values: unknown[]): string {
+  return values.map(escapeCsvValue).join(",") + "\r\n";
+}
@@ -0,0 +1,94 @@
+import { db } from "../db";
+import { estimates } from "../db/schema";
+import { and, asc, eq, gt, isNull } from "drizzle-orm";
+import type { Estimate } from "../db/schema";
+import { ESTIMATE_CSV_COLUMNS, toCsvLine } from "./estimate-csv";
+
+/**
+ * Streaming estimate export (CSV or NDJSON)
+ *
+ * Estimates are read in keyset-paginated chunks ordered by id, so only one chunk
+ * of rows (items JSONB included) is held in memory at a time, however many
+ * estimates the user has.
+ */
+
+export type ExportFormat = "csv" | "ndjson";
+
+// Estimates fetched per chunk
+export const EXPORT_CHUNK_SIZE = 500;
+
+export const EXPORT_CONTENT_TYPES: Record<ExportFormat, string> = {
+  csv: "text/csv; charset=utf-8",
+  ndjson: "application/x-ndjson",
+};
+
+/**
+ * Iterate over a user's live estimates one chunk at a time
+ */
+export async function* iterateEstimateChunks(
+  userId: string,
+  chunkSize: number = EXPORT_CHUNK_SIZE
+): AsyncGenerator<Estimate[]> {
+  let lastId = 0;
+
+  for (;;) {
+    const rows = await db
+      .select()
+      .from(estimates)
+      .where(and(eq(estimates.userId, userId), isNull(estimates.deletedAt), gt(estimates.id, lastId)))
+      .orderBy(asc(estimates.id))
+      .limit(chunkSize);
+
+    if (rows.length === 0) return;
+    yield rows;
+    if (rows.length < chunkSize) return;
+    lastId = rows[rows.length - 1].id;
+  }
+}
+
+/**
+ * Serialize one estimate as CSV lines (one per line item)
+ */
+function estimateToCsv(estimate: Estimate): string {
+  const common = [
+    estimate.id,
+    estimate.title,
+    estimate.clientName,
+    estimate.clientPhone,
+    estimate.clientAddress,
+    "", // Discount isn't stored separately; it's reflected in the total
+    estimate.createdAt,
+    (estimate.total / 100).toFixed(2),
+  ];
+
+  // Estimates always have items, but keep an empty one exportable as a single row
+  if (estimate.items.length === 0) {
+    return toCsvLine([...common, "", "", "", ""]);
+  }
+
+  return estimate.items
+    .map((item) => toCsvLine([...common, item.description, item.type, item.quantity, item.unitPrice]))
+    .join("");
+}
+
+/**
+ * Write every estimate for a user in the requested format
+ * `write` is awaited per chunk so a slow client applies backpressure to the reads.
+ */
+export async function exportEstimates(
+  userId: string,
+  format: ExportFormat,
+  write: (text: string) => Promise<void>
+): Promise<void> {
+  if (format === "csv") {
+    await write(toCsvLine([...ESTIMATE_CSV_COLUMNS]));
+  }
+
+  for await (const chunk of iterateEstimateChunks(userId)) {
+    const text =
+      format === "csv"
+        ? chunk.map(estimateToCsv).join("")
+        : chunk.map((estimate) => JSON.stringify(estimate) + "\n").join("");
+    await write(text);
+  }
+}
@@ -0,0 +1,224 @@
+import { db } from "../db";
+import { estimates } from "../db/schema";
+import type { NewEstimate } from "../db/schema";
+import { createEstimateSchema, calculateTotal, type CreateEstimateInput } from "./validations";
+import { CsvRowParser, normalizeCsvHeader, unescapeCsvText } from "./estimate-csv";
+import { rememberMaterials } from "./materials-catalog";
+
+/**
+ * Streaming CSV import for historic estimates
+ *
+ * The request body is decoded and parsed chunk by chunk. Rows are grouped into
+ * estimates (one row per line item), validated against createEstimateSchema and
+ * inserted with multi-row INSERTs, so memory use is bounded by the batch size
+ * rather than the file size.
+ */
+
+// Estimates inserted per multi-row INSERT
+export const IMPORT_BATCH_SIZE = 250;
+
+// Hard cap on data rows per import request
+export const MAX_IMPORT_ROWS = 200_000;
+
+// Per-row errors reported before further errors are only counted
+const MAX_REPORTED_ERRORS = 1000;
+
+export type ImportEvent =
+  | { type: "progress"; rowsRead: number; imported: number; failed: number }
+  | { type: "error"; row: number; details: unknown }
+  | { type: "done"; rowsRead: number; imported: number; failed: number; truncated: boolean }
+  | { type: "aborted"; error: string };
+
+/**
+ * Raised when the file itself can't be imported (as opposed to individual bad rows)
+ */
+export class ImportFormatError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = "ImportFormatError";
+  }
+}
+
+type RowGroup = {
+  key: string;
+  firstRow: number;
+  fields: Record<string, string>;
+  items: Array<Record<string, string>>;
+};
+
+const REQUIRED_COLUMNS = ["title", "client_name", "item_description", "item_quantity", "item_unit_price", "item_type"];
+
+/**
+ * Parse a number from a spreadsheet cell, tolerating "$1,234.50" style values
+ */
+function parseNumber(value: string | undefined): number | undefined {
+  if (value === undefined || value.trim() === "") {
+    return undefined;
+  }
+  return Number(value.replace(/[$,\s]/g, ""));
+}
+
+function text(value: string | undefined): string {
+  return unescapeCsvText(value?.trim() ?? "");
+}
+
+function optionalText(value: string | undefined): string | undefined {
+  return text(value) || undefined;
+}
+
+/**
+ * Turn a group of line-item rows into a createEstimateSchema input
+ */
+function toEstimateInput(group: RowGroup): unknown {
+  return {
+    title: text(group.fields.title),
+    clientName: text(group.fields.client_name),
+    clientPhone: optionalText(group.fields.client_phone),
+    clientAddress: optionalText(group.fields.client_address),
+    discountPercent: parseNumber(group.fields.discount_percent),
+    items: group.items.map((item) => ({
+      description: text(item.item_description),
+      quantity: parseNumber(item.item_quantity),
+      unitPrice: parseNumber(item.item_unit_price),
+      type: item.item_type?.trim().toLowerCase(),
+    })),
+  };
+}
+
+/**
+ * Import estimates from a CSV byte stream, reporting progress through `emit`
+ * `emit` is awaited, so a slow client naturally applies backpressure to parsing.
+ */
+export async function importEstimatesFromCsv(
+  userId: string,
+  body: ReadableStream<Uint8Array>,
+  emit: (event: ImportEvent) => Promise<void>
+): Promise<void> {
+  const reader = body.getReader();
+  const decoder = new TextDecoder("utf-8");
+  const parser = new CsvRowParser();
+
+  let headers: string[] | null = null;
+  let rowsRead = 0;
+  let imported = 0;
+  let failed = 0;
+  let reportedErrors = 0;
+  let truncated = false;
+  let current: RowGroup | null = null;
+  let batch: NewEstimate[] = [];
+
+  const reportError = async (row: number, details: unknown) => {
+    failed++;
+    if (reportedErrors < MAX_REPORTED_ERRORS) {
+      reportedErrors++;
+      await emit({ type: "error", row, details });
+    }
+  };
+
+  const flushBatch = async () => {
+    if (batch.length === 0) return;
+    await db.insert(estimates).values(batch as any);
+    // Imported prices show up in line item autocomplete, like saved estimates
+    await rememberMaterials(userId, batch.flatMap((estimate) => estimate.items));
+    imported += batch.length;
+    batch = [];
+    await emit({ type: "progress", rowsRead, imported, failed });
+  };
+
+  const finishGroup = async (group: RowGroup) => {
+    const validationResult = createEstimateSchema.safeParse(toEstimateInput(group));
+    if (!validationResult.success) {
+      await reportError(group.firstRow, validationResult.error.errors);
+      return;
+    }
+
+    const data: CreateEstimateInput = validationResult.data;
+    const now = new Date();
+    batch.push({
+      userId,
+      title: data.title,
+      clientName: data.clientName,
+      clientPhone: data.clientPhone,
+      clientAddress: data.clientAddress,
+      items: data.items,
+      total: Math.round(calculateTotal(data.items, data.discountPercent || 0) * 100),
+      createdAt: now,
+      updatedAt: now,
+    });
+
+    if (batch.length >= IMPORT_BATCH_SIZE) {
+      await flushBatch();
+    }
+  };
+
+  const handleRecord = async (record: string[]) => {
+    if (!headers) {
+      headers = record.map(normalizeCsvHeader);
+      const missing = REQUIRED_COLUMNS.filter((column) => !headers!.includes(column));
+      if (missing.length > 0) {
+        throw new ImportFormatError(`Missing required columns: ${missing.join(", ")}`);
+      }
+      return;
+    }
+
+    // Skip blank lines
+    if (record.every((value) => value.trim() === "")) {
+      return;
+    }
+
+    rowsRead++;
+    const rowNumber = rowsRead + 1; // Spreadsheet row number (header is row 1)
+    const fields: Record<string, string> = {};
+    headers.forEach((header, i) => {
+      fields[header] = record[i] ?? "";
+    });
+
+    // Consecutive rows for the same estimate are merged into one estimate with several items
+    const key = fields.estimate_id?.trim() || `${fields.title?.trim()}\u0000${fields.client_name?.trim()}`;
+    if (current && current.key === key) {
+      current.items.push(fields);
+      return;
+    }
+
+    if (current) {
+      await finishGroup(current);
+    }
+    current = { key, firstRow: rowNumber, fields, items: [fields] };
+  };
+
+  try {
+    let done = false;
+    while (!done) {
+      const { value, done: streamDone } = await reader.read();
+      done = streamDone;
+      const text = value ? decoder.decode(value, { stream: true }) : decoder.decode();
+
+      for (const record of parser.push(text)) {
+        if (rowsRead >= MAX_IMPORT_ROWS) {
+          truncated = true;
+          break;
+        }
+        await handleRecord(record);
+      }
+      if (truncated) break;
+    }
+
+    if (!truncated) {
+      for (const record of parser.flush()) {
+        await handleRecord(record);
+      }
+    }
+    if (!headers) {
+      throw new ImportFormatError("The file is empty");
+    }
+
+    if (current) {
+      await finishGroup(current);
+    }
+    await flushBatch();
+  } finally {
+    reader.cancel().catch(() => {});
+  }
+
+  await emit({ type: "done", rowsRead, imported, failed, truncated });
+}
@@ -0,0 +1,224 @@
+import { db } from "../db";
+import { estimateRevisions, estimates } from "../db/schema";
+import { ESTIMATE_REVISION_FIELDS } from "../db/estimate-revisions";
+import { and, asc, eq, gte, isNull, lte, sql } from "drizzle-orm";
+import type { Estimate } from "../db/schema";
+
+/**
+ * Estimate revision history - rebuilding and comparing stored versions
+ *
+ * Revisions are written by a database trigger (server/db/estimate-revisions.ts)
+ * as periodic snapshots with JSON Patch deltas in between. Reading revision N
+ * loads the nearest snapshot at or before N plus the deltas after it in a single
+ * indexed range query, then replays the deltas.
+ */
+
+/**
+ * The quoted content of an estimate at one revision
+ */
+export type RevisionDocument = Pick<Estimate, "title" | "clientName" | "clientPhone" | "clientAddress" | "items" | "total">;
+
+/**
+ * One RFC 6902 operation; only the operations the trigger produces are supported
+ */
+export type PatchOperation =
+  | { op: "add" | "replace"; path: string; value: unknown }
+  | { op: "remove"; path: string };
+
+export type RevisionSummary = {
+  revision: number;
+  kind: "snapshot" | "delta";
+  // Stored size of the row's data in bytes (after Postgres compression)
+  size: number;
+  createdAt: Date;
+};
+
+export class RevisionPatchError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = "RevisionPatchError";
+  }
+}
+
+function isEqual(a: unknown, b: unknown): boolean {
+  if (a === b) return true;
+  if (typeof a !== "object" || typeof b !== "object" || a === null || b === null) return false;
+  if (Array.isArray(a) !== Array.isArray(b)) return false;
+  const aKeys = Object.keys(a);
+  const bKeys = Object.keys(b);
+  if (aKeys.length !== bKeys.length) return false;
+  return aKeys.every(
+    (key) =>
+      Object.prototype.hasOwnProperty.call(b, key) &&
+      isEqual((a as Record<string, unknown>)[key], (b as Record<string, unknown>)[key])
+  );
+}
+
+function isPlainObject(value: unknown): value is Record<string, unknown> {
+  return typeof value === "object" && value !== null && !Array.isArray(value);
+}
+
+const escapePointer = (key: string) => key.replace(/~/g, "~0").replace(/\//g, "~1");
+const unescapePointer = (token: string) => token.replace(/~1/g, "/").replace(/~0/g, "~");
+
+/**
+ * JSON Patch between two revision documents
+ * Must stay in step with estimate_revision_patch() in server/db/estimate-revisions.ts:
+ * changed top-level fields are replaced, line items are compared by position
+ * and field by field, then appended items are added and dropped items removed
+ * from the end.
+ */
+export function estimateRevisionPatch(from: RevisionDocument, to: RevisionDocument): PatchOperation[] {
+  const ops: PatchOperation[] = [];
+
+  for (const field of ESTIMATE_REVISION_FIELDS) {
+    if (!isEqual(from[field] ?? null, to[field] ?? null)) {
+      ops.push({ op: "replace", path: `/${field}`, value: to[field] ?? null });
+    }
+  }
+
+  const fromItems: unknown[] = from.items ?? [];
+  const toItems: unknown[] = to.items ?? [];
+  const shared = Math.min(fromItems.length, toItems.length);
+
+  for (let i = 0; i < shared; i++) {
+    const oldItem = fromItems[i];
+    const newItem = toItems[i];
+    if (isEqual(oldItem, newItem)) continue;
+
+    if (!isPlainObject(oldItem) || !isPlainObject(newItem)) {
+      ops.push({ op: "replace", path: `/items/${i}`, value: newItem });
+      continue;
+    }
+    const keys = [...new Set([...Object.keys(oldItem), ...Object.keys(newItem)])].sort();
+    for (const key of keys) {
+      const path = `/items/${i}/${escapePointer(key)}`;
+      if (!(key in newItem)) {
+        ops.push({ op: "remove", path });
+      } else if (!(key in oldItem)) {
+        ops.push({ op: "add", path, value: newItem[key] });
+      } else if (!isEqual(oldItem[key], newItem[key])) {
+        ops.push({ op: "replace", path, value: newItem[key] });
+      }
+    }
+  }
+
+  for (let i = fromItems.length; i < toItems.length; i++) {
+    ops.push({ op: "add", path: `/items/${i}`, value: toItems[i] });
+  }
+  for (let i = fromItems.length - 1; i >= toItems.length; i--) {
+    ops.push({ op: "remove", path: `/items/${i}` });
+  }
+
+  return ops;
+}
+
+/**
+ * Apply a JSON Patch to a copy of a document
+ */
+export function applyRevisionPatch<T>(document: T, ops: PatchOperation[]): T {
+  const result = structuredClone(document);
+
+  for (const operation of ops) {
+    const tokens = operation.path.split("/").slice(1).map(unescapePointer);
+    if (tokens.length === 0) {
+      throw new RevisionPatchError(`Unsupported patch path "${operation.path}"`);
+    }
+    const last = tokens.pop()!;
+    let parent: unknown = result;
+    for (const token of tokens) {
+      parent = Array.isArray(parent) ? parent[Number(token)] : isPlainObject(parent) ? parent[token] : undefined;
+      if (parent === undefined) {
+        throw new RevisionPatchError(`Patch path "${operation.path}" does not exist`);
+      }
+    }
+
+    if (Array.isArray(parent)) {
+      const index = last === "-" ? parent.length : Number(last);
+      const maxIndex = operation.op === "add" ? parent.length : parent.length - 1;
+      if (!Number.isInteger(index) || index < 0 || index > maxIndex) {
+        throw new RevisionPatchError(`Patch path "${operation.path}" is out of range`);
+      }
+      if (operation.op === "add") parent.splice(index, 0, operation.value);
+      else if (operation.op === "remove") parent.splice(index, 1);
+      else parent[index] = operation.value;
+    } else if (isPlainObject(parent)) {
+      if (operation.op !== "add" && !(last in parent)) {
+        throw new RevisionPatchError(`Patch path "${operation.path}" does not exist`);
+      }
+      if (operation.op === "remove") delete parent[last];
+      else parent[last] = operation.value;
+    } else {
+      throw new RevisionPatchError(`Patch path "${operation.path}" does not exist`);
+    }
+  }
+
+  return result;
+}
+
+/**
+ * Whether a live (not deleted) estimate belongs to the user
+ */
+export async function ownsEstimate(userId: string, estimateId: number): Promise<boolean> {
+  const [estimate] = await db
+    .select({ id: estimates.id })
+    .from(estimates)
+    .where(and(eq(estimates.id, estimateId), eq(estimates.userId, userId), isNull(estimates.deletedAt)))
+    .limit(1);
+  return estimate !== undefined;
+}
+
+/**
+ * Stored revisions of an estimate, oldest first (ownership is checked by the caller)
+ */
+export async function listRevisions(estimateId: number): Promise<RevisionSummary[]> {
+  return db
+    .select({
+      revision: estimateRevisions.revision,
+      kind: estimateRevisions.kind,
+      size: sql<number>`pg_column_size(${estimateRevisions.data})::integer`,
+      createdAt: estimateRevisions.createdAt,
+    })
+    .from(estimateRevisions)
+    .where(eq(estimateRevisions.estimateId, estimateId))
+    .orderBy(asc(estimateRevisions.revision));
+}
+
+/**
+ * Rebuild one revision of an estimate; null if it doesn't exist
+ */
+export async function getRevision(
+  estimateId: number,
+  revision: number
+): Promise<{ revision: number; createdAt: Date; estimate: RevisionDocument } | null> {
+  // Nearest snapshot at or before the requested revision, by primary key
+  const latestSnapshot = sql`(
+    SELECT max(${estimateRevisions.revision}) FROM ${estimateRevisions}
+    WHERE ${estimateRevisions.estimateId} = ${estimateId}
+      AND ${estimateRevisions.revision} <= ${revision}
+      AND ${estimateRevisions.kind} = 'snapshot'
+  )`;
+
+  const rows = await db
+    .select()
+    .from(estimateRevisions)
+    .where(
+      and(
+        eq(estimateRevisions.estimateId, estimateId),
+        lte(estimateRevisions.revision, revision),
+        gte(estimateRevisions.revision, latestSnapshot)
+      )
+    )
+    .orderBy(asc(estimateRevisions.revision));
+
+  const target = rows[rows.length - 1];
+  if (!target || target.revision !== revision || rows[0].kind !== "snapshot") {
+    return null;
+  }
+
+  let document = rows[0].data as RevisionDocument;
+  for (const row of rows.slice(1)) {
+    document = applyRevisionPatch(document, row.data as PatchOperation[]);
+  }
+  return { revision, createdAt: target.createdAt, estimate: document };
+}
@@ -0,0 +1,63 @@
+import { db } from "../db";
+import { estimates } from "../db/schema";
+import { ESTIMATE_SEARCH_DOCUMENT, ESTIMATE_SEARCH_TEXT } from "../db/indexes";
+import { and, desc, eq, isNull, or, sql } from "drizzle-orm";
+import type { Estimate } from "../db/schema";
+
+/**
+ * Server-side estimate search
+ *
+ * Combines Postgres full-text search (ranked, every word matched as a prefix so
+ * results update as the user types) with trigram word similarity so small typos
+ * in client names and addresses still match. Both are served by GIN indexes
+ * defined in server/db/indexes.ts.
+ */
+
+export const SEARCH_RESULT_LIMIT = 50;
+export const MAX_SEARCH_QUERY_LENGTH = 200;
+
+const searchDocument = sql.raw(ESTIMATE_SEARCH_DOCUMENT);
+const searchText = sql.raw(ESTIMATE_SEARCH_TEXT);
+
+/**
+ * Build a prefix tsquery ("smi:* & 12:*") from free text
+ * Returns null if the text has no searchable words.
+ */
+export function toPrefixTsQuery(query: string): string | null {
+  const words = query
+    .toLowerCase()
+    .split(/[^\p{L}\p{N}]+/u)
+    .filter(Boolean);
+  if (words.length === 0) {
+    return null;
+  }
+  return words.map((word) => `${word}:*`).join(" & ");
+}
+
+/**
+ * Search a user's live estimates, best matches first
+ */
+export async function searchEstimates(
+  userId: string,
+  query: string,
+  limit: number = SEARCH_RESULT_LIMIT
+): Promise<Estimate[]> {
+  const text = query.trim().slice(0, MAX_SEARCH_QUERY_LENGTH);
+  const tsQuery = toPrefixTsQuery(text);
+  if (!tsQuery) {
+    return [];
+  }
+
+  const fullTextMatch = sql`${searchDocument} @@ to_tsquery('simple', ${tsQuery})`;
+  const fuzzyMatch = sql`${text} <% ${searchText}`;
+
+  return db
+    .select()
+    .from(estimates)
+    .where(and(eq(estimates.userId, userId), isNull(estimates.deletedAt), or(fullTextMatch, fuzzyMatch)))
+    .orderBy(
+      desc(sql`ts_rank(${searchDocument}, to_tsquery('simple', ${tsQuery})) + word_similarity(${text}, ${searchText})`),
+      desc(estimates.createdAt)
+    )
+    .limit(limit);
+}
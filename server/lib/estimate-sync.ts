@@ -0,0 +1,199 @@
+import { db } from "../db";
+import { estimates } from "../db/schema";
+import { and, asc, eq, getTableColumns, gt, isNotNull, lt, or, sql } from "drizzle-orm";
+import type { Estimate } from "../db/schema";
+
+/**
+ * Change feed utilities for incremental estimate sync
+ */
+
+// Deleted estimates are kept as tombstones for this long so clients can see the delete
+export const TOMBSTONE_RETENTION_DAYS = 30;
+
+// Maximum number of changed rows returned per change feed request
+export const CHANGE_FEED_PAGE_SIZE = 500;
+
+// Writes can commit a little after the time they record, so a cursor only vouches
+// for changes up to this long before it was issued
+const SYNC_SAFETY_MARGIN_MS = 5 * 60_000;
+
+/**
+ * `updatedAt` is the Postgres text form of `updated_at` (UTC, e.g.
+ * "2026-10-19 12:34:56.123456"). It keeps the column's microseconds: a JS Date
+ * only has milliseconds, and a truncated cursor would return the same rows again
+ * on every poll when many rows share one NOW() (batch writes, imports).
+ *
+ * `syncedAt` is when the client last had every change, including deletes. It is
+ * what the tombstone horizon is checked against: (updatedAt, id) only says when
+ * the data last changed, which can be long ago for a user who syncs but never edits.
+ */
+export type SyncCursor = {
+  updatedAt: string;
+  id: number;
+  syncedAt: Date;
+};
+
+// position timestamp:id[:syncedAt epoch ms]
+const CURSOR_PATTERN = /^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d{1,6})?):(\d+)(?::(\d+))?$/;
+// Cursors issued before microsecond precision: epoch milliseconds
+const LEGACY_CURSOR_PATTERN = /^(\d+):(\d+)$/;
+
+/**
+ * Postgres timestamp text for a Date (millisecond precision)
+ */
+function toTimestampText(date: Date): string {
+  return date.toISOString().replace("T", " ").replace("Z", "");
+}
+
+/**
+ * A Postgres timestamp text as a Date, truncated to milliseconds
+ */
+function timestampDate(text: string): Date {
+  return new Date(`${text.replace(" ", "T")}Z`);
+}
+
+/**
+ * `syncedAt` for a client that has just been sent everything
+ */
+function syncedNow(): Date {
+  return new Date(Date.now() - SYNC_SAFETY_MARGIN_MS);
+}
+
+/**
+ * Encode a cursor as an opaque, URL-safe token
+ * The cursor points at the last (updatedAt, id) pair the client has seen
+ */
+export function encodeCursor(cursor: SyncCursor): string {
+  return Buffer.from(`${cursor.updatedAt}:${cursor.id}:${cursor.syncedAt.getTime()}`).toString("base64url");
+}
+
+/**
+ * Decode a cursor token, returning null if it is malformed
+ * Cursors issued without `syncedAt` count as synced at their position.
+ */
+export function decodeCursor(token: string): SyncCursor | null {
+  const decoded = Buffer.from(token, "base64url").toString("utf8");
+  const match = CURSOR_PATTERN.exec(decoded);
+  if (match) {
+    const position = timestampDate(match[1]);
+    const syncedAt = match[3] ? new Date(Number(match[3])) : position;
+    if (Number.isNaN(position.getTime()) || Number.isNaN(syncedAt.getTime())) {
+      return null;
+    }
+    return { updatedAt: match[1], id: Number(match[2]), syncedAt };
+  }
+
+  const legacy = LEGACY_CURSOR_PATTERN.exec(decoded);
+  if (!legacy) {
+    return null;
+  }
+
+  const updatedAt = new Date(Number(legacy[1]));
+  if (Number.isNaN(updatedAt.getTime())) {
+    return null;
+  }
+  return { updatedAt: toTimestampText(updatedAt), id: Number(legacy[2]), syncedAt: updatedAt };
+}
+
+/**
+ * Build a cursor for the newest row in a list of estimates
+ * Rows only carry milliseconds, so the first poll may repeat rows written in the
+ * same millisecond; clients apply changes by ID, and the feed's own cursors are exact.
+ */
+export function cursorFor(rows: Estimate[]): string | null {
+  let latest: Estimate | null = null;
+  for (const row of rows) {
+    if (
+      !latest ||
+      row.updatedAt > latest.updatedAt ||
+      (row.updatedAt.getTime() === latest.updatedAt.getTime() && row.id > latest.id)
+    ) {
+      latest = row;
+    }
+  }
+
+  return latest
+    ? encodeCursor({ updatedAt: toTimestampText(latest.updatedAt), id: latest.id, syncedAt: syncedNow() })
+    : null;
+}
+
+/**
+ * Tombstones older than this date have been purged, so cursors before it must resync
+ */
+export function tombstoneHorizon(now: Date = new Date()): Date {
+  return new Date(now.getTime() - TOMBSTONE_RETENTION_DAYS * 24 * 60 * 60 * 1000);
+}
+
+/**
+ * Fetch one page of estimates changed after the cursor, including tombstones
+ */
+export async function getEstimateChanges(
+  userId: string,
+  since: SyncCursor
+): Promise<{ changes: Estimate[]; deleted: number[]; cursor: string; hasMore: boolean }> {
+  const sinceUpdatedAt = sql`${since.updatedAt}::timestamp`;
+  const rows = await db
+    .select({
+      ...getTableColumns(estimates),
+      cursorUpdatedAt: sql<string>`${estimates.updatedAt}::text`,
+    })
+    .from(estimates)
+    .where(
+      and(
+        eq(estimates.userId, userId),
+        or(
+          gt(estimates.updatedAt, sinceUpdatedAt),
+          and(eq(estimates.updatedAt, sinceUpdatedAt), gt(estimates.id, since.id))
+        )
+      )
+    )
+    .orderBy(asc(estimates.updatedAt), asc(estimates.id))
+    .limit(CHANGE_FEED_PAGE_SIZE + 1);
+
+  const hasMore = rows.length > CHANGE_FEED_PAGE_SIZE;
+  const page = hasMore ? rows.slice(0, CHANGE_FEED_PAGE_SIZE) : rows;
+
+  const changes: Estimate[] = [];
+  const deleted: number[] = [];
+  for (const { cursorUpdatedAt, ...row } of page) {
+    if (row.deletedAt) {
+      deleted.push(row.id);
+    } else {
+      changes.push(row);
+    }
+  }
+
+  // After the last page the client has every change up to now; mid-way through, it
+  // has every change up to the page's position (and everything it had before)
+  const last = page[page.length - 1];
+  const position = last ? { updatedAt: last.cursorUpdatedAt, id: last.id } : since;
+  const positionDate = timestampDate(position.updatedAt);
+  const syncedAt = !hasMore
+    ? syncedNow()
+    : positionDate > since.syncedAt
+      ? positionDate
+      : since.syncedAt;
+  const cursor = encodeCursor({ updatedAt: position.updatedAt, id: position.id, syncedAt });
+
+  return { changes, deleted, cursor, hasMore };
+}
+
+/**
+ * Permanently remove a user's tombstones that are past the retention window
+ */
+export async function purgeExpiredTombstones(userId: string): Promise<void> {
+  try {
+    await db
+      .delete(estimates)
+      .where(
+        and(
+          eq(estimates.userId, userId),
+          isNotNull(estimates.deletedAt),
+          lt(estimates.deletedAt, tombstoneHorizon())
+        )
+      );
+  } catch (error) {
+    console.error("Error purging expired estimate tombstones:", error);
+    // Don't throw - tombstone cleanup is a background operation
+  }
+}
@@ -1,7 +1,11 @@
-import { writeFile, mkdir } from "fs/promises";
-import { existsSync } from "fs";
 import path from "path";
-import { randomBytes } from "crypto";
+import type { Readable } from "stream";
+import { db } from "../db";
+import { settings } from "../db/schema";
+import { sql } from "drizzle-orm";
+import { getBlobStorage } from "./blob-storage";
+import { processLogo } from "./image-processing";
+import type { MultipartFileRule } from "./multipart";
 
 /**
  * File upload configuration
@@ -14,108 +18,210 @@ export const FILE_UPLOAD_CONFIG = {
   ALLOWED_IMAGE_TYPES: ["image/png", "image/jpeg", "image/jpg", "image/webp"],
   // Allowed PDF MIME types
   ALLOWED_PDF_TYPES: ["application/pdf"],
-  // Upload directory relative to project root
-  UPLOAD_DIR: path.join(process.cwd(), "public", "uploads"),
-  // Public URL prefix for uploaded files
+  // Public URL prefix for uploaded files (served by GET /uploads/:key)
   PUBLIC_URL_PREFIX: "/uploads",
+  // How long a released upload must stay unreferenced before it is deleted; covers
+  // requests that stored the same bytes but haven't written their settings row yet
+  RELEASE_GRACE_SECONDS: Number(process.env.UPLOAD_RELEASE_GRACE_SECONDS ?? 60 * 60),
+};
+
+// Stored extension per MIME type; the client's filename is never used for naming
+const EXTENSIONS_BY_TYPE: Record<string, string> = {
+  "image/png": ".png",
+  "image/jpeg": ".jpg",
+  "image/jpg": ".jpg",
+  "image/webp": ".webp",
+  "application/pdf": ".pdf",
+};
+
+const CONTENT_TYPES_BY_EXTENSION: Record<string, string> = {
+  ".png": "image/png",
+  ".jpg": "image/jpeg",
+  ".jpeg": "image/jpeg",
+  ".webp": "image/webp",
+  ".pdf": "application/pdf",
 };
 
 /**
- * Validate uploaded file
+ * Upload limits for PUT /api/settings, enforced while the multipart body streams in
  */
-export function validateFile(file: File, allowPDF: boolean = false): { valid: boolean; error?: string } {
-  const allowedTypes = allowPDF 
-    ? [...FILE_UPLOAD_CONFIG.ALLOWED_IMAGE_TYPES, ...FILE_UPLOAD_CONFIG.ALLOWED_PDF_TYPES]
-    : FILE_UPLOAD_CONFIG.ALLOWED_IMAGE_TYPES;
-  
-  // Check file type
-  if (!allowedTypes.includes(file.type)) {
-    return {
-      valid: false,
-      error: `Invalid file type. Allowed types: ${allowedTypes.join(", ")}`,
-    };
-  }
+export const SETTINGS_UPLOAD_RULES: Record<"companyLogo" | "pdfTemplate", MultipartFileRule> = {
+  companyLogo: {
+    maxBytes: FILE_UPLOAD_CONFIG.MAX_FILE_SIZE,
+    allowedTypes: FILE_UPLOAD_CONFIG.ALLOWED_IMAGE_TYPES,
+  },
+  pdfTemplate: {
+    maxBytes: FILE_UPLOAD_CONFIG.MAX_PDF_SIZE,
+    allowedTypes: [...FILE_UPLOAD_CONFIG.ALLOWED_IMAGE_TYPES, ...FILE_UPLOAD_CONFIG.ALLOWED_PDF_TYPES],
+  },
+};
 
-  // Check file size (different limits for PDFs)
-  const maxSize = allowPDF && file.type === "application/pdf" 
-    ? FILE_UPLOAD_CONFIG.MAX_PDF_SIZE 
-    : FILE_UPLOAD_CONFIG.MAX_FILE_SIZE;
-    
-  if (file.size > maxSize) {
-    return {
-      valid: false,
-      error: `File size exceeds maximum allowed size of ${maxSize / 1024 / 1024}MB`,
-    };
-  }
+// Request body cap: every file at its limit plus room for fields and part headers
+export const SETTINGS_MAX_BODY_BYTES =
+  FILE_UPLOAD_CONFIG.MAX_FILE_SIZE + FILE_UPLOAD_CONFIG.MAX_PDF_SIZE + 256 * 1024;
+
+/**
+ * Public URL for a blob key
+ */
+function toUploadUrl(key: string): string {
+  return `${FILE_UPLOAD_CONFIG.PUBLIC_URL_PREFIX}/${key}`;
+}
 
-  return { valid: true };
+/**
+ * Blob key for an upload URL, or null if the URL isn't one of ours
+ */
+export function uploadKeyFromUrl(fileUrl: string | null | undefined): string | null {
+  if (!fileUrl || !fileUrl.startsWith(`${FILE_UPLOAD_CONFIG.PUBLIC_URL_PREFIX}/`)) {
+    return null;
+  }
+  return path.basename(fileUrl);
 }
 
 /**
- * Generate unique filename
+ * Content type to serve an upload with, or undefined for unknown extensions
  */
-function generateUniqueFilename(originalName: string): string {
-  const ext = path.extname(originalName);
-  const randomString = randomBytes(16).toString("hex");
-  const timestamp = Date.now();
-  return `${timestamp}-${randomString}${ext}`;
+export function uploadContentType(key: string): string | undefined {
+  return CONTENT_TYPES_BY_EXTENSION[path.extname(key).toLowerCase()];
 }
 
 /**
- * Ensure upload directory exists
+ * Pipe an uploaded file stream into blob storage and return public URL
+ * Files are named by content hash, so identical uploads share one stored blob.
  */
-async function ensureUploadDir(): Promise<void> {
-  if (!existsSync(FILE_UPLOAD_CONFIG.UPLOAD_DIR)) {
-    await mkdir(FILE_UPLOAD_CONFIG.UPLOAD_DIR, { recursive: true });
+export async function saveUploadedStream(stream: Readable, mimeType: string): Promise<string> {
+  const extension = EXTENSIONS_BY_TYPE[mimeType];
+  if (!extension) {
+    throw new Error(`Invalid file type: ${mimeType}`);
   }
+
+  // Images keep the smaller limit even where PDFs are allowed
+  const maxBytes = mimeType === "application/pdf" ? FILE_UPLOAD_CONFIG.MAX_PDF_SIZE : FILE_UPLOAD_CONFIG.MAX_FILE_SIZE;
+  const { key } = await getBlobStorage().put(stream, { extension, contentType: mimeType, maxBytes });
+  await keepUploads([key]);
+
+  return toUploadUrl(key);
 }
 
 /**
- * Save uploaded file to disk and return public URL
+ * Save an uploaded logo stream as normalized PDF and thumbnail variants
+ * The original (at most MAX_FILE_SIZE) is decoded and discarded; only the small variants are stored.
  */
-export async function saveUploadedFile(file: File, userId: string, allowPDF: boolean = false): Promise<string> {
-  // Validate file
-  const validation = validateFile(file, allowPDF);
-  if (!validation.valid) {
-    throw new Error(validation.error || "File validation failed");
+export async function saveLogoStream(stream: Readable): Promise<{ logoUrl: string; thumbnailUrl: string }> {
+  // sharp needs the whole image to decode it; the stream is already capped at MAX_FILE_SIZE
+  const chunks: Buffer[] = [];
+  for await (const chunk of stream) {
+    chunks.push(chunk);
   }
 
-  // Ensure upload directory exists
-  await ensureUploadDir();
+  let processed;
+  try {
+    processed = await processLogo(Buffer.concat(chunks));
+  } catch {
+    throw new Error("Logo could not be read as an image");
+  }
 
-  // Generate unique filename
-  const filename = generateUniqueFilename(file.name);
-  const filePath = path.join(FILE_UPLOAD_CONFIG.UPLOAD_DIR, filename);
+  // Normalized output is deterministic, so the same logo maps to the same keys
+  const storage = getBlobStorage();
+  const [logo, thumbnail] = await Promise.all([
+    storage.put(processed.pdf.buffer, {
+      extension: processed.pdf.extension,
+      contentType: CONTENT_TYPES_BY_EXTENSION[processed.pdf.extension],
+    }),
+    storage.put(processed.thumbnail.buffer, {
+      extension: processed.thumbnail.extension,
+      contentType: CONTENT_TYPES_BY_EXTENSION[processed.thumbnail.extension],
+    }),
+  ]);
+  await keepUploads([logo.key, thumbnail.key]);
 
-  // Convert File to Buffer and save
-  const arrayBuffer = await file.arrayBuffer();
-  const buffer = Buffer.from(arrayBuffer);
-  await writeFile(filePath, buffer);
+  return {
+    logoUrl: toUploadUrl(logo.key),
+    thumbnailUrl: toUploadUrl(thumbnail.key),
+  };
+}
 
-  // Return public URL
-  return `${FILE_UPLOAD_CONFIG.PUBLIC_URL_PREFIX}/${filename}`;
+/**
+ * Read an uploaded file by URL (served from the in-process cache when warm)
+ */
+export async function readUploadedFile(fileUrl: string | null | undefined): Promise<Buffer | null> {
+  const key = uploadKeyFromUrl(fileUrl);
+  if (!key) {
+    return null;
+  }
+  return getBlobStorage().get(key);
 }
 
 /**
  * Delete uploaded file by URL
  */
 export async function deleteUploadedFile(fileUrl: string): Promise<void> {
-  if (!fileUrl || !fileUrl.startsWith(FILE_UPLOAD_CONFIG.PUBLIC_URL_PREFIX)) {
+  const key = uploadKeyFromUrl(fileUrl);
+  if (!key) {
     return; // Not a valid upload URL, skip deletion
   }
 
-  const filename = path.basename(fileUrl);
-  const filePath = path.join(FILE_UPLOAD_CONFIG.UPLOAD_DIR, filename);
+  try {
+    await getBlobStorage().delete(key);
+  } catch (error) {
+    // Log error but don't throw - file deletion is not critical
+    console.error(`Failed to delete file ${key}:`, error);
+  }
+}
 
-  // Use dynamic import to avoid issues if fs/promises is not available
-  const { unlink } = await import("fs/promises");
-  
+/**
+ * Cancel pending releases of blobs that were just stored again
+ */
+async function keepUploads(keys: string[]): Promise<void> {
+  await db.execute(
+    sql`DELETE FROM upload_releases WHERE key IN (${sql.join(keys.map((key) => sql`${key}`), sql`, `)})`
+  );
+}
+
+/**
+ * Release uploads that may no longer be referenced, e.g. replaced or rejected files
+ * Blobs are shared between users with identical files, and another request may have
+ * stored the same bytes without having written its settings row yet, so nothing is
+ * deleted here: the keys are queued and the sweep deletes them once they have been
+ * released for RELEASE_GRACE_SECONDS and nothing points at them. Call after the
+ * settings write.
+ */
+export async function releaseUploadedFiles(fileUrls: Array<string | null | undefined>): Promise<void> {
+  const keys = [...new Set(fileUrls.map(uploadKeyFromUrl))].filter((key): key is string => key !== null);
+  if (keys.length > 0) {
+    await db.execute(sql`
+      INSERT INTO upload_releases (key)
+      VALUES ${sql.join(keys.map((key) => sql`(${key})`), sql`, `)}
+      ON CONFLICT (key) DO UPDATE SET released_at = NOW()
+    `);
+  }
+  await sweepReleasedUploads();
+}
+
+/**
+ * Delete released uploads past the grace period that no settings row references
+ * Each expired release is claimed by exactly one sweep, so concurrent sweeps don't
+ * delete twice; releases still referenced are dropped and their blobs kept.
+ */
+async function sweepReleasedUploads(): Promise<void> {
   try {
-    if (existsSync(filePath)) {
-      await unlink(filePath);
+    const result = await db.execute(sql`
+      WITH expired AS (
+        DELETE FROM upload_releases
+        WHERE released_at <= NOW() - make_interval(secs => ${FILE_UPLOAD_CONFIG.RELEASE_GRACE_SECONDS})
+        RETURNING key
+      )
+      SELECT key FROM expired
+      WHERE NOT EXISTS (
+        SELECT 1 FROM ${settings}
+        WHERE ${`${FILE_UPLOAD_CONFIG.PUBLIC_URL_PREFIX}/`}::text || expired.key
+          IN (${settings.companyLogo}, ${settings.companyLogoThumbnail}, ${settings.pdfTemplate})
+      )
+    `);
+    for (const { key } of result.rows as Array<{ key: string }>) {
+      await deleteUploadedFile(toUploadUrl(key));
     }
   } catch (error) {
-    // Log error but don't throw - file deletion is not critical
-    console.error(`Failed to delete file ${filePath}:`, error);
+    console.error("Error sweeping released uploads:", error);
+    // Don't throw - the next sweep picks the releases up again
   }
 }
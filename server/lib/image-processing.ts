@@ -0,0 +1,106 @@
+import sharp from "sharp";
+
+/**
+ * Logo normalization - runs once at upload time
+ *
+ * Decodes the upload (PNG, JPEG or WebP), applies EXIF orientation, strips all
+ * metadata and produces:
+ * - a PDF variant sized to the PDF logo box at 2x, as PNG when the logo has
+ *   transparency and JPEG otherwise (the two formats pdf-lib can embed)
+ * - a small WebP thumbnail for the settings page
+ */
+
+// Logo box in the PDF header, in points (used by PDF_CONFIG in pdf-generator.ts)
+export const PDF_LOGO_BOX = {
+  MAX_WIDTH: 120,
+  MAX_HEIGHT: 50,
+};
+
+export const LOGO_IMAGE_CONFIG = {
+  // PDF logo box at 2x for sharp output on high-DPI screens and print
+  PDF_MAX_WIDTH: PDF_LOGO_BOX.MAX_WIDTH * 2,
+  PDF_MAX_HEIGHT: PDF_LOGO_BOX.MAX_HEIGHT * 2,
+  THUMBNAIL_SIZE: 160,
+  JPEG_QUALITY: 85,
+  // Reject decompression bombs before decoding (pixels in the source image)
+  MAX_INPUT_PIXELS: 40_000_000,
+};
+
+export type ProcessedImage = {
+  buffer: Buffer;
+  extension: ".png" | ".jpg" | ".webp";
+  width: number;
+  height: number;
+};
+
+export type ProcessedLogo = {
+  pdf: ProcessedImage;
+  thumbnail: ProcessedImage;
+};
+
+/**
+ * Normalize an uploaded logo into a PDF-embeddable variant and a web thumbnail
+ * Throws if the input can't be decoded as an image.
+ */
+export async function processLogo(input: Buffer): Promise<ProcessedLogo> {
+  const source = sharp(input, { failOn: "error", limitInputPixels: LOGO_IMAGE_CONFIG.MAX_INPUT_PIXELS }).rotate();
+  const { hasAlpha } = await source.metadata();
+
+  const pdfPipeline = source
+    .clone()
+    .resize(LOGO_IMAGE_CONFIG.PDF_MAX_WIDTH, LOGO_IMAGE_CONFIG.PDF_MAX_HEIGHT, {
+      fit: "inside",
+      withoutEnlargement: true,
+    });
+  const pdfOutput = hasAlpha
+    ? pdfPipeline.png({ compressionLevel: 9, palette: true })
+    : pdfPipeline.flatten({ background: "#ffffff" }).jpeg({ quality: LOGO_IMAGE_CONFIG.JPEG_QUALITY, mozjpeg: true });
+
+  const thumbnailOutput = source
+    .clone()
+    .resize(LOGO_IMAGE_CONFIG.THUMBNAIL_SIZE, LOGO_IMAGE_CONFIG.THUMBNAIL_SIZE, {
+      fit: "inside",
+      withoutEnlargement: true,
+    })
+    .webp({ quality: 80 });
+
+  const [pdf, thumbnail] = await Promise.all([
+    pdfOutput.toBuffer({ resolveWithObject: true }),
+    thumbnailOutput.toBuffer({ resolveWithObject: true }),
+  ]);
+
+  return {
+    pdf: { buffer: pdf.data, extension: hasAlpha ? ".png" : ".jpg", width: pdf.info.width, height: pdf.info.height },
+    thumbnail: { buffer: thumbnail.data, extension: ".webp", width: thumbnail.info.width, height: thumbnail.info.height },
+  };
+}
+
+/**
+ * Detect whether bytes are PNG or JPEG (the formats pdf-lib can embed)
+ */
+export function detectEmbeddableFormat(buffer: Buffer): "png" | "jpg" | null {
+  if (buffer.length >= 8 && buffer.readUInt32BE(0) === 0x89504e47 && buffer.readUInt32BE(4) === 0x0d0a1a0a) {
+    return "png";
+  }
+  if (buffer.length >= 3 && buffer[0] === 0xff && buffer[1] === 0xd8 && buffer[2] === 0xff) {
+    return "jpg";
+  }
+  return null;
+}
+
+/**
+ * Whether a stored PDF logo predates upload-time normalization and needs processLogo
+ * True for formats pdf-lib can't embed, and for PNG/JPEG logos larger than the 2x
+ * logo box or with an EXIF rotation. Only the image header is read.
+ */
+export async function needsLogoProcessing(buffer: Buffer): Promise<boolean> {
+  if (!detectEmbeddableFormat(buffer)) {
+    return true;
+  }
+  const { width = 0, height = 0, orientation = 1 } = await sharp(buffer).metadata();
+  return (
+    width > LOGO_IMAGE_CONFIG.PDF_MAX_WIDTH ||
+    height > LOGO_IMAGE_CONFIG.PDF_MAX_HEIGHT ||
+    orientation !== 1
+  );
+}
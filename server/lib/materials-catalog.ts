@@ -0,0 +1,351 @@
+import { db } from "../db";
+import { materials, type Material } from "../db/schema";
+import { MATERIAL_NAME_KEY } from "../db/materials";
+import { and, asc, desc, eq, or, sql } from "drizzle-orm";
+
+/**
+ * Materials price catalog - line item autocomplete for EstimateForm
+ *
+ * Every keystroke in a line item description asks for suggestions, so the
+ * common path never touches the database: each user's most recently used items
+ * are held in memory (with precomputed trigrams) and ranked there. Only users
+ * whose catalog is larger than the cached slice fall through to the indexed
+ * query for keystrokes the cache can't fill.
+ *
+ * The cache is per server instance. Writes made here invalidate the user's entry
+ * straight away; writes on another instance show up once the entry expires.
+ */
+
+export const MATERIALS_CATALOG_CONFIG = {
+  // Most recently used items kept in memory per user
+  CACHE_ITEMS_PER_USER: 500,
+  // Least recently used users are evicted past this many
+  CACHE_MAX_USERS: 1_000,
+  CACHE_TTL_MS: 60_000,
+  DEFAULT_SUGGESTIONS: 8,
+  MAX_SUGGESTIONS: 20,
+  MAX_QUERY_LENGTH: 100,
+  // Distinct line items learned from one saved estimate
+  MAX_LEARNED_ITEMS: 200,
+  // Share of the query's trigrams a name must contain to count as a fuzzy match
+  // (close to pg_trgm's default word_similarity_threshold)
+  MIN_FUZZY_SCORE: 0.6,
+};
+
+// unit_price_cents is a Postgres INTEGER
+const MAX_UNIT_PRICE_CENTS = 2_147_483_647;
+
+export type MaterialType = Material["type"];
+
+/**
+ * Catalog item as returned to the client; unitPrice is in dollars like line items
+ */
+export type MaterialSuggestion = {
+  id: number;
+  name: string;
+  type: MaterialType;
+  unitPrice: number;
+  useCount: number;
+};
+
+export type MaterialInput = {
+  name: string;
+  type: MaterialType;
+  unitPrice: number;
+};
+
+type CachedMaterial = MaterialSuggestion & {
+  key: string;
+  trigrams: Set<string>;
+};
+
+type CatalogCacheEntry = {
+  items: CachedMaterial[];
+  // True when the user's whole catalog fit in the cached slice
+  complete: boolean;
+  expiresAt: number;
+};
+
+const catalogCache = new Map<string, CatalogCacheEntry>();
+const pendingLoads = new Map<string, Promise<CatalogCacheEntry>>();
+
+/**
+ * Case- and whitespace-insensitive form of a name, matching lower(name) in SQL
+ */
+export function normalizeMaterialName(name: string): string {
+  return name.trim().replace(/\s+/g, " ").toLowerCase();
+}
+
+/**
+ * Trigrams the way pg_trgm extracts them: per alphanumeric word, padded with two
+ * spaces in front and one behind
+ */
+function trigramsOf(text: string): Set<string> {
+  const trigrams = new Set<string>();
+  for (const word of text.split(/[^\p{L}\p{N}]+/u)) {
+    if (!word) continue;
+    const padded = `  ${word} `;
+    for (let i = 0; i + 3 <= padded.length; i++) {
+      trigrams.add(padded.slice(i, i + 3));
+    }
+  }
+  return trigrams;
+}
+
+function toSuggestion(row: Pick<Material, "id" | "name" | "type" | "unitPriceCents" | "useCount">): MaterialSuggestion {
+  return {
+    id: row.id,
+    name: row.name,
+    type: row.type,
+    unitPrice: row.unitPriceCents / 100,
+    useCount: row.useCount,
+  };
+}
+
+function toCached(row: Material): CachedMaterial {
+  const key = normalizeMaterialName(row.name);
+  return { ...toSuggestion(row), key, trigrams: trigramsOf(key) };
+}
+
+async function loadCatalog(userId: string): Promise<CatalogCacheEntry> {
+  const { CACHE_ITEMS_PER_USER, CACHE_TTL_MS } = MATERIALS_CATALOG_CONFIG;
+  const rows = await db
+    .select()
+    .from(materials)
+    .where(eq(materials.userId, userId))
+    .orderBy(desc(materials.lastUsedAt))
+    .limit(CACHE_ITEMS_PER_USER + 1);
+
+  return {
+    items: rows.slice(0, CACHE_ITEMS_PER_USER).map(toCached),
+    complete: rows.length <= CACHE_ITEMS_PER_USER,
+    expiresAt: Date.now() + CACHE_TTL_MS,
+  };
+}
+
+/**
+ * The user's cached catalog, loading it once for concurrent keystrokes
+ */
+async function getCatalog(userId: string): Promise<CatalogCacheEntry> {
+  const cached = catalogCache.get(userId);
+  if (cached && cached.expiresAt > Date.now()) {
+    // Re-insert to mark as most recently used
+    catalogCache.delete(userId);
+    catalogCache.set(userId, cached);
+    return cached;
+  }
+
+  let pending = pendingLoads.get(userId);
+  if (!pending) {
+    pending = loadCatalog(userId);
+    pendingLoads.set(userId, pending);
+    const load = pending;
+    load
+      .then((entry) => {
+        // Skip caching if the catalog was written while this load was in flight
+        if (pendingLoads.get(userId) !== load) return;
+        catalogCache.delete(userId);
+        catalogCache.set(userId, entry);
+        if (catalogCache.size > MATERIALS_CATALOG_CONFIG.CACHE_MAX_USERS) {
+          const oldest = catalogCache.keys().next().value;
+          if (oldest !== undefined) catalogCache.delete(oldest);
+        }
+      })
+      .catch(() => {})
+      .finally(() => {
+        if (pendingLoads.get(userId) === load) pendingLoads.delete(userId);
+      });
+  }
+  return pending;
+}
+
+/**
+ * Drop a user's cached catalog after it changes
+ */
+export function invalidateMaterialsCache(userId: string): void {
+  catalogCache.delete(userId);
+  pendingLoads.delete(userId);
+}
+
+/**
+ * Rank cached items against a normalized query:
+ * name prefix, then word prefix, then substring, then fuzzy (trigram) matches;
+ * most used first within each group
+ */
+function rankCached(items: CachedMaterial[], key: string, limit: number): CachedMaterial[] {
+  const queryTrigrams = trigramsOf(key);
+  const ranked: { item: CachedMaterial; rank: number; score: number }[] = [];
+
+  for (const item of items) {
+    const position = item.key.indexOf(key);
+    if (position === 0) {
+      ranked.push({ item, rank: 0, score: 1 });
+    } else if (position > 0) {
+      const wordStart = !/[\p{L}\p{N}]/u.test(item.key[position - 1]);
+      ranked.push({ item, rank: wordStart ? 1 : 2, score: 1 });
+    } else if (queryTrigrams.size > 0) {
+      let shared = 0;
+      for (const trigram of queryTrigrams) {
+        if (item.trigrams.has(trigram)) shared++;
+      }
+      const score = shared / queryTrigrams.size;
+      if (score >= MATERIALS_CATALOG_CONFIG.MIN_FUZZY_SCORE) {
+        ranked.push({ item, rank: 3, score });
+      }
+    }
+  }
+
+  ranked.sort(
+    (a, b) =>
+      a.rank - b.rank ||
+      b.score - a.score ||
+      b.item.useCount - a.item.useCount ||
+      a.item.key.localeCompare(b.item.key)
+  );
+  return ranked.slice(0, limit).map((entry) => entry.item);
+}
+
+function escapeLike(text: string): string {
+  return text.replace(/[\\%_]/g, (char) => `\\${char}`);
+}
+
+/**
+ * Indexed lookup for catalogs too large to hold in memory: prefix matches via
+ * materials_user_name_idx, fuzzy matches via materials_name_trgm_idx
+ */
+async function searchCatalog(userId: string, key: string, limit: number): Promise<MaterialSuggestion[]> {
+  const nameKey = sql.raw(MATERIAL_NAME_KEY);
+  const prefixMatch = sql`${nameKey} LIKE ${`${escapeLike(key)}%`}`;
+  const fuzzyMatch = sql`${key} <% ${nameKey}`;
+
+  const rows = await db
+    .select()
+    .from(materials)
+    .where(and(eq(materials.userId, userId), or(prefixMatch, fuzzyMatch)))
+    .orderBy(desc(prefixMatch), desc(sql`word_similarity(${key}, ${nameKey})`), desc(materials.useCount))
+    .limit(limit);
+
+  return rows.map(toSuggestion);
+}
+
+/**
+ * Suggestions for a partially typed line item description
+ * An empty query returns the most recently used items.
+ */
+export async function autocompleteMaterials(
+  userId: string,
+  query: string,
+  limit: number = MATERIALS_CATALOG_CONFIG.DEFAULT_SUGGESTIONS
+): Promise<{ materials: MaterialSuggestion[]; source: "cache" | "database" }> {
+  const key = normalizeMaterialName(query.slice(0, MATERIALS_CATALOG_CONFIG.MAX_QUERY_LENGTH));
+  const catalog = await getCatalog(userId);
+  const matches = key ? rankCached(catalog.items, key, limit) : catalog.items.slice(0, limit);
+  const suggestions = matches.map(({ key: _key, trigrams: _trigrams, ...suggestion }) => suggestion);
+
+  if (catalog.complete || matches.length >= limit || !key) {
+    return { materials: suggestions, source: "cache" };
+  }
+
+  // Older items outside the cached slice may still match
+  const seen = new Set(suggestions.map((suggestion) => suggestion.id));
+  for (const row of await searchCatalog(userId, key, limit)) {
+    if (suggestions.length >= limit) break;
+    if (!seen.has(row.id)) suggestions.push(row);
+  }
+  return { materials: suggestions, source: "database" };
+}
+
+/**
+ * Every catalog item for a user, alphabetically
+ */
+export async function listMaterials(userId: string): Promise<MaterialSuggestion[]> {
+  const rows = await db
+    .select()
+    .from(materials)
+    .where(eq(materials.userId, userId))
+    .orderBy(asc(sql.raw(MATERIAL_NAME_KEY)));
+  return rows.map(toSuggestion);
+}
+
+type UpsertRow = { name: string; type: MaterialType; unitPriceCents: number };
+
+/**
+ * Insert or update catalog items by name (case-insensitive); names must be
+ * distinct within one call. `uses` is added to use_count of each item.
+ */
+async function upsertMaterials(userId: string, rows: UpsertRow[], uses: number): Promise<MaterialSuggestion[]> {
+  const values = sql.join(
+    rows.map((row) => sql`(${userId}, ${row.name}, ${row.type}, ${row.unitPriceCents}, ${uses}, NOW())`),
+    sql`, `
+  );
+
+  const result = await db.execute(sql`
+    INSERT INTO materials (user_id, name, type, unit_price_cents, use_count, last_used_at)
+    VALUES ${values}
+    ON CONFLICT (user_id, lower(name)) DO UPDATE SET
+      name = EXCLUDED.name,
+      type = EXCLUDED.type,
+      unit_price_cents = EXCLUDED.unit_price_cents,
+      use_count = materials.use_count + EXCLUDED.use_count,
+      last_used_at = NOW(),
+      updated_at = NOW()
+    RETURNING id, name, type, unit_price_cents AS "unitPriceCents", use_count AS "useCount"
+  `);
+  invalidateMaterialsCache(userId);
+
+  return (result.rows as Pick<Material, "id" | "name" | "type" | "unitPriceCents" | "useCount">[]).map(toSuggestion);
+}
+
+/**
+ * Add an item to the catalog, or update the price and type of the item with that name
+ */
+export async function saveMaterial(userId: string, input: MaterialInput): Promise<MaterialSuggestion> {
+  const [material] = await upsertMaterials(
+    userId,
+    [{ name: input.name.trim().replace(/\s+/g, " "), type: input.type, unitPriceCents: Math.round(input.unitPrice * 100) }],
+    0
+  );
+  return material;
+}
+
+/**
+ * Learn line items from a saved estimate, so their latest prices are suggested next time
+ * Best effort: a failure is logged and never fails the estimate save.
+ */
+export async function rememberMaterials(
+  userId: string,
+  items: { description: string; type: MaterialType; unitPrice: number }[]
+): Promise<void> {
+  const byKey = new Map<string, UpsertRow>();
+  for (const item of items) {
+    const name = item.description.trim().replace(/\s+/g, " ");
+    const unitPriceCents = Math.round(item.unitPrice * 100);
+    if (!name || name.length > 255 || unitPriceCents > MAX_UNIT_PRICE_CENTS) continue;
+    const key = normalizeMaterialName(name);
+    byKey.delete(key); // keep the latest occurrence, in order
+    byKey.set(key, { name, type: item.type, unitPriceCents });
+  }
+  const rows = [...byKey.values()].slice(-MATERIALS_CATALOG_CONFIG.MAX_LEARNED_ITEMS);
+  if (rows.length === 0) {
+    return;
+  }
+
+  try {
+    await upsertMaterials(userId, rows, 1);
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : "Unknown error";
+    console.warn(`⚠️ Could not update materials catalog: ${errorMessage}`);
+  }
+}
+
+/**
+ * Remove an item from a user's catalog; returns false if it doesn't exist
+ */
+export async function deleteMaterial(userId: string, id: number): Promise<boolean> {
+  const deleted = await db
+    .delete(materials)
+    .where(and(eq(materials.id, id), eq(materials.userId, userId)))
+    .returning({ id: materials.id });
+  invalidateMaterialsCache(userId);
+  return deleted.length > 0;
+}
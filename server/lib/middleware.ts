@@ -1,8 +1,6 @@
 import type { Context, Next } from "hono";
 import { auth } from "./auth";
-import { db } from "../db";
-import { user as userTable } from "../db/schema";
-import { eq } from "drizzle-orm";
+import { selectUserById } from "../db/queries";
 
 export type HonoContext = {
   Variables: {
@@ -52,11 +50,7 @@ export async function requireSubscription(c: Context<HonoContext>, next: Next) {
 
   try {
     // Fetch fresh user data directly from database to ensure we have latest subscription info
-    const [freshUser] = await db
-      .select()
-      .from(userTable)
-      .where(eq(userTable.id, sessionUser.id))
-      .limit(1);
+    const [freshUser] = await selectUserById.execute({ userId: sessionUser.id });
 
     if (!freshUser) {
       return c.json({ error: "User not found" }, 404);
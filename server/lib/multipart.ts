@@ -0,0 +1,271 @@
+import busboy from "busboy";
+import { Readable, Transform } from "stream";
+
+/**
+ * Streaming multipart/form-data (and urlencoded) parsing
+ *
+ * Unlike `c.req.formData()`, file parts are never buffered here: each one is
+ * handed to `onFile` as a stream while the request is still arriving. Size and
+ * type limits are enforced on the bytes as they come in, and parsing stops as
+ * soon as a limit is hit. The rest of the body is then discarded without parsing
+ * (so the client can read the error response) until maxBodyBytes, after which the
+ * connection is dropped. Files already stored for a rejected request are handed
+ * to `onDiscard`, since the caller never sees them.
+ */
+
+export type MultipartFileRule = {
+  maxBytes: number;
+  allowedTypes: string[];
+};
+
+export type MultipartFilePart = {
+  field: string;
+  filename: string;
+  mimeType: string;
+  stream: Readable;
+};
+
+export type MultipartOptions<T> = {
+  // Whole request body, checked against Content-Length up front and counted while reading
+  maxBodyBytes: number;
+  // Accepted file fields; parts for any other field are discarded
+  files: Record<string, MultipartFileRule>;
+  onFile: (part: MultipartFilePart) => Promise<T>;
+  // Undo onFile for a stored file whose request was rejected (runs after every onFile settles)
+  onDiscard?: (result: T) => Promise<void>;
+};
+
+export type MultipartResult<T> = {
+  fields: Record<string, string>;
+  files: Record<string, T>;
+};
+
+/**
+ * Rejected multipart request; `status` is the HTTP status to respond with
+ */
+export class MultipartError extends Error {
+  constructor(message: string, public status: 400 | 413) {
+    super(message);
+    this.name = "MultipartError";
+  }
+}
+
+const MAX_FIELD_BYTES = 64 * 1024;
+const MAX_FIELDS = 20;
+
+// Leading bytes of the upload types we accept; the declared type must match the content
+const SIGNATURES: Record<string, (head: Buffer) => boolean> = {
+  "image/png": (head) => head.length >= 8 && head.readUInt32BE(0) === 0x89504e47 && head.readUInt32BE(4) === 0x0d0a1a0a,
+  "image/jpeg": (head) => head.length >= 3 && head[0] === 0xff && head[1] === 0xd8 && head[2] === 0xff,
+  "image/jpg": (head) => head.length >= 3 && head[0] === 0xff && head[1] === 0xd8 && head[2] === 0xff,
+  "image/webp": (head) => head.length >= 12 && head.toString("ascii", 0, 4) === "RIFF" && head.toString("ascii", 8, 12) === "WEBP",
+  "application/pdf": (head) => head.length >= 5 && head.toString("ascii", 0, 5) === "%PDF-",
+};
+const SIGNATURE_BYTES = 12;
+
+function formatMegabytes(bytes: number): string {
+  return `${bytes / 1024 / 1024}MB`;
+}
+
+/**
+ * Pass-through that fails once more than maxBytes have been seen
+ */
+function byteLimit(maxBytes: number, error: () => MultipartError): Transform {
+  let size = 0;
+  return new Transform({
+    transform(chunk: Buffer, _encoding, callback) {
+      size += chunk.length;
+      callback(size > maxBytes ? error() : null, chunk);
+    },
+  });
+}
+
+/**
+ * Pass-through that enforces a file rule: size limit plus content signature check
+ */
+function fileGuard(field: string, mimeType: string, rule: MultipartFileRule): Transform {
+  const matchesSignature = SIGNATURES[mimeType];
+  let size = 0;
+  let head: Buffer | null = matchesSignature ? Buffer.alloc(0) : null;
+
+  const checkHead = (): MultipartError | null =>
+    head && !matchesSignature(head) ? new MultipartError(`File content does not match type ${mimeType}`, 400) : null;
+
+  return new Transform({
+    transform(chunk: Buffer, _encoding, callback) {
+      size += chunk.length;
+      if (size > rule.maxBytes) {
+        callback(new MultipartError(`File size exceeds maximum allowed size of ${formatMegabytes(rule.maxBytes)}`, 400));
+        return;
+      }
+      if (head) {
+        // Hold bytes back until there are enough to check the signature
+        head = Buffer.concat([head, chunk]);
+        if (head.length < SIGNATURE_BYTES) {
+          callback();
+          return;
+        }
+        const error = checkHead();
+        const buffered = head;
+        head = null;
+        callback(error, buffered);
+        return;
+      }
+      callback(null, chunk);
+    },
+    flush(callback) {
+      if (head) {
+        const error = size === 0 ? new MultipartError(`${field} is empty`, 400) : checkHead();
+        callback(error, head);
+        return;
+      }
+      callback();
+    },
+  });
+}
+
+/**
+ * Parse a multipart/form-data or urlencoded request body, streaming file parts to onFile
+ * Rejects with MultipartError for limit/type violations and malformed bodies.
+ */
+export function parseMultipart<T>(request: Request, options: MultipartOptions<T>): Promise<MultipartResult<T>> {
+  const contentLength = Number(request.headers.get("content-length"));
+  if (contentLength > options.maxBodyBytes) {
+    return Promise.reject(
+      new MultipartError(`Request body exceeds maximum allowed size of ${formatMegabytes(options.maxBodyBytes)}`, 413)
+    );
+  }
+  if (!request.body) {
+    return Promise.resolve({ fields: {}, files: {} });
+  }
+
+  return new Promise((resolve, reject) => {
+    const fields: Record<string, string> = {};
+    const files: Record<string, T> = {};
+    const pending: Promise<void>[] = [];
+    const stored: T[] = [];
+    const seenFiles = new Set<string>();
+    const activeFiles = new Set<Transform>();
+    let failed = false;
+
+    const discardStored = () => {
+      if (!options.onDiscard) return;
+      Promise.allSettled(pending)
+        .then(() => Promise.allSettled(stored.map((result) => options.onDiscard!(result))))
+        .then((outcomes) => {
+          for (const outcome of outcomes) {
+            if (outcome.status === "rejected") {
+              console.error("Error discarding uploaded file:", outcome.reason);
+            }
+          }
+        });
+    };
+
+    let parser: busboy.Busboy;
+    try {
+      parser = busboy({
+        headers: Object.fromEntries(request.headers),
+        limits: {
+          fieldSize: MAX_FIELD_BYTES,
+          fields: MAX_FIELDS,
+          files: Object.keys(options.files).length,
+        },
+      });
+    } catch (error) {
+      reject(new MultipartError(error instanceof Error ? error.message : "Malformed form data", 400));
+      return;
+    }
+
+    const source = Readable.fromWeb(request.body as any);
+    const body = byteLimit(
+      options.maxBodyBytes,
+      () => new MultipartError(`Request body exceeds maximum allowed size of ${formatMegabytes(options.maxBodyBytes)}`, 413)
+    );
+
+    // Stop parsing as soon as anything is rejected
+    const fail = (error: unknown) => {
+      if (failed) return;
+      failed = true;
+      const rejection =
+        error instanceof MultipartError
+          ? error
+          : new MultipartError(error instanceof Error ? error.message : "Malformed form data", 400);
+      body.unpipe(parser);
+      if (rejection.status === 413) {
+        source.destroy();
+      } else {
+        // Discard the remainder; byteLimit still drops the connection past maxBodyBytes
+        body.resume();
+      }
+      // Files still being written won't receive more bytes; fail them so consumers clean up
+      for (const file of activeFiles) {
+        file.destroy(rejection);
+      }
+      discardStored();
+      reject(rejection);
+    };
+
+    parser.on("field", (name, value, info) => {
+      if (info.valueTruncated) {
+        fail(new MultipartError(`Field ${name} is too long`, 400));
+        return;
+      }
+      fields[name] = value;
+    });
+
+    parser.on("file", (field, stream, info) => {
+      const rule = options.files[field];
+      if (!rule || failed) {
+        stream.resume(); // Discard parts we don't accept
+        return;
+      }
+      if (seenFiles.has(field)) {
+        stream.resume();
+        fail(new MultipartError(`Only one file is allowed for ${field}`, 400));
+        return;
+      }
+      seenFiles.add(field);
+      if (!rule.allowedTypes.includes(info.mimeType)) {
+        stream.resume();
+        fail(new MultipartError(`Invalid file type. Allowed types: ${rule.allowedTypes.join(", ")}`, 400));
+        return;
+      }
+
+      const guarded = stream.pipe(fileGuard(field, info.mimeType, rule));
+      stream.on("error", (error) => guarded.destroy(error));
+      activeFiles.add(guarded);
+      guarded.on("close", () => activeFiles.delete(guarded));
+      pending.push(
+        options
+          .onFile({ field, filename: info.filename, mimeType: info.mimeType, stream: guarded })
+          .then((result) => {
+            stored.push(result);
+            files[field] = result;
+          })
+          .catch((error) => {
+            stream.resume();
+            fail(error);
+          })
+      );
+    });
+
+    parser.on("filesLimit", () => fail(new MultipartError("Too many files", 400)));
+    parser.on("fieldsLimit", () => fail(new MultipartError("Too many fields", 400)));
+    parser.on("error", fail);
+    body.on("error", (error) => {
+      source.destroy();
+      fail(error);
+    });
+    source.on("error", fail);
+
+    parser.on("close", () => {
+      Promise.all(pending).then(() => {
+        if (!failed) {
+          resolve({ fields, files });
+        }
+      });
+    });
+
+    source.pipe(body).pipe(parser);
+  });
+}
@@ -1,9 +1,21 @@
-import { PDFDocument, StandardFonts, rgb, PDFPage } from "pdf-lib";
-import { readFile } from "fs/promises";
-import { existsSync } from "fs";
-import path from "path";
+import {
+  PDFDocument,
+  StandardFonts,
+  rgb,
+  degrees,
+  PDFPage,
+  PDFFont,
+  drawObject,
+  drawText,
+  popGraphicsState,
+  pushGraphicsState,
+  setGraphicsState,
+  translate,
+} from "pdf-lib";
 import type { Estimate } from "../db/schema";
 import type { Settings } from "../db/schema";
+import { PDF_LOGO_BOX, detectEmbeddableFormat, needsLogoProcessing, processLogo } from "./image-processing";
+import { readUploadedFile } from "./file-upload";
 
 /**
  * PDF generation configuration - Modern Professional Design
@@ -34,10 +46,57 @@ const PDF_CONFIG = {
   FONT_SIZE_SMALL: 9,
   FONT_SIZE_TINY: 8,
   // Logo dimensions
-  LOGO_MAX_HEIGHT: 50,
-  LOGO_MAX_WIDTH: 120,
+  LOGO_MAX_HEIGHT: PDF_LOGO_BOX.MAX_HEIGHT,
+  LOGO_MAX_WIDTH: PDF_LOGO_BOX.MAX_WIDTH,
+  // Free tier branding, centered near the bottom of every page
+  WATERMARK_TEXT: "Created with Roofing Estimate Pro",
+  WATERMARK_Y: 30,
+  WATERMARK_OPACITY: 0.7,
 };
 
+/**
+ * Output options for generated PDFs
+ */
+export type PdfOutputOptions = {
+  // Smaller files: the template page, and the watermark when several pages carry
+  // it, are each stored once as a form XObject that every page draws. Off reproduces the earlier output (a full
+  // copy of the template page, and watermark text, per page). Both modes use
+  // pdf-lib's default compressed object streams.
+  compact?: boolean;
+  // Free tier branding line on every page
+  watermark?: boolean;
+};
+
+/**
+ * Custom template overlay configuration (see docs/PDF_TEMPLATE_GUIDE.md)
+ */
+const TEMPLATE_CONFIG = {
+  COLOR_ACCENT: rgb(0.9, 0.22, 0.27), // #E63946 - Title and total
+  COLOR_TEXT: rgb(0.067, 0.067, 0.067), // #111111 - Body text
+  FONT_SIZE_TITLE: 24,
+  FONT_SIZE_BODY: 10,
+  FONT_SIZE_TOTAL: 18,
+  TABLE_X: 72,
+  ROW_HEIGHT: 20,
+  COLUMN_WIDTHS: { description: 200, quantity: 50, unitPrice: 80, type: 80, subtotal: 80 },
+  // Parsed templates kept in memory; keys are content-hash URLs, so each upload is its own version
+  CACHE_MAX_TEMPLATES: 50,
+};
+
+/**
+ * Field positions on the template page, in points from the bottom-left corner
+ */
+export function getFieldPositions(pageWidth: number, pageHeight: number) {
+  return {
+    title: { x: 72, y: pageHeight - 100 },
+    clientName: { x: 72, y: pageHeight - 200 },
+    clientPhone: { x: 72, y: pageHeight - 220 },
+    clientAddress: { x: 72, y: pageHeight - 240 },
+    lineItemsStartY: pageHeight - 300,
+    total: { x: pageWidth - 200, y: 150 },
+  };
+}
+
 /**
  * Format currency from cents to dollars
  */
@@ -81,26 +140,23 @@ async function embedLogo(
   }
 
   try {
-    const filename = path.basename(logoPath);
-    const filePath = path.join(process.cwd(), "public", "uploads", filename);
-
-    if (!existsSync(filePath)) {
-      console.warn(`Logo file not found: ${filePath}`);
+    // Read through blob storage; repeat PDFs hit the in-process cache
+    let fileBuffer = await readUploadedFile(logoPath);
+    if (!fileBuffer) {
+      console.warn(`Logo file not found: ${logoPath}`);
       return null;
     }
 
-    const fileBuffer = await readFile(filePath);
-    const fileExtension = path.extname(filePath).toLowerCase();
-
-    let embeddedImage;
-    if (fileExtension === ".png" || fileExtension === ".webp") {
-      embeddedImage = await pdfDoc.embedPng(fileBuffer);
-    } else if (fileExtension === ".jpg" || fileExtension === ".jpeg") {
-      embeddedImage = await pdfDoc.embedJpg(fileBuffer);
-    } else {
-      console.warn(`Unsupported logo format: ${fileExtension}`);
-      return null;
+    // Logos uploaded before upload-time normalization may be WebP, full size or EXIF-rotated
+    if (await needsLogoProcessing(fileBuffer)) {
+      console.warn(`Logo ${logoPath} was not normalized at upload; converting for this PDF`);
+      fileBuffer = (await processLogo(fileBuffer)).pdf.buffer;
     }
+    const format = detectEmbeddableFormat(fileBuffer);
+
+    const embeddedImage = format === "png"
+      ? await pdfDoc.embedPng(fileBuffer)
+      : await pdfDoc.embedJpg(fileBuffer);
 
     const { width: imgWidth, height: imgHeight } = embeddedImage;
     const aspectRatio = imgWidth / imgHeight;
@@ -172,14 +228,248 @@ function drawRoundedRect(
   });
 }
 
+// Parsed template documents by template URL, least recently used first
+const templateCache = new Map<string, Promise<PDFDocument | null>>();
+
+/**
+ * Load and parse a PDF template, once per template version
+ * Concurrent exports share the same in-flight parse. Returns null (and logs) if
+ * the template is missing or isn't a readable PDF.
+ */
+async function loadTemplate(templateUrl: string): Promise<PDFDocument | null> {
+  const cached = templateCache.get(templateUrl);
+  if (cached) {
+    templateCache.delete(templateUrl);
+    templateCache.set(templateUrl, cached);
+    return cached;
+  }
+
+  const loading = (async () => {
+    try {
+      const bytes = await readUploadedFile(templateUrl);
+      if (!bytes) {
+        console.warn(`PDF template not found: ${templateUrl}`);
+        return null;
+      }
+      // Image templates are allowed by upload validation but can't be overlaid
+      if (bytes.subarray(0, 5).toString("ascii") !== "%PDF-") {
+        console.warn(`PDF template ${templateUrl} is not a PDF; using the default layout`);
+        return null;
+      }
+      const template = await PDFDocument.load(bytes, { ignoreEncryption: true, updateMetadata: false });
+      return template.getPageCount() > 0 ? template : null;
+    } catch (error) {
+      console.error(`Error loading PDF template: ${error instanceof Error ? error.message : "Unknown error"}`);
+      return null;
+    }
+  })();
+
+  templateCache.set(templateUrl, loading);
+  // Don't remember failures; the file may be fixed or storage may recover
+  loading.then((template) => {
+    if (!template && templateCache.get(templateUrl) === loading) {
+      templateCache.delete(templateUrl);
+    }
+  });
+  while (templateCache.size > TEMPLATE_CONFIG.CACHE_MAX_TEMPLATES) {
+    templateCache.delete(templateCache.keys().next().value!);
+  }
+  return loading;
+}
+
+/**
+ * Draw the Free tier watermark on every page
+ * In compact mode a watermark shared by several pages is drawn once into a form
+ * XObject with the document's own Helvetica, so each page adds only a reference
+ * to it. A single page gets the text directly, which is smaller than the form.
+ */
+function drawWatermark(pdfDoc: PDFDocument, font: PDFFont, compact: boolean): void {
+  const pages = pdfDoc.getPages();
+  const text = PDF_CONFIG.WATERMARK_TEXT;
+  const size = PDF_CONFIG.FONT_SIZE_SMALL;
+  const width = font.widthOfTextAtSize(text, size);
+  const xOn = (page: PDFPage) => (page.getWidth() - width) / 2;
+
+  if (!compact || pages.length < 2) {
+    for (const page of pages) {
+      page.drawText(text, {
+        x: xOn(page),
+        y: PDF_CONFIG.WATERMARK_Y,
+        size,
+        font,
+        color: PDF_CONFIG.COLOR_TEXT_LIGHT,
+        opacity: PDF_CONFIG.WATERMARK_OPACITY,
+      });
+    }
+    return;
+  }
+
+  // Room below the baseline for descenders, which would otherwise be clipped by the form's bounding box
+  const baseline = size * 0.3;
+  const { context } = pdfDoc;
+  const watermark = context.register(
+    context.formXObject(
+      drawText(font.encodeText(text), {
+        x: 0,
+        y: baseline,
+        size,
+        font: "F",
+        color: PDF_CONFIG.COLOR_TEXT_LIGHT,
+        rotate: degrees(0),
+        xSkew: degrees(0),
+        ySkew: degrees(0),
+      }),
+      { BBox: [0, 0, width, size + baseline], Resources: { Font: { F: font.ref } } }
+    )
+  );
+  const opacity = context.register(
+    context.obj({ Type: "ExtGState", ca: PDF_CONFIG.WATERMARK_OPACITY, CA: PDF_CONFIG.WATERMARK_OPACITY })
+  );
+
+  for (const page of pages) {
+    const xObject = page.node.newXObject("Watermark", watermark);
+    const graphicsState = page.node.newExtGState("WatermarkGS", opacity);
+    page.pushOperators(
+      pushGraphicsState(),
+      setGraphicsState(graphicsState),
+      translate(xOn(page), PDF_CONFIG.WATERMARK_Y - baseline),
+      drawObject(xObject),
+      popGraphicsState()
+    );
+  }
+}
+
+/**
+ * Generate PDF by overlaying estimate data onto the first page of a parsed template
+ * Only the template page is copied per export; items that don't fit continue on
+ * further pages with the same background. In compact mode the template page is
+ * embedded once and drawn on every page (unless it's rotated, which embedding
+ * wouldn't preserve).
+ */
+export async function generatePDFFromTemplate(
+  estimate: Estimate,
+  template: PDFDocument,
+  options: PdfOutputOptions = {}
+): Promise<Uint8Array> {
+  const items = estimate.items as Array<{
+    description: string;
+    quantity: number;
+    unitPrice: number;
+    type: "labor" | "material" | "equipment";
+  }>;
+
+  if (!items || items.length === 0) {
+    throw new Error("Estimate must have at least one item");
+  }
+
+  const compact = options.compact ?? false;
+  const pdfDoc = await PDFDocument.create();
+  const helvetica = await pdfDoc.embedFont(StandardFonts.Helvetica);
+  const helveticaBold = await pdfDoc.embedFont(StandardFonts.HelveticaBold);
+
+  const templatePage = template.getPage(0);
+  const background =
+    compact && templatePage.getRotation().angle % 360 === 0 ? await pdfDoc.embedPage(templatePage) : null;
+
+  const addTemplatePage = async (): Promise<PDFPage> => {
+    let page: PDFPage;
+    if (background) {
+      page = pdfDoc.addPage([background.width, background.height]);
+      page.drawPage(background, { x: 0, y: 0 });
+    } else {
+      const [copy] = await pdfDoc.copyPages(template, [0]);
+      page = pdfDoc.addPage(copy);
+    }
+    return page;
+  };
+
+  const drawBody = (page: PDFPage, text: string, x: number, y: number, font: PDFFont = helvetica) => {
+    page.drawText(text, { x, y, size: TEMPLATE_CONFIG.FONT_SIZE_BODY, font, color: TEMPLATE_CONFIG.COLOR_TEXT });
+  };
+
+  let page = await addTemplatePage();
+  const { width: pageWidth, height: pageHeight } = page.getSize();
+  const positions = getFieldPositions(pageWidth, pageHeight);
+  const columns = TEMPLATE_CONFIG.COLUMN_WIDTHS;
+
+  // Title and client details
+  page.drawText(estimate.title, {
+    x: positions.title.x,
+    y: positions.title.y,
+    size: TEMPLATE_CONFIG.FONT_SIZE_TITLE,
+    font: helveticaBold,
+    color: TEMPLATE_CONFIG.COLOR_ACCENT,
+  });
+  drawBody(page, estimate.clientName || "—", positions.clientName.x, positions.clientName.y, helveticaBold);
+  if (estimate.clientPhone) {
+    drawBody(page, estimate.clientPhone, positions.clientPhone.x, positions.clientPhone.y);
+  }
+  if (estimate.clientAddress) {
+    drawBody(page, estimate.clientAddress, positions.clientAddress.x, positions.clientAddress.y);
+  }
+
+  // Line items table
+  const drawTableHeader = (y: number) => {
+    let x = TEMPLATE_CONFIG.TABLE_X;
+    drawBody(page, "Description", x, y, helveticaBold);
+    drawBody(page, "Qty", (x += columns.description), y, helveticaBold);
+    drawBody(page, "Unit Price", (x += columns.quantity), y, helveticaBold);
+    drawBody(page, "Type", (x += columns.unitPrice), y, helveticaBold);
+    drawBody(page, "Subtotal", (x += columns.type), y, helveticaBold);
+    return y - TEMPLATE_CONFIG.ROW_HEIGHT;
+  };
+
+  // Rows stop above the total; further rows continue on another copy of the template
+  const lowestRowY = positions.total.y + TEMPLATE_CONFIG.ROW_HEIGHT * 2;
+  let rowY = drawTableHeader(positions.lineItemsStartY);
+
+  for (const item of items) {
+    if (rowY < lowestRowY) {
+      page = await addTemplatePage();
+      rowY = drawTableHeader(positions.lineItemsStartY);
+    }
+
+    let x = TEMPLATE_CONFIG.TABLE_X;
+    drawBody(page, item.description.substring(0, 40), x, rowY);
+    drawBody(page, item.quantity.toString(), (x += columns.description), rowY);
+    drawBody(page, formatCurrencyFromDollars(item.unitPrice), (x += columns.quantity), rowY);
+    drawBody(page, item.type.charAt(0).toUpperCase() + item.type.slice(1), (x += columns.unitPrice), rowY);
+    drawBody(page, formatCurrencyFromDollars(item.quantity * item.unitPrice), (x += columns.type), rowY);
+    rowY -= TEMPLATE_CONFIG.ROW_HEIGHT;
+  }
+
+  // Total on the last page
+  page.drawText(`Total: ${formatCurrency(estimate.total)}`, {
+    x: positions.total.x,
+    y: positions.total.y,
+    size: TEMPLATE_CONFIG.FONT_SIZE_TOTAL,
+    font: helveticaBold,
+    color: TEMPLATE_CONFIG.COLOR_ACCENT,
+  });
+
+  if (options.watermark) {
+    drawWatermark(pdfDoc, helvetica, compact);
+  }
+
+  return await pdfDoc.save();
+}
+
 /**
  * Generate PDF from estimate data
+ * Uses the user's uploaded template when there is a usable one, otherwise the default layout.
  */
 export async function generateEstimatePDF(
   estimate: Estimate,
-  settings: Settings | null
+  settings: Settings | null,
+  options: PdfOutputOptions = {}
 ): Promise<Uint8Array> {
-  return await generatePDFProgrammatically(estimate, settings);
+  if (settings?.pdfTemplate) {
+    const template = await loadTemplate(settings.pdfTemplate);
+    if (template) {
+      return await generatePDFFromTemplate(estimate, template, options);
+    }
+  }
+  return await generatePDFProgrammatically(estimate, settings, options);
 }
 
 /**
@@ -187,8 +477,10 @@ export async function generateEstimatePDF(
  */
 async function generatePDFProgrammatically(
   estimate: Estimate,
-  settings: Settings | null
+  settings: Settings | null,
+  options: PdfOutputOptions
 ): Promise<Uint8Array> {
+  const compact = options.compact ?? false;
   const pdfDoc = await PDFDocument.create();
   
   // Embed fonts
@@ -640,7 +932,10 @@ async function generatePDFProgrammatically(
     });
   }
 
+  if (options.watermark) {
+    drawWatermark(pdfDoc, helvetica, compact);
+  }
+
   // Serialize and return
-  const pdfBytes = await pdfDoc.save();
-  return pdfBytes;
+  return await pdfDoc.save();
 }
@@ -0,0 +1,163 @@
+/**
+ * Batch quoting - tier prices for many job scenarios in one pass
+ *
+ * Mirrors the Quick Estimate calculation in EstimateBuilder (labor = hours x rate,
+ * subtotal, percentage discount, then a multiplier per service tier), but in
+ * integer fixed point so every price is exact cents:
+ * - money is converted to cents, labor hours to hundredths, discounts and tier
+ *   multipliers to basis points
+ * - each division rounds half up, once per step
+ *
+ * Inputs are validated into typed-array columns up front, then every scenario
+ * is priced in a single tight loop, which keeps 100k scenarios well under a second.
+ */
+
+export const TIER_MULTIPLIERS = {
+  standard: 1.0,
+  priority: 1.15,
+  emergency: 1.3,
+} as const;
+
+export type QuoteTier = keyof typeof TIER_MULTIPLIERS;
+
+// TIER_MULTIPLIERS in basis points (1.15 -> 11500), precomputed once
+const TIER_BASIS_POINTS = Object.fromEntries(
+  Object.entries(TIER_MULTIPLIERS).map(([tier, multiplier]) => [tier, Math.round(multiplier * 10_000)])
+) as Record<QuoteTier, number>;
+
+export const MAX_QUOTE_SCENARIOS = 100_000;
+
+// Upper bounds per input; they keep every intermediate product below 2^53
+export const QUOTE_INPUT_LIMITS = {
+  equipmentCost: 1_000_000,
+  materialsCost: 1_000_000,
+  laborHours: 10_000,
+  laborRate: 10_000,
+  discountPercent: 100,
+} as const;
+
+export type QuoteInput = keyof typeof QUOTE_INPUT_LIMITS;
+
+// Fixed-point scale per input: cents, hundredths of an hour, basis points
+const INPUT_SCALE: Record<QuoteInput, number> = {
+  equipmentCost: 100,
+  materialsCost: 100,
+  laborHours: 100,
+  laborRate: 100,
+  discountPercent: 100,
+};
+
+const QUOTE_INPUTS = Object.keys(QUOTE_INPUT_LIMITS) as QuoteInput[];
+
+export type QuoteScenario = Partial<Record<QuoteInput, number>>;
+
+/**
+ * Prices for one scenario, all in cents
+ */
+export type Quote = {
+  laborTotal: number;
+  subtotal: number;
+  discountAmount: number;
+  finalPrice: number;
+  standardPrice: number;
+  priorityPrice: number;
+  emergencyPrice: number;
+};
+
+export type QuoteIssue = {
+  path: (string | number)[];
+  message: string;
+};
+
+/**
+ * Invalid scenarios; `details` follows the shape of zod issues used by other endpoints
+ */
+export class QuoteValidationError extends Error {
+  constructor(public details: QuoteIssue[]) {
+    super("Validation failed");
+    this.name = "QuoteValidationError";
+  }
+}
+
+// Stop collecting issues past this many; the client has enough to fix
+const MAX_REPORTED_ISSUES = 100;
+
+/**
+ * a / b rounded half up, for non-negative integers
+ */
+function roundDiv(a: number, b: number): number {
+  return Math.floor((2 * a + b) / (2 * b));
+}
+
+/**
+ * Decimal input to fixed point; the epsilon nudge keeps e.g. 1.005 dollars at 101
+ * cents despite 1.005 * 100 being 100.49999999999999 in floating point
+ */
+function toFixedPoint(value: number, scale: number): number {
+  return Math.round(value * scale * (1 + Number.EPSILON));
+}
+
+/**
+ * Quote every scenario at every tier
+ * Missing inputs count as 0, like empty fields in the Quick Estimate builder.
+ * Throws QuoteValidationError if any scenario is invalid.
+ */
+export function quoteScenarios(scenarios: unknown[]): Quote[] {
+  const count = scenarios.length;
+  const columns = Object.fromEntries(QUOTE_INPUTS.map((input) => [input, new Float64Array(count)])) as Record<
+    QuoteInput,
+    Float64Array
+  >;
+  const issues: QuoteIssue[] = [];
+
+  // Load and validate into fixed-point columns
+  for (let i = 0; i < count && issues.length < MAX_REPORTED_ISSUES; i++) {
+    const scenario = scenarios[i];
+    if (typeof scenario !== "object" || scenario === null || Array.isArray(scenario)) {
+      issues.push({ path: ["scenarios", i], message: "Scenario must be an object" });
+      continue;
+    }
+    for (const input of QUOTE_INPUTS) {
+      const value = (scenario as Record<string, unknown>)[input];
+      if (value === undefined || value === null) {
+        continue;
+      }
+      if (typeof value !== "number" || !Number.isFinite(value)) {
+        issues.push({ path: ["scenarios", i, input], message: `${input} must be a number` });
+      } else if (value < 0) {
+        issues.push({ path: ["scenarios", i, input], message: `${input} cannot be negative` });
+      } else if (value > QUOTE_INPUT_LIMITS[input]) {
+        issues.push({ path: ["scenarios", i, input], message: `${input} cannot exceed ${QUOTE_INPUT_LIMITS[input]}` });
+      } else {
+        columns[input][i] = toFixedPoint(value, INPUT_SCALE[input]);
+      }
+    }
+  }
+  if (issues.length > 0) {
+    throw new QuoteValidationError(issues);
+  }
+
+  const { equipmentCost, materialsCost, laborHours, laborRate, discountPercent } = columns;
+  const { standard, priority, emergency } = TIER_BASIS_POINTS;
+  const quotes: Quote[] = new Array(count);
+
+  for (let i = 0; i < count; i++) {
+    // hundredths of an hour x cents per hour
+    const laborTotal = roundDiv(laborHours[i] * laborRate[i], 100);
+    const subtotal = equipmentCost[i] + materialsCost[i] + laborTotal;
+    const discountAmount = roundDiv(subtotal * discountPercent[i], 10_000);
+    const finalPrice = subtotal - discountAmount;
+
+    quotes[i] = {
+      laborTotal,
+      subtotal,
+      discountAmount,
+      finalPrice,
+      standardPrice: roundDiv(finalPrice * standard, 10_000),
+      priorityPrice: roundDiv(finalPrice * priority, 10_000),
+      emergencyPrice: roundDiv(finalPrice * emergency, 10_000),
+    };
+  }
+
+  return quotes;
+}
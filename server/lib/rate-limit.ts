@@ -0,0 +1,335 @@
+import type { Context, Next } from "hono";
+import { sql } from "drizzle-orm";
+import { db } from "../db";
+import type { HonoContext } from "./middleware";
+
+/**
+ * Rate limiting and load shedding for expensive endpoints
+ *
+ * rateLimit(policy) is route middleware backed by token buckets: each bucket holds
+ * up to `capacity` requests and refills continuously at `refillPerMinute`, so
+ * clients get short bursts but a bounded sustained rate. Buckets are kept per
+ * signed-in user and per client IP; a request must find a token in both, which
+ * stops one account from starving others and many accounts from one address from
+ * adding up. Rejected requests get 429 with Retry-After set to when a token will
+ * be available.
+ *
+ * Backends:
+ * - memory (default): buckets in this process; each server instance limits on its own
+ * - postgres: buckets in rate_limit_buckets (server/db/rate-limits.ts), shared by all
+ *   instances at the cost of one round trip per bucket. If the database can't be
+ *   reached, the in-memory buckets are used rather than failing the request.
+ *
+ * loadShedding() runs on every API request and counts the ones in flight. Once that
+ * passes SHED_LOW_AT, low-priority work (PDFs, exports, uploads) and clients that
+ * already hold more than their fair share of requests are turned away with 503;
+ * past SHED_NORMAL_AT everything but critical requests is. Critical requests
+ * (webhooks, health checks, subscription status) are never shed.
+ */
+
+export const RATE_LIMIT_CONFIG = {
+  BACKEND: (process.env.RATE_LIMIT_BACKEND || "memory") as "memory" | "postgres",
+  // Take the client address from X-Forwarded-For / X-Real-IP. Only enable behind a
+  // proxy that sets them: clients reaching the server directly can send any value.
+  // On Netlify the platform's client address is used without this.
+  TRUST_PROXY: process.env.RATE_LIMIT_TRUST_PROXY === "true",
+  // In-memory buckets kept; the least recently used are dropped (a dropped bucket starts full)
+  MAX_MEMORY_BUCKETS: 50_000,
+  // Shared buckets idle this long are full again and are deleted; longer than any policy takes to refill
+  BUCKET_IDLE_PURGE_MS: 60 * 60_000,
+  BUCKET_PURGE_INTERVAL_MS: 5 * 60_000,
+  // API requests in flight at which low-priority work is shed, and at which all but critical work is
+  SHED_LOW_AT: Number(process.env.RATE_LIMIT_SHED_LOW_AT) || 32,
+  SHED_NORMAL_AT: Number(process.env.RATE_LIMIT_SHED_NORMAL_AT) || 64,
+  // Once shedding, a client (IP address) holding this many requests in flight gets no more
+  FAIR_SHARE_IN_FLIGHT: 4,
+  SHED_RETRY_AFTER_SECONDS: 2,
+};
+
+export type BucketSpec = {
+  capacity: number; // Largest burst
+  refillPerMinute: number; // Sustained rate
+};
+
+export type RateLimitPolicy = {
+  user?: BucketSpec; // Per signed-in user
+  ip?: BucketSpec; // Per client IP address
+};
+
+export const RATE_LIMIT_POLICIES = {
+  // pdf-lib rendering plus several queries per request
+  pdf: {
+    user: { capacity: 20, refillPerMinute: 30 },
+    ip: { capacity: 60, refillPerMinute: 120 },
+  },
+  // Multipart uploads with image processing
+  settings: {
+    user: { capacity: 20, refillPerMinute: 20 },
+    ip: { capacity: 60, refillPerMinute: 60 },
+  },
+  // Sign-in and sign-up hash a password; there's no user yet, so per IP only
+  auth: {
+    ip: { capacity: 20, refillPerMinute: 60 },
+  },
+  // Up to 100k scenarios priced per request
+  quotes: {
+    user: { capacity: 10, refillPerMinute: 30 },
+    ip: { capacity: 30, refillPerMinute: 90 },
+  },
+  // Up to 500 estimate writes in one transaction; offline replay sends a few in a row
+  batch: {
+    user: { capacity: 20, refillPerMinute: 60 },
+    ip: { capacity: 60, refillPerMinute: 180 },
+  },
+  // Streams and inserts up to 200k CSV rows
+  import: {
+    user: { capacity: 5, refillPerMinute: 10 },
+    ip: { capacity: 20, refillPerMinute: 40 },
+  },
+} satisfies Record<string, RateLimitPolicy>;
+
+export type RateLimitPolicyName = keyof typeof RATE_LIMIT_POLICIES;
+
+export type TakeResult = {
+  allowed: boolean;
+  remaining: number; // Tokens left after this request (fractional while refilling)
+  retryAfterMs: number; // Until enough tokens are available; 0 when allowed
+};
+
+export interface RateLimitStore {
+  /** Refill the bucket for the time elapsed, then spend `cost` tokens if it has them */
+  take(key: string, spec: BucketSpec, cost?: number): Promise<TakeResult>;
+}
+
+function toTakeResult(spec: BucketSpec, allowed: boolean, tokens: number, cost: number): TakeResult {
+  const refillPerMs = spec.refillPerMinute / 60_000;
+  return {
+    allowed,
+    remaining: tokens,
+    retryAfterMs: allowed ? 0 : Math.ceil((cost - tokens) / refillPerMs),
+  };
+}
+
+export class MemoryRateLimitStore implements RateLimitStore {
+  // Insertion order is least recently used first
+  private buckets = new Map<string, { tokens: number; updatedAt: number }>();
+
+  constructor(
+    private maxBuckets: number,
+    private now: () => number = Date.now
+  ) {}
+
+  async take(key: string, spec: BucketSpec, cost = 1): Promise<TakeResult> {
+    const now = this.now();
+    const bucket = this.buckets.get(key);
+    let tokens = bucket
+      ? Math.min(spec.capacity, bucket.tokens + ((now - bucket.updatedAt) * spec.refillPerMinute) / 60_000)
+      : spec.capacity;
+
+    const allowed = tokens >= cost;
+    if (allowed) {
+      tokens -= cost;
+    }
+
+    this.buckets.delete(key);
+    this.buckets.set(key, { tokens, updatedAt: now });
+    if (this.buckets.size > this.maxBuckets) {
+      this.buckets.delete(this.buckets.keys().next().value!);
+    }
+
+    return toTakeResult(spec, allowed, tokens, cost);
+  }
+}
+
+export class PostgresRateLimitStore implements RateLimitStore {
+  private lastPurgeAt = 0;
+
+  constructor(private fallback: RateLimitStore) {}
+
+  async take(key: string, spec: BucketSpec, cost = 1): Promise<TakeResult> {
+    try {
+      const result = await db.execute(
+        sql`SELECT allowed, remaining FROM take_rate_limit_tokens(${key}, ${spec.capacity}, ${spec.refillPerMinute / 60}, ${cost})`
+      );
+      const [row] = result.rows as Array<{ allowed: boolean; remaining: number | string }>;
+      this.purgeIdleBuckets();
+      return toTakeResult(spec, row.allowed, Number(row.remaining), cost);
+    } catch (error) {
+      const errorMessage = error instanceof Error ? error.message : "Unknown error";
+      console.error(`❌ Shared rate limit unavailable, using in-memory buckets: ${errorMessage}`);
+      return this.fallback.take(key, spec, cost);
+    }
+  }
+
+  private purgeIdleBuckets(): void {
+    const now = Date.now();
+    if (now - this.lastPurgeAt < RATE_LIMIT_CONFIG.BUCKET_PURGE_INTERVAL_MS) {
+      return;
+    }
+    this.lastPurgeAt = now;
+
+    const idleSeconds = RATE_LIMIT_CONFIG.BUCKET_IDLE_PURGE_MS / 1000;
+    // Non-blocking; deleting an idle bucket doesn't change any later decision
+    db.execute(sql`DELETE FROM rate_limit_buckets WHERE updated_at < now() - make_interval(secs => ${idleSeconds})`).catch(
+      (error) => console.error("Error purging idle rate limit buckets:", error)
+    );
+  }
+}
+
+let store: RateLimitStore | null = null;
+
+/**
+ * The configured bucket store (created on first use)
+ */
+export function getRateLimitStore(): RateLimitStore {
+  if (!store) {
+    const memory = new MemoryRateLimitStore(RATE_LIMIT_CONFIG.MAX_MEMORY_BUCKETS);
+    store = RATE_LIMIT_CONFIG.BACKEND === "postgres" ? new PostgresRateLimitStore(memory) : memory;
+  }
+  return store;
+}
+
+/**
+ * Address of the client that sent the request
+ */
+export function clientIp(c: Context): string {
+  const env = c.env as { ip?: unknown; incoming?: { socket?: { remoteAddress?: string } } } | undefined;
+  // Netlify Functions pass their context as c.env; its ip comes from the platform, not the request
+  if (typeof env?.ip === "string" && env.ip) {
+    return env.ip;
+  }
+  if (RATE_LIMIT_CONFIG.TRUST_PROXY) {
+    // The last X-Forwarded-For entry is the one our proxy added; earlier ones are client supplied
+    const forwarded =
+      c.req.header("x-forwarded-for")?.split(",").pop()?.trim() || c.req.header("x-real-ip")?.trim();
+    if (forwarded) {
+      return forwarded;
+    }
+  }
+  // @hono/node-server passes the Node request along as c.env.incoming
+  return env?.incoming?.socket?.remoteAddress || "unknown";
+}
+
+const toSeconds = (ms: number) => Math.max(1, Math.ceil(ms / 1000));
+
+/**
+ * Rate limiting middleware; place after requireAuth so requests are also counted per user
+ */
+export function rateLimit(name: RateLimitPolicyName) {
+  const policy: RateLimitPolicy = RATE_LIMIT_POLICIES[name];
+
+  return async (c: Context<HonoContext>, next: Next) => {
+    // Not set on routes registered before the session middleware (auth)
+    const user = c.get("user");
+    const buckets: Array<[string, BucketSpec]> = [];
+    // User first, so a client over its own limit doesn't use up its address's tokens
+    if (policy.user && user) {
+      buckets.push([`${name}:user:${user.id}`, policy.user]);
+    }
+    if (policy.ip) {
+      buckets.push([`${name}:ip:${clientIp(c)}`, policy.ip]);
+    }
+
+    let limit = Infinity;
+    let remaining = Infinity;
+    for (const [key, spec] of buckets) {
+      const result = await getRateLimitStore().take(key, spec);
+      if (!result.allowed) {
+        const retryAfter = toSeconds(result.retryAfterMs);
+        c.header("Retry-After", String(retryAfter));
+        return c.json(
+          {
+            error: "Too many requests",
+            message: `Rate limit exceeded, try again in ${retryAfter} second${retryAfter === 1 ? "" : "s"}`,
+            retryAfter,
+          },
+          429
+        );
+      }
+      if (result.remaining < remaining) {
+        limit = spec.capacity;
+        remaining = result.remaining;
+      }
+    }
+
+    await next();
+
+    if (buckets.length > 0) {
+      c.res.headers.set("RateLimit-Limit", String(limit));
+      c.res.headers.set("RateLimit-Remaining", String(Math.floor(remaining)));
+    }
+  };
+}
+
+export type RequestPriority = "critical" | "normal" | "low";
+
+// First match wins; anything else is normal
+const REQUEST_PRIORITIES: Array<{ method?: string; pattern: RegExp; priority: RequestPriority }> = [
+  { pattern: /^\/api\/webhooks\//, priority: "critical" },
+  { pattern: /^\/api\/health/, priority: "critical" },
+  // Status reads are cheap and gate the UI; verify and portal call Stripe, so they stay normal
+  { method: "GET", pattern: /^\/api\/subscription\/(status|events)$/, priority: "critical" },
+  { method: "POST", pattern: /^\/api\/pdf\/generate$/, priority: "low" },
+  { method: "PUT", pattern: /^\/api\/settings$/, priority: "low" },
+  { method: "GET", pattern: /^\/api\/estimates\/export$/, priority: "low" },
+  { method: "POST", pattern: /^\/api\/estimates\/import$/, priority: "low" },
+  { method: "POST", pattern: /^\/api\/analytics\/rebuild$/, priority: "low" },
+  { method: "POST", pattern: /^\/api\/quotes\/batch$/, priority: "low" },
+];
+
+export function requestPriority(method: string, path: string): RequestPriority {
+  const match = REQUEST_PRIORITIES.find(
+    (entry) => (!entry.method || entry.method === method) && entry.pattern.test(path)
+  );
+  return match?.priority ?? "normal";
+}
+
+let inFlight = 0;
+const inFlightByClient = new Map<string, number>();
+
+/**
+ * Requests currently counted by loadShedding()
+ */
+export function requestsInFlight(): number {
+  return inFlight;
+}
+
+/**
+ * Load shedding middleware; register first so shed requests cost as little as possible
+ */
+export function loadShedding() {
+  return async (c: Context, next: Next) => {
+    const priority = requestPriority(c.req.method, c.req.path);
+    // Critical requests are cheap or must land (webhooks), and long-lived event
+    // streams would otherwise count as load for their whole lifetime
+    if (priority === "critical" || c.req.method === "OPTIONS") {
+      return next();
+    }
+
+    const { SHED_LOW_AT, SHED_NORMAL_AT, FAIR_SHARE_IN_FLIGHT, SHED_RETRY_AFTER_SECONDS } = RATE_LIMIT_CONFIG;
+    const client = clientIp(c);
+    const clientInFlight = inFlightByClient.get(client) ?? 0;
+    const shed =
+      inFlight >= SHED_NORMAL_AT ||
+      (inFlight >= SHED_LOW_AT && (priority === "low" || clientInFlight >= FAIR_SHARE_IN_FLIGHT));
+
+    if (shed) {
+      c.header("Retry-After", String(SHED_RETRY_AFTER_SECONDS));
+      return c.json({ error: "Server busy", message: "The server is under heavy load, please retry shortly" }, 503);
+    }
+
+    inFlight++;
+    inFlightByClient.set(client, clientInFlight + 1);
+    try {
+      await next();
+    } finally {
+      inFlight--;
+      const remaining = (inFlightByClient.get(client) ?? 1) - 1;
+      if (remaining > 0) {
+        inFlightByClient.set(client, remaining);
+      } else {
+        inFlightByClient.delete(client);
+      }
+    }
+  };
+}
@@ -0,0 +1,218 @@
+import type { z } from "zod";
+import { MAX_ROOF_PITCH, type estimateItemSchema, type roofMeasurementSchema } from "./validations";
+
+/**
+ * Roof measurement - roof planes to squares and material quantities
+ *
+ * Each plane is measured the way it's taken off a plan or satellite image: its
+ * footprint (horizontal) area in square feet and its pitch as inches of rise per
+ * 12 inches of run. The true surface area is the footprint times the pitch
+ * multiplier, sqrt(1 + (rise / 12)^2), which comes from a table precomputed for
+ * every quarter-inch of rise.
+ *
+ * Quantities are worked out on the whole roof, not per plane, so that rounding up
+ * to whole bundles, rolls and boxes happens once:
+ * - squares (100 sq ft of roof surface), plus a waste allowance for cuts
+ * - shingle bundles, synthetic underlayment rolls and coil nails
+ * - estimate line items for those materials, in the shape of `estimateItemSchema`
+ */
+
+export type RoofMeasurementInput = z.infer<typeof roofMeasurementSchema>;
+export type RoofStyle = NonNullable<RoofMeasurementInput["roofStyle"]>;
+type EstimateItem = z.infer<typeof estimateItemSchema>;
+
+// Lookup resolution: quarter-inch steps of rise per 12" of run
+const PITCH_STEPS_PER_INCH = 4;
+
+/**
+ * Pitch multipliers indexed by rise * 4 (0/12 through 24/12)
+ */
+export const PITCH_MULTIPLIERS = Float64Array.from(
+  { length: MAX_ROOF_PITCH * PITCH_STEPS_PER_INCH + 1 },
+  (_, step) => Math.sqrt(1 + (step / PITCH_STEPS_PER_INCH / 12) ** 2)
+);
+
+/**
+ * Surface area / footprint area for a pitch (rise per 12" of run)
+ * Quarter-inch pitches come from the table; anything finer is computed.
+ */
+export function pitchMultiplier(pitch: number): number {
+  const step = pitch * PITCH_STEPS_PER_INCH;
+  if (Number.isInteger(step) && step >= 0 && step < PITCH_MULTIPLIERS.length) {
+    return PITCH_MULTIPLIERS[step];
+  }
+  return Math.sqrt(1 + (pitch / 12) ** 2);
+}
+
+/**
+ * Waste allowance (percent of roof area) by roof style
+ * Hips and valleys mean more angled cuts, so more shingles end up as offcuts.
+ */
+export const WASTE_PERCENT_BY_STYLE = {
+  gable: 10,
+  hip: 15,
+  complex: 20,
+} as const;
+
+/**
+ * Roof style assumed when none is given: up to two planes is a gable roof, up to
+ * four a hip roof, anything with more facets has valleys and dormers
+ */
+export function roofStyleForPlaneCount(planeCount: number): RoofStyle {
+  if (planeCount <= 2) return "gable";
+  if (planeCount <= 4) return "hip";
+  return "complex";
+}
+
+export const ROOF_COVERAGE = {
+  // Standard three-tab and architectural shingles: 3 bundles cover one square
+  BUNDLES_PER_SQUARE: 3,
+  // Synthetic underlayment roll, 10 squares after laps
+  SQUARES_PER_UNDERLAYMENT_ROLL: 10,
+  // 4 nails per shingle at roughly 80 shingles per square
+  NAILS_PER_SQUARE: 320,
+  // Coil roofing nails, 1-1/4", one box
+  NAILS_PER_BOX: 7_200,
+  // Asphalt shingles aren't rated for pitches below 2/12
+  MIN_SHINGLE_PITCH: 2,
+} as const;
+
+/**
+ * Default unit prices in dollars, used for any price the request doesn't set
+ */
+export const DEFAULT_ROOF_MATERIAL_PRICES = {
+  shingleBundle: 38,
+  underlaymentRoll: 95,
+  nailBox: 55,
+} as const;
+
+export type RoofMaterialPrices = Record<keyof typeof DEFAULT_ROOF_MATERIAL_PRICES, number>;
+
+export type MeasuredPlane = {
+  label: string | null;
+  footprintArea: number;
+  pitch: number;
+  pitchMultiplier: number;
+  roofArea: number;
+  squares: number;
+};
+
+export type RoofMeasurement = {
+  planes: MeasuredPlane[];
+  totals: {
+    planeCount: number;
+    footprintArea: number;
+    roofArea: number;
+    squares: number;
+    roofStyle: RoofStyle;
+    wastePercent: number;
+    squaresWithWaste: number;
+  };
+  materials: {
+    shingleBundles: number;
+    underlaymentRolls: number;
+    nails: number;
+    nailBoxes: number;
+  };
+  prices: RoofMaterialPrices;
+  lineItems: EstimateItem[];
+  // Sum of the line items, in dollars
+  materialsCost: number;
+  warnings: string[];
+};
+
+function round2(value: number): number {
+  return Math.round(value * 100) / 100;
+}
+
+/**
+ * Round up to a whole unit, ignoring floating-point noise (30.000000000004 is 30)
+ */
+function wholeUnits(value: number): number {
+  return Math.ceil(value - 1e-9);
+}
+
+/**
+ * Measure a roof from its planes; input is validated by `roofMeasurementSchema`
+ */
+export function measureRoof(input: RoofMeasurementInput): RoofMeasurement {
+  const planeCount = input.planes.length;
+  const planes: MeasuredPlane[] = new Array(planeCount);
+  const warnings: string[] = [];
+  let footprintArea = 0;
+  let roofArea = 0;
+
+  for (let i = 0; i < planeCount; i++) {
+    const { label, footprintArea: footprint, pitch } = input.planes[i];
+    const multiplier = pitchMultiplier(pitch);
+    const area = footprint * multiplier;
+    footprintArea += footprint;
+    roofArea += area;
+
+    planes[i] = {
+      label: label ?? null,
+      footprintArea: footprint,
+      pitch,
+      pitchMultiplier: Math.round(multiplier * 10_000) / 10_000,
+      roofArea: round2(area),
+      squares: round2(area / 100),
+    };
+
+    if (pitch < ROOF_COVERAGE.MIN_SHINGLE_PITCH) {
+      warnings.push(
+        `${label || `Plane ${i + 1}`}: ${pitch}/12 is below ${ROOF_COVERAGE.MIN_SHINGLE_PITCH}/12, too low-slope for asphalt shingles`
+      );
+    }
+  }
+
+  const roofStyle = input.roofStyle ?? roofStyleForPlaneCount(planeCount);
+  const wastePercent = input.wastePercent ?? WASTE_PERCENT_BY_STYLE[roofStyle];
+  const squaresWithWaste = (roofArea * (1 + wastePercent / 100)) / 100;
+
+  const shingleBundles = wholeUnits(squaresWithWaste * ROOF_COVERAGE.BUNDLES_PER_SQUARE);
+  const underlaymentRolls = wholeUnits(squaresWithWaste / ROOF_COVERAGE.SQUARES_PER_UNDERLAYMENT_ROLL);
+  const nails = wholeUnits(squaresWithWaste * ROOF_COVERAGE.NAILS_PER_SQUARE);
+  const nailBoxes = Math.ceil(nails / ROOF_COVERAGE.NAILS_PER_BOX);
+
+  const prices: RoofMaterialPrices = { ...DEFAULT_ROOF_MATERIAL_PRICES, ...input.prices };
+  const lineItems: EstimateItem[] = [
+    {
+      description: `Asphalt shingles, bundle (${round2(squaresWithWaste)} sq incl. ${wastePercent}% waste)`,
+      quantity: shingleBundles,
+      unitPrice: prices.shingleBundle,
+      type: "material",
+    },
+    {
+      description: `Synthetic underlayment, roll (${ROOF_COVERAGE.SQUARES_PER_UNDERLAYMENT_ROLL} sq)`,
+      quantity: underlaymentRolls,
+      unitPrice: prices.underlaymentRoll,
+      type: "material",
+    },
+    {
+      description: `Coil roofing nails, box of ${ROOF_COVERAGE.NAILS_PER_BOX.toLocaleString("en-US")}`,
+      quantity: nailBoxes,
+      unitPrice: prices.nailBox,
+      type: "material",
+    },
+  ];
+  // Quantities are whole units, so summing cents is exact
+  const materialsCents = lineItems.reduce((sum, item) => sum + item.quantity * Math.round(item.unitPrice * 100), 0);
+
+  return {
+    planes,
+    totals: {
+      planeCount,
+      footprintArea: round2(footprintArea),
+      roofArea: round2(roofArea),
+      squares: round2(roofArea / 100),
+      roofStyle,
+      wastePercent,
+      squaresWithWaste: round2(squaresWithWaste),
+    },
+    materials: { shingleBundles, underlaymentRolls, nails, nailBoxes },
+    prices,
+    lineItems,
+    materialsCost: materialsCents / 100,
+    warnings,
+  };
+}
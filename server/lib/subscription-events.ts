@@ -0,0 +1,85 @@
+import { EventEmitter } from "events";
+import { eq } from "drizzle-orm";
+import { db } from "../db";
+import { user } from "../db/schema";
+
+/**
+ * Subscription status change notifications for GET /api/subscription/events
+ *
+ * Whatever commits a subscription change (the Stripe webhook, manual verify)
+ * publishes it here, and open event streams for that user push it to the browser
+ * right away. Delivery is in-process only: when the webhook lands on a different
+ * server instance than the stream, the stream picks the change up from its
+ * periodic database re-check instead (a single indexed row read, never a Stripe call).
+ */
+
+export type SubscriptionChange = {
+  userId: string;
+  subscriptionStatus: string;
+  subscriptionTier: string;
+  isActive: boolean;
+};
+
+export const SUBSCRIPTION_EVENTS_CONFIG = {
+  // How often an open stream re-reads the user's row, for changes committed elsewhere
+  RECHECK_INTERVAL_MS: 5_000,
+  // Streams close after this long (serverless response limits); browsers reconnect
+  MAX_STREAM_MS: 25_000,
+  // Reconnect delay sent to EventSource clients
+  RETRY_MS: 1_000,
+};
+
+const emitter = new EventEmitter();
+// One listener per open stream; there's no fixed upper bound to warn about
+emitter.setMaxListeners(0);
+
+/**
+ * Build a change from a user row as returned by `.returning()`
+ */
+export function toSubscriptionChange(row: {
+  id: string;
+  subscriptionStatus?: string | null;
+  subscriptionTier?: string | null;
+}): SubscriptionChange {
+  const subscriptionStatus = row.subscriptionStatus || "pending";
+  return {
+    userId: row.id,
+    subscriptionStatus,
+    subscriptionTier: row.subscriptionTier || "free",
+    isActive: subscriptionStatus === "active",
+  };
+}
+
+/**
+ * Notify open streams for this user; call after the change is committed
+ */
+export function publishSubscriptionChange(change: SubscriptionChange): void {
+  emitter.emit(change.userId, change);
+}
+
+/**
+ * Listen for changes to one user's subscription; returns the unsubscribe function
+ */
+export function onSubscriptionChange(userId: string, listener: (change: SubscriptionChange) => void): () => void {
+  emitter.on(userId, listener);
+  return () => {
+    emitter.off(userId, listener);
+  };
+}
+
+/**
+ * Current subscription state from the database
+ */
+export async function readSubscriptionState(userId: string): Promise<SubscriptionChange | null> {
+  const [row] = await db
+    .select({
+      id: user.id,
+      subscriptionStatus: user.subscriptionStatus,
+      subscriptionTier: user.subscriptionTier,
+    })
+    .from(user)
+    .where(eq(user.id, userId))
+    .limit(1);
+
+  return row ? toSubscriptionChange(row) : null;
+}
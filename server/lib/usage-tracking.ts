@@ -1,5 +1,6 @@
 import { db } from "../db";
 import { user as userTable } from "../db/schema";
+import { selectUserById } from "../db/queries";
 import { eq } from "drizzle-orm";
 
 /**
@@ -14,11 +15,7 @@ const FREE_TIER_LIMIT = 3;
  */
 export async function checkAndResetMonthlyUsage(userId: string): Promise<void> {
   try {
-    const [user] = await db
-      .select()
-      .from(userTable)
-      .where(eq(userTable.id, userId))
-      .limit(1);
+    const [user] = await selectUserById.execute({ userId });
 
     if (!user) {
       throw new Error("User not found");
@@ -49,12 +46,13 @@ export async function checkAndResetMonthlyUsage(userId: string): Promise<void> {
 }
 
 /**
- * Increment estimate counter for a user
+ * Increment estimate counter for a user by `count` (default 1)
  * Only increments for Free tier users
  */
 export async function incrementEstimateUsage(
   userId: string,
-  subscriptionTier: "free" | "monthly" | "annual"
+  subscriptionTier: "free" | "monthly" | "annual",
+  count = 1
 ): Promise<{ success: boolean; currentUsage: number; limit: number; error?: string }> {
   try {
     // Only track usage for Free tier
@@ -70,11 +68,7 @@ export async function incrementEstimateUsage(
     await checkAndResetMonthlyUsage(userId);
 
     // Get current usage
-    const [user] = await db
-      .select()
-      .from(userTable)
-      .where(eq(userTable.id, userId))
-      .limit(1);
+    const [user] = await selectUserById.execute({ userId });
 
     if (!user) {
       return {
@@ -88,7 +82,7 @@ export async function incrementEstimateUsage(
     const currentUsage = user.estimatesThisMonth;
 
     // Check if limit reached
-    if (currentUsage >= FREE_TIER_LIMIT) {
+    if (currentUsage + count > FREE_TIER_LIMIT) {
       return {
         success: false,
         currentUsage,
@@ -98,7 +92,7 @@ export async function incrementEstimateUsage(
     }
 
     // Increment counter
-    const newUsage = currentUsage + 1;
+    const newUsage = currentUsage + count;
     await db
       .update(userTable)
       .set({
@@ -146,11 +140,7 @@ export async function canCreateEstimate(
     await checkAndResetMonthlyUsage(userId);
 
     // Get current usage
-    const [user] = await db
-      .select()
-      .from(userTable)
-      .where(eq(userTable.id, userId))
-      .limit(1);
+    const [user] = await selectUserById.execute({ userId });
 
     if (!user) {
       return {
@@ -202,11 +192,7 @@ export async function getUsageStats(
     await checkAndResetMonthlyUsage(userId);
 
     // Get current usage
-    const [user] = await db
-      .select()
-      .from(userTable)
-      .where(eq(userTable.id, userId))
-      .limit(1);
+    const [user] = await selectUserById.execute({ userId });
 
     if (!user) {
       return {
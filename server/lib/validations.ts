@@ -1,12 +1,25 @@
 import { z } from "zod";
 
+/**
+ * Line item bounds - within estimate_items' NUMERIC(12, 3) quantity and
+ * INTEGER unit_price_cents columns
+ */
+export const MAX_ITEM_QUANTITY = 1_000_000;
+export const MAX_UNIT_PRICE = 10_000_000;
+
 /**
  * Estimate item schema - represents a single line item in an estimate
  */
 export const estimateItemSchema = z.object({
   description: z.string().min(1, "Description is required"),
-  quantity: z.number().positive("Quantity must be positive"),
-  unitPrice: z.number().nonnegative("Unit price must be non-negative"),
+  quantity: z
+    .number()
+    .positive("Quantity must be positive")
+    .max(MAX_ITEM_QUANTITY, "Quantity cannot exceed 1,000,000"),
+  unitPrice: z
+    .number()
+    .nonnegative("Unit price must be non-negative")
+    .max(MAX_UNIT_PRICE, "Unit price cannot exceed 10,000,000"),
   type: z.enum(["labor", "material", "equipment"], {
     errorMap: () => ({ message: "Type must be 'labor', 'material', or 'equipment'" }),
   }),
@@ -36,6 +49,90 @@ export const updateEstimateSchema = z.object({
   discountPercent: z.number().min(0, "Discount cannot be negative").max(100, "Discount cannot exceed 100%").optional(),
 });
 
+/**
+ * Batch estimate operation schemas - bulk imports and offline replay
+ * Item payloads are validated individually so one bad item doesn't reject the batch
+ */
+export const MAX_BATCH_OPERATIONS = 500;
+
+export const estimateBatchOperationSchema = z.discriminatedUnion("op", [
+  z.object({
+    op: z.literal("create"),
+    clientId: z.string().min(1, "Client ID is required").max(100),
+    data: z.unknown(),
+  }),
+  z.object({
+    op: z.literal("update"),
+    id: z.number().int().positive("Estimate ID must be positive"),
+    baseUpdatedAt: z.string().datetime({ message: "baseUpdatedAt must be an ISO timestamp" }),
+    data: z.unknown(),
+  }),
+  z.object({
+    op: z.literal("delete"),
+    id: z.number().int().positive("Estimate ID must be positive"),
+  }),
+]);
+
+export const estimateBatchSchema = z.object({
+  operations: z
+    .array(estimateBatchOperationSchema)
+    .min(1, "At least one operation is required")
+    .max(MAX_BATCH_OPERATIONS, `A batch can contain at most ${MAX_BATCH_OPERATIONS} operations`),
+});
+
+/**
+ * Roof measurement schema - planes in, squares and material quantities out
+ * Footprint area is the plane's horizontal (plan view) area in square feet;
+ * pitch is inches of rise per 12 inches of run.
+ */
+export const MAX_ROOF_PLANES = 1000;
+export const MAX_ROOF_PITCH = 24;
+// Whole roof: at 24/12 pitch with 50% waste this is about 503,000 shingle bundles,
+// so every computed quantity stays within MAX_ITEM_QUANTITY
+export const MAX_ROOF_FOOTPRINT_AREA = 5_000_000;
+
+export const roofPlaneSchema = z.object({
+  label: z.string().max(100, "Label must be 100 characters or less").optional(),
+  footprintArea: z
+    .number()
+    .positive("Footprint area must be positive")
+    .max(100_000, "Footprint area cannot exceed 100,000 sq ft per plane"),
+  pitch: z
+    .number()
+    .min(0, "Pitch cannot be negative")
+    .max(MAX_ROOF_PITCH, `Pitch cannot exceed ${MAX_ROOF_PITCH}/12`),
+});
+
+export const roofMeasurementSchema = z.object({
+  planes: z
+    .array(roofPlaneSchema)
+    .min(1, "At least one roof plane is required")
+    .max(MAX_ROOF_PLANES, `A roof can have at most ${MAX_ROOF_PLANES} planes`)
+    .refine(
+      (planes) => planes.reduce((sum, plane) => sum + plane.footprintArea, 0) <= MAX_ROOF_FOOTPRINT_AREA,
+      "Total footprint area cannot exceed 5,000,000 sq ft"
+    ),
+  roofStyle: z.enum(["gable", "hip", "complex"]).optional(),
+  wastePercent: z.number().min(0, "Waste cannot be negative").max(50, "Waste cannot exceed 50%").optional(),
+  prices: z
+    .object({
+      shingleBundle: estimateItemSchema.shape.unitPrice,
+      underlaymentRoll: estimateItemSchema.shape.unitPrice,
+      nailBox: estimateItemSchema.shape.unitPrice,
+    })
+    .partial()
+    .optional(),
+});
+
+/**
+ * Materials catalog schema - one price list entry, unit price in dollars like line items
+ */
+export const materialSchema = z.object({
+  name: z.string().trim().min(1, "Name is required").max(255, "Name must be 255 characters or less"),
+  type: estimateItemSchema.shape.type,
+  unitPrice: estimateItemSchema.shape.unitPrice,
+});
+
 /**
  * Calculate total from items array with optional discount
  */
@@ -118,4 +215,5 @@ export type EstimateItem = z.infer<typeof estimateItemSchema>;
 export type CreateEstimateInput = z.infer<typeof createEstimateSchema>;
 export type UpdateEstimateInput = z.infer<typeof updateEstimateSchema>;
 export type UpdateSettingsInput = z.infer<typeof updateSettingsSchema>;
-export type CreateTemplateInput = z.infer<typeof createTemplateSchema>;
\ No newline at end of file
+export type CreateTemplateInput = z.infer<typeof createTemplateSchema>;
+export type EstimateBatchOperation = z.infer<typeof estimateBatchOperationSchema>;
\ No newline at end of file
@@ -0,0 +1,157 @@
+// Load environment variables first
+import * as dotenv from "dotenv";
+dotenv.config();
+
+/**
+ * PDF generation benchmark - custom template vs programmatic layout
+ *
+ * Renders the same estimate many times with a bounded number of exports in
+ * flight, comparing:
+ * - programmatic: the default layout drawn from scratch
+ * - template (cached): overlay onto an uploaded template, parsed once per version
+ * - template (uncached): the same overlay but parsing the template for every export,
+ *   i.e. what the cache saves
+ * - template (compact): the cached overlay in compact output mode, for file size
+ *
+ * The template is stored through the configured blob storage (local by default).
+ * Uses the app's .env like the other server scripts.
+ *
+ *   npm run bench:pdf
+ *   BENCH_PDF_REQUESTS=5000 BENCH_PDF_CONCURRENCY=128 npm run bench:pdf
+ */
+
+import { PDFDocument, StandardFonts, rgb } from "pdf-lib";
+import { generateEstimatePDF, generatePDFFromTemplate } from "./lib/pdf-generator";
+import { getBlobStorage } from "./lib/blob-storage";
+import type { Estimate, Settings } from "./db/schema";
+
+const REQUESTS = Number(process.env.BENCH_PDF_REQUESTS || 2000);
+const CONCURRENCY = Number(process.env.BENCH_PDF_CONCURRENCY || 64);
+
+/**
+ * A branded letterhead-style template with enough vector content to be realistic
+ */
+async function buildTemplate(): Promise<Uint8Array> {
+  const doc = await PDFDocument.create();
+  const font = await doc.embedFont(StandardFonts.TimesRomanBold);
+  const page = doc.addPage([612, 792]);
+
+  page.drawRectangle({ x: 0, y: 712, width: 612, height: 80, color: rgb(0.1, 0.2, 0.35) });
+  page.drawText("Summit Roofing & Exteriors", { x: 72, y: 742, size: 22, font, color: rgb(1, 1, 1) });
+  for (let i = 0; i < 400; i++) {
+    // Background pattern: many small paths, like a traced logo or watermark
+    page.drawCircle({ x: 20 + (i % 20) * 30, y: 40 + Math.floor(i / 20) * 30, size: 4, color: rgb(0.95, 0.95, 0.97) });
+  }
+  page.drawText("Licensed - Bonded - Insured", { x: 72, y: 60, size: 9, font, color: rgb(0.4, 0.4, 0.4) });
+
+  return await doc.save();
+}
+
+function buildEstimate(): Estimate {
+  const items = Array.from({ length: 15 }, (_, i) => ({
+    description: `Architectural shingles, bundle ${i + 1}`,
+    quantity: 3 + i,
+    unitPrice: 42.5,
+    type: (["material", "labor", "equipment"] as const)[i % 3],
+  }));
+  return {
+    id: 1234,
+    userId: "bench-user",
+    title: "Full roof replacement",
+    clientName: "Jordan Rivera",
+    clientPhone: "(555) 010-2030",
+    clientAddress: "42 Ridge Road, Springfield",
+    items,
+    total: Math.round(items.reduce((sum, item) => sum + item.quantity * item.unitPrice, 0) * 100),
+    createdAt: new Date(),
+    updatedAt: new Date(),
+    deletedAt: null,
+  } as unknown as Estimate;
+}
+
+function percentile(sorted: number[], p: number): number {
+  return sorted[Math.min(sorted.length - 1, Math.floor((p / 100) * sorted.length))];
+}
+
+/**
+ * Run `render` REQUESTS times with at most CONCURRENCY in flight
+ */
+async function run(name: string, render: () => Promise<Uint8Array>) {
+  const latencies: number[] = [];
+  let next = 0;
+  let bytes = 0;
+  const heapBefore = process.memoryUsage().heapUsed;
+  const started = performance.now();
+
+  const worker = async () => {
+    while (next < REQUESTS) {
+      next++;
+      const start = performance.now();
+      const pdf = await render();
+      latencies.push(performance.now() - start);
+      bytes = pdf.length;
+    }
+  };
+  await Promise.all(Array.from({ length: CONCURRENCY }, worker));
+
+  const elapsedMs = performance.now() - started;
+  latencies.sort((a, b) => a - b);
+  const result = {
+    name,
+    throughput: REQUESTS / (elapsedMs / 1000),
+    p50: percentile(latencies, 50),
+    p95: percentile(latencies, 95),
+    p99: percentile(latencies, 99),
+    heapMb: (process.memoryUsage().heapUsed - heapBefore) / 1024 / 1024,
+    pdfKb: bytes / 1024,
+  };
+  console.log(
+    `${name.padEnd(22)} ${result.throughput.toFixed(0).padStart(6)} PDFs/s` +
+      `  p50 ${result.p50.toFixed(1)}ms  p95 ${result.p95.toFixed(1)}ms  p99 ${result.p99.toFixed(1)}ms` +
+      `  heap Δ ${result.heapMb.toFixed(1)}MB  size ${result.pdfKb.toFixed(1)}KB`
+  );
+  return result;
+}
+
+async function main() {
+  console.log(`📄 PDF benchmark: ${REQUESTS} exports, ${CONCURRENCY} concurrent\n`);
+
+  const templateBytes = await buildTemplate();
+  const { key } = await getBlobStorage().put(templateBytes, { extension: ".pdf", contentType: "application/pdf" });
+  const estimate = buildEstimate();
+  const baseSettings = { companyName: "Summit Roofing", companyLogo: null, companyLogoThumbnail: null } as unknown as Settings;
+  const templateSettings = { ...baseSettings, pdfTemplate: `/uploads/${key}` } as Settings;
+
+  // Sanity check: the template path really is used and keeps the template content
+  const sample = await PDFDocument.load(await generateEstimatePDF(estimate, templateSettings));
+  if (sample.getPageCount() !== 1) {
+    throw new Error(`Expected a single template page, got ${sample.getPageCount()}`);
+  }
+
+  // Warm up JIT and the template cache before measuring
+  for (let i = 0; i < 20; i++) {
+    await generateEstimatePDF(estimate, baseSettings);
+    await generateEstimatePDF(estimate, templateSettings);
+  }
+
+  const programmatic = await run("programmatic", () => generateEstimatePDF(estimate, baseSettings));
+  const cached = await run("template (cached)", () => generateEstimatePDF(estimate, templateSettings));
+  const uncached = await run("template (uncached)", async () =>
+    generatePDFFromTemplate(estimate, await PDFDocument.load(templateBytes))
+  );
+  const compact = await run("template (compact)", () =>
+    generateEstimatePDF(estimate, templateSettings, { compact: true })
+  );
+
+  console.log(
+    `\n✅ Cached template vs programmatic: ${(cached.throughput / programmatic.throughput).toFixed(2)}x throughput;` +
+      ` cache saves ${(uncached.p50 - cached.p50).toFixed(1)}ms p50 per export;` +
+      ` compact output ${compact.pdfKb.toFixed(1)}KB vs ${cached.pdfKb.toFixed(1)}KB`
+  );
+  await getBlobStorage().delete(key);
+}
+
+main().catch((error) => {
+  console.error("❌ PDF benchmark failed:", error);
+  process.exit(1);
+});
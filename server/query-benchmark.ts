@@ -0,0 +1,144 @@
+// Load environment variables first
+import * as dotenv from "dotenv";
+dotenv.config();
+
+/**
+ * Query benchmark - prepared statements vs queries built per call
+ *
+ * For each hot query in server/db/queries.ts, compares:
+ * - build: constructing the Drizzle query and serializing it to SQL, which inline
+ *   queries do on every call and prepared statements do once (no database needed)
+ * - round trip: executing inline vs prepared against the database, sequentially,
+ *   for an existing user (skipped with BENCH_QUERIES_ROUND_TRIPS=0)
+ *
+ * Uses the app's .env like the other server scripts.
+ *
+ *   npm run bench:queries
+ *   BENCH_QUERIES_ITERATIONS=200000 BENCH_QUERIES_ROUND_TRIPS=200 npm run bench:queries
+ */
+
+import { and, desc, eq, isNull } from "drizzle-orm";
+import { db } from "./db";
+import { estimates, settings, user } from "./db/schema";
+import {
+  selectUserById,
+  selectSettingsByUser,
+  selectEstimateForUser,
+  selectEstimatesByUser,
+} from "./db/queries";
+
+const ITERATIONS = Number(process.env.BENCH_QUERIES_ITERATIONS || 50_000);
+const ROUND_TRIPS = Number(process.env.BENCH_QUERIES_ROUND_TRIPS ?? 50);
+
+type Params = { userId: string; estimateId: number };
+
+// The inline form of each prepared statement, as the call sites wrote it before
+const QUERIES = [
+  {
+    name: "user by id",
+    inline: (p: Params) => db.select().from(user).where(eq(user.id, p.userId)).limit(1),
+    prepared: (p: Params) => selectUserById.execute({ userId: p.userId }),
+  },
+  {
+    name: "settings by user",
+    inline: (p: Params) => db.select().from(settings).where(eq(settings.userId, p.userId)).limit(1),
+    prepared: (p: Params) => selectSettingsByUser.execute({ userId: p.userId }),
+  },
+  {
+    name: "estimate for user",
+    inline: (p: Params) =>
+      db
+        .select()
+        .from(estimates)
+        .where(and(eq(estimates.id, p.estimateId), eq(estimates.userId, p.userId), isNull(estimates.deletedAt)))
+        .limit(1),
+    prepared: (p: Params) => selectEstimateForUser.execute({ estimateId: p.estimateId, userId: p.userId }),
+  },
+  {
+    name: "estimates by user",
+    inline: (p: Params) =>
+      db
+        .select()
+        .from(estimates)
+        .where(and(eq(estimates.userId, p.userId), isNull(estimates.deletedAt)))
+        .orderBy(desc(estimates.createdAt)),
+    prepared: (p: Params) => selectEstimatesByUser.execute({ userId: p.userId }),
+  },
+];
+
+function percentile(sorted: number[], p: number): number {
+  const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1);
+  return sorted[Math.max(0, index)];
+}
+
+/**
+ * Per-call cost of building and serializing the inline query, in microseconds
+ */
+function measureBuild(build: (p: Params) => { toSQL: () => unknown }): number {
+  const params = { userId: "bench-user", estimateId: 1 };
+  for (let i = 0; i < 1000; i++) build(params).toSQL(); // Warm up the JIT
+
+  const started = performance.now();
+  for (let i = 0; i < ITERATIONS; i++) {
+    params.estimateId = i;
+    build(params).toSQL();
+  }
+  return ((performance.now() - started) * 1000) / ITERATIONS;
+}
+
+async function measureRoundTrips(run: () => Promise<unknown>): Promise<{ p50: number; p95: number }> {
+  await run();
+  const latencies: number[] = [];
+  for (let i = 0; i < ROUND_TRIPS; i++) {
+    const start = performance.now();
+    await run();
+    latencies.push(performance.now() - start);
+  }
+  latencies.sort((a, b) => a - b);
+  return { p50: percentile(latencies, 50), p95: percentile(latencies, 95) };
+}
+
+async function main() {
+  console.log(`🗄️  Query benchmark: ${ITERATIONS} builds, ${ROUND_TRIPS} round trips per query\n`);
+
+  console.log("Build + serialize per call (saved by preparing once):");
+  let savedPerRequest = 0;
+  for (const query of QUERIES) {
+    const micros = measureBuild(query.inline);
+    savedPerRequest += micros;
+    console.log(`  ${query.name.padEnd(20)} ${micros.toFixed(2).padStart(7)} µs`);
+  }
+  console.log(`  ${"all four".padEnd(20)} ${savedPerRequest.toFixed(2).padStart(7)} µs\n`);
+
+  if (ROUND_TRIPS <= 0) {
+    return;
+  }
+
+  // Any user with an estimate, so every query returns rows
+  const [sample] = await db
+    .select({ userId: estimates.userId, estimateId: estimates.id })
+    .from(estimates)
+    .where(isNull(estimates.deletedAt))
+    .limit(1);
+  if (!sample) {
+    console.log("No estimates in the database; skipping round trips");
+    return;
+  }
+
+  console.log("Round trip (inline vs prepared):");
+  for (const query of QUERIES) {
+    const inline = await measureRoundTrips(() => query.inline(sample));
+    const prepared = await measureRoundTrips(() => query.prepared(sample));
+    console.log(
+      `  ${query.name.padEnd(20)} inline p50 ${inline.p50.toFixed(1)}ms p95 ${inline.p95.toFixed(1)}ms` +
+        `  prepared p50 ${prepared.p50.toFixed(1)}ms p95 ${prepared.p95.toFixed(1)}ms`
+    );
+  }
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((error) => {
+    console.error("❌ Query benchmark failed:", error);
+    process.exit(1);
+  });
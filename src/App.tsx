@@ -3,26 +3,36 @@ import { Toaster as Sonner } from "@/components/ui/sonner";
 import { TooltipProvider } from "@/components/ui/tooltip";
 import { QueryClient, QueryClientProvider } from "@tanstack/react-query";
 import { BrowserRouter, Routes, Route, useLocation } from "react-router-dom";
-import React, { useEffect } from "react";
+import React, { Suspense, lazy, useEffect, type ReactNode } from "react";
 import Index from "./pages/Index";
-import Privacy from "./pages/Privacy";
-import Terms from "./pages/Terms";
-import NotFound from "./pages/NotFound";
-import Signup from "./pages/Signup";
-import Login from "./pages/Login";
-import ForgotPassword from "./pages/ForgotPassword";
-import ResetPassword from "./pages/ResetPassword";
-import Dashboard from "./pages/Dashboard";
-import Settings from "./pages/Settings";
-import Success from "./pages/Success";
-import Pricing from "./pages/Pricing";
-import Blog from "./pages/Blog";
-import EstimateGuide from "./pages/blog/EstimateGuide";
-import PricingGuide from "./pages/blog/PricingGuide";
-import TemplateComparison from "./pages/blog/TemplateComparison";
+
+// The landing page is the only eager route; every other page is its own chunk,
+// fetched on first navigation (budget: scripts/check-bundle-size.js)
+const Privacy = lazy(() => import("./pages/Privacy"));
+const Terms = lazy(() => import("./pages/Terms"));
+const NotFound = lazy(() => import("./pages/NotFound"));
+const Signup = lazy(() => import("./pages/Signup"));
+const Login = lazy(() => import("./pages/Login"));
+const ForgotPassword = lazy(() => import("./pages/ForgotPassword"));
+const ResetPassword = lazy(() => import("./pages/ResetPassword"));
+const Dashboard = lazy(() => import("./pages/Dashboard"));
+const Settings = lazy(() => import("./pages/Settings"));
+const Success = lazy(() => import("./pages/Success"));
+const Pricing = lazy(() => import("./pages/Pricing"));
+const Blog = lazy(() => import("./pages/Blog"));
+const EstimateGuide = lazy(() => import("./pages/blog/EstimateGuide"));
+const PricingGuide = lazy(() => import("./pages/blog/PricingGuide"));
+const TemplateComparison = lazy(() => import("./pages/blog/TemplateComparison"));
 
 const queryClient = new QueryClient();
 
+// Shown while a route chunk loads
+const RouteFallback = () => (
+  <div className="flex min-h-screen items-center justify-center" role="status" aria-label="Loading">
+    <div className="h-8 w-8 animate-spin rounded-full border-2 border-[#DC2626] border-t-transparent" />
+  </div>
+);
+
 // Component to handle API routes - makes actual API call via fetch (goes through Vite proxy)
 const ApiRouteHandler = () => {
   const location = useLocation();
@@ -115,36 +125,49 @@ const ApiRouteHandler = () => {
   );
 };
 
-const App = () => (
+// Providers shared by the browser app and the build-time prerender (src/entry-server.tsx)
+export const AppProviders = ({ queryClient, children }: { queryClient: QueryClient; children: ReactNode }) => (
   <QueryClientProvider client={queryClient}>
     <TooltipProvider>
       <Toaster />
       <Sonner />
-      <BrowserRouter>
-        <Routes>
-          <Route path="/" element={<Index />} />
-          <Route path="/privacy" element={<Privacy />} />
-          <Route path="/terms" element={<Terms />} />
-          <Route path="/signup" element={<Signup />} />
-          <Route path="/login" element={<Login />} />
-          <Route path="/forgot-password" element={<ForgotPassword />} />
-          <Route path="/reset-password" element={<ResetPassword />} />
-          <Route path="/dashboard" element={<Dashboard />} />
-          <Route path="/settings" element={<Settings />} />
-          <Route path="/success" element={<Success />} />
-          <Route path="/pricing" element={<Pricing />} />
-          <Route path="/blog" element={<Blog />} />
-          <Route path="/blog/estimate-guide" element={<EstimateGuide />} />
-          <Route path="/blog/pricing-guide" element={<PricingGuide />} />
-          <Route path="/blog/template-comparison" element={<TemplateComparison />} />
-          {/* Handle API routes separately - allows Vite proxy to work */}
-          <Route path="/api/*" element={<ApiRouteHandler />} />
-          {/* ADD ALL CUSTOM ROUTES ABOVE THE CATCH-ALL "*" ROUTE */}
-          <Route path="*" element={<NotFound />} />
-        </Routes>
-      </BrowserRouter>
+      {children}
     </TooltipProvider>
   </QueryClientProvider>
 );
 
+export const AppRoutes = () => (
+  <Suspense fallback={<RouteFallback />}>
+    <Routes>
+      <Route path="/" element={<Index />} />
+      <Route path="/privacy" element={<Privacy />} />
+      <Route path="/terms" element={<Terms />} />
+      <Route path="/signup" element={<Signup />} />
+      <Route path="/login" element={<Login />} />
+      <Route path="/forgot-password" element={<ForgotPassword />} />
+      <Route path="/reset-password" element={<ResetPassword />} />
+      <Route path="/dashboard" element={<Dashboard />} />
+      <Route path="/settings" element={<Settings />} />
+      <Route path="/success" element={<Success />} />
+      <Route path="/pricing" element={<Pricing />} />
+      <Route path="/blog" element={<Blog />} />
+      <Route path="/blog/estimate-guide" element={<EstimateGuide />} />
+      <Route path="/blog/pricing-guide" element={<PricingGuide />} />
+      <Route path="/blog/template-comparison" element={<TemplateComparison />} />
+      {/* Handle API routes separately - allows Vite proxy to work */}
+      <Route path="/api/*" element={<ApiRouteHandler />} />
+      {/* ADD ALL CUSTOM ROUTES ABOVE THE CATCH-ALL "*" ROUTE */}
+      <Route path="*" element={<NotFound />} />
+    </Routes>
+  </Suspense>
+);
+
+const App = () => (
+  <AppProviders queryClient={queryClient}>
+    <BrowserRouter>
+      <AppRoutes />
+    </BrowserRouter>
+  </AppProviders>
+);
+
 export default App;
@@ -0,0 +1,131 @@
+import { useQuery } from "@tanstack/react-query";
+import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
+import {
+  Table,
+  TableBody,
+  TableCell,
+  TableHead,
+  TableHeader,
+  TableRow,
+} from "@/components/ui/table";
+import { Loader2 } from "lucide-react";
+import { fetchAnalytics, formatCurrency } from "@/lib/api";
+
+const MIX_TYPES = [
+  { key: "laborCents", label: "Labor", color: "bg-[#DC2626]" },
+  { key: "materialCents", label: "Material", color: "bg-amber-500" },
+  { key: "equipmentCents", label: "Equipment", color: "bg-sky-500" },
+] as const;
+
+function formatMonth(month: string): string {
+  const [year, monthIndex] = month.split("-").map(Number);
+  return new Date(Date.UTC(year, monthIndex - 1, 1)).toLocaleDateString(undefined, {
+    month: "short",
+    year: "numeric",
+    timeZone: "UTC",
+  });
+}
+
+/**
+ * Business analytics - monthly estimate counts, quoted value, average ticket and line item mix
+ */
+export default function AnalyticsPanel() {
+  const { data: analytics, isLoading, error } = useQuery({
+    queryKey: ["analytics"],
+    queryFn: () => fetchAnalytics(12),
+  });
+
+  if (isLoading) {
+    return (
+      <Card className="border-white/10 bg-[#242424]">
+        <CardContent className="flex items-center justify-center py-12">
+          <Loader2 className="h-8 w-8 animate-spin text-[#DC2626]" />
+        </CardContent>
+      </Card>
+    );
+  }
+
+  if (error || !analytics) {
+    return (
+      <Card className="border-white/10 bg-[#242424]">
+        <CardContent className="py-12 text-center text-red-400">
+          {error instanceof Error ? error.message : "Failed to load analytics"}
+        </CardContent>
+      </Card>
+    );
+  }
+
+  const { totals } = analytics;
+  const mixTotal = totals.mix.laborCents + totals.mix.materialCents + totals.mix.equipmentCents;
+
+  return (
+    <Card className="border-white/10 bg-[#242424]" data-testid="analytics-panel">
+      <CardHeader>
+        <CardTitle className="text-white">Analytics</CardTitle>
+        <CardDescription className="text-white/60">Last 12 months</CardDescription>
+      </CardHeader>
+      <CardContent className="space-y-6">
+        <div className="grid grid-cols-1 sm:grid-cols-3 gap-4">
+          <div className="rounded-lg border border-white/10 p-4">
+            <div className="text-sm text-white/60">Estimates</div>
+            <div className="text-2xl font-bold text-white" data-testid="analytics-estimate-count">
+              {totals.estimateCount}
+            </div>
+          </div>
+          <div className="rounded-lg border border-white/10 p-4">
+            <div className="text-sm text-white/60">Total quoted</div>
+            <div className="text-2xl font-bold text-[#DC2626]">{formatCurrency(totals.totalCents)}</div>
+          </div>
+          <div className="rounded-lg border border-white/10 p-4">
+            <div className="text-sm text-white/60">Average ticket</div>
+            <div className="text-2xl font-bold text-white">{formatCurrency(totals.averageTicketCents)}</div>
+          </div>
+        </div>
+
+        {/* Labor / material / equipment mix */}
+        <div>
+          <div className="text-sm text-white/60 mb-2">Line item mix</div>
+          <div className="flex h-3 w-full overflow-hidden rounded-full bg-white/10">
+            {mixTotal > 0 &&
+              MIX_TYPES.map(({ key, color }) => (
+                <div key={key} className={color} style={{ width: `${(totals.mix[key] / mixTotal) * 100}%` }} />
+              ))}
+          </div>
+          <div className="mt-2 flex flex-wrap gap-4 text-sm text-white/80">
+            {MIX_TYPES.map(({ key, label, color }) => (
+              <span key={key} className="flex items-center gap-2">
+                <span className={`h-2 w-2 rounded-full ${color}`} />
+                {label} {formatCurrency(totals.mix[key])}
+              </span>
+            ))}
+          </div>
+        </div>
+
+        <div className="border border-white/10 rounded-lg overflow-x-auto">
+          <Table>
+            <TableHeader>
+              <TableRow className="border-white/10 hover:bg-white/5">
+                <TableHead className="text-white/60">Month</TableHead>
+                <TableHead className="text-white/60">Estimates</TableHead>
+                <TableHead className="text-white/60">Quoted</TableHead>
+                <TableHead className="hidden sm:table-cell text-white/60">Average ticket</TableHead>
+              </TableRow>
+            </TableHeader>
+            <TableBody>
+              {[...analytics.months].reverse().map((month) => (
+                <TableRow key={month.month} className="border-white/10 hover:bg-white/5">
+                  <TableCell className="text-white">{formatMonth(month.month)}</TableCell>
+                  <TableCell className="text-white/80">{month.estimateCount}</TableCell>
+                  <TableCell className="text-white/80">{formatCurrency(month.totalCents)}</TableCell>
+                  <TableCell className="hidden sm:table-cell text-white/60">
+                    {formatCurrency(month.averageTicketCents)}
+                  </TableCell>
+                </TableRow>
+              ))}
+            </TableBody>
+          </Table>
+        </div>
+      </CardContent>
+    </Card>
+  );
+}
@@ -5,16 +5,26 @@ import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
 import { Tooltip, TooltipContent, TooltipProvider, TooltipTrigger } from "@/components/ui/tooltip";
-import { RotateCcw, Calculator, DollarSign, Clock, Percent, Wrench, Package, Download, Copy, Check, Save } from "lucide-react";
+import { RotateCcw, Calculator, DollarSign, Clock, Percent, Wrench, Package, Download, Copy, Check, Save, Ruler } from "lucide-react";
 import { useDebounce } from "@/hooks/use-debounce";
 import { usePDFGenerator } from "@/hooks/use-pdf-generator";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
-import { fetchSettings, incrementEstimateUsage, fetchTemplates, createTemplate, deleteTemplate, type Template } from "@/lib/api";
+import {
+  fetchSettings,
+  incrementEstimateUsage,
+  fetchTemplates,
+  createTemplate,
+  deleteTemplate,
+  type Template,
+  type EstimateItem,
+  type RoofMeasurement,
+} from "@/lib/api";
 import { useSession } from "@/lib/auth-client";
 import { toast } from "sonner";
 import { UpgradePromptDialog } from "@/components/subscription";
 import SaveTemplateDialog from "./SaveTemplateDialog";
 import TemplateDropdown from "./TemplateDropdown";
+import RoofMeasurementDialog from "./RoofMeasurementDialog";
 
 interface EstimateInputs {
   equipmentCost: string;
@@ -68,6 +78,9 @@ export default function EstimateBuilder({
   const [showUpgradeDialog, setShowUpgradeDialog] = useState(false);
   const [isCopied, setIsCopied] = useState(false);
   const [showSaveTemplateDialog, setShowSaveTemplateDialog] = useState(false);
+  const [showRoofDialog, setShowRoofDialog] = useState(false);
+  // Itemized materials from a roof measurement; cleared once materials cost is edited by hand
+  const [roofLineItems, setRoofLineItems] = useState<EstimateItem[] | null>(null);
   const previousResultsRef = useRef<EstimateResults | null>(null);
 
   // Check if user is on paid tier
@@ -200,6 +213,9 @@ export default function EstimateBuilder({
   // Handle input change
   const handleInputChange = useCallback((name: keyof EstimateInputs, value: string) => {
     setInputs(prev => ({ ...prev, [name]: value }));
+    if (name === "materialsCost") {
+      setRoofLineItems(null);
+    }
     
     // Clear error when user starts typing
     const error = validateField(name, value);
@@ -216,8 +232,17 @@ export default function EstimateBuilder({
       discountPercent: "",
     });
     setErrors({});
+    setRoofLineItems(null);
   }, []);
 
+  // Use a roof measurement's materials as the materials cost
+  const handleApplyRoofMeasurement = (measurement: RoofMeasurement) => {
+    setInputs(prev => ({ ...prev, materialsCost: measurement.materialsCost.toFixed(2) }));
+    setErrors(prev => ({ ...prev, materialsCost: undefined }));
+    setRoofLineItems(measurement.lineItems);
+    toast.success(`Materials added for ${measurement.totals.squaresWithWaste} squares`);
+  };
+
   // Handle save template
   const handleSaveTemplate = async (name: string) => {
     if (!isPaidUser) {
@@ -246,6 +271,7 @@ export default function EstimateBuilder({
       discountPercent: template.discountPercent.toString(),
     });
     setErrors({});
+    setRoofLineItems(null);
     toast.success(`Loaded template: ${template.name}`);
   };
 
@@ -285,7 +311,11 @@ export default function EstimateBuilder({
     if (parseValue(inputs.equipmentCost) > 0) {
       lines.push(`Equipment: ${formatCurrency(parseValue(inputs.equipmentCost))}`);
     }
-    if (parseValue(inputs.materialsCost) > 0) {
+    if (roofLineItems) {
+      for (const item of roofLineItems) {
+        lines.push(`${item.description}: ${item.quantity} @ ${formatCurrency(item.unitPrice)} = ${formatCurrency(item.quantity * item.unitPrice)}`);
+      }
+    } else if (parseValue(inputs.materialsCost) > 0) {
       lines.push(`Materials: ${formatCurrency(parseValue(inputs.materialsCost))}`);
     }
     if (results.laborTotal > 0) {
@@ -428,7 +458,9 @@ export default function EstimateBuilder({
               },
             ]
           : []),
-        ...(parseValue(inputs.materialsCost) > 0
+        ...(roofLineItems
+          ? roofLineItems
+          : parseValue(inputs.materialsCost) > 0
           ? [
               {
                 description: "Materials",
@@ -582,7 +614,23 @@ export default function EstimateBuilder({
             {errors.materialsCost && (
               <p className="text-xs text-red-400">{errors.materialsCost}</p>
             )}
-            <p className="text-xs text-white/40">Shingles, underlayment, flashing, and supplies</p>
+            <div className="flex items-center justify-between gap-2">
+              <p className="text-xs text-white/40">
+                {roofLineItems
+                  ? `Itemized from roof measurement (${roofLineItems.length} items)`
+                  : "Shingles, underlayment, flashing, and supplies"}
+              </p>
+              <Button
+                type="button"
+                variant="ghost"
+                size="sm"
+                onClick={() => setShowRoofDialog(true)}
+                className="h-7 px-2 text-xs text-white/60 hover:text-white hover:bg-white/10"
+              >
+                <Ruler className="h-3.5 w-3.5 mr-1" />
+                Measure Roof
+              </Button>
+            </div>
           </div>
 
           {/* Labor Hours */}
@@ -878,6 +926,13 @@ export default function EstimateBuilder({
         isLoading={createTemplateMutation.isPending}
       />
 
+      {/* Roof Measurement Dialog */}
+      <RoofMeasurementDialog
+        open={showRoofDialog}
+        onOpenChange={setShowRoofDialog}
+        onApply={handleApplyRoofMeasurement}
+      />
+
       {/* Upgrade Prompt Dialog */}
       <UpgradePromptDialog
         open={showUpgradeDialog}
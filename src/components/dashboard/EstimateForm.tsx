@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { Fragment, useState, useEffect, useMemo } from "react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -21,8 +21,16 @@ import {
   TableRow,
 } from "@/components/ui/table";
 import { Plus, Trash2 } from "lucide-react";
-import type { EstimateItem, CreateEstimateInput, UpdateEstimateInput, Estimate } from "@/lib/api";
+import type { EstimateItem, CreateEstimateInput, UpdateEstimateInput, Estimate, MaterialSuggestion } from "@/lib/api";
 import { calculateTotal, formatCurrencyFromDollars } from "@/lib/api";
+import { useDebounce } from "@/hooks/use-debounce";
+import { SpacerRow, useVirtualRows } from "@/hooks/use-virtual-rows";
+import { clearDraft, draftKey, isOfflineStoreAvailable, loadDraft, saveDraft } from "@/lib/offline-drafts";
+import MaterialAutocompleteInput from "./MaterialAutocompleteInput";
+
+// Height of a line item row without a validation message; long jobs only mount the rows in view
+const ITEM_ROW_HEIGHT = 73;
+const ITEM_COLUMN_COUNT = 6;
 
 interface EstimateFormProps {
   open: boolean;
@@ -49,6 +57,30 @@ export default function EstimateForm({
   ]);
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [errors, setErrors] = useState<Record<string, string>>({});
+  const [draftRestored, setDraftRestored] = useState(false);
+  const [draftReady, setDraftReady] = useState(false);
+  // Line item to bring into view once it's rendered (a new row, or the first invalid one)
+  const [scrollToItem, setScrollToItem] = useState<number | null>(null);
+
+  const { scrollRef, virtualizer, rows, gapAfter, rowProps, tableProps } = useVirtualRows({
+    count: items.length,
+    rowHeight: ITEM_ROW_HEIGHT,
+  });
+
+  useEffect(() => {
+    if (scrollToItem !== null && scrollToItem < items.length) {
+      virtualizer.scrollToIndex(scrollToItem);
+      setScrollToItem(null);
+    }
+  }, [scrollToItem, items.length, virtualizer]);
+
+  // Drafts are kept locally per form so edits survive a lost connection or reload
+  const currentDraftKey = draftKey(mode === "edit" ? estimate?.id : null);
+  const liveFields = useMemo(
+    () => ({ title, clientName, clientPhone, clientAddress, discountPercent, items }),
+    [title, clientName, clientPhone, clientAddress, discountPercent, items]
+  );
+  const draftFields = useDebounce(liveFields, 500);
 
   // Calculate total and apply discount
   const subtotal = calculateTotal(items);
@@ -76,8 +108,82 @@ export default function EstimateForm({
         setItems([{ description: "", quantity: 1, unitPrice: 0, type: "labor" }]);
       }
       setErrors({});
+      setDraftRestored(false);
+      setDraftReady(false);
+
+      if (!isOfflineStoreAvailable()) {
+        setDraftReady(true);
+        return;
+      }
+
+      // Restore an unsaved local draft for this form, if any
+      let cancelled = false;
+      loadDraft(currentDraftKey)
+        .then((draft) => {
+          if (cancelled || !draft) return;
+          setTitle(draft.title);
+          setClientName(draft.clientName);
+          setClientPhone(draft.clientPhone);
+          setClientAddress(draft.clientAddress);
+          setDiscountPercent(draft.discountPercent);
+          setItems(draft.items.length > 0 ? draft.items : [{ description: "", quantity: 1, unitPrice: 0, type: "labor" }]);
+          setDraftRestored(true);
+        })
+        .catch(console.error)
+        .finally(() => {
+          if (!cancelled) setDraftReady(true);
+        });
+
+      return () => {
+        cancelled = true;
+      };
+    }
+  }, [open, estimate, mode, currentDraftKey]);
+
+  // Persist the form locally as the user types (debounced, no network)
+  useEffect(() => {
+    if (!open || !draftReady || !isOfflineStoreAvailable()) return;
+    // Wait until the debounce has caught up with the current form state
+    if (draftFields !== liveFields) return;
+
+    const isEmpty =
+      !draftFields.title && !draftFields.clientName && !draftFields.clientPhone &&
+      !draftFields.clientAddress && draftFields.items.every((item) => !item.description);
+    if (mode === "create" && isEmpty) return;
+
+    const isUnchanged =
+      mode === "edit" && !!estimate &&
+      draftFields.title === estimate.title &&
+      draftFields.clientName === estimate.clientName &&
+      draftFields.clientPhone === (estimate.clientPhone || "") &&
+      draftFields.clientAddress === (estimate.clientAddress || "") &&
+      !draftFields.discountPercent &&
+      JSON.stringify(draftFields.items) === JSON.stringify(estimate.items);
+    if (isUnchanged) return;
+
+    saveDraft({ key: currentDraftKey, ...draftFields, savedAt: Date.now() }).catch(console.error);
+  }, [draftFields, liveFields, open, draftReady, mode, estimate, currentDraftKey]);
+
+  const handleDiscardDraft = async () => {
+    await clearDraft(currentDraftKey).catch(console.error);
+    setDraftReady(false);
+    setDraftRestored(false);
+    if (mode === "edit" && estimate) {
+      setTitle(estimate.title);
+      setClientName(estimate.clientName);
+      setClientPhone(estimate.clientPhone || "");
+      setClientAddress(estimate.clientAddress || "");
+      setItems(estimate.items.length > 0 ? estimate.items : [{ description: "", quantity: 1, unitPrice: 0, type: "labor" }]);
+    } else {
+      setTitle("");
+      setClientName("");
+      setClientPhone("");
+      setClientAddress("");
+      setItems([{ description: "", quantity: 1, unitPrice: 0, type: "labor" }]);
     }
-  }, [open, estimate, mode]);
+    setDiscountPercent("");
+    setDraftReady(true);
+  };
 
   const validateForm = (): boolean => {
     const newErrors: Record<string, string> = {};
@@ -110,6 +216,7 @@ export default function EstimateForm({
     if (items.length === 0) {
       newErrors.items = "At least one item is required";
     } else {
+      let firstInvalidItem: number | null = null;
       items.forEach((item, index) => {
         if (!item.description.trim()) {
           newErrors[`item-${index}-description`] = "Description is required";
@@ -120,7 +227,11 @@ export default function EstimateForm({
         if (item.unitPrice < 0) {
           newErrors[`item-${index}-unitPrice`] = "Unit price must be non-negative";
         }
+        if (firstInvalidItem === null && Object.keys(newErrors).some((key) => key.startsWith(`item-${index}-`))) {
+          firstInvalidItem = index;
+        }
       });
+      setScrollToItem(firstInvalidItem);
     }
 
     setErrors(newErrors);
@@ -151,6 +262,10 @@ export default function EstimateForm({
       };
 
       await onSubmit(formData);
+      setDraftReady(false);
+      if (isOfflineStoreAvailable()) {
+        await clearDraft(currentDraftKey).catch(console.error);
+      }
       onOpenChange(false);
     } catch (error) {
       console.error("Error submitting estimate:", error);
@@ -162,6 +277,7 @@ export default function EstimateForm({
 
   const addItem = () => {
     setItems([...items, { description: "", quantity: 1, unitPrice: 0, type: "labor" }]);
+    setScrollToItem(items.length);
   };
 
   const removeItem = (index: number) => {
@@ -176,6 +292,18 @@ export default function EstimateForm({
     setItems(newItems);
   };
 
+  // Fill a line item from a catalog pick; quantity is kept
+  const applyMaterial = (index: number, material: MaterialSuggestion) => {
+    const newItems = [...items];
+    newItems[index] = {
+      ...newItems[index],
+      description: material.name,
+      unitPrice: material.unitPrice,
+      type: material.type,
+    };
+    setItems(newItems);
+  };
+
   return (
     <Dialog open={open} onOpenChange={onOpenChange}>
       <DialogContent className="max-w-4xl max-h-[90vh] overflow-y-auto border-white/10 bg-[#242424] text-white">
@@ -188,6 +316,15 @@ export default function EstimateForm({
           </DialogDescription>
         </DialogHeader>
 
+        {draftRestored && (
+          <div className="flex items-center justify-between rounded-md border border-white/10 bg-[#1A1A1A] px-3 py-2 text-sm text-white/70" data-testid="draft-restored-notice">
+            <span>Restored your unsaved draft.</span>
+            <Button type="button" variant="ghost" size="sm" onClick={handleDiscardDraft} className="text-white/70 hover:text-white hover:bg-white/10">
+              Discard draft
+            </Button>
+          </div>
+        )}
+
         <form onSubmit={handleSubmit} className="space-y-6">
           {/* Client Information Section */}
           <div className="space-y-4">
@@ -262,8 +399,12 @@ export default function EstimateForm({
 
             {errors.items && <p className="text-sm text-red-400">{errors.items}</p>}
 
-            <div className="border border-white/10 rounded-lg overflow-hidden">
-              <Table>
+            <div
+              ref={scrollRef}
+              className="border border-white/10 rounded-lg overflow-auto max-h-[28rem]"
+              data-testid="line-items-scroll"
+            >
+              <Table {...tableProps()}>
                 <TableHeader>
                   <TableRow className="border-white/10 hover:bg-white/5">
                     <TableHead className="w-[30%] text-white/60">Description</TableHead>
@@ -275,94 +416,101 @@ export default function EstimateForm({
                   </TableRow>
                 </TableHeader>
                 <TableBody>
-                  {items.map((item, index) => {
+                  {rows.map((row) => {
+                    const index = row.index;
+                    const item = items[index];
                     const subtotal = item.quantity * item.unitPrice;
                     return (
-                      <TableRow key={index} className="border-white/10 hover:bg-white/5">
-                        <TableCell>
-                          <Input
-                            value={item.description}
-                            onChange={(e) => updateItem(index, "description", e.target.value)}
-                            placeholder="Item description"
-                            className={`bg-[#1A1A1A] border-white/20 text-white placeholder:text-white/40 focus:border-[#DC2626] focus:ring-[#DC2626] ${
-                              errors[`item-${index}-description`] ? "border-red-500" : ""
-                            }`}
-                          />
-                          {errors[`item-${index}-description`] && (
-                            <p className="text-xs text-red-400 mt-1">
-                              {errors[`item-${index}-description`]}
-                            </p>
-                          )}
-                        </TableCell>
-                        <TableCell>
-                          <Select
-                            value={item.type}
-                            onValueChange={(value) => updateItem(index, "type", value as EstimateItem["type"])}
-                          >
-                            <SelectTrigger data-testid={`line-item-${index}-type-select`} className="bg-[#1A1A1A] border-white/20 text-white">
-                              <SelectValue />
-                            </SelectTrigger>
-                            <SelectContent className="bg-[#242424] border-white/10">
-                              <SelectItem value="labor" className="text-white hover:bg-white/10">Labor</SelectItem>
-                              <SelectItem value="material" className="text-white hover:bg-white/10">Material</SelectItem>
-                              <SelectItem value="equipment" className="text-white hover:bg-white/10">Equipment</SelectItem>
-                            </SelectContent>
-                          </Select>
-                        </TableCell>
-                        <TableCell>
-                          <Input
-                            type="number"
-                            min="0.01"
-                            step="0.01"
-                            data-testid={`line-item-${index}-quantity`}
-                            value={item.quantity}
-                            onChange={(e) => updateItem(index, "quantity", parseFloat(e.target.value) || 0)}
-                            className={`bg-[#1A1A1A] border-white/20 text-white placeholder:text-white/40 focus:border-[#DC2626] focus:ring-[#DC2626] ${
-                              errors[`item-${index}-quantity`] ? "border-red-500" : ""
-                            }`}
-                          />
-                          {errors[`item-${index}-quantity`] && (
-                            <p className="text-xs text-red-400 mt-1">
-                              {errors[`item-${index}-quantity`]}
-                            </p>
-                          )}
-                        </TableCell>
-                        <TableCell>
-                          <Input
-                            type="number"
-                            min="0"
-                            step="0.01"
-                            data-testid={`line-item-${index}-unit-price`}
-                            value={item.unitPrice}
-                            onChange={(e) => updateItem(index, "unitPrice", parseFloat(e.target.value) || 0)}
-                            className={`bg-[#1A1A1A] border-white/20 text-white placeholder:text-white/40 focus:border-[#DC2626] focus:ring-[#DC2626] ${
-                              errors[`item-${index}-unitPrice`] ? "border-red-500" : ""
-                            }`}
-                          />
-                          {errors[`item-${index}-unitPrice`] && (
-                            <p className="text-xs text-red-400 mt-1">
-                              {errors[`item-${index}-unitPrice`]}
-                            </p>
-                          )}
-                        </TableCell>
-                        <TableCell className="font-medium text-white">
-                          {formatCurrencyFromDollars(subtotal)}
-                        </TableCell>
-                        <TableCell>
-                          <Button
-                            type="button"
-                            variant="ghost"
-                            size="icon"
-                            onClick={() => removeItem(index)}
-                            disabled={items.length === 1}
-                            className="text-red-400 hover:text-red-300 hover:bg-red-500/10"
-                          >
-                            <Trash2 className="h-4 w-4" />
-                          </Button>
-                        </TableCell>
-                      </TableRow>
+                      <Fragment key={index}>
+                        <SpacerRow height={row.gapBefore} colSpan={ITEM_COLUMN_COUNT} />
+                        <TableRow {...rowProps(index)} className="border-white/10 hover:bg-white/5" data-testid="line-item-row">
+                          <TableCell>
+                            <MaterialAutocompleteInput
+                              value={item.description}
+                              onChange={(value) => updateItem(index, "description", value)}
+                              onSelect={(material) => applyMaterial(index, material)}
+                              placeholder="Item description"
+                              className={`bg-[#1A1A1A] border-white/20 text-white placeholder:text-white/40 focus:border-[#DC2626] focus:ring-[#DC2626] ${
+                                errors[`item-${index}-description`] ? "border-red-500" : ""
+                              }`}
+                            />
+                            {errors[`item-${index}-description`] && (
+                              <p className="text-xs text-red-400 mt-1">
+                                {errors[`item-${index}-description`]}
+                              </p>
+                            )}
+                          </TableCell>
+                          <TableCell>
+                            <Select
+                              value={item.type}
+                              onValueChange={(value) => updateItem(index, "type", value as EstimateItem["type"])}
+                            >
+                              <SelectTrigger data-testid={`line-item-${index}-type-select`} className="bg-[#1A1A1A] border-white/20 text-white">
+                                <SelectValue />
+                              </SelectTrigger>
+                              <SelectContent className="bg-[#242424] border-white/10">
+                                <SelectItem value="labor" className="text-white hover:bg-white/10">Labor</SelectItem>
+                                <SelectItem value="material" className="text-white hover:bg-white/10">Material</SelectItem>
+                                <SelectItem value="equipment" className="text-white hover:bg-white/10">Equipment</SelectItem>
+                              </SelectContent>
+                            </Select>
+                          </TableCell>
+                          <TableCell>
+                            <Input
+                              type="number"
+                              min="0.01"
+                              step="0.01"
+                              data-testid={`line-item-${index}-quantity`}
+                              value={item.quantity}
+                              onChange={(e) => updateItem(index, "quantity", parseFloat(e.target.value) || 0)}
+                              className={`bg-[#1A1A1A] border-white/20 text-white placeholder:text-white/40 focus:border-[#DC2626] focus:ring-[#DC2626] ${
+                                errors[`item-${index}-quantity`] ? "border-red-500" : ""
+                              }`}
+                            />
+                            {errors[`item-${index}-quantity`] && (
+                              <p className="text-xs text-red-400 mt-1">
+                                {errors[`item-${index}-quantity`]}
+                              </p>
+                            )}
+                          </TableCell>
+                          <TableCell>
+                            <Input
+                              type="number"
+                              min="0"
+                              step="0.01"
+                              data-testid={`line-item-${index}-unit-price`}
+                              value={item.unitPrice}
+                              onChange={(e) => updateItem(index, "unitPrice", parseFloat(e.target.value) || 0)}
+                              className={`bg-[#1A1A1A] border-white/20 text-white placeholder:text-white/40 focus:border-[#DC2626] focus:ring-[#DC2626] ${
+                                errors[`item-${index}-unitPrice`] ? "border-red-500" : ""
+                              }`}
+                            />
+                            {errors[`item-${index}-unitPrice`] && (
+                              <p className="text-xs text-red-400 mt-1">
+                                {errors[`item-${index}-unitPrice`]}
+                              </p>
+                            )}
+                          </TableCell>
+                          <TableCell className="font-medium text-white">
+                            {formatCurrencyFromDollars(subtotal)}
+                          </TableCell>
+                          <TableCell>
+                            <Button
+                              type="button"
+                              variant="ghost"
+                              size="icon"
+                              onClick={() => removeItem(index)}
+                              disabled={items.length === 1}
+                              className="text-red-400 hover:text-red-300 hover:bg-red-500/10"
+                            >
+                              <Trash2 className="h-4 w-4" />
+                            </Button>
+                          </TableCell>
+                        </TableRow>
+                      </Fragment>
                     );
                   })}
+                  <SpacerRow height={gapAfter} colSpan={ITEM_COLUMN_COUNT} />
                 </TableBody>
               </Table>
             </div>
@@ -1,5 +1,5 @@
-import { useState, useMemo } from "react";
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { Fragment, useState, useMemo } from "react";
+import { useQuery, useMutation, useQueryClient, keepPreviousData } from "@tanstack/react-query";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
@@ -23,9 +23,23 @@ import {
 } from "@/components/ui/alert-dialog";
 import { Badge } from "@/components/ui/badge";
 import { Search, Edit, Trash2, Download, Loader2, Plus } from "lucide-react";
-import { fetchEstimates, deleteEstimate, generatePDF, formatCurrency, type Estimate } from "@/lib/api";
+import {
+  syncEstimates,
+  searchEstimates,
+  deleteEstimate,
+  generatePDF,
+  formatCurrency,
+  type Estimate,
+  type EstimateSnapshot,
+} from "@/lib/api";
+import { useDebounce } from "@/hooks/use-debounce";
+import { SpacerRow, useVirtualRows } from "@/hooks/use-virtual-rows";
 import { toast } from "sonner";
 
+// Height of a row with its icon buttons; long lists only mount the rows in view
+const ROW_HEIGHT = 73;
+const COLUMN_COUNT = 6;
+
 interface EstimateListProps {
   onEdit: (estimate: Estimate) => void;
   onCreate: () => void;
@@ -48,10 +62,11 @@ export default function EstimateList({
   const [estimateToDelete, setEstimateToDelete] = useState<Estimate | null>(null);
   const queryClient = useQueryClient();
 
-  // Fetch estimates
+  // Fetch estimates - after the first load, refetches only pull deltas from the change feed
   const { data: estimates = [], isLoading, error } = useQuery({
     queryKey: ["estimates"],
-    queryFn: fetchEstimates,
+    queryFn: () => syncEstimates(queryClient.getQueryData<EstimateSnapshot>(["estimates"])),
+    select: (snapshot: EstimateSnapshot) => snapshot.estimates,
     retry: (failureCount, error: any) => {
       // Don't retry on subscription errors (403) or auth errors (401)
       if (error?.message?.includes("Subscription required") || error?.message?.includes("Unauthorized")) {
@@ -111,13 +126,26 @@ export default function EstimateList({
     },
   });
 
-  // Filter estimates based on search query
+  // Search on the server as the user types (ranked, matches line items too)
+  const debouncedSearch = useDebounce(searchQuery.trim(), 200);
+  const searchResults = useQuery({
+    queryKey: ["estimates", "search", debouncedSearch],
+    queryFn: ({ signal }) => searchEstimates(debouncedSearch, signal),
+    enabled: debouncedSearch.length > 0,
+    placeholderData: keepPreviousData,
+    retry: false,
+  });
+
   const filteredEstimates = useMemo(() => {
-    if (!searchQuery.trim()) {
+    if (!debouncedSearch) {
       return estimates;
     }
+    if (!searchResults.isError) {
+      return searchResults.data ?? [];
+    }
 
-    const query = searchQuery.toLowerCase();
+    // Search is unavailable (e.g. offline) - fall back to filtering what's loaded
+    const query = debouncedSearch.toLowerCase();
     return estimates.filter(
       (estimate) =>
         estimate.title.toLowerCase().includes(query) ||
@@ -125,7 +153,12 @@ export default function EstimateList({
         estimate.clientPhone?.toLowerCase().includes(query) ||
         estimate.clientAddress?.toLowerCase().includes(query)
     );
-  }, [estimates, searchQuery]);
+  }, [estimates, debouncedSearch, searchResults.data, searchResults.isError]);
+
+  const { scrollRef, rows, gapAfter, rowProps, tableProps } = useVirtualRows({
+    count: filteredEstimates.length,
+    rowHeight: ROW_HEIGHT,
+  });
 
   const handleDeleteClick = (estimate: Estimate) => {
     setEstimateToDelete(estimate);
@@ -221,7 +254,7 @@ export default function EstimateList({
               <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 h-4 w-4 text-white/40" />
               <Input
                 type="text"
-                placeholder="Search by title, client name, phone, or address..."
+                placeholder="Search by title, client, phone, address, or line item..."
                 value={searchQuery}
                 onChange={(e) => setSearchQuery(e.target.value)}
                 className="pl-10 bg-[#1A1A1A] border-white/20 text-white placeholder:text-white/40 focus:border-[#DC2626] focus:ring-[#DC2626]"
@@ -249,8 +282,12 @@ export default function EstimateList({
               )}
             </div>
           ) : (
-            <div className="border border-white/10 rounded-lg overflow-x-auto">
-              <Table>
+            <div
+              ref={scrollRef}
+              className="border border-white/10 rounded-lg overflow-auto max-h-[70vh]"
+              data-testid="estimate-list-scroll"
+            >
+              <Table {...tableProps()}>
                 <TableHeader>
                   <TableRow className="border-white/10 hover:bg-white/5">
                     <TableHead className="text-white/60">Title</TableHead>
@@ -262,56 +299,63 @@ export default function EstimateList({
                   </TableRow>
                 </TableHeader>
                 <TableBody>
-                  {filteredEstimates.map((estimate) => (
-                    <TableRow key={estimate.id} className="border-white/10 hover:bg-white/5">
-                      <TableCell className="font-medium text-white">{estimate.title}</TableCell>
-                      <TableCell className="text-white/80">{estimate.clientName}</TableCell>
-                      <TableCell className="hidden sm:table-cell text-white/60">{estimate.clientPhone || "-"}</TableCell>
-                      <TableCell className="font-semibold text-[#DC2626]">{formatCurrency(estimate.total)}</TableCell>
-                      <TableCell className="hidden md:table-cell text-white/60">
-                        {new Date(estimate.createdAt).toLocaleDateString()}
-                      </TableCell>
-                      <TableCell className="text-right">
-                        <div className="flex items-center justify-end gap-2">
-                          <Button
-                            variant="ghost"
-                            size="icon"
-                            onClick={() => handleDownloadPDF(estimate.id)}
-                            disabled={pdfMutation.isPending}
-                            title="Download PDF"
-                            aria-label={`Download PDF for ${estimate.title}`}
-                            className="text-white/60 hover:text-white hover:bg-white/10"
-                          >
-                            {pdfMutation.isPending ? (
-                              <Loader2 className="h-4 w-4 animate-spin" />
-                            ) : (
-                              <Download className="h-4 w-4" />
-                            )}
-                          </Button>
-                          <Button
-                            variant="ghost"
-                            size="icon"
-                            onClick={() => onEdit(estimate)}
-                            title="Edit estimate"
-                            aria-label={`Edit estimate ${estimate.title}`}
-                            className="text-white/60 hover:text-white hover:bg-white/10"
-                          >
-                            <Edit className="h-4 w-4" />
-                          </Button>
-                          <Button
-                            variant="ghost"
-                            size="icon"
-                            onClick={() => handleDeleteClick(estimate)}
-                            title="Delete estimate"
-                            aria-label={`Delete estimate ${estimate.title}`}
-                            className="text-red-400 hover:text-red-300 hover:bg-red-500/10"
-                          >
-                            <Trash2 className="h-4 w-4" />
-                          </Button>
-                        </div>
-                      </TableCell>
-                    </TableRow>
-                  ))}
+                  {rows.map((row) => {
+                    const estimate = filteredEstimates[row.index];
+                    return (
+                      <Fragment key={estimate.id}>
+                        <SpacerRow height={row.gapBefore} colSpan={COLUMN_COUNT} />
+                        <TableRow {...rowProps(row.index)} className="border-white/10 hover:bg-white/5" data-testid="estimate-row">
+                          <TableCell className="font-medium text-white">{estimate.title}</TableCell>
+                          <TableCell className="text-white/80">{estimate.clientName}</TableCell>
+                          <TableCell className="hidden sm:table-cell text-white/60">{estimate.clientPhone || "-"}</TableCell>
+                          <TableCell className="font-semibold text-[#DC2626]">{formatCurrency(estimate.total)}</TableCell>
+                          <TableCell className="hidden md:table-cell text-white/60">
+                            {new Date(estimate.createdAt).toLocaleDateString()}
+                          </TableCell>
+                          <TableCell className="text-right">
+                            <div className="flex items-center justify-end gap-2">
+                              <Button
+                                variant="ghost"
+                                size="icon"
+                                onClick={() => handleDownloadPDF(estimate.id)}
+                                disabled={pdfMutation.isPending}
+                                title="Download PDF"
+                                aria-label={`Download PDF for ${estimate.title}`}
+                                className="text-white/60 hover:text-white hover:bg-white/10"
+                              >
+                                {pdfMutation.isPending ? (
+                                  <Loader2 className="h-4 w-4 animate-spin" />
+                                ) : (
+                                  <Download className="h-4 w-4" />
+                                )}
+                              </Button>
+                              <Button
+                                variant="ghost"
+                                size="icon"
+                                onClick={() => onEdit(estimate)}
+                                title="Edit estimate"
+                                aria-label={`Edit estimate ${estimate.title}`}
+                                className="text-white/60 hover:text-white hover:bg-white/10"
+                              >
+                                <Edit className="h-4 w-4" />
+                              </Button>
+                              <Button
+                                variant="ghost"
+                                size="icon"
+                                onClick={() => handleDeleteClick(estimate)}
+                                title="Delete estimate"
+                                aria-label={`Delete estimate ${estimate.title}`}
+                                className="text-red-400 hover:text-red-300 hover:bg-red-500/10"
+                              >
+                                <Trash2 className="h-4 w-4" />
+                              </Button>
+                            </div>
+                          </TableCell>
+                        </TableRow>
+                      </Fragment>
+                    );
+                  })}
+                  <SpacerRow height={gapAfter} colSpan={COLUMN_COUNT} />
                 </TableBody>
               </Table>
             </div>
@@ -0,0 +1,124 @@
+import { useId, useState } from "react";
+import { keepPreviousData, useQuery } from "@tanstack/react-query";
+import { Input } from "@/components/ui/input";
+import { Popover, PopoverAnchor, PopoverContent } from "@/components/ui/popover";
+import { useDebounce } from "@/hooks/use-debounce";
+import { fetchMaterialSuggestions, type MaterialSuggestion } from "@/lib/api";
+import { cn } from "@/lib/utils";
+
+interface MaterialAutocompleteInputProps {
+  value: string;
+  onChange: (value: string) => void;
+  onSelect: (material: MaterialSuggestion) => void;
+  placeholder?: string;
+  className?: string;
+}
+
+const formatPrice = (amount: number) =>
+  new Intl.NumberFormat("en-US", { style: "currency", currency: "USD" }).format(amount);
+
+/**
+ * Line item description input that suggests items from the user's materials catalog
+ * Requests are debounced and each keystroke's response is cached by React Query,
+ * so backspacing over text already typed doesn't hit the server again.
+ */
+export default function MaterialAutocompleteInput({
+  value,
+  onChange,
+  onSelect,
+  placeholder,
+  className,
+}: MaterialAutocompleteInputProps) {
+  const listId = useId();
+  const [isFocused, setIsFocused] = useState(false);
+  // Closed after picking a suggestion or pressing Escape, until the next keystroke
+  const [isDismissed, setIsDismissed] = useState(true);
+  const [highlighted, setHighlighted] = useState(0);
+
+  const query = useDebounce(value.trim(), 150);
+  const { data: suggestions = [] } = useQuery({
+    queryKey: ["materials", "autocomplete", query],
+    queryFn: ({ signal }) => fetchMaterialSuggestions(query, signal),
+    enabled: isFocused && !isDismissed && query.length > 0,
+    staleTime: 30_000,
+    placeholderData: keepPreviousData,
+    retry: false,
+  });
+
+  const open = isFocused && !isDismissed && query.length > 0 && suggestions.length > 0;
+
+  const select = (material: MaterialSuggestion) => {
+    onSelect(material);
+    setIsDismissed(true);
+  };
+
+  const handleKeyDown = (e: React.KeyboardEvent<HTMLInputElement>) => {
+    if (!open) return;
+    if (e.key === "ArrowDown") {
+      e.preventDefault();
+      setHighlighted((index) => (index + 1) % suggestions.length);
+    } else if (e.key === "ArrowUp") {
+      e.preventDefault();
+      setHighlighted((index) => (index - 1 + suggestions.length) % suggestions.length);
+    } else if (e.key === "Enter") {
+      e.preventDefault();
+      select(suggestions[Math.min(highlighted, suggestions.length - 1)]);
+    }
+  };
+
+  return (
+    <Popover open={open} onOpenChange={(next) => !next && setIsDismissed(true)}>
+      <PopoverAnchor asChild>
+        <Input
+          value={value}
+          onChange={(e) => {
+            onChange(e.target.value);
+            setIsDismissed(false);
+            setHighlighted(0);
+          }}
+          onFocus={() => setIsFocused(true)}
+          onBlur={() => setIsFocused(false)}
+          onKeyDown={handleKeyDown}
+          placeholder={placeholder}
+          role="combobox"
+          aria-autocomplete="list"
+          aria-expanded={open}
+          aria-controls={listId}
+          aria-activedescendant={open ? `${listId}-${highlighted}` : undefined}
+          className={className}
+        />
+      </PopoverAnchor>
+      <PopoverContent
+        align="start"
+        className="w-80 p-1 bg-[#242424] border-white/10 text-white"
+        onOpenAutoFocus={(e) => e.preventDefault()}
+        onCloseAutoFocus={(e) => e.preventDefault()}
+      >
+        <ul id={listId} role="listbox" aria-label="Catalog items">
+          {suggestions.map((material, index) => (
+            <li
+              key={material.id}
+              id={`${listId}-${index}`}
+              role="option"
+              aria-selected={index === highlighted}
+              data-testid="material-suggestion"
+              // Keep focus in the input so typing can continue
+              onMouseDown={(e) => e.preventDefault()}
+              onMouseEnter={() => setHighlighted(index)}
+              onClick={() => select(material)}
+              className={cn(
+                "flex cursor-pointer items-center justify-between gap-3 rounded px-2 py-1.5 text-sm",
+                index === highlighted ? "bg-white/10" : ""
+              )}
+            >
+              <span className="truncate">{material.name}</span>
+              <span className="shrink-0 text-xs text-white/60">
+                {formatPrice(material.unitPrice)} · {material.type}
+              </span>
+            </li>
+          ))}
+        </ul>
+      </PopoverContent>
+    </Popover>
+  );
+}
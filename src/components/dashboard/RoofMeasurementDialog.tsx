@@ -0,0 +1,252 @@
+import { useState } from "react";
+import { useMutation } from "@tanstack/react-query";
+import { Button } from "@/components/ui/button";
+import { Input } from "@/components/ui/input";
+import { Label } from "@/components/ui/label";
+import {
+  Dialog,
+  DialogContent,
+  DialogDescription,
+  DialogFooter,
+  DialogHeader,
+  DialogTitle,
+} from "@/components/ui/dialog";
+import { Ruler, Plus, Trash2, Loader2, AlertTriangle } from "lucide-react";
+import { measureRoof, type RoofMeasurement } from "@/lib/api";
+
+interface PlaneInput {
+  footprintArea: string;
+  pitch: string;
+}
+
+interface RoofMeasurementDialogProps {
+  open: boolean;
+  onOpenChange: (open: boolean) => void;
+  onApply: (measurement: RoofMeasurement) => void;
+}
+
+const EMPTY_PLANE: PlaneInput = { footprintArea: "", pitch: "6" };
+
+const inputClassName =
+  "bg-[#1A1A1A] border-white/20 text-white placeholder:text-white/40 focus:border-[#DC2626] focus:ring-[#DC2626]";
+
+export default function RoofMeasurementDialog({ open, onOpenChange, onApply }: RoofMeasurementDialogProps) {
+  const [planes, setPlanes] = useState<PlaneInput[]>([{ ...EMPTY_PLANE }, { ...EMPTY_PLANE }]);
+  const [wastePercent, setWastePercent] = useState("");
+  const [error, setError] = useState<string | null>(null);
+
+  const measureMutation = useMutation({
+    mutationFn: measureRoof,
+    onError: (err: Error) => {
+      setError(err.message || "Failed to measure roof");
+    },
+  });
+  const measurement = measureMutation.data;
+
+  const updatePlane = (index: number, field: keyof PlaneInput, value: string) => {
+    setPlanes((prev) => prev.map((plane, i) => (i === index ? { ...plane, [field]: value } : plane)));
+    measureMutation.reset();
+    setError(null);
+  };
+
+  const addPlane = () => {
+    // New planes usually share the previous plane's pitch
+    setPlanes((prev) => [...prev, { footprintArea: "", pitch: prev[prev.length - 1]?.pitch ?? EMPTY_PLANE.pitch }]);
+    measureMutation.reset();
+  };
+
+  const removePlane = (index: number) => {
+    setPlanes((prev) => prev.filter((_, i) => i !== index));
+    measureMutation.reset();
+  };
+
+  const handleMeasure = (e: React.FormEvent) => {
+    e.preventDefault();
+    setError(null);
+
+    const parsed = planes.map((plane) => ({
+      footprintArea: parseFloat(plane.footprintArea),
+      pitch: parseFloat(plane.pitch),
+    }));
+    const invalid = parsed.findIndex(
+      (plane) => !(plane.footprintArea > 0) || !(plane.pitch >= 0 && plane.pitch <= 24)
+    );
+    if (parsed.length === 0 || invalid !== -1) {
+      setError(
+        parsed.length === 0
+          ? "Add at least one roof plane"
+          : `Plane ${invalid + 1}: enter an area above 0 and a pitch from 0 to 24`
+      );
+      return;
+    }
+
+    const waste = parseFloat(wastePercent);
+    measureMutation.mutate({
+      planes: parsed,
+      ...(Number.isNaN(waste) ? {} : { wastePercent: waste }),
+    });
+  };
+
+  const handleApply = () => {
+    if (measurement) {
+      onApply(measurement);
+      onOpenChange(false);
+    }
+  };
+
+  return (
+    <Dialog open={open} onOpenChange={onOpenChange}>
+      <DialogContent className="sm:max-w-lg bg-[#242424] border-white/10 text-white">
+        <DialogHeader>
+          <DialogTitle className="flex items-center gap-2 text-white">
+            <Ruler className="h-5 w-5 text-[#DC2626]" />
+            Measure Roof
+          </DialogTitle>
+          <DialogDescription className="text-white/60">
+            Enter each roof plane's footprint area and pitch to work out squares, shingles, underlayment, and nails.
+          </DialogDescription>
+        </DialogHeader>
+        <form onSubmit={handleMeasure}>
+          <div className="space-y-4 py-2">
+            <div className="grid grid-cols-[1fr_6rem_2.5rem] gap-2 text-xs text-white/60">
+              <span>Footprint area (sq ft)</span>
+              <span>Pitch (x/12)</span>
+              <span />
+            </div>
+            <div className="max-h-64 overflow-auto space-y-2 pr-1" data-testid="roof-planes">
+              {planes.map((plane, index) => (
+                <div key={index} className="grid grid-cols-[1fr_6rem_2.5rem] gap-2">
+                  <Input
+                    type="number"
+                    min="0"
+                    step="1"
+                    placeholder="0"
+                    aria-label={`Plane ${index + 1} footprint area`}
+                    value={plane.footprintArea}
+                    onChange={(e) => updatePlane(index, "footprintArea", e.target.value)}
+                    className={inputClassName}
+                  />
+                  <Input
+                    type="number"
+                    min="0"
+                    max="24"
+                    step="0.5"
+                    aria-label={`Plane ${index + 1} pitch`}
+                    value={plane.pitch}
+                    onChange={(e) => updatePlane(index, "pitch", e.target.value)}
+                    className={inputClassName}
+                  />
+                  <Button
+                    type="button"
+                    variant="ghost"
+                    size="icon"
+                    onClick={() => removePlane(index)}
+                    disabled={planes.length === 1}
+                    aria-label={`Remove plane ${index + 1}`}
+                    className="text-white/60 hover:text-white hover:bg-white/10"
+                  >
+                    <Trash2 className="h-4 w-4" />
+                  </Button>
+                </div>
+              ))}
+            </div>
+            <div className="flex items-end justify-between gap-4">
+              <Button
+                type="button"
+                variant="outline"
+                onClick={addPlane}
+                className="border-white/20 text-white hover:bg-white/10 hover:text-white"
+              >
+                <Plus className="h-4 w-4 mr-2" />
+                Add Plane
+              </Button>
+              <div className="space-y-1 w-32">
+                <Label htmlFor="roofWastePercent" className="text-xs text-white/60">
+                  Waste %
+                </Label>
+                <Input
+                  id="roofWastePercent"
+                  type="number"
+                  min="0"
+                  max="50"
+                  step="1"
+                  placeholder="Auto"
+                  value={wastePercent}
+                  onChange={(e) => {
+                    setWastePercent(e.target.value);
+                    measureMutation.reset();
+                  }}
+                  className={inputClassName}
+                />
+              </div>
+            </div>
+
+            {error && <p className="text-xs text-red-400">{error}</p>}
+
+            {measurement && (
+              <div className="rounded-lg border border-white/10 bg-[#1A1A1A] p-4 space-y-2 text-sm" data-testid="roof-measurement">
+                <div className="flex justify-between">
+                  <span className="text-white/60">Roof area</span>
+                  <span>
+                    {measurement.totals.roofArea.toLocaleString("en-US")} sq ft ({measurement.totals.squares} squares)
+                  </span>
+                </div>
+                <div className="flex justify-between">
+                  <span className="text-white/60">With {measurement.totals.wastePercent}% waste</span>
+                  <span>{measurement.totals.squaresWithWaste} squares</span>
+                </div>
+                <div className="border-t border-white/10 pt-2 space-y-1">
+                  {measurement.lineItems.map((item) => (
+                    <div key={item.description} className="flex justify-between gap-4">
+                      <span className="text-white/60">{item.description}</span>
+                      <span className="whitespace-nowrap">× {item.quantity}</span>
+                    </div>
+                  ))}
+                </div>
+                <div className="flex justify-between border-t border-white/10 pt-2 font-semibold">
+                  <span>Materials</span>
+                  <span>
+                    {new Intl.NumberFormat("en-US", { style: "currency", currency: "USD" }).format(
+                      measurement.materialsCost
+                    )}
+                  </span>
+                </div>
+                {measurement.warnings.map((warning) => (
+                  <p key={warning} className="flex items-start gap-2 text-xs text-amber-400">
+                    <AlertTriangle className="h-3.5 w-3.5 mt-0.5 shrink-0" />
+                    {warning}
+                  </p>
+                ))}
+              </div>
+            )}
+          </div>
+          <DialogFooter className="gap-2 sm:gap-0">
+            <Button
+              type="submit"
+              variant="outline"
+              disabled={measureMutation.isPending}
+              className="border-white/20 text-white hover:bg-white/10 hover:text-white"
+            >
+              {measureMutation.isPending ? (
+                <>
+                  <Loader2 className="h-4 w-4 mr-2 animate-spin" />
+                  Measuring...
+                </>
+              ) : (
+                "Calculate"
+              )}
+            </Button>
+            <Button
+              type="button"
+              onClick={handleApply}
+              disabled={!measurement}
+              className="bg-gradient-to-r from-[#DC2626] to-[#B91C1C] hover:from-[#B91C1C] hover:to-[#991B1B] text-white"
+            >
+              Use in Estimate
+            </Button>
+          </DialogFooter>
+        </form>
+      </DialogContent>
+    </Dialog>
+  );
+}
@@ -1,13 +1,7 @@
-import { Document, Page, Text, View, StyleSheet, Image, Font } from '@react-pdf/renderer';
+import { Document, Page, Text, View, StyleSheet, Image } from '@react-pdf/renderer';
 
-// Register fonts (using default fonts for now)
-Font.register({
-  family: 'Helvetica',
-  fonts: [
-    { src: 'Helvetica' },
-    { src: 'Helvetica-Bold', fontWeight: 'bold' },
-  ],
-});
+// Helvetica is one of the standard PDF fonts: viewers supply it, so it needs no
+// registration and adds no font data to the file
 
 // Define styles
 const styles = StyleSheet.create({
@@ -0,0 +1,62 @@
+import { Writable } from "stream";
+import { renderToPipeableStream } from "react-dom/server";
+import { StaticRouter } from "react-router-dom/server";
+import { HelmetProvider, type HelmetServerState } from "react-helmet-async";
+import { QueryClient } from "@tanstack/react-query";
+import { AppProviders, AppRoutes } from "./App";
+
+/**
+ * Build-time render of a public page (see scripts/prerender.js)
+ *
+ * Renders the same tree the browser app hydrates, with StaticRouter in place of
+ * BrowserRouter. Waits for every lazy route chunk to resolve so the HTML holds the
+ * full page rather than the Suspense fallback.
+ */
+
+export type RenderedPage = {
+  html: string;
+  head: string;
+};
+
+export function render(url: string): Promise<RenderedPage> {
+  const helmetContext: { helmet?: HelmetServerState } = {};
+  // Fresh per page so no query state leaks between renders
+  const queryClient = new QueryClient();
+
+  return new Promise((resolve, reject) => {
+    let html = "";
+    const output = new Writable({
+      write(chunk, _encoding, callback) {
+        html += chunk.toString();
+        callback();
+      },
+      final(callback) {
+        const helmet = helmetContext.helmet;
+        const head = helmet
+          ? [helmet.title, helmet.meta, helmet.link, helmet.script].map((tags) => tags.toString()).join("")
+          : "";
+        resolve({ html, head });
+        callback();
+      },
+    });
+
+    const { pipe } = renderToPipeableStream(
+      <HelmetProvider context={helmetContext}>
+        <AppProviders queryClient={queryClient}>
+          <StaticRouter location={url}>
+            <AppRoutes />
+          </StaticRouter>
+        </AppProviders>
+      </HelmetProvider>,
+      {
+        onAllReady() {
+          pipe(output);
+        },
+        onShellError: reject,
+        onError(error) {
+          reject(error);
+        },
+      }
+    );
+  });
+}
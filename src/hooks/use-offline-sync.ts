@@ -0,0 +1,84 @@
+import { useCallback, useEffect, useRef, useState } from "react";
+import { useQueryClient } from "@tanstack/react-query";
+import { toast } from "sonner";
+import {
+  isOfflineStoreAvailable,
+  listPendingMutations,
+  replayPendingMutations,
+} from "@/lib/offline-drafts";
+
+/**
+ * Hook to track connectivity and replay estimates saved while offline
+ * Replays when the browser comes back online, and once on mount in case the
+ * page was reloaded with changes still queued.
+ */
+export function useOfflineSync() {
+  const queryClient = useQueryClient();
+  const [isOnline, setIsOnline] = useState(() => navigator.onLine);
+  const [pendingCount, setPendingCount] = useState(0);
+  const [isSyncing, setIsSyncing] = useState(false);
+  const syncingRef = useRef(false);
+
+  const refreshPendingCount = useCallback(async () => {
+    if (!isOfflineStoreAvailable()) return;
+    const pending = await listPendingMutations().catch(() => []);
+    setPendingCount(pending.length);
+  }, []);
+
+  const syncNow = useCallback(async () => {
+    if (!isOfflineStoreAvailable() || !navigator.onLine || syncingRef.current) return;
+
+    syncingRef.current = true;
+    setIsSyncing(true);
+    try {
+      const results = await replayPendingMutations();
+      if (results.length === 0) return;
+
+      const created = results.filter((r) => r.status === "created").length;
+      const updated = results.filter((r) => r.status === "updated").length;
+      const conflicts = results.filter((r) => r.status === "conflict");
+      const failed = results.filter((r) => r.status === "invalid" || r.status === "not_found");
+
+      // Free tier usage for created estimates is counted by the batch endpoint
+      queryClient.invalidateQueries({ queryKey: ["estimates"] });
+      queryClient.invalidateQueries({ queryKey: ["subscription-status"] });
+
+      if (created + updated > 0) {
+        toast.success(`Synced ${created + updated} offline ${created + updated === 1 ? "change" : "changes"}`);
+      }
+      for (const conflict of conflicts) {
+        const title = ("estimate" in conflict && conflict.estimate?.title) || "An estimate";
+        toast.error(`"${title}" was changed on another device. Your offline edit was not applied.`);
+      }
+      if (failed.length > 0) {
+        toast.error(`${failed.length} offline ${failed.length === 1 ? "change" : "changes"} could not be saved`);
+      }
+    } catch (error) {
+      // Still unreachable - leave the queue for the next attempt
+      console.error("Offline sync failed:", error);
+    } finally {
+      syncingRef.current = false;
+      setIsSyncing(false);
+      refreshPendingCount();
+    }
+  }, [queryClient, refreshPendingCount]);
+
+  useEffect(() => {
+    const handleOnline = () => {
+      setIsOnline(true);
+      syncNow();
+    };
+    const handleOffline = () => setIsOnline(false);
+
+    window.addEventListener("online", handleOnline);
+    window.addEventListener("offline", handleOffline);
+    syncNow();
+
+    return () => {
+      window.removeEventListener("online", handleOnline);
+      window.removeEventListener("offline", handleOffline);
+    };
+  }, [syncNow]);
+
+  return { isOnline, pendingCount, isSyncing, syncNow, refreshPendingCount };
+}
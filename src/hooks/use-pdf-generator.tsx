@@ -1,8 +1,24 @@
 import { useState } from 'react';
-import { pdf } from '@react-pdf/renderer';
-import { EstimatePDFDocument } from '@/components/pdf/EstimatePDFDocument';
 import { toast } from 'sonner';
 
+// @react-pdf/renderer is large, so it and the document component are only
+// fetched on the first export; later exports reuse the loaded modules
+let pdfModules: Promise<[typeof import('@react-pdf/renderer'), typeof import('@/components/pdf/EstimatePDFDocument')]> | null = null;
+
+function loadPDFModules() {
+  if (!pdfModules) {
+    pdfModules = Promise.all([
+      import('@react-pdf/renderer'),
+      import('@/components/pdf/EstimatePDFDocument'),
+    ]).catch((error) => {
+      // Allow a retry after a failed chunk load (e.g. a flaky connection)
+      pdfModules = null;
+      throw error;
+    });
+  }
+  return pdfModules;
+}
+
 interface EstimateData {
   id: number;
   title: string;
@@ -38,6 +54,8 @@ export function usePDFGenerator() {
     setIsGenerating(true);
 
     try {
+      const [{ pdf }, { EstimatePDFDocument }] = await loadPDFModules();
+
       // Create PDF document
       const doc = (
         <EstimatePDFDocument
@@ -0,0 +1,92 @@
+import { useCallback, useState, type FocusEvent } from "react";
+import { defaultRangeExtractor, useVirtualizer, type Range } from "@tanstack/react-virtual";
+
+/**
+ * Windowed rendering for table rows
+ *
+ * Only the rows in (or near) the scroll container's viewport are mounted; the
+ * rest of the table's height is filled by spacer rows, so a real <table> keeps
+ * its column layout. Rows are measured once mounted, so a row that grows (e.g.
+ * a validation message) stays correctly positioned.
+ *
+ * Keyboard and screen reader use:
+ * - the row holding focus stays mounted even when scrolled out of view
+ * - overscan keeps the next rows mounted, so Tab can always move into them
+ * - rowProps() sets aria-rowindex, and tableProps() sets aria-rowcount to the full count
+ *
+ * @param count - Total number of rows
+ * @param rowHeight - Expected row height in pixels, used until a row is measured
+ * @param overscan - Rows mounted beyond each edge of the viewport (default: 10)
+ */
+export function useVirtualRows<TScroll extends HTMLElement = HTMLDivElement>({
+  count,
+  rowHeight,
+  overscan = 10,
+}: {
+  count: number;
+  rowHeight: number;
+  overscan?: number;
+}) {
+  // State rather than a ref: the container may mount after this component does (e.g. in a dialog portal)
+  const [scrollElement, scrollRef] = useState<TScroll | null>(null);
+  const [focusedIndex, setFocusedIndex] = useState<number | null>(null);
+
+  const rangeExtractor = useCallback(
+    (range: Range) => {
+      const indexes = defaultRangeExtractor(range);
+      if (focusedIndex === null || focusedIndex >= count || indexes.includes(focusedIndex)) {
+        return indexes;
+      }
+      return [...indexes, focusedIndex].sort((a, b) => a - b);
+    },
+    [focusedIndex, count]
+  );
+
+  const virtualizer = useVirtualizer({
+    count,
+    getScrollElement: () => scrollElement,
+    estimateSize: () => rowHeight,
+    overscan,
+    rangeExtractor,
+  });
+
+  // Mounted rows, each with the gap to the previous one (only non-zero around a pinned focused row)
+  let offset = 0;
+  const rows = virtualizer.getVirtualItems().map((row) => {
+    const gapBefore = row.start - offset;
+    offset = row.end;
+    return { ...row, gapBefore };
+  });
+  const gapAfter = Math.max(0, virtualizer.getTotalSize() - offset);
+
+  const rowProps = (index: number) => ({
+    "data-index": index,
+    ref: virtualizer.measureElement,
+    // Header row is 1
+    "aria-rowindex": index + 2,
+    onFocus: () => setFocusedIndex(index),
+    onBlur: (event: FocusEvent<HTMLElement>) => {
+      if (!event.currentTarget.contains(event.relatedTarget as Node | null)) {
+        setFocusedIndex((current) => (current === index ? null : current));
+      }
+    },
+  });
+
+  const tableProps = () => ({ "aria-rowcount": count + 1 });
+
+  return { scrollRef, virtualizer, rows, gapAfter, rowProps, tableProps };
+}
+
+/**
+ * Stands in for rows that aren't mounted
+ */
+export function SpacerRow({ height, colSpan }: { height: number; colSpan: number }) {
+  if (height <= 0) {
+    return null;
+  }
+  return (
+    <tr aria-hidden="true">
+      <td colSpan={colSpan} style={{ height, padding: 0, border: 0 }} />
+    </tr>
+  );
+}
@@ -47,6 +47,22 @@ export type UpdateEstimateInput = {
   discountPercent?: number;
 };
 
+/**
+ * Cached estimate list plus the change feed cursor it is current as of
+ */
+export type EstimateSnapshot = {
+  estimates: Estimate[];
+  cursor: string | null;
+};
+
+export type EstimateChanges = {
+  resync: boolean;
+  changes: Estimate[];
+  deleted: number[];
+  cursor: string | null;
+  hasMore: boolean;
+};
+
 /**
  * Get auth headers for API requests
  * Better-Auth uses cookies for authentication, so we just need to include credentials
@@ -61,6 +77,14 @@ function getAuthHeaders(): HeadersInit {
  * Fetch all estimates for the authenticated user
  */
 export async function fetchEstimates(): Promise<Estimate[]> {
+  const snapshot = await fetchEstimateSnapshot();
+  return snapshot.estimates;
+}
+
+/**
+ * Fetch all estimates along with a cursor for incremental sync
+ */
+export async function fetchEstimateSnapshot(): Promise<EstimateSnapshot> {
   const headers = getAuthHeaders();
   const response = await fetch(`${getBaseURL()}/api/estimates`, {
     method: "GET",
@@ -79,7 +103,74 @@ export async function fetchEstimates(): Promise<Estimate[]> {
   }
 
   const data = await response.json();
-  return data.estimates || [];
+  return { estimates: data.estimates || [], cursor: data.cursor ?? null };
+}
+
+/**
+ * Fetch estimates changed since a cursor, including IDs of deleted estimates
+ */
+export async function fetchEstimateChanges(since: string): Promise<EstimateChanges> {
+  const headers = getAuthHeaders();
+  const response = await fetch(`${getBaseURL()}/api/estimates/changes?since=${encodeURIComponent(since)}`, {
+    method: "GET",
+    headers,
+    credentials: "include",
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ error: "Failed to fetch estimate changes" }));
+    const errorMessage = error.error || error.message || "Failed to fetch estimate changes";
+    if (response.status === 403 && error.subscriptionStatus) {
+      throw new Error(`Subscription required: ${errorMessage}`);
+    }
+    throw new Error(errorMessage);
+  }
+
+  return await response.json();
+}
+
+/**
+ * Bring a cached estimate snapshot up to date
+ * Merges deltas from the change feed; falls back to a full fetch when there is
+ * no cached snapshot or the server asks the client to resync.
+ */
+export async function syncEstimates(previous?: EstimateSnapshot): Promise<EstimateSnapshot> {
+  if (!previous?.cursor) {
+    return fetchEstimateSnapshot();
+  }
+
+  const byId = new Map(previous.estimates.map((estimate) => [estimate.id, estimate]));
+  let cursor = previous.cursor;
+  let changed = false;
+  let hasMore = true;
+
+  while (hasMore) {
+    const feed = await fetchEstimateChanges(cursor);
+    if (feed.resync || !feed.cursor) {
+      return fetchEstimateSnapshot();
+    }
+
+    for (const estimate of feed.changes) {
+      byId.set(estimate.id, estimate);
+      changed = true;
+    }
+    for (const id of feed.deleted) {
+      changed = byId.delete(id) || changed;
+    }
+
+    cursor = feed.cursor;
+    hasMore = feed.hasMore;
+  }
+
+  if (!changed) {
+    return { estimates: previous.estimates, cursor };
+  }
+
+  // Keep the same ordering as the full list (newest first)
+  const estimates = Array.from(byId.values()).sort(
+    (a, b) => new Date(b.createdAt).getTime() - new Date(a.createdAt).getTime() || b.id - a.id
+  );
+  return { estimates, cursor };
 }
 
 /**
@@ -106,6 +197,65 @@ export async function fetchEstimate(id: number): Promise<Estimate> {
   return data.estimate;
 }
 
+/**
+ * Search estimates on the server (ranked, prefix and typo tolerant)
+ */
+export async function searchEstimates(query: string, signal?: AbortSignal): Promise<Estimate[]> {
+  const headers = getAuthHeaders();
+  const params = new URLSearchParams({ q: query });
+  const response = await fetch(`${getBaseURL()}/api/estimates/search?${params}`, {
+    method: "GET",
+    headers,
+    credentials: "include",
+    signal,
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ error: "Failed to search estimates" }));
+    const errorMessage = error.error || error.message || "Failed to search estimates";
+    if (response.status === 403 && error.subscriptionStatus) {
+      throw new Error(`Subscription required: ${errorMessage}`);
+    }
+    throw new Error(errorMessage);
+  }
+
+  const data = await response.json();
+  return data.estimates || [];
+}
+
+/**
+ * Materials catalog entry; unitPrice is in dollars like line items
+ */
+export type MaterialSuggestion = {
+  id: number;
+  name: string;
+  type: EstimateItem["type"];
+  unitPrice: number;
+  useCount: number;
+};
+
+/**
+ * Catalog suggestions for a partially typed line item description
+ */
+export async function fetchMaterialSuggestions(query: string, signal?: AbortSignal): Promise<MaterialSuggestion[]> {
+  const headers = getAuthHeaders();
+  const params = new URLSearchParams({ q: query });
+  const response = await fetch(`${getBaseURL()}/api/materials/autocomplete?${params}`, {
+    method: "GET",
+    headers,
+    credentials: "include",
+    signal,
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ error: "Failed to fetch material suggestions" }));
+    throw new Error(error.error || error.message || "Failed to fetch material suggestions");
+  }
+
+  const data = await response.json();
+  return data.materials || [];
+}
+
 /**
  * Create a new estimate
  */
@@ -177,6 +327,87 @@ export async function deleteEstimate(id: number): Promise<void> {
   }
 }
 
+export type EstimateBatchOperation =
+  | { op: "create"; clientId: string; data: CreateEstimateInput }
+  | { op: "update"; id: number; baseUpdatedAt: string; data: UpdateEstimateInput }
+  | { op: "delete"; id: number };
+
+export type EstimateBatchResult =
+  | { op: "create"; clientId: string; status: "created" | "invalid"; estimate?: Estimate; details?: unknown }
+  | { op: "update"; id: number; status: "updated" | "conflict" | "invalid" | "not_found"; estimate?: Estimate; details?: unknown }
+  | { op: "delete"; id: number; status: "deleted" | "invalid" | "not_found"; details?: unknown };
+
+/**
+ * Apply many estimate mutations in one request (bulk edits and offline sync)
+ * All writes in a batch are applied in a single transaction on the server.
+ */
+export async function batchEstimates(operations: EstimateBatchOperation[]): Promise<EstimateBatchResult[]> {
+  const headers = getAuthHeaders();
+  const response = await fetch(`${getBaseURL()}/api/estimates/batch`, {
+    method: "POST",
+    headers,
+    credentials: "include",
+    body: JSON.stringify({ operations }),
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ error: "Failed to sync estimates" }));
+    const errorMessage = error.error || error.message || "Failed to sync estimates";
+    if (response.status === 403 && error.subscriptionStatus) {
+      throw new Error(`Subscription required: ${errorMessage}`);
+    }
+    throw new Error(errorMessage);
+  }
+
+  const data = await response.json();
+  return data.results || [];
+}
+
+export type EstimateImportEvent =
+  | { type: "progress"; rowsRead: number; imported: number; failed: number }
+  | { type: "error"; row: number; details: unknown }
+  | { type: "done"; rowsRead: number; imported: number; failed: number; truncated: boolean }
+  | { type: "aborted"; error: string };
+
+/**
+ * Import estimates from a CSV file
+ * The server streams NDJSON progress events; `onEvent` is called for each one.
+ */
+export async function importEstimatesCsv(
+  file: File,
+  onEvent: (event: EstimateImportEvent) => void
+): Promise<void> {
+  const response = await fetch(`${getBaseURL()}/api/estimates/import`, {
+    method: "POST",
+    headers: { "Content-Type": file.type || "text/csv" },
+    credentials: "include",
+    body: file,
+  });
+
+  if (!response.ok || !response.body) {
+    const error = await response.json().catch(() => ({ error: "Failed to import estimates" }));
+    const errorMessage = error.error || error.message || "Failed to import estimates";
+    if (response.status === 403 && error.subscriptionStatus) {
+      throw new Error(`Subscription required: ${errorMessage}`);
+    }
+    throw new Error(errorMessage);
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffered = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffered += value;
+    const lines = buffered.split("\n");
+    buffered = lines.pop() ?? "";
+    lines.filter(Boolean).forEach((line) => onEvent(JSON.parse(line)));
+  }
+  if (buffered.trim()) {
+    onEvent(JSON.parse(buffered));
+  }
+}
+
 /**
  * Generate PDF for an estimate
  */
@@ -201,6 +432,120 @@ export async function generatePDF(estimateId: number): Promise<Blob> {
   return await response.blob();
 }
 
+/**
+ * Inputs for one quoting scenario, as entered in the Quick Estimate builder
+ */
+export type QuoteScenario = {
+  equipmentCost?: number;
+  materialsCost?: number;
+  laborHours?: number;
+  laborRate?: number;
+  discountPercent?: number;
+};
+
+/**
+ * Tier prices for one scenario, all in cents
+ */
+export type Quote = {
+  laborTotal: number;
+  subtotal: number;
+  discountAmount: number;
+  finalPrice: number;
+  standardPrice: number;
+  priorityPrice: number;
+  emergencyPrice: number;
+};
+
+/**
+ * Price many scenarios at every service tier in one request (exact cents, same order)
+ */
+export async function quoteScenarios(scenarios: QuoteScenario[]): Promise<Quote[]> {
+  const headers = getAuthHeaders();
+  const response = await fetch(`${getBaseURL()}/api/quotes/batch`, {
+    method: "POST",
+    headers,
+    credentials: "include",
+    body: JSON.stringify({ scenarios }),
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ error: "Failed to quote scenarios" }));
+    throw new Error(error.error || error.message || "Failed to quote scenarios");
+  }
+
+  const data = await response.json();
+  return data.quotes;
+}
+
+/**
+ * One roof plane: plan-view area in sq ft and pitch as rise per 12" of run
+ */
+export type RoofPlane = {
+  label?: string;
+  footprintArea: number;
+  pitch: number;
+};
+
+export type RoofStyle = "gable" | "hip" | "complex";
+
+export type RoofMeasurementRequest = {
+  planes: RoofPlane[];
+  roofStyle?: RoofStyle;
+  wastePercent?: number;
+  prices?: Partial<{ shingleBundle: number; underlaymentRoll: number; nailBox: number }>;
+};
+
+/**
+ * Squares and material quantities for a roof; lineItems and materialsCost are in dollars
+ */
+export type RoofMeasurement = {
+  planes: (Required<Omit<RoofPlane, "label">> & {
+    label: string | null;
+    pitchMultiplier: number;
+    roofArea: number;
+    squares: number;
+  })[];
+  totals: {
+    planeCount: number;
+    footprintArea: number;
+    roofArea: number;
+    squares: number;
+    roofStyle: RoofStyle;
+    wastePercent: number;
+    squaresWithWaste: number;
+  };
+  materials: {
+    shingleBundles: number;
+    underlaymentRolls: number;
+    nails: number;
+    nailBoxes: number;
+  };
+  prices: { shingleBundle: number; underlaymentRoll: number; nailBox: number };
+  lineItems: EstimateItem[];
+  materialsCost: number;
+  warnings: string[];
+};
+
+/**
+ * Measure a roof (any number of planes, up to 1000) into squares and materials
+ */
+export async function measureRoof(request: RoofMeasurementRequest): Promise<RoofMeasurement> {
+  const headers = getAuthHeaders();
+  const response = await fetch(`${getBaseURL()}/api/roof/measure`, {
+    method: "POST",
+    headers,
+    credentials: "include",
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ error: "Failed to measure roof" }));
+    throw new Error(error.error || error.message || "Failed to measure roof");
+  }
+
+  return await response.json();
+}
+
 /**
  * Calculate total from items array (in dollars)
  */
@@ -290,6 +635,28 @@ export async function verifySubscription(): Promise<SubscriptionVerifyResponse>
   return await response.json();
 }
 
+export type SubscriptionStatusEvent = {
+  subscriptionStatus: SubscriptionStatus;
+  subscriptionTier: "free" | "monthly" | "annual";
+  isActive: boolean;
+};
+
+/**
+ * Listen for subscription status changes pushed by the server (server-sent events)
+ * onStatus receives the current status, then each change as the payment webhook
+ * commits it. The browser reconnects if the stream drops; call the returned
+ * function to stop listening.
+ */
+export function subscribeToSubscriptionEvents(
+  onStatus: (event: SubscriptionStatusEvent) => void
+): () => void {
+  const source = new EventSource(`${getBaseURL()}/api/subscription/events`, { withCredentials: true });
+  source.addEventListener("status", (message) => {
+    onStatus(JSON.parse((message as MessageEvent<string>).data));
+  });
+  return () => source.close();
+}
+
 /**
  * Increment estimate usage counter (Free tier only)
  */
@@ -362,6 +729,7 @@ export type Settings = {
   userId: string;
   companyName: string | null;
   companyLogo: string | null;
+  companyLogoThumbnail: string | null;
   pdfTemplate: string | null;
   createdAt: string;
   updatedAt: string;
@@ -561,3 +929,44 @@ export async function deleteTemplate(id: number): Promise<void> {
     throw new Error(errorMessage);
   }
 }
+
+// ============================================================================
+// Analytics API
+// ============================================================================
+
+export type MonthlyAnalytics = {
+  month: string; // YYYY-MM
+  estimateCount: number;
+  totalCents: number;
+  averageTicketCents: number;
+  mix: { laborCents: number; materialCents: number; equipmentCents: number };
+};
+
+export type AnalyticsSummary = {
+  months: MonthlyAnalytics[];
+  totals: Omit<MonthlyAnalytics, "month">;
+};
+
+/**
+ * Fetch monthly analytics for the last `months` months
+ */
+export async function fetchAnalytics(months: number = 12): Promise<AnalyticsSummary> {
+  const headers = getAuthHeaders();
+  const response = await fetch(`${getBaseURL()}/api/analytics?months=${months}`, {
+    method: "GET",
+    headers,
+    credentials: "include",
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ error: "Failed to fetch analytics" }));
+    const errorMessage = error.error || error.message || "Failed to fetch analytics";
+    if (response.status === 403 && error.subscriptionStatus) {
+      throw new Error(`Subscription required: ${errorMessage}`);
+    }
+    throw new Error(errorMessage);
+  }
+
+  const data = await response.json();
+  return data.analytics;
+}
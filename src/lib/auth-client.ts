@@ -4,6 +4,10 @@ import { createAuthClient } from "better-auth/react";
 // In development, use relative URL to go through Vite proxy (which forwards to port 3001)
 // In production, API routes are proxied through Netlify
 const getBaseURL = () => {
+  if (typeof window === "undefined") {
+    // Build-time prerender (scripts/prerender.js): no requests are made, the session stays empty
+    return "http://localhost";
+  }
   if (import.meta.env.DEV) {
     // Development: use relative URL to go through Vite proxy
     // Vite proxy forwards /api/* to http://localhost:3001/api/*
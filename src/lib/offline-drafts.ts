@@ -0,0 +1,195 @@
+/**
+ * Offline draft store for estimates (IndexedDB)
+ *
+ * - drafts: in-progress EstimateForm contents, so edits survive a dropped
+ *   connection or a page reload
+ * - pending: creates/updates saved while offline, replayed in batches
+ *   through POST /api/estimates/batch once the connection comes back
+ */
+
+import {
+  batchEstimates,
+  type CreateEstimateInput,
+  type EstimateBatchOperation,
+  type EstimateBatchResult,
+  type EstimateItem,
+  type UpdateEstimateInput,
+} from "@/lib/api";
+
+const DB_NAME = "roofing-estimate-pro";
+const DB_VERSION = 1;
+const DRAFTS_STORE = "drafts";
+const PENDING_STORE = "pending";
+
+// Operations sent per batch request when replaying the queue
+const REPLAY_BATCH_SIZE = 50;
+
+export type EstimateDraft = {
+  key: string; // "new" or "estimate-<id>"
+  title: string;
+  clientName: string;
+  clientPhone: string;
+  clientAddress: string;
+  discountPercent: string;
+  items: EstimateItem[];
+  savedAt: number;
+};
+
+export type PendingMutation = {
+  id?: number; // Auto-increment key assigned by IndexedDB
+  operation: EstimateBatchOperation;
+  queuedAt: number;
+};
+
+let dbPromise: Promise<IDBDatabase> | null = null;
+
+/**
+ * Open (and upgrade if needed) the offline database
+ */
+function openDatabase(): Promise<IDBDatabase> {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve, reject) => {
+      const request = indexedDB.open(DB_NAME, DB_VERSION);
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        if (!db.objectStoreNames.contains(DRAFTS_STORE)) {
+          db.createObjectStore(DRAFTS_STORE, { keyPath: "key" });
+        }
+        if (!db.objectStoreNames.contains(PENDING_STORE)) {
+          db.createObjectStore(PENDING_STORE, { keyPath: "id", autoIncrement: true });
+        }
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => {
+        dbPromise = null;
+        reject(request.error);
+      };
+    });
+  }
+  return dbPromise;
+}
+
+/**
+ * Run a single request against an object store and resolve with its result
+ */
+async function withStore<T>(
+  storeName: string,
+  mode: IDBTransactionMode,
+  run: (store: IDBObjectStore) => IDBRequest<T>
+): Promise<T> {
+  const db = await openDatabase();
+  return new Promise((resolve, reject) => {
+    const transaction = db.transaction(storeName, mode);
+    const request = run(transaction.objectStore(storeName));
+    transaction.oncomplete = () => resolve(request.result);
+    transaction.onerror = () => reject(transaction.error);
+    transaction.onabort = () => reject(transaction.error);
+  });
+}
+
+/**
+ * Whether IndexedDB is usable in this browser (it isn't in some private modes)
+ */
+export function isOfflineStoreAvailable(): boolean {
+  return typeof indexedDB !== "undefined";
+}
+
+/**
+ * Draft key for a form: "new" when creating, "estimate-<id>" when editing
+ */
+export function draftKey(estimateId?: number | null): string {
+  return estimateId ? `estimate-${estimateId}` : "new";
+}
+
+export async function saveDraft(draft: EstimateDraft): Promise<void> {
+  await withStore(DRAFTS_STORE, "readwrite", (store) => store.put(draft));
+}
+
+export async function loadDraft(key: string): Promise<EstimateDraft | undefined> {
+  return withStore<EstimateDraft | undefined>(DRAFTS_STORE, "readonly", (store) => store.get(key));
+}
+
+export async function clearDraft(key: string): Promise<void> {
+  await withStore(DRAFTS_STORE, "readwrite", (store) => store.delete(key));
+}
+
+/**
+ * Queue a create for replay when the connection comes back
+ */
+export async function queueCreate(data: CreateEstimateInput): Promise<void> {
+  const clientId = typeof crypto !== "undefined" && "randomUUID" in crypto
+    ? crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+  const mutation: PendingMutation = {
+    operation: { op: "create", clientId, data },
+    queuedAt: Date.now(),
+  };
+  await withStore(PENDING_STORE, "readwrite", (store) => store.add(mutation));
+}
+
+/**
+ * Queue an update for replay; a later update to the same estimate replaces the
+ * earlier one but keeps its baseUpdatedAt so conflicts are still detected
+ */
+export async function queueUpdate(id: number, baseUpdatedAt: string, data: UpdateEstimateInput): Promise<void> {
+  const pending = await listPendingMutations();
+  const existing = pending.find((m) => m.operation.op === "update" && m.operation.id === id);
+
+  if (existing && existing.operation.op === "update") {
+    const merged: PendingMutation = {
+      ...existing,
+      operation: { ...existing.operation, data: { ...existing.operation.data, ...data } },
+      queuedAt: Date.now(),
+    };
+    await withStore(PENDING_STORE, "readwrite", (store) => store.put(merged));
+    return;
+  }
+
+  const mutation: PendingMutation = {
+    operation: { op: "update", id, baseUpdatedAt, data },
+    queuedAt: Date.now(),
+  };
+  await withStore(PENDING_STORE, "readwrite", (store) => store.add(mutation));
+}
+
+export async function listPendingMutations(): Promise<PendingMutation[]> {
+  return withStore<PendingMutation[]>(PENDING_STORE, "readonly", (store) => store.getAll());
+}
+
+async function removePendingMutations(ids: number[]): Promise<void> {
+  const db = await openDatabase();
+  await new Promise<void>((resolve, reject) => {
+    const transaction = db.transaction(PENDING_STORE, "readwrite");
+    const store = transaction.objectStore(PENDING_STORE);
+    ids.forEach((id) => store.delete(id));
+    transaction.oncomplete = () => resolve();
+    transaction.onerror = () => reject(transaction.error);
+  });
+}
+
+/**
+ * Replay queued mutations in batches
+ * Every item that got a definitive answer from the server (including conflicts
+ * and validation failures) is removed from the queue; network errors stop the
+ * replay and leave the remaining items queued for the next attempt.
+ */
+export async function replayPendingMutations(): Promise<EstimateBatchResult[]> {
+  const pending = (await listPendingMutations()).sort((a, b) => (a.id ?? 0) - (b.id ?? 0));
+  const results: EstimateBatchResult[] = [];
+
+  for (let i = 0; i < pending.length; i += REPLAY_BATCH_SIZE) {
+    const chunk = pending.slice(i, i + REPLAY_BATCH_SIZE);
+    const chunkResults = await batchEstimates(chunk.map((m) => m.operation));
+    await removePendingMutations(chunk.map((m) => m.id!));
+    results.push(...chunkResults);
+  }
+
+  return results;
+}
+
+/**
+ * True when a fetch failed because the network is unreachable (as opposed to an API error)
+ */
+export function isNetworkError(error: unknown): boolean {
+  return (typeof navigator !== "undefined" && !navigator.onLine) || error instanceof TypeError;
+}
@@ -6,12 +6,15 @@ import Footer from "@/components/layout/Footer";
 import EstimateBuilder from "@/components/dashboard/EstimateBuilder";
 import EstimateList from "@/components/dashboard/EstimateList";
 import EstimateForm from "@/components/dashboard/EstimateForm";
+import AnalyticsPanel from "@/components/dashboard/AnalyticsPanel";
 import { SubscriptionRequired, UpgradePromptDialog } from "@/components/subscription";
 import { useSubscription } from "@/hooks/use-subscription";
+import { useOfflineSync } from "@/hooks/use-offline-sync";
 import { createEstimate, updateEstimate, incrementEstimateUsage, type Estimate, type CreateEstimateInput, type UpdateEstimateInput } from "@/lib/api";
+import { queueCreate, queueUpdate, isNetworkError, isOfflineStoreAvailable } from "@/lib/offline-drafts";
 import { toast } from "sonner";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
-import { Calculator, FileText } from "lucide-react";
+import { Calculator, FileText, CloudOff, BarChart3 } from "lucide-react";
 
 /**
  * Dashboard content - only rendered when user has active subscription
@@ -35,18 +38,35 @@ const DashboardContent = () => {
   const userTier = getUserTier();
   const isPaidUser = userTier === "monthly" || userTier === "annual";
   const isAtLimit = !isPaidUser && estimatesUsed >= estimatesLimit;
+  const { isOnline, pendingCount, isSyncing, refreshPendingCount } = useOfflineSync();
 
   // Create mutation - also increments usage for free tier users
+  // Without a connection the estimate is queued locally and synced later
   const createMutation = useMutation({
     mutationFn: async (data: CreateEstimateInput) => {
-      const result = await createEstimate(data);
+      let result: Estimate;
+      try {
+        result = await createEstimate(data);
+      } catch (error) {
+        if (isOfflineStoreAvailable() && isNetworkError(error)) {
+          await queueCreate(data);
+          return null;
+        }
+        throw error;
+      }
       // Increment usage for free tier users
       if (!isPaidUser) {
         await incrementEstimateUsage().catch(console.error);
       }
       return result;
     },
-    onSuccess: () => {
+    onSuccess: (result) => {
+      if (!result) {
+        refreshPendingCount();
+        toast.success("Saved offline. It will sync when you're back online.");
+        setFormOpen(false);
+        return;
+      }
       queryClient.invalidateQueries({ queryKey: ["estimates"] });
       queryClient.invalidateQueries({ queryKey: ["subscription-status"] });
       toast.success("Estimate created successfully");
@@ -63,10 +83,27 @@ const DashboardContent = () => {
     },
   });
 
-  // Update mutation
+  // Update mutation - queued with the last seen updatedAt when offline
   const updateMutation = useMutation({
-    mutationFn: ({ id, data }: { id: number; data: UpdateEstimateInput }) => updateEstimate(id, data),
-    onSuccess: () => {
+    mutationFn: async ({ estimate, data }: { estimate: Estimate; data: UpdateEstimateInput }) => {
+      try {
+        return await updateEstimate(estimate.id, data);
+      } catch (error) {
+        if (isOfflineStoreAvailable() && isNetworkError(error)) {
+          await queueUpdate(estimate.id, estimate.updatedAt, data);
+          return null;
+        }
+        throw error;
+      }
+    },
+    onSuccess: (result) => {
+      if (!result) {
+        refreshPendingCount();
+        toast.success("Saved offline. It will sync when you're back online.");
+        setFormOpen(false);
+        setEditingEstimate(null);
+        return;
+      }
       queryClient.invalidateQueries({ queryKey: ["estimates"] });
       toast.success("Estimate updated successfully");
       setFormOpen(false);
@@ -99,7 +136,7 @@ const DashboardContent = () => {
 
   const handleSubmit = async (data: CreateEstimateInput | UpdateEstimateInput) => {
     if (editingEstimate) {
-      await updateMutation.mutateAsync({ id: editingEstimate.id, data: data as UpdateEstimateInput });
+      await updateMutation.mutateAsync({ estimate: editingEstimate, data: data as UpdateEstimateInput });
     } else {
       await createMutation.mutateAsync(data as CreateEstimateInput);
     }
@@ -118,6 +155,20 @@ const DashboardContent = () => {
             <p className="text-white/60 mt-2">
               Create professional estimates in under 60 seconds.
             </p>
+            {(!isOnline || pendingCount > 0) && (
+              <div
+                className="mt-3 inline-flex items-center gap-2 rounded-md border border-amber-400/30 bg-amber-400/10 px-3 py-1 text-sm text-amber-300"
+                role="status"
+                data-testid="offline-sync-status"
+              >
+                <CloudOff className="h-4 w-4" />
+                {!isOnline
+                  ? `Offline - ${pendingCount} ${pendingCount === 1 ? "change" : "changes"} waiting to sync`
+                  : isSyncing
+                    ? "Syncing offline changes..."
+                    : `${pendingCount} ${pendingCount === 1 ? "change" : "changes"} waiting to sync`}
+              </div>
+            )}
           </div>
 
           {/* Tabs for switching between Builder and Saved Estimates */}
@@ -137,6 +188,13 @@ const DashboardContent = () => {
                 <FileText className="h-4 w-4 mr-2" />
                 Saved Estimates
               </TabsTrigger>
+              <TabsTrigger 
+                value="analytics" 
+                className="data-[state=active]:bg-[#DC2626] data-[state=active]:text-white text-white/60"
+              >
+                <BarChart3 className="h-4 w-4 mr-2" />
+                Analytics
+              </TabsTrigger>
             </TabsList>
 
             {/* Quick Estimate Builder Tab */}
@@ -158,6 +216,11 @@ const DashboardContent = () => {
                 estimatesLimit={estimatesLimit}
               />
             </TabsContent>
+
+            {/* Analytics Tab */}
+            <TabsContent value="analytics" className="space-y-6">
+              <AnalyticsPanel />
+            </TabsContent>
           </Tabs>
 
           {/* Estimate Form Dialog */}
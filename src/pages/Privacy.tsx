@@ -14,7 +14,7 @@ const Privacy = () => {
             
             <div className="prose prose-lg max-w-none">
               <p className="text-muted-foreground text-lg mb-8">
-                Last updated: {new Date().toLocaleDateString('en-US', { month: 'long', day: 'numeric', year: 'numeric' })}
+                Last updated: January 5, 2026
               </p>
 
               <section className="mb-8">
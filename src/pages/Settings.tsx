@@ -237,10 +237,12 @@ const SettingsContent = () => {
     );
   }
 
+  // Prefer the small thumbnail; logos uploaded before normalization only have the PDF variant
+  const storedLogoUrl = settings.companyLogoThumbnail || settings.companyLogo;
   const currentLogoUrl = logoPreviewUrl
     ? logoPreviewUrl
-    : !removeLogo && settings.companyLogo
-    ? `${import.meta.env.DEV ? "http://localhost:3001" : ""}${settings.companyLogo}`
+    : !removeLogo && storedLogoUrl
+    ? `${import.meta.env.DEV ? "http://localhost:3001" : ""}${storedLogoUrl}`
     : null;
 
   return (
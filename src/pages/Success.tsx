@@ -1,50 +1,71 @@
 import { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { useSession } from "@/lib/auth-client";
-import { verifySubscription } from "@/lib/api";
+import { subscribeToSubscriptionEvents, verifySubscription } from "@/lib/api";
 import { Loader2, CheckCircle2 } from "lucide-react";
 
+// The webhook normally lands within seconds; past this, ask Stripe directly once
+// (e.g. the webhook failed) and then continue to the dashboard either way
+const VERIFY_FALLBACK_MS = 20000;
+
 const Success = () => {
   const navigate = useNavigate();
   const { data: session, isPending } = useSession();
   const [status, setStatus] = useState<"processing" | "activating" | "success">("processing");
 
+  const userId = session?.user?.id;
+
   useEffect(() => {
-    // Quick redirect flow after Stripe payment
-    const activateAndRedirect = async () => {
-      // Wait briefly for session to be available
-      if (isPending) return;
+    // Wait for the session to be available
+    if (isPending) return;
 
-      try {
-        setStatus("activating");
-        
-        // Verify and activate subscription by checking with Stripe
-        if (session?.user) {
-          try {
-            const result = await verifySubscription();
-            console.log("Subscription verification result:", result);
-          } catch (verifyError) {
-            // Ignore errors - webhook may have already activated
-            console.log("Verification skipped:", verifyError);
-          }
-        }
+    if (!userId) {
+      navigate("/dashboard", { replace: true });
+      return;
+    }
 
+    setStatus("activating");
+    let finished = false;
+    let redirectTimer: ReturnType<typeof setTimeout> | undefined;
+
+    const finish = (activated: boolean) => {
+      if (finished) return;
+      finished = true;
+      unsubscribe();
+      clearTimeout(fallbackTimer);
+      if (activated) {
         setStatus("success");
-        
-        // Redirect to dashboard immediately
-        setTimeout(() => {
-          navigate("/dashboard", { replace: true });
-        }, 500);
-        
-      } catch (error) {
-        console.error("Activation error:", error);
-        // Still redirect even if activation fails - webhook should handle it
-        navigate("/dashboard", { replace: true });
       }
+      redirectTimer = setTimeout(() => {
+        navigate("/dashboard", { replace: true });
+      }, activated ? 500 : 0);
     };
 
-    activateAndRedirect();
-  }, [navigate, session, isPending]);
+    // The server pushes the status change as soon as the payment webhook commits it
+    const unsubscribe = subscribeToSubscriptionEvents((event) => {
+      if (event.isActive) {
+        finish(true);
+      }
+    });
+
+    const fallbackTimer = setTimeout(async () => {
+      try {
+        const result = await verifySubscription();
+        finish(result.isActive);
+      } catch (verifyError) {
+        // Still redirect - the webhook may yet activate the subscription
+        console.error("Subscription verification failed:", verifyError);
+        finish(false);
+      }
+    }, VERIFY_FALLBACK_MS);
+
+    return () => {
+      finished = true;
+      unsubscribe();
+      clearTimeout(fallbackTimer);
+      clearTimeout(redirectTimer);
+    };
+  }, [navigate, userId, isPending]);
 
   return (
     <div className="min-h-screen bg-[#1A1A1A] flex items-center justify-center">
@@ -1,7 +1,46 @@
 import asyncio
+import json
+import os
 from playwright import async_api
 from playwright.async_api import expect
 
+# Production build with prerendered pages, served by `npm run build && npm run preview`
+PREVIEW_URL = os.environ.get("PREVIEW_URL", "http://localhost:4173")
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bundle-budget.json")
+
+FIRST_CONTENTFUL_PAINT = """
+() => new Promise((resolve) => {
+  new PerformanceObserver((list) => {
+    const entry = list.getEntriesByName("first-contentful-paint")[0];
+    if (entry) resolve(entry.startTime);
+  }).observe({ type: "paint", buffered: true });
+})
+"""
+
+
+async def assert_prerendered_fcp(context, path, max_fcp_ms):
+    """The page's HTML carries its content, paints within budget and hydrates without a mismatch"""
+    response = await context.request.get(f"{PREVIEW_URL}{path}")
+    assert response.ok, f"{path} returned {response.status}"
+    html = await response.text()
+    assert '<div id="root"></div>' not in html and "<h1" in html, f"{path} was not prerendered"
+
+    page = await context.new_page()
+    errors = []
+    page.on("console", lambda message: message.type == "error" and errors.append(message.text))
+    try:
+        await page.goto(f"{PREVIEW_URL}{path}", wait_until="load", timeout=30000)
+        fcp = await page.evaluate(FIRST_CONTENTFUL_PAINT)
+        print(f"{path}: first contentful paint {fcp:.0f} ms")
+        assert fcp <= max_fcp_ms, f"{path} first contentful paint {fcp:.0f} ms, budget {max_fcp_ms} ms"
+        await page.wait_for_timeout(1000)
+        # React reports a markup mismatch as recoverable error #418/#423 in production builds
+        mismatches = [e for e in errors if "ydrat" in e or "#418" in e or "#423" in e]
+        assert not mismatches, f"{path} did not hydrate cleanly: {mismatches}"
+    finally:
+        await page.close()
+
+
 async def run_test():
     pw = None
     browser = None
@@ -25,6 +64,12 @@ async def run_test():
         # Create a new browser context (like an incognito window)
         context = await browser.new_context()
         context.set_default_timeout(5000)
+
+        # -> Prerendered pages paint from static HTML within the first contentful paint budget
+        with open(BUDGET_PATH) as f:
+            max_fcp_ms = json.load(f)["prerendered"]["maxFirstContentfulPaintMs"]
+        for path in ("/privacy", "/terms"):
+            await assert_prerendered_fcp(context, path, max_fcp_ms)
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -0,0 +1,101 @@
+import requests
+import time
+
+
+BASE_URL = "http://localhost:3001"
+
+
+def test_estimates_change_feed_returns_deltas_and_tombstones():
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    timeout = 30
+
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"changefeed_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Change Feed User"
+    }
+
+    estimate_payload = {
+        "title": "Change Feed Estimate",
+        "clientName": "Client A",
+        "items": [
+            {"description": "Shingles", "quantity": 10, "unitPrice": 35, "type": "material"}
+        ]
+    }
+
+    # Sign up, sign in and activate subscription
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    # Unauthenticated and malformed requests are rejected
+    r = requests.get(f"{BASE_URL}/api/estimates/changes?since=abc", timeout=timeout)
+    assert r.status_code == 401
+    r = session.get(f"{BASE_URL}/api/estimates/changes", timeout=timeout)
+    assert r.status_code == 400
+    r = session.get(f"{BASE_URL}/api/estimates/changes?since=not-a-cursor", timeout=timeout)
+    assert r.status_code == 400
+
+    # Seed one estimate and take a snapshot
+    r = session.post(f"{BASE_URL}/api/estimates", json=estimate_payload, timeout=timeout)
+    assert r.status_code == 201, f"Create failed: {r.text}"
+    first_id = r.json()["estimate"]["id"]
+
+    r = session.get(f"{BASE_URL}/api/estimates", timeout=timeout)
+    assert r.status_code == 200
+    snapshot = r.json()
+    assert len(snapshot["estimates"]) == 1
+    cursor = snapshot["cursor"]
+    assert isinstance(cursor, str) and cursor
+
+    # No changes since the snapshot
+    r = session.get(f"{BASE_URL}/api/estimates/changes", params={"since": cursor}, timeout=timeout)
+    assert r.status_code == 200
+    feed = r.json()
+    assert feed["resync"] is False
+    assert feed["changes"] == [] and feed["deleted"] == []
+    assert feed["hasMore"] is False
+
+    # Create a second estimate, update the first - both show up as changes
+    r = session.post(f"{BASE_URL}/api/estimates", json={**estimate_payload, "title": "Second"}, timeout=timeout)
+    assert r.status_code == 201
+    second_id = r.json()["estimate"]["id"]
+    r = session.put(f"{BASE_URL}/api/estimates/{first_id}", json={"title": "First (edited)"}, timeout=timeout)
+    assert r.status_code == 200
+
+    r = session.get(f"{BASE_URL}/api/estimates/changes", params={"since": cursor}, timeout=timeout)
+    assert r.status_code == 200
+    feed = r.json()
+    changed = {e["id"]: e for e in feed["changes"]}
+    assert set(changed) == {first_id, second_id}
+    assert changed[first_id]["title"] == "First (edited)"
+    assert feed["deleted"] == []
+    cursor = feed["cursor"]
+
+    # Delete the second estimate - only a tombstone comes back
+    r = session.delete(f"{BASE_URL}/api/estimates/{second_id}", timeout=timeout)
+    assert r.status_code == 200
+
+    r = session.get(f"{BASE_URL}/api/estimates/changes", params={"since": cursor}, timeout=timeout)
+    assert r.status_code == 200
+    feed = r.json()
+    assert feed["changes"] == []
+    assert feed["deleted"] == [second_id]
+
+    # Deleted estimates disappear from the full list and single fetch
+    r = session.get(f"{BASE_URL}/api/estimates", timeout=timeout)
+    assert [e["id"] for e in r.json()["estimates"]] == [first_id]
+    r = session.get(f"{BASE_URL}/api/estimates/{second_id}", timeout=timeout)
+    assert r.status_code == 404
+
+
+test_estimates_change_feed_returns_deltas_and_tombstones()
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from playwright import async_api
+from playwright.async_api import expect
+
+FRONTEND_URL = "http://localhost:8085"
+API_URL = "http://localhost:3001"
+
+
+async def run_test():
+    pw = None
+    browser = None
+    context = None
+
+    try:
+        # Start a Playwright session in asynchronous mode
+        pw = await async_api.async_playwright().start()
+
+        # Launch a Chromium browser in headless mode with custom arguments
+        browser = await pw.chromium.launch(
+            headless=True,
+            args=[
+                "--window-size=1280,720",         # Set the browser window size
+                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                "--ipc=host",                     # Use host-level IPC for better stability
+                "--single-process"                # Run the browser in a single process mode
+            ],
+        )
+
+        # Create a new browser context (like an incognito window)
+        context = await browser.new_context()
+        context.set_default_timeout(5000)
+
+        # -> Create a paid user through the API; the context shares cookies with the page
+        suffix = str(int(time.time() * 1000))
+        email = f"offline_{suffix}@example.com"
+        password = "Password123!"
+        r = await context.request.post(f"{API_URL}/api/auth/sign-up/email", data={"email": email, "password": password, "name": "Offline User"})
+        assert r.ok, f"Sign up failed: {await r.text()}"
+        r = await context.request.post(f"{API_URL}/api/auth/sign-in/email", data={"email": email, "password": password})
+        assert r.ok, f"Sign in failed: {await r.text()}"
+        r = await context.request.post(f"{API_URL}/api/test/activate-subscription", data={"tier": "monthly"})
+        assert r.ok, f"Activate subscription failed: {await r.text()}"
+
+        # Open the dashboard and switch to the saved estimates tab
+        page = await context.new_page()
+        await page.goto(f"{FRONTEND_URL}/dashboard", wait_until="domcontentloaded", timeout=15000)
+        await page.get_by_role("tab", name="Saved Estimates").click(timeout=15000)
+        await expect(page.get_by_test_id("new-estimate-button")).to_be_visible(timeout=15000)
+
+        # -> Drop the network and create an estimate
+        await context.set_offline(True)
+        await page.get_by_test_id("new-estimate-button").click()
+        title = f"Offline Roof {suffix}"
+        await page.get_by_test_id("estimate-title-input").fill(title)
+        await page.get_by_test_id("estimate-client-name-input").fill("Offline Client")
+        await page.get_by_placeholder("Item description").first.fill("Architectural shingles")
+        await page.get_by_test_id("line-item-0-quantity").fill("20")
+        await page.get_by_test_id("line-item-0-unit-price").fill("45")
+        await page.get_by_test_id("submit-estimate-button").click()
+
+        # The estimate is queued locally instead of failing
+        status = page.get_by_test_id("offline-sync-status")
+        await expect(status).to_contain_text("waiting to sync", timeout=10000)
+        await expect(page.get_by_test_id("estimate-title-input")).to_be_hidden(timeout=5000)
+
+        # Nothing reached the server while offline
+        r = await context.request.get(f"{API_URL}/api/estimates")
+        assert title not in [e["title"] for e in (await r.json())["estimates"]]
+
+        # -> Back online: the queue replays through the batch endpoint
+        await context.set_offline(False)
+        await expect(status).to_be_hidden(timeout=20000)
+        await expect(page.get_by_text(title).first).to_be_visible(timeout=20000)
+
+        r = await context.request.get(f"{API_URL}/api/estimates")
+        assert r.ok
+        synced = [e for e in (await r.json())["estimates"] if e["title"] == title]
+        assert len(synced) == 1, "Offline estimate should be created exactly once"
+        assert synced[0]["total"] == 90000
+
+    finally:
+        if context:
+            await context.close()
+        if browser:
+            await browser.close()
+        if pw:
+            await pw.stop()
+
+asyncio.run(run_test())
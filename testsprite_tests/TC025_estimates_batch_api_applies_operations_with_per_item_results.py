@@ -0,0 +1,109 @@
+import requests
+import time
+
+
+BASE_URL = "http://localhost:3001"
+
+
+def test_estimates_batch_api_applies_operations_with_per_item_results():
+    timeout = 60
+    timestamp_suffix = str(int(time.time() * 1000))
+
+    def signed_in_session(prefix):
+        session = requests.Session()
+        session.headers.update({"Content-Type": "application/json"})
+        user = {
+            "email": f"{prefix}_{timestamp_suffix}@example.com",
+            "password": "Password123!",
+            "name": f"{prefix} user"
+        }
+        r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+        assert r.status_code == 200, f"Sign up failed: {r.text}"
+        r = session.post(
+            f"{BASE_URL}/api/auth/sign-in/email",
+            json={"email": user["email"], "password": user["password"]},
+            timeout=timeout
+        )
+        assert r.status_code == 200, f"Sign in failed: {r.text}"
+        r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+        assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+        return session
+
+    def estimate(title):
+        return {
+            "title": title,
+            "clientName": "Batch Client",
+            "items": [
+                {"description": "Tear-off", "quantity": 2, "unitPrice": 150, "type": "labor"},
+                {"description": "Shingles", "quantity": 10, "unitPrice": 30, "type": "material"}
+            ]
+        }
+
+    owner = signed_in_session("batch_owner")
+    other = signed_in_session("batch_other")
+
+    # Unauthenticated and malformed envelopes are rejected
+    r = requests.post(f"{BASE_URL}/api/estimates/batch", json={"operations": []}, timeout=timeout)
+    assert r.status_code == 401
+    r = owner.post(f"{BASE_URL}/api/estimates/batch", json={"operations": []}, timeout=timeout)
+    assert r.status_code == 400
+    r = owner.post(f"{BASE_URL}/api/estimates/batch", json={"operations": [{"op": "explode", "id": 1}]}, timeout=timeout)
+    assert r.status_code == 400
+
+    # Seed estimates: two for the owner, one for another user
+    r = owner.post(f"{BASE_URL}/api/estimates", json=estimate("Keep"), timeout=timeout)
+    keep = r.json()["estimate"]
+    r = owner.post(f"{BASE_URL}/api/estimates", json=estimate("Remove"), timeout=timeout)
+    remove = r.json()["estimate"]
+    r = other.post(f"{BASE_URL}/api/estimates", json=estimate("Not yours"), timeout=timeout)
+    foreign = r.json()["estimate"]
+
+    operations = [
+        {"op": "create", "clientId": "c1", "data": estimate("Created in batch")},
+        {"op": "create", "clientId": "c2", "data": {"title": "", "clientName": "", "items": []}},
+        {"op": "update", "id": keep["id"], "baseUpdatedAt": keep["updatedAt"], "data": {"title": "Kept and renamed"}},
+        {"op": "delete", "id": remove["id"]},
+        {"op": "delete", "id": foreign["id"]},
+        {"op": "update", "id": remove["id"], "baseUpdatedAt": remove["updatedAt"], "data": {"title": "Duplicate"}},
+    ]
+    r = owner.post(f"{BASE_URL}/api/estimates/batch", json={"operations": operations}, timeout=timeout)
+    assert r.status_code == 200, f"Batch failed: {r.text}"
+    results = r.json()["results"]
+    assert len(results) == len(operations)
+
+    assert results[0]["status"] == "created" and results[0]["clientId"] == "c1"
+    assert results[0]["estimate"]["total"] == 60000
+    assert results[1]["status"] == "invalid"
+    assert results[2]["status"] == "updated" and results[2]["estimate"]["title"] == "Kept and renamed"
+    assert results[3]["status"] == "deleted"
+    assert results[4]["status"] == "not_found", "Other users' estimates must not be touched"
+    assert results[5]["status"] == "invalid", "An estimate may only appear once per batch"
+
+    r = other.get(f"{BASE_URL}/api/estimates/{foreign['id']}", timeout=timeout)
+    assert r.status_code == 200
+
+    # Replaying the same update with a stale updatedAt is a conflict, not an overwrite
+    stale = [{"op": "update", "id": keep["id"], "baseUpdatedAt": keep["updatedAt"], "data": {"title": "Stale edit"}}]
+    r = owner.post(f"{BASE_URL}/api/estimates/batch", json={"operations": stale}, timeout=timeout)
+    result = r.json()["results"][0]
+    assert result["status"] == "conflict"
+    assert result["estimate"]["title"] == "Kept and renamed"
+
+    # PUT no longer pre-selects, but still enforces ownership
+    r = other.put(f"{BASE_URL}/api/estimates/{keep['id']}", json={"title": "Hijack"}, timeout=timeout)
+    assert r.status_code == 404
+
+    # A season's worth of estimates imports in one request
+    season = [{"op": "create", "clientId": f"s{i}", "data": estimate(f"Season job {i}")} for i in range(500)]
+    started = time.time()
+    r = owner.post(f"{BASE_URL}/api/estimates/batch", json={"operations": season}, timeout=timeout)
+    elapsed = time.time() - started
+    assert r.status_code == 200, f"Season import failed: {r.text}"
+    results = r.json()["results"]
+    assert all(res["status"] == "created" for res in results)
+    assert [res["clientId"] for res in results] == [f"s{i}" for i in range(500)]
+    assert [res["estimate"]["title"] for res in results] == [f"Season job {i}" for i in range(500)]
+    assert elapsed < 10, f"Importing 500 estimates took {elapsed:.1f}s"
+
+
+test_estimates_batch_api_applies_operations_with_per_item_results()
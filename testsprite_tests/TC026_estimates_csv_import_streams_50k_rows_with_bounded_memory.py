@@ -0,0 +1,141 @@
+import json
+import threading
+import time
+
+import psutil
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+ROW_COUNT = 50000
+ITEMS_PER_ESTIMATE = 5
+
+
+def find_server_process(port=3001):
+    for conn in psutil.net_connections(kind="inet"):
+        if conn.laddr and conn.laddr.port == port and conn.status == psutil.CONN_LISTEN and conn.pid:
+            return psutil.Process(conn.pid)
+    return None
+
+
+def test_estimates_csv_import_streams_50k_rows_with_bounded_memory():
+    timeout = 300
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"csv_import_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "CSV Import User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+
+    # Free users can't bulk import around the estimate limit
+    r = session.post(f"{BASE_URL}/api/estimates/import", data=b"title\n", timeout=timeout)
+    assert r.status_code == 403
+    assert r.json().get("requiresUpgrade") is True
+
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    r = session.post(
+        f"{BASE_URL}/api/estimates/import",
+        data=b"x",
+        headers={"Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"},
+        timeout=timeout
+    )
+    assert r.status_code == 415
+
+    # Missing required columns aborts before anything is written
+    r = session.post(f"{BASE_URL}/api/estimates/import", data=b"title,client_name\nA,B\n", timeout=timeout)
+    assert r.status_code == 200
+    events = [json.loads(line) for line in r.text.splitlines() if line]
+    assert events[-1]["type"] == "aborted"
+    assert "item_unit_price" in events[-1]["error"]
+
+    def generate_csv():
+        yield b"Estimate ID,Title,Client Name,Client Address,Item Description,Item Type,Item Quantity,Item Unit Price\r\n"
+        for row in range(ROW_COUNT):
+            estimate_id = row // ITEMS_PER_ESTIMATE
+            if row == 7:
+                # One bad row invalidates its estimate and is reported with its line number
+                yield f'{estimate_id},"Job {estimate_id}",Client {estimate_id},"1 Main St, Apt 2",Shingles,material,-1,30\r\n'.encode()
+                continue
+            yield (
+                f'{estimate_id},"Job {estimate_id}",Client {estimate_id},"1 Main St, Apt 2",'
+                f'"Bundle ""{row}""",material,2,"$1,000.50"\r\n'
+            ).encode()
+
+    process = find_server_process()
+    baseline_rss = process.memory_info().rss if process else None
+    peak_rss = baseline_rss or 0
+    sampling = True
+
+    def sample_memory():
+        nonlocal peak_rss
+        while sampling and process:
+            try:
+                peak_rss = max(peak_rss, process.memory_info().rss)
+            except psutil.Error:
+                return
+            time.sleep(0.05)
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+
+    events = []
+    try:
+        r = session.post(
+            f"{BASE_URL}/api/estimates/import",
+            data=generate_csv(),
+            headers={"Content-Type": "text/csv"},
+            stream=True,
+            timeout=timeout
+        )
+        assert r.status_code == 200, f"Import failed: {r.status_code}"
+        assert r.headers.get("Content-Type", "").startswith("application/x-ndjson")
+        for line in r.iter_lines():
+            if line:
+                events.append(json.loads(line))
+    finally:
+        sampling = False
+        sampler.join(timeout=5)
+
+    done = events[-1]
+    assert done["type"] == "done", f"Import did not finish: {done}"
+    assert done["rowsRead"] == ROW_COUNT
+    assert done["imported"] == ROW_COUNT // ITEMS_PER_ESTIMATE - 1
+    assert done["failed"] == 1
+
+    errors = [e for e in events if e["type"] == "error"]
+    assert len(errors) == 1
+    assert errors[0]["row"] == 7 // ITEMS_PER_ESTIMATE * ITEMS_PER_ESTIMATE + 2
+
+    progress = [e for e in events if e["type"] == "progress"]
+    assert len(progress) > 10, "Progress should be reported per insert batch"
+    assert all(a["imported"] < b["imported"] for a, b in zip(progress, progress[1:]))
+
+    # Imported estimates carry the parsed values
+    r = session.get(f"{BASE_URL}/api/estimates", timeout=timeout)
+    imported = r.json()["estimates"]
+    assert len(imported) == done["imported"]
+    sample = imported[0]
+    assert sample["clientAddress"] == "1 Main St, Apt 2"
+    assert len(sample["items"]) == ITEMS_PER_ESTIMATE
+    assert sample["items"][0]["unitPrice"] == 1000.5
+    assert sample["items"][0]["description"].startswith('Bundle "')
+
+    # Memory is bounded by the insert batch, not the ~4MB upload
+    if process:
+        growth_mb = (peak_rss - baseline_rss) / (1024 * 1024)
+        assert growth_mb < 64, f"Server RSS grew by {growth_mb:.1f}MB during import"
+
+
+test_estimates_csv_import_streams_50k_rows_with_bounded_memory()
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import time
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+ITEM_COUNT = 100000
+ITEMS_PER_ESTIMATE = 10
+
+
+def test_estimates_export_streams_csv_and_ndjson():
+    timeout = 300
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"csv_export_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "CSV Export User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    r = requests.get(f"{BASE_URL}/api/estimates/export", timeout=timeout)
+    assert r.status_code == 401
+    r = session.get(f"{BASE_URL}/api/estimates/export?format=xml", timeout=timeout)
+    assert r.status_code == 400
+
+    # Seed 100k line items through the CSV import
+    def generate_csv():
+        yield b"estimate_id,title,client_name,item_description,item_type,item_quantity,item_unit_price\n"
+        for row in range(ITEM_COUNT):
+            estimate_id = row // ITEMS_PER_ESTIMATE
+            yield f'{estimate_id},"Export job, {estimate_id}",Client {estimate_id},Item {row},labor,1,25\n'.encode()
+
+    r = session.post(f"{BASE_URL}/api/estimates/import", data=generate_csv(), timeout=timeout)
+    assert r.status_code == 200
+    done = json.loads(r.text.strip().splitlines()[-1])
+    assert done["type"] == "done" and done["imported"] == ITEM_COUNT // ITEMS_PER_ESTIMATE, done
+
+    # CSV: bytes arrive long before the whole export has been read
+    started = time.time()
+    r = session.get(f"{BASE_URL}/api/estimates/export?format=csv", stream=True, timeout=timeout)
+    assert r.status_code == 200
+    assert r.headers["Content-Type"].startswith("text/csv")
+    assert "attachment" in r.headers.get("Content-Disposition", "")
+    assert "Content-Length" not in r.headers, "Export should be streamed, not buffered"
+
+    chunks = r.iter_content(chunk_size=None)
+    first_chunk = next(chunks)
+    first_byte_at = time.time() - started
+    body = io.BytesIO()
+    body.write(first_chunk)
+    for chunk in chunks:
+        body.write(chunk)
+    finished_at = time.time() - started
+    assert first_byte_at < finished_at / 2, (
+        f"First bytes after {first_byte_at:.2f}s of {finished_at:.2f}s - export is not streaming"
+    )
+
+    rows = list(csv.DictReader(io.StringIO(body.getvalue().decode("utf-8"))))
+    assert len(rows) == ITEM_COUNT
+    assert rows[0]["title"] == "Export job, 0"
+    assert rows[0]["total"] == "250.00"
+    assert rows[0]["item_unit_price"] == "25"
+    assert len({row["estimate_id"] for row in rows}) == ITEM_COUNT // ITEMS_PER_ESTIMATE
+
+    # NDJSON: one estimate per line, same data
+    r = session.get(f"{BASE_URL}/api/estimates/export?format=ndjson", stream=True, timeout=timeout)
+    assert r.status_code == 200
+    assert r.headers["Content-Type"].startswith("application/x-ndjson")
+    estimates = [json.loads(line) for line in r.iter_lines() if line]
+    assert len(estimates) == ITEM_COUNT // ITEMS_PER_ESTIMATE
+    assert sum(len(e["items"]) for e in estimates) == ITEM_COUNT
+    ids = [e["id"] for e in estimates]
+    assert ids == sorted(ids)
+
+
+test_estimates_export_streams_csv_and_ndjson()
@@ -0,0 +1,97 @@
+import time
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+
+
+def test_estimates_search_ranks_prefix_and_fuzzy_matches():
+    timeout = 30
+    timestamp_suffix = str(int(time.time() * 1000))
+
+    def signed_in_session(prefix):
+        session = requests.Session()
+        session.headers.update({"Content-Type": "application/json"})
+        user = {
+            "email": f"{prefix}_{timestamp_suffix}@example.com",
+            "password": "Password123!",
+            "name": f"{prefix} user"
+        }
+        r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+        assert r.status_code == 200, f"Sign up failed: {r.text}"
+        r = session.post(
+            f"{BASE_URL}/api/auth/sign-in/email",
+            json={"email": user["email"], "password": user["password"]},
+            timeout=timeout
+        )
+        assert r.status_code == 200, f"Sign in failed: {r.text}"
+        r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+        assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+        return session
+
+    def estimate(title, client, address, description):
+        return {
+            "title": title,
+            "clientName": client,
+            "clientAddress": address,
+            "items": [{"description": description, "quantity": 1, "unitPrice": 100, "type": "labor"}]
+        }
+
+    owner = signed_in_session("search_owner")
+    other = signed_in_session("search_other")
+
+    seed = [
+        estimate("Roof replacement", "Margaret Thompson", "12 Birch Lane", "Tear-off"),
+        estimate("Gutter repair", "Bob Smith", "44 Thompson Road", "Seamless gutters"),
+        estimate("Inspection", "Alice Jones", "9 Oak Court", "Skylight flashing"),
+    ]
+    operations = [{"op": "create", "clientId": str(i), "data": data} for i, data in enumerate(seed)]
+    r = owner.post(f"{BASE_URL}/api/estimates/batch", json={"operations": operations}, timeout=timeout)
+    assert r.status_code == 200, f"Seeding failed: {r.text}"
+    r = other.post(
+        f"{BASE_URL}/api/estimates",
+        json=estimate("Other roof", "Margaret Thompson", "1 Elm St", "Tear-off"),
+        timeout=timeout
+    )
+    assert r.status_code == 201
+
+    def search(session, query):
+        r = session.get(f"{BASE_URL}/api/estimates/search", params={"q": query}, timeout=timeout)
+        assert r.status_code == 200, f"Search failed: {r.text}"
+        return [e["title"] for e in r.json()["estimates"]]
+
+    r = owner.get(f"{BASE_URL}/api/estimates/search", timeout=timeout)
+    assert r.status_code == 400
+    r = requests.get(f"{BASE_URL}/api/estimates/search", params={"q": "roof"}, timeout=timeout)
+    assert r.status_code == 401
+
+    # Prefix-as-you-type
+    assert search(owner, "Thom")[0] == "Roof replacement", "Client name matches outrank address matches"
+    assert set(search(owner, "Thom")) == {"Roof replacement", "Gutter repair"}
+    assert search(owner, "marg thom") == ["Roof replacement"]
+
+    # Line item descriptions are searchable
+    assert search(owner, "skyl") == ["Inspection"]
+
+    # Small typos still match
+    assert "Roof replacement" in search(owner, "Margret")
+
+    # Results never leak across users
+    assert "Other roof" not in search(owner, "Margaret")
+
+    # Out-of-range limits are clamped rather than passed to the query
+    for limit, expected in (("-1", 1), ("1.5", 1), ("1000", 2)):
+        r = owner.get(f"{BASE_URL}/api/estimates/search", params={"q": "Thom", "limit": limit}, timeout=timeout)
+        assert r.status_code == 200, f"limit={limit}: {r.text}"
+        assert len(r.json()["estimates"]) == expected, f"limit={limit}: {r.json()}"
+
+    # Deleted estimates drop out of results
+    r = owner.get(f"{BASE_URL}/api/estimates/search", params={"q": "gutter"}, timeout=timeout)
+    gutter = r.json()["estimates"][0]
+    r = owner.delete(f"{BASE_URL}/api/estimates/{gutter['id']}", timeout=timeout)
+    assert r.status_code == 200
+    assert search(owner, "gutter") == []
+
+
+test_estimates_search_ranks_prefix_and_fuzzy_matches()
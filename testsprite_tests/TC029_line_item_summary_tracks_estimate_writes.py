@@ -0,0 +1,128 @@
+import time
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+
+
+def test_line_item_summary_tracks_estimate_writes():
+    timeout = 30
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"line_items_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Line Items User"
+    }
+
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    def summary(**params):
+        r = session.get(f"{BASE_URL}/api/estimates/line-items/summary", params=params, timeout=timeout)
+        assert r.status_code == 200, f"Summary failed: {r.text}"
+        return r.json()["summary"]
+
+    def brute_force():
+        estimates = session.get(f"{BASE_URL}/api/estimates", timeout=timeout).json()["estimates"]
+        by_type = {t: {"quantity": 0, "totalCents": 0, "itemCount": 0} for t in ("labor", "material", "equipment")}
+        for estimate in estimates:
+            for item in estimate["items"]:
+                by_type[item["type"]]["quantity"] += item["quantity"]
+                by_type[item["type"]]["totalCents"] += round(item["quantity"] * round(item["unitPrice"] * 100))
+                by_type[item["type"]]["itemCount"] += 1
+        return len(estimates), by_type
+
+    def assert_matches_brute_force():
+        count, expected = brute_force()
+        actual = summary()
+        assert actual["estimateCount"] == count
+        for item_type, values in expected.items():
+            assert actual["byType"][item_type]["itemCount"] == values["itemCount"], item_type
+            assert abs(actual["byType"][item_type]["quantity"] - values["quantity"]) < 1e-6, item_type
+            assert actual["byType"][item_type]["totalCents"] == values["totalCents"], item_type
+        return actual
+
+    empty = summary()
+    assert empty["estimateCount"] == 0 and empty["totalCents"] == 0
+
+    r = session.post(f"{BASE_URL}/api/estimates", json={
+        "title": "Full replacement",
+        "clientName": "A",
+        "items": [
+            {"description": "Crew", "quantity": 16, "unitPrice": 65, "type": "labor"},
+            {"description": "Shingles", "quantity": 30, "unitPrice": 32.99, "type": "material"},
+            {"description": "Dumpster", "quantity": 1, "unitPrice": 450, "type": "equipment"}
+        ]
+    }, timeout=timeout)
+    assert r.status_code == 201
+    first = r.json()["estimate"]
+
+    r = session.post(f"{BASE_URL}/api/estimates", json={
+        "title": "Repair",
+        "clientName": "B",
+        "items": [{"description": "Crew", "quantity": 4, "unitPrice": 65, "type": "labor"}]
+    }, timeout=timeout)
+    second = r.json()["estimate"]
+
+    result = assert_matches_brute_force()
+    assert result["byType"]["material"]["totalCents"] == 98970
+    assert result["averageLaborHoursPerEstimate"] == 10
+
+    # Updates replace the estimate's line items
+    r = session.put(f"{BASE_URL}/api/estimates/{first['id']}", json={
+        "items": [{"description": "Crew", "quantity": 8, "unitPrice": 70, "type": "labor"}]
+    }, timeout=timeout)
+    assert r.status_code == 200
+    result = assert_matches_brute_force()
+    assert result["byType"]["material"]["itemCount"] == 0
+
+    # Deletes drop them
+    r = session.delete(f"{BASE_URL}/api/estimates/{second['id']}", timeout=timeout)
+    assert r.status_code == 200
+    result = assert_matches_brute_force()
+    assert result["estimateCount"] == 1
+
+    # Batch and import paths are covered too
+    r = session.post(f"{BASE_URL}/api/estimates/batch", json={"operations": [
+        {"op": "create", "clientId": "x", "data": {
+            "title": "Batch", "clientName": "C",
+            "items": [{"description": "Nails", "quantity": 2, "unitPrice": 12.5, "type": "material"}]
+        }}
+    ]}, timeout=timeout)
+    assert r.status_code == 200
+    r = session.post(
+        f"{BASE_URL}/api/estimates/import",
+        data=b"title,client_name,item_description,item_type,item_quantity,item_unit_price\nImported,D,Lift,equipment,1,200\n",
+        headers={"Content-Type": "text/csv"},
+        timeout=timeout
+    )
+    assert r.status_code == 200
+    assert_matches_brute_force()
+
+    # Items too large for the line item columns are rejected up front, not by the trigger
+    for item in (
+        {"description": "Huge", "quantity": 1e12, "unitPrice": 1, "type": "material"},
+        {"description": "Huge", "quantity": 1, "unitPrice": 1e8, "type": "material"},
+    ):
+        r = session.post(f"{BASE_URL}/api/estimates", json={"title": "Too big", "clientName": "E", "items": [item]}, timeout=timeout)
+        assert r.status_code == 400, f"{item}: {r.status_code} {r.text}"
+    assert_matches_brute_force()
+
+    # Date ranges filter by estimate creation date
+    assert summary(to="2000-01-01T00:00:00Z")["estimateCount"] == 0
+    r = session.get(f"{BASE_URL}/api/estimates/line-items/summary", params={"from": "not-a-date"}, timeout=timeout)
+    assert r.status_code == 400
+
+
+test_line_item_summary_tracks_estimate_writes()
@@ -0,0 +1,129 @@
+import random
+import time
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+
+
+def round_half_up(value):
+    # Postgres rounds numerics half away from zero; Python's round() is banker's rounding
+    return int(Decimal(str(value)).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def test_analytics_rollups_match_brute_force():
+    timeout = 60
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"analytics_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Analytics User"
+    }
+
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    r = requests.get(f"{BASE_URL}/api/analytics", timeout=timeout)
+    assert r.status_code == 401
+    r = session.get(f"{BASE_URL}/api/analytics", params={"months": 0}, timeout=timeout)
+    assert r.status_code == 400
+
+    def analytics():
+        r = session.get(f"{BASE_URL}/api/analytics", timeout=timeout)
+        assert r.status_code == 200, f"Analytics failed: {r.text}"
+        return r.json()["analytics"]
+
+    def brute_force():
+        estimates = session.get(f"{BASE_URL}/api/estimates", timeout=timeout).json()["estimates"]
+        months = defaultdict(lambda: {"estimateCount": 0, "totalCents": 0, "laborCents": 0, "materialCents": 0, "equipmentCents": 0})
+        for estimate in estimates:
+            month = months[estimate["createdAt"][:7]]
+            month["estimateCount"] += 1
+            month["totalCents"] += estimate["total"]
+            for item in estimate["items"]:
+                month[f"{item['type']}Cents"] += round_half_up(Decimal(str(item["quantity"])) * round_half_up(Decimal(str(item["unitPrice"])) * 100))
+        return months
+
+    def assert_matches_brute_force():
+        expected = brute_force()
+        actual = analytics()
+        assert len(actual["months"]) == 12
+        for month in actual["months"]:
+            want = expected.get(month["month"], {"estimateCount": 0, "totalCents": 0, "laborCents": 0, "materialCents": 0, "equipmentCents": 0})
+            assert month["estimateCount"] == want["estimateCount"], month
+            assert month["totalCents"] == want["totalCents"], month
+            assert month["mix"] == {k: want[k] for k in ("laborCents", "materialCents", "equipmentCents")}, month
+            if want["estimateCount"]:
+                assert month["averageTicketCents"] == round_half_up(Decimal(want["totalCents"]) / want["estimateCount"])
+        assert actual["totals"]["estimateCount"] == sum(m["estimateCount"] for m in expected.values())
+        return actual
+
+    empty = assert_matches_brute_force()
+    assert empty["totals"]["estimateCount"] == 0
+
+    rng = random.Random(42)
+
+    def random_items():
+        return [
+            {
+                "description": f"Item {i}",
+                "quantity": rng.choice([1, 2, 3.5, 10]),
+                "unitPrice": rng.choice([12.5, 45, 99.99, 250]),
+                "type": rng.choice(["labor", "material", "equipment"])
+            }
+            for i in range(rng.randint(1, 4))
+        ]
+
+    # Creates through every write path
+    created = []
+    for i in range(15):
+        r = session.post(f"{BASE_URL}/api/estimates", json={
+            "title": f"Job {i}", "clientName": "Client", "items": random_items(),
+            "discountPercent": rng.choice([0, 0, 10])
+        }, timeout=timeout)
+        assert r.status_code == 201
+        created.append(r.json()["estimate"])
+
+    operations = [
+        {"op": "create", "clientId": f"b{i}", "data": {"title": f"Batch {i}", "clientName": "Client", "items": random_items()}}
+        for i in range(10)
+    ]
+    r = session.post(f"{BASE_URL}/api/estimates/batch", json={"operations": operations}, timeout=timeout)
+    assert r.status_code == 200
+    assert_matches_brute_force()
+
+    # Updates move value between types; title-only updates don't change anything
+    for estimate in created[:5]:
+        r = session.put(f"{BASE_URL}/api/estimates/{estimate['id']}", json={"items": random_items()}, timeout=timeout)
+        assert r.status_code == 200
+    r = session.put(f"{BASE_URL}/api/estimates/{created[5]['id']}", json={"title": "Renamed"}, timeout=timeout)
+    assert r.status_code == 200
+    assert_matches_brute_force()
+
+    # Deletes subtract
+    for estimate in created[5:9]:
+        r = session.delete(f"{BASE_URL}/api/estimates/{estimate['id']}", timeout=timeout)
+        assert r.status_code == 200
+    incremental = assert_matches_brute_force()
+    assert incremental["totals"]["estimateCount"] == 21
+
+    # A full rebuild produces exactly what the incremental updates did
+    r = session.post(f"{BASE_URL}/api/analytics/rebuild", timeout=timeout)
+    assert r.status_code == 200, f"Rebuild failed: {r.text}"
+    assert r.json()["analytics"] == incremental
+
+
+test_analytics_rollups_match_brute_force()
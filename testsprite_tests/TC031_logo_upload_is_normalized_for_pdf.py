@@ -0,0 +1,111 @@
+import io
+import random
+import time
+
+import requests
+from PIL import Image
+
+
+BASE_URL = "http://localhost:3001"
+
+
+def make_image(fmt, size, mode="RGB", exif_orientation=None):
+    # Random colour so stored blobs (named by content hash) aren't shared with earlier runs
+    color = tuple(random.randrange(256) for _ in range(3))
+    image = Image.new(mode, size, color + (128,) if mode == "RGBA" else color)
+    buffer = io.BytesIO()
+    kwargs = {}
+    if exif_orientation is not None:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        exif[0x010F] = "Test Camera"
+        kwargs["exif"] = exif.tobytes()
+    image.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def stored_file(url):
+    assert url.startswith("/uploads/"), url
+    r = requests.get(f"{BASE_URL}{url}", timeout=30)
+    assert r.status_code == 200, f"Missing upload {url}"
+    return io.BytesIO(r.content)
+
+
+def is_stored(url):
+    return requests.get(f"{BASE_URL}{url}", timeout=30).status_code == 200
+
+
+def test_logo_upload_is_normalized_for_pdf():
+    timeout = 60
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"logo_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Logo User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    def upload(name, content, content_type):
+        r = session.put(f"{BASE_URL}/api/settings", files={"companyLogo": (name, content, content_type)}, timeout=timeout)
+        assert r.status_code == 200, f"Logo upload failed: {r.text}"
+        return r.json()["settings"]
+
+    # Large opaque JPEG with EXIF rotation: stored as a small JPEG with no metadata, rotated upright
+    settings = upload("photo.jpg", make_image("JPEG", (1200, 3000), exif_orientation=6), "image/jpeg")
+    with Image.open(stored_file(settings["companyLogo"])) as logo:
+        assert logo.format == "JPEG"
+        assert logo.width <= 240 and logo.height <= 100, logo.size
+        # Orientation 6 rotates portrait 1200x3000 into landscape
+        assert logo.width > logo.height, logo.size
+        assert not logo.getexif(), "EXIF metadata should be stripped"
+    old_logo = settings["companyLogo"]
+    old_thumbnail = settings["companyLogoThumbnail"]
+    with Image.open(stored_file(old_thumbnail)) as thumbnail:
+        assert thumbnail.format == "WEBP"
+        assert max(thumbnail.size) <= 160
+
+    # Transparent WebP: pdf-lib can't embed WebP, so it's stored as PNG and keeps its alpha
+    settings = upload("logo.webp", make_image("WEBP", (800, 800), mode="RGBA"), "image/webp")
+    with Image.open(stored_file(settings["companyLogo"])) as logo:
+        assert logo.format == "PNG"
+        assert logo.width <= 240 and logo.height <= 100, logo.size
+    stored_file(settings["companyLogoThumbnail"])
+
+    # Replacing the logo removes both old variants
+    assert not is_stored(old_logo)
+    assert not is_stored(old_thumbnail)
+
+    # Bytes that aren't an image are rejected even with an image content type
+    r = session.put(f"{BASE_URL}/api/settings", files={"companyLogo": ("fake.png", b"not an image", "image/png")}, timeout=timeout)
+    assert r.status_code == 400, r.text
+
+    # PDF generation embeds the normalized logo
+    r = session.post(f"{BASE_URL}/api/estimates", json={
+        "title": "Logo job", "clientName": "Client",
+        "items": [{"description": "Labor", "quantity": 1, "unitPrice": 100, "type": "labor"}]
+    }, timeout=timeout)
+    assert r.status_code == 201
+    r = session.post(f"{BASE_URL}/api/pdf/generate", json={"estimateId": r.json()["estimate"]["id"]}, timeout=timeout)
+    assert r.status_code == 200, f"PDF generation failed: {r.text}"
+    assert r.content.startswith(b"%PDF")
+    assert b"/Subtype /Image" in r.content or b"/Subtype/Image" in r.content
+
+    # Removing the logo clears both variants
+    r = session.put(f"{BASE_URL}/api/settings", json={"companyLogo": None}, timeout=timeout)
+    assert r.status_code == 200
+    assert r.json()["settings"]["companyLogo"] is None
+    assert r.json()["settings"]["companyLogoThumbnail"] is None
+
+
+test_logo_upload_is_normalized_for_pdf()
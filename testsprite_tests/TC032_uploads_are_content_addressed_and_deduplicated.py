@@ -0,0 +1,102 @@
+import io
+import os
+import random
+import re
+import time
+
+import requests
+from PIL import Image
+
+
+BASE_URL = "http://localhost:3001"
+
+
+def sign_up_with_subscription(label, timeout):
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"{label}_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Storage User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+    return session
+
+
+def test_uploads_are_content_addressed_and_deduplicated():
+    timeout = 60
+    alice = sign_up_with_subscription("storage_a", timeout)
+    bob = sign_up_with_subscription("storage_b", timeout)
+
+    # Unique per run so blobs aren't already referenced by earlier test users
+    color = tuple(random.randrange(256) for _ in range(3))
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 300), color).save(buffer, format="PNG")
+    logo_bytes = buffer.getvalue()
+    template_bytes = b"%PDF-1.4\n% storage test " + os.urandom(16).hex().encode() + b"\n%%EOF\n"
+
+    def upload(session, files):
+        r = session.put(f"{BASE_URL}/api/settings", files=files, timeout=timeout)
+        assert r.status_code == 200, f"Upload failed: {r.text}"
+        return r.json()["settings"]
+
+    # Identical uploads from two accounts resolve to the same content-hash URLs
+    a = upload(alice, {"companyLogo": ("a.png", logo_bytes, "image/png"), "pdfTemplate": ("a.pdf", template_bytes, "application/pdf")})
+    b = upload(bob, {"companyLogo": ("different-name.png", logo_bytes, "image/png"), "pdfTemplate": ("b.pdf", template_bytes, "application/pdf")})
+    for field in ("companyLogo", "companyLogoThumbnail", "pdfTemplate"):
+        assert a[field] == b[field], f"{field} not deduplicated: {a[field]} vs {b[field]}"
+        assert re.fullmatch(r"/uploads/[0-9a-f]{64}\.(png|jpg|webp|pdf)", a[field]), a[field]
+
+    # Served with immutable caching and the right content type; the template bytes round-trip exactly
+    r = requests.get(f"{BASE_URL}{a['pdfTemplate']}", timeout=timeout)
+    assert r.status_code == 200
+    assert r.content == template_bytes
+    assert r.headers["Content-Type"].startswith("application/pdf")
+    assert "immutable" in r.headers["Cache-Control"]
+    r = requests.get(f"{BASE_URL}{a['companyLogoThumbnail']}", timeout=timeout)
+    assert r.status_code == 200 and r.headers["Content-Type"].startswith("image/webp")
+
+    # Only stored keys are served
+    assert requests.get(f"{BASE_URL}/uploads/{'0' * 64}.png", timeout=timeout).status_code == 404
+    assert requests.get(f"{BASE_URL}/uploads/..%2F..%2Fpackage.json", timeout=timeout).status_code == 404
+    assert requests.get(f"{BASE_URL}/uploads/{a['pdfTemplate'][9:-4]}.txt", timeout=timeout).status_code == 404
+
+    # Removing Alice's logo keeps the shared blob because Bob still uses it
+    r = alice.put(f"{BASE_URL}/api/settings", json={"companyLogo": None}, timeout=timeout)
+    assert r.status_code == 200
+    assert requests.get(f"{BASE_URL}{b['companyLogo']}", timeout=timeout).status_code == 200
+
+    # Once the last reference is gone the blob is deleted by the release sweep
+    # (run the server with UPLOAD_RELEASE_GRACE_SECONDS=0 so it doesn't wait)
+    r = bob.put(f"{BASE_URL}/api/settings", json={"companyLogo": None}, timeout=timeout)
+    assert r.status_code == 200
+    assert requests.get(f"{BASE_URL}{b['companyLogo']}", timeout=timeout).status_code == 404
+    assert requests.get(f"{BASE_URL}{b['companyLogoThumbnail']}", timeout=timeout).status_code == 404
+
+    # Re-uploading the same bytes as the current file keeps it (no self-deletion)
+    again = upload(alice, {"pdfTemplate": ("again.pdf", template_bytes, "application/pdf")})
+    assert again["pdfTemplate"] == a["pdfTemplate"]
+    assert requests.get(f"{BASE_URL}{again['pdfTemplate']}", timeout=timeout).status_code == 200
+
+    # Oversized uploads are rejected and nothing is stored
+    r = alice.put(
+        f"{BASE_URL}/api/settings",
+        files={"pdfTemplate": ("big.pdf", b"%PDF-1.4\n" + b"0" * (6 * 1024 * 1024), "application/pdf")},
+        timeout=timeout
+    )
+    assert r.status_code in (400, 413), r.text
+    r = alice.get(f"{BASE_URL}/api/settings", timeout=timeout)
+    assert r.json()["settings"]["pdfTemplate"] == a["pdfTemplate"]
+
+
+test_uploads_are_content_addressed_and_deduplicated()
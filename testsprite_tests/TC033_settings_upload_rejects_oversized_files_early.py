@@ -0,0 +1,214 @@
+import hashlib
+import os
+import threading
+import time
+
+import psutil
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+BOUNDARY = "----settingsUploadBoundary7MA4YWxkTrZu0gW"
+CHUNK = b"0" * (1024 * 1024)
+
+
+def find_server_process(port=3001):
+    for conn in psutil.net_connections(kind="inet"):
+        if conn.laddr and conn.laddr.port == port and conn.status == psutil.CONN_LISTEN and conn.pid:
+            return psutil.Process(conn.pid)
+    return None
+
+
+class MemorySampler:
+    def __init__(self, process):
+        self.process = process
+        self.baseline = process.memory_info().rss if process else 0
+        self.peak = self.baseline
+        self.running = True
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while self.running and self.process:
+            try:
+                self.peak = max(self.peak, self.process.memory_info().rss)
+            except psutil.Error:
+                return
+            time.sleep(0.02)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.running = False
+        self.thread.join(timeout=5)
+
+    def growth_mb(self):
+        return (self.peak - self.baseline) / (1024 * 1024)
+
+
+def multipart_stream(field, filename, content_type, head, total_bytes, sent):
+    """Chunked multipart body with a single file part of total_bytes, counting what was consumed"""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + head
+    remaining = total_bytes - len(head)
+    while remaining > 0:
+        chunk = CHUNK[:remaining]
+        remaining -= len(chunk)
+        sent[0] += len(chunk)
+        yield chunk
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def put_settings(session, data, headers, timeout):
+    """PUT that treats the server closing the connection mid-upload as a rejection"""
+    try:
+        r = session.put(f"{BASE_URL}/api/settings", data=data, headers=headers, timeout=timeout)
+        return r.status_code, r.text
+    except requests.exceptions.ConnectionError as error:
+        return None, str(error)
+
+
+def test_settings_upload_rejects_oversized_files_early():
+    timeout = 60
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"upload_limits_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Upload Limits User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    process = find_server_process()
+    multipart_headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+
+    # A declared Content-Length over the body limit is refused from the headers alone
+    with MemorySampler(process) as sampler:
+        started = time.time()
+        status, text = put_settings(
+            session,
+            b"0" * (40 * 1024 * 1024),
+            {**multipart_headers, "Content-Length": str(40 * 1024 * 1024)},
+            timeout
+        )
+        elapsed = time.time() - started
+    assert status in (413, None), f"Expected 413 for oversized body, got {status}: {text}"
+    assert elapsed < 15, f"Oversized body took {elapsed:.1f}s to reject"
+    if process:
+        assert sampler.growth_mb() < 32, f"Server RSS grew by {sampler.growth_mb():.1f}MB for a refused body"
+
+    # A chunked 200MB PDF template (no Content-Length) is cut off just past the 5MB limit
+    sent = [0]
+    with MemorySampler(process) as sampler:
+        status, text = put_settings(
+            session,
+            multipart_stream("pdfTemplate", "huge.pdf", "application/pdf", b"%PDF-1.4\n", 200 * 1024 * 1024, sent),
+            multipart_headers,
+            timeout
+        )
+    assert status in (400, 413, None), f"Expected rejection for oversized template, got {status}: {text}"
+    if status is not None:
+        assert "exceeds maximum allowed size" in text
+    assert sent[0] < 48 * 1024 * 1024, f"Server kept reading: {sent[0] / 1024 / 1024:.0f}MB consumed before abort"
+    if process:
+        assert sampler.growth_mb() < 32, f"Server RSS grew by {sampler.growth_mb():.1f}MB for an oversized stream"
+
+    # Oversized logos are cut off at 2MB
+    sent = [0]
+    status, text = put_settings(
+        session,
+        multipart_stream("companyLogo", "huge.png", "image/png", b"\x89PNG\r\n\x1a\n", 100 * 1024 * 1024, sent),
+        multipart_headers,
+        timeout
+    )
+    assert status in (400, 413, None), f"Expected rejection for oversized logo, got {status}: {text}"
+    assert sent[0] < 48 * 1024 * 1024
+
+    # Content that doesn't match the declared type is rejected on the first bytes
+    r = session.put(
+        f"{BASE_URL}/api/settings",
+        files={"companyLogo": ("logo.png", b"%PDF-1.4\n" + b"0" * 1024, "image/png")},
+        timeout=timeout
+    )
+    assert r.status_code == 400, r.text
+    assert "does not match" in r.json()["details"]
+
+    # Disallowed types never reach storage
+    r = session.put(
+        f"{BASE_URL}/api/settings",
+        files={"pdfTemplate": ("template.txt", b"hello", "text/plain")},
+        timeout=timeout
+    )
+    assert r.status_code == 400, r.text
+
+    # Files stored before a later part is rejected are released again
+    # (run the server with UPLOAD_RELEASE_GRACE_SECONDS=0 so the sweep deletes them at once)
+    def stored(template_bytes, attempts=20):
+        url = f"{BASE_URL}/uploads/{hashlib.sha256(template_bytes).hexdigest()}.pdf"
+        for _ in range(attempts):
+            if requests.get(url, timeout=timeout).status_code == 404:
+                return False
+            time.sleep(0.25)
+        return True
+
+    orphan = b"%PDF-1.4\n% orphan " + os.urandom(16).hex().encode() + b"\n%%EOF\n"
+    r = session.put(
+        f"{BASE_URL}/api/settings",
+        files=[
+            ("pdfTemplate", ("template.pdf", orphan, "application/pdf")),
+            ("companyLogo", ("logo.png", b"%PDF-1.4\n" + b"0" * 1024, "image/png")),
+        ],
+        timeout=timeout
+    )
+    assert r.status_code == 400, r.text
+    assert not stored(orphan), "Template stored before the rejected logo was not released"
+
+    # A file field sent twice is rejected, not silently overwritten
+    first = b"%PDF-1.4\n% first " + os.urandom(16).hex().encode() + b"\n%%EOF\n"
+    second = b"%PDF-1.4\n% second " + os.urandom(16).hex().encode() + b"\n%%EOF\n"
+    r = session.put(
+        f"{BASE_URL}/api/settings",
+        files=[
+            ("pdfTemplate", ("first.pdf", first, "application/pdf")),
+            ("pdfTemplate", ("second.pdf", second, "application/pdf")),
+        ],
+        timeout=timeout
+    )
+    assert r.status_code == 400, r.text
+    assert "pdfTemplate" in r.json()["details"]
+    assert not stored(first) and not stored(second)
+
+    # Nothing was stored by the rejected requests, and normal uploads still work afterwards
+    r = session.get(f"{BASE_URL}/api/settings", timeout=timeout)
+    assert r.status_code == 200
+    assert r.json()["settings"]["pdfTemplate"] is None
+    assert r.json()["settings"]["companyLogo"] is None
+
+    template = b"%PDF-1.4\n% small template\n%%EOF\n"
+    r = session.put(
+        f"{BASE_URL}/api/settings",
+        files={"pdfTemplate": ("template.pdf", template, "application/pdf")},
+        data={"companyName": "Streaming Roofing"},
+        timeout=timeout
+    )
+    assert r.status_code == 200, r.text
+    settings = r.json()["settings"]
+    assert settings["companyName"] == "Streaming Roofing"
+    assert requests.get(f"{BASE_URL}{settings['pdfTemplate']}", timeout=timeout).content == template
+
+
+test_settings_upload_rejects_oversized_files_early()
@@ -0,0 +1,110 @@
+import io
+import time
+import uuid
+
+import requests
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+
+BASE_URL = "http://localhost:3001"
+
+
+def build_template(marker):
+    """One-page letter-size PDF template with a text marker in its content stream"""
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=612, height=792)
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    page[NameObject("/Resources")] = DictionaryObject({
+        NameObject("/Font"): DictionaryObject({NameObject("/F1"): writer._add_object(font)})
+    })
+    content = DecodedStreamObject()
+    content.set_data(f"BT /F1 12 Tf 72 40 Td ({marker}) Tj ET".encode())
+    page[NameObject("/Contents")] = writer._add_object(content)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_pdf_generation_renders_onto_uploaded_template():
+    timeout = 60
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"pdf_template_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Template User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    items = [
+        {"description": f"Shingle bundle {i}", "quantity": 2, "unitPrice": 45.5, "type": "material"}
+        for i in range(30)
+    ]
+    r = session.post(f"{BASE_URL}/api/estimates", json={
+        "title": "Template Roof Job", "clientName": "Casey Template", "clientPhone": "555-0100", "items": items
+    }, timeout=timeout)
+    assert r.status_code == 201
+    estimate_id = r.json()["estimate"]["id"]
+
+    def generate():
+        r = session.post(f"{BASE_URL}/api/pdf/generate", json={"estimateId": estimate_id}, timeout=timeout)
+        assert r.status_code == 200, f"PDF generation failed: {r.text}"
+        return PdfReader(io.BytesIO(r.content))
+
+    # Without a template the default layout is used
+    default_pdf = generate()
+    assert "ESTIMATE" in default_pdf.pages[0].extract_text()
+
+    marker = f"TEMPLATE-{uuid.uuid4().hex[:8]}"
+    r = session.put(
+        f"{BASE_URL}/api/settings",
+        files={"pdfTemplate": ("template.pdf", build_template(marker), "application/pdf")},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Template upload failed: {r.text}"
+
+    # Estimate data is drawn over the template; 30 rows overflow onto a second copy of the page
+    template_pdf = generate()
+    assert len(template_pdf.pages) == 2, f"Expected 2 pages, got {len(template_pdf.pages)}"
+    first_page = template_pdf.pages[0].extract_text()
+    last_page = template_pdf.pages[-1].extract_text()
+    assert marker in first_page and marker in last_page
+    assert "Template Roof Job" in first_page
+    assert "Casey Template" in first_page
+    assert "Shingle bundle 0" in first_page
+    assert "Shingle bundle 29" in last_page
+    assert "Total: $2,730.00" in last_page
+    assert "ESTIMATE" not in first_page
+
+    # Repeated exports (served from the parsed-template cache) produce the same content
+    again = generate()
+    assert [p.extract_text() for p in again.pages] == [p.extract_text() for p in template_pdf.pages]
+
+    # A new template version is picked up immediately
+    new_marker = f"TEMPLATE-{uuid.uuid4().hex[:8]}"
+    r = session.put(
+        f"{BASE_URL}/api/settings",
+        files={"pdfTemplate": ("template.pdf", build_template(new_marker), "application/pdf")},
+        timeout=timeout
+    )
+    assert r.status_code == 200
+    updated = generate().pages[0].extract_text()
+    assert new_marker in updated and marker not in updated
+
+
+test_pdf_generation_renders_onto_uploaded_template()
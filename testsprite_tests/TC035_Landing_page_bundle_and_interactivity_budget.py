@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import time
+from playwright import async_api
+from playwright.async_api import expect
+
+# Production build served by `npm run build && npm run preview` (the dev server doesn't bundle)
+PREVIEW_URL = os.environ.get("PREVIEW_URL", "http://localhost:4173")
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bundle-budget.json")
+
+# Records long tasks from the start of navigation, for the time-to-interactive estimate
+LONG_TASK_OBSERVER = """
+window.__longTasks = [];
+new PerformanceObserver((list) => {
+  for (const entry of list.getEntries()) {
+    window.__longTasks.push({ start: entry.startTime, end: entry.startTime + entry.duration });
+  }
+}).observe({ type: "longtask", buffered: true });
+"""
+
+# TTI approximation: end of the last long task before a 500ms quiet window, or DOMContentLoaded if later
+TIME_TO_INTERACTIVE = """
+() => {
+  const nav = performance.getEntriesByType("navigation")[0];
+  let tti = nav.domContentLoadedEventEnd;
+  for (const task of window.__longTasks) {
+    if (task.start - tti < 500) tti = Math.max(tti, task.end);
+  }
+  return tti;
+}
+"""
+
+SCRIPT_BYTES = """
+() => performance.getEntriesByType("resource")
+  .filter((entry) => entry.initiatorType === "script" || entry.name.endsWith(".js"))
+  .map((entry) => ({ name: entry.name, bytes: entry.decodedBodySize, transferred: entry.transferSize }))
+"""
+
+
+async def run_test():
+    pw = None
+    browser = None
+    context = None
+
+    with open(BUDGET_PATH) as f:
+        budget = json.load(f)
+
+    try:
+        # Start a Playwright session in asynchronous mode
+        pw = await async_api.async_playwright().start()
+
+        # Launch a Chromium browser in headless mode with custom arguments
+        browser = await pw.chromium.launch(
+            headless=True,
+            args=[
+                "--window-size=1280,720",         # Set the browser window size
+                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                "--ipc=host",                     # Use host-level IPC for better stability
+            ],
+        )
+
+        # Fresh context so nothing is served from cache
+        context = await browser.new_context()
+        context.set_default_timeout(10000)
+        await context.add_init_script(LONG_TASK_OBSERVER)
+
+        page = await context.new_page()
+        started = time.time()
+        await page.goto(PREVIEW_URL, wait_until="load", timeout=30000)
+
+        # Let the page settle so a trailing long task is observed
+        await page.wait_for_timeout(1500)
+
+        # -> Landing page JS stays within budget and lazy-only chunks aren't fetched
+        scripts = await page.evaluate(SCRIPT_BYTES)
+        total_kb = sum(s["bytes"] for s in scripts) / 1024
+        print(f"Landing page JS: {total_kb:.1f} KB across {len(scripts)} files")
+        assert total_kb <= budget["landing"]["maxInitialJsKb"], (
+            f"Landing page loaded {total_kb:.1f} KB of JS, budget {budget['landing']['maxInitialJsKb']} KB"
+        )
+        for name in budget["lazyOnlyChunks"]:
+            eager = [s["name"] for s in scripts if name in s["name"].rsplit("/", 1)[-1]]
+            assert not eager, f"{name} chunk loaded on the landing page: {eager}"
+
+        # -> Time to interactive within budget
+        tti = await page.evaluate(TIME_TO_INTERACTIVE)
+        print(f"Landing page time to interactive: {tti:.0f} ms (wall clock {((time.time() - started) * 1000):.0f} ms)")
+        assert tti <= budget["landing"]["maxTimeToInteractiveMs"], (
+            f"Time to interactive {tti:.0f} ms, budget {budget['landing']['maxTimeToInteractiveMs']} ms"
+        )
+
+        # The page is actually usable: the hero is rendered and navigation works
+        await expect(page.locator("h1").first).to_be_visible()
+
+        # -> Navigating to another route fetches its chunk on demand
+        await page.goto(f"{PREVIEW_URL}/privacy", wait_until="load", timeout=30000)
+        await expect(page.locator("h1").first).to_be_visible(timeout=10000)
+        scripts = await page.evaluate(SCRIPT_BYTES)
+        assert any("Privacy" in s["name"] for s in scripts), "Privacy page should load as its own chunk"
+        assert not any("react-pdf" in s["name"] for s in scripts), "react-pdf should only load on PDF export"
+
+    finally:
+        if context:
+            await context.close()
+        if browser:
+            await browser.close()
+        if pw:
+            await pw.stop()
+
+
+asyncio.run(run_test())
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import time
+from playwright import async_api
+from playwright.async_api import expect
+
+APP_URL = "http://localhost:8085"
+ROWS = 10000
+
+# Budgets for a mid-range laptop; tablets are what the virtualization is for
+MAX_RENDER_MS = 1500
+MAX_SCROLL_FRAME_P95_MS = 50
+MAX_MOUNTED_ROWS = 200
+
+# Scrolls the container a fixed distance per frame for ~2s, recording frame durations
+SCROLL_FRAME_TIMES = """
+async (selector) => {
+  const scroller = document.querySelector(selector);
+  const frames = [];
+  let last = performance.now();
+  const end = last + 2000;
+  await new Promise((resolve) => {
+    const step = (now) => {
+      frames.push(now - last);
+      last = now;
+      scroller.scrollTop += 400;
+      if (now < end && scroller.scrollTop + scroller.clientHeight < scroller.scrollHeight) {
+        requestAnimationFrame(step);
+      } else {
+        resolve();
+      }
+    };
+    requestAnimationFrame(step);
+  });
+  frames.sort((a, b) => a - b);
+  return {
+    frames: frames.length,
+    p50: frames[Math.floor(frames.length * 0.5)],
+    p95: frames[Math.min(frames.length - 1, Math.floor(frames.length * 0.95))],
+    max: frames[frames.length - 1],
+  };
+}
+"""
+
+
+def build_estimates(user_id):
+    """10k saved estimates; the first one is a job with 10k line items"""
+    estimates = []
+    for i in range(ROWS):
+        items = [
+            {"description": f"Line item {n + 1}", "quantity": 1 + n % 5, "unitPrice": 12.5, "type": "material"}
+            for n in range(ROWS if i == 0 else 3)
+        ]
+        estimates.append({
+            "id": ROWS - i,
+            "userId": user_id,
+            "title": f"Roof replacement #{ROWS - i}",
+            "clientName": f"Client {ROWS - i}",
+            "clientPhone": "(555) 010-2030",
+            "clientAddress": "42 Ridge Road",
+            "items": items,
+            "total": sum(round(item["quantity"] * item["unitPrice"] * 100) for item in items),
+            "createdAt": "2026-01-05T12:00:00.000Z",
+            "updatedAt": "2026-01-05T12:00:00.000Z",
+        })
+    return estimates
+
+
+async def run_test():
+    pw = None
+    browser = None
+    context = None
+
+    try:
+        # Start a Playwright session in asynchronous mode
+        pw = await async_api.async_playwright().start()
+
+        # Launch a Chromium browser in headless mode with custom arguments
+        browser = await pw.chromium.launch(
+            headless=True,
+            args=[
+                "--window-size=1280,720",         # Set the browser window size
+                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                "--ipc=host",                     # Use host-level IPC for better stability
+            ],
+        )
+
+        context = await browser.new_context(viewport={"width": 1280, "height": 720})
+        context.set_default_timeout(10000)
+
+        # Signed-in user with an active subscription (cookies are shared with the page)
+        email = f"virtual_rows_{int(time.time() * 1000)}@example.com"
+        r = await context.request.post(
+            f"{APP_URL}/api/auth/sign-up/email",
+            data={"email": email, "password": "Password123!", "name": "Virtual Rows User"},
+        )
+        assert r.ok, f"Sign up failed: {await r.text()}"
+        user_id = (await r.json())["user"]["id"]
+        r = await context.request.post(f"{APP_URL}/api/test/activate-subscription")
+        assert r.ok, f"Activate subscription failed: {await r.text()}"
+
+        # Serve the 10k estimates in place of the user's (empty) list
+        payload = json.dumps({"estimates": build_estimates(user_id), "cursor": None})
+
+        async def serve_estimates(route):
+            await route.fulfill(status=200, content_type="application/json", body=payload)
+
+        page = await context.new_page()
+        await page.route("**/api/estimates", serve_estimates)
+        await page.goto(f"{APP_URL}/dashboard", wait_until="load", timeout=30000)
+
+        # -> EstimateList: render time and mounted rows at 10k estimates
+        started = time.time()
+        await page.get_by_role("tab", name="Saved Estimates").click()
+        await expect(page.locator('[data-testid="estimate-row"]').first).to_be_visible(timeout=30000)
+        render_ms = (time.time() - started) * 1000
+        mounted = await page.locator('[data-testid="estimate-row"]').count()
+        print(f"EstimateList: {ROWS} estimates rendered in {render_ms:.0f} ms with {mounted} rows mounted")
+        await expect(page.locator(f"text={ROWS} estimates").first).to_be_visible()
+        assert mounted <= MAX_MOUNTED_ROWS, f"{mounted} rows mounted, expected a window of at most {MAX_MOUNTED_ROWS}"
+        assert render_ms <= MAX_RENDER_MS, f"List took {render_ms:.0f} ms to render, budget {MAX_RENDER_MS} ms"
+
+        # The table still describes the full list to assistive technology
+        assert await page.locator('[data-testid="estimate-list-scroll"] table').get_attribute("aria-rowcount") == str(ROWS + 1)
+
+        # -> EstimateList: scroll frame times
+        frames = await page.evaluate(SCROLL_FRAME_TIMES, '[data-testid="estimate-list-scroll"]')
+        print(f"EstimateList scroll: {frames['frames']} frames, p50 {frames['p50']:.1f} ms, p95 {frames['p95']:.1f} ms, max {frames['max']:.1f} ms")
+        assert frames["p95"] <= MAX_SCROLL_FRAME_P95_MS, f"Scroll p95 frame time {frames['p95']:.1f} ms"
+        assert await page.locator('[data-testid="estimate-row"]').count() <= MAX_MOUNTED_ROWS
+
+        # -> Keyboard: Tab walks through rows beyond the initial window without losing focus
+        await page.evaluate("document.querySelector('[data-testid=\"estimate-list-scroll\"]').scrollTop = 0")
+        await page.get_by_role("button", name=f"Download PDF for Roof replacement #{ROWS}").focus()
+        for _ in range(60):
+            await page.keyboard.press("Tab")
+        row_index = await page.evaluate("document.activeElement.closest('tr')?.getAttribute('aria-rowindex')")
+        assert row_index is not None and int(row_index) > 15, f"Focus left the list or stalled (row {row_index})"
+        assert await page.evaluate("document.activeElement.closest('tr').isConnected")
+
+        # -> EstimateForm: open the job with 10k line items
+        await page.get_by_role("button", name=f"Edit estimate Roof replacement #{ROWS}").click()
+        started = time.time()
+        await expect(page.locator('[data-testid="line-item-row"]').first).to_be_visible(timeout=30000)
+        render_ms = (time.time() - started) * 1000
+        mounted = await page.locator('[data-testid="line-item-row"]').count()
+        print(f"EstimateForm: {ROWS} line items rendered in {render_ms:.0f} ms with {mounted} rows mounted")
+        assert mounted <= MAX_MOUNTED_ROWS, f"{mounted} line item rows mounted"
+        assert render_ms <= MAX_RENDER_MS, f"Form took {render_ms:.0f} ms to render, budget {MAX_RENDER_MS} ms"
+
+        frames = await page.evaluate(SCROLL_FRAME_TIMES, '[data-testid="line-items-scroll"]')
+        print(f"EstimateForm scroll: {frames['frames']} frames, p50 {frames['p50']:.1f} ms, p95 {frames['p95']:.1f} ms, max {frames['max']:.1f} ms")
+        assert frames["p95"] <= MAX_SCROLL_FRAME_P95_MS, f"Scroll p95 frame time {frames['p95']:.1f} ms"
+
+        # The last line item is reachable by scrolling and editable
+        await page.evaluate("(() => { const s = document.querySelector('[data-testid=\"line-items-scroll\"]'); s.scrollTop = s.scrollHeight; })()")
+        last_quantity = page.locator(f'[data-testid="line-item-{ROWS - 1}-quantity"]')
+        await expect(last_quantity).to_be_visible(timeout=5000)
+        await last_quantity.fill("7")
+        await expect(last_quantity).to_have_value("7")
+
+    finally:
+        if context:
+            await context.close()
+        if browser:
+            await browser.close()
+        if pw:
+            await pw.stop()
+
+
+asyncio.run(run_test())
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+
+
+def read_events(response, events, done):
+    """Collect server-sent events as (event, data, received_at) until the stream ends"""
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            events.append((event, json.loads(line[len("data:"):].strip()), time.time()))
+        elif line == "":
+            event = None
+    done.set()
+
+
+def test_subscription_events_push_activation():
+    timeout = 30
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"subscription_events_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Subscription Events User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+
+    # Requires a session
+    r = requests.get(f"{BASE_URL}/api/subscription/events", timeout=timeout)
+    assert r.status_code == 401
+
+    # The stream opens with the current (pending) status
+    stream = session.get(f"{BASE_URL}/api/subscription/events", stream=True, timeout=timeout)
+    assert stream.status_code == 200, stream.text
+    assert stream.headers["Content-Type"].startswith("text/event-stream")
+
+    events = []
+    done = threading.Event()
+    reader = threading.Thread(target=read_events, args=(stream, events, done), daemon=True)
+    reader.start()
+
+    deadline = time.time() + 10
+    while not events and time.time() < deadline:
+        time.sleep(0.05)
+    assert events, "No initial status event"
+    assert events[0][0] == "status"
+    assert events[0][1]["isActive"] is False
+    assert events[0][1]["subscriptionStatus"] == "pending"
+
+    # Activation is pushed as soon as it's committed, well before the periodic re-check
+    activated_at = time.time()
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    assert done.wait(10), "Stream should end once the subscription is active"
+    active = [e for e in events if e[1]["isActive"]]
+    assert active, f"No activation event received: {events}"
+    latency = active[0][2] - activated_at
+    print(f"Activation pushed after {latency * 1000:.0f} ms")
+    assert latency < 2, f"Activation took {latency:.1f}s to arrive"
+    assert active[0][1]["subscriptionStatus"] == "active"
+    assert active[0][1]["subscriptionTier"] == "monthly"
+
+    # Once active, a new stream reports it immediately and closes
+    started = time.time()
+    r = session.get(f"{BASE_URL}/api/subscription/events", timeout=timeout)
+    assert r.status_code == 200
+    assert time.time() - started < 5
+    assert '"isActive":true' in r.text
+    assert r.text.count("event: status") == 1
+
+
+test_subscription_events_push_activation()
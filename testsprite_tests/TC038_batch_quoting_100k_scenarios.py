@@ -0,0 +1,131 @@
+import random
+import statistics
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+SCENARIOS = 100_000
+RUNS = 3
+# Whole round trip for 100k scenarios: JSON both ways plus pricing
+MAX_CALL_SECONDS = 5
+
+TIER_MULTIPLIERS = {"standard": Decimal("1.00"), "priority": Decimal("1.15"), "emergency": Decimal("1.30")}
+
+
+def round_half_up(value, exponent="1"):
+    return value.quantize(Decimal(exponent), rounding=ROUND_HALF_UP)
+
+
+def reference_quote(scenario):
+    """Exact-cents reference: inputs to cents / hundredths, each step rounded half up"""
+    def fixed(name):
+        return round_half_up(Decimal(str(scenario.get(name, 0))), "0.01")
+
+    labor = round_half_up(fixed("laborHours") * fixed("laborRate") * 100)
+    subtotal = fixed("equipmentCost") * 100 + fixed("materialsCost") * 100 + labor
+    discount = round_half_up(subtotal * fixed("discountPercent") / 100)
+    final = subtotal - discount
+    return {
+        "laborTotal": int(labor),
+        "subtotal": int(subtotal),
+        "discountAmount": int(discount),
+        "finalPrice": int(final),
+        "standardPrice": int(round_half_up(final * TIER_MULTIPLIERS["standard"])),
+        "priorityPrice": int(round_half_up(final * TIER_MULTIPLIERS["priority"])),
+        "emergencyPrice": int(round_half_up(final * TIER_MULTIPLIERS["emergency"])),
+    }
+
+
+def random_scenario(rng):
+    return {
+        "equipmentCost": rng.randint(0, 5_000_000) / 100,
+        "materialsCost": rng.randint(0, 5_000_000) / 100,
+        "laborHours": rng.randint(0, 20_000) / 100,
+        "laborRate": rng.randint(2_500, 25_000) / 100,
+        "discountPercent": rng.choice([0, 5, 10, 12.5, 15, 33.33, 100]),
+    }
+
+
+def test_batch_quoting_100k_scenarios():
+    timeout = 60
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"batch_quotes_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Batch Quotes User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+
+    # Known values, including rounding edge cases
+    edge_cases = [
+        {"equipmentCost": 1.005, "materialsCost": 200, "laborHours": 7.5, "laborRate": 65.33, "discountPercent": 12.5},
+        {"equipmentCost": 0.01, "discountPercent": 50},
+        {"laborHours": 0.5, "laborRate": 0.01},
+        {"materialsCost": 999.99, "discountPercent": 100},
+        {},
+    ]
+    r = session.post(f"{BASE_URL}/api/quotes/batch", json={"scenarios": edge_cases}, timeout=timeout)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["tiers"] == {"standard": 1, "priority": 1.15, "emergency": 1.3}
+    assert body["quotes"][0] == {
+        "laborTotal": 48998,
+        "subtotal": 69099,
+        "discountAmount": 8637,
+        "finalPrice": 60462,
+        "standardPrice": 60462,
+        "priorityPrice": 69531,
+        "emergencyPrice": 78601,
+    }
+    for scenario, quote in zip(edge_cases, body["quotes"]):
+        assert quote == reference_quote(scenario), (scenario, quote)
+
+    # Invalid scenarios are rejected with the offending path
+    r = session.post(
+        f"{BASE_URL}/api/quotes/batch",
+        json={"scenarios": [{"laborHours": 8}, {"laborRate": -1}, {"discountPercent": 101}, {"equipmentCost": "12"}]},
+        timeout=timeout
+    )
+    assert r.status_code == 400, r.text
+    paths = [issue["path"] for issue in r.json()["details"]]
+    assert paths == [["scenarios", 1, "laborRate"], ["scenarios", 2, "discountPercent"], ["scenarios", 3, "equipmentCost"]]
+    r = session.post(f"{BASE_URL}/api/quotes/batch", json={"scenarios": []}, timeout=timeout)
+    assert r.status_code == 400
+    r = session.post(f"{BASE_URL}/api/quotes/batch", json={"scenarios": [{}] * (SCENARIOS + 1)}, timeout=timeout)
+    assert r.status_code == 400
+
+    # -> Benchmark: 100k scenarios per call, every price exact
+    rng = random.Random(43)
+    scenarios = [random_scenario(rng) for _ in range(SCENARIOS)]
+    expected = [reference_quote(scenario) for scenario in scenarios]
+
+    durations = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        r = session.post(f"{BASE_URL}/api/quotes/batch", json={"scenarios": scenarios}, timeout=timeout)
+        durations.append(time.perf_counter() - started)
+        assert r.status_code == 200, r.text[:500]
+        quotes = r.json()["quotes"]
+        assert len(quotes) == SCENARIOS
+        mismatches = [i for i, (quote, ref) in enumerate(zip(quotes, expected)) if quote != ref]
+        assert not mismatches, f"{len(mismatches)} quotes differ, first: {scenarios[mismatches[0]]} -> {quotes[mismatches[0]]}"
+
+    median = statistics.median(durations)
+    print(f"Quoted {SCENARIOS} scenarios per call: median {median * 1000:.0f} ms "
+          f"({SCENARIOS / median:,.0f} scenarios/s), runs {[f'{d * 1000:.0f}' for d in durations]} ms")
+    assert median <= MAX_CALL_SECONDS, f"100k scenarios took {median:.2f}s per call"
+
+
+test_batch_quoting_100k_scenarios()
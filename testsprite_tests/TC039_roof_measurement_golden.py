@@ -0,0 +1,189 @@
+import math
+import random
+import time
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+FACETS = 800
+MAX_CALL_SECONDS = 1
+
+# Hand-checked roofs: pitch multipliers from sqrt(1 + (rise / 12)^2)
+GOLDEN_ROOFS = [
+    {
+        "name": "gable, two 1000 sq ft planes at 6/12",
+        "request": {"planes": [{"footprintArea": 1000, "pitch": 6}, {"footprintArea": 1000, "pitch": 6}]},
+        "totals": {"planeCount": 2, "footprintArea": 2000, "roofArea": 2236.07, "squares": 22.36,
+                   "roofStyle": "gable", "wastePercent": 10, "squaresWithWaste": 24.6},
+        "materials": {"shingleBundles": 74, "underlaymentRolls": 3, "nails": 7871, "nailBoxes": 2},
+    },
+    {
+        "name": "hip, four planes at 8/12",
+        "request": {"planes": [{"footprintArea": a, "pitch": 8} for a in (600, 600, 300, 300)]},
+        "totals": {"planeCount": 4, "footprintArea": 1800, "roofArea": 2163.33, "squares": 21.63,
+                   "roofStyle": "hip", "wastePercent": 15, "squaresWithWaste": 24.88},
+        "materials": {"shingleBundles": 75, "underlaymentRolls": 3, "nails": 7962, "nailBoxes": 2},
+    },
+    {
+        "name": "cut-up roof with dormers, mixed pitches",
+        "request": {"planes": [
+            {"footprintArea": 850, "pitch": 4}, {"footprintArea": 850, "pitch": 4},
+            {"footprintArea": 420, "pitch": 12}, {"footprintArea": 420, "pitch": 12},
+            {"footprintArea": 95, "pitch": 7.5}, {"footprintArea": 95, "pitch": 7.5},
+        ]},
+        "totals": {"planeCount": 6, "footprintArea": 2730, "roofArea": 3203.95, "squares": 32.04,
+                   "roofStyle": "complex", "wastePercent": 20, "squaresWithWaste": 38.45},
+        "materials": {"shingleBundles": 116, "underlaymentRolls": 4, "nails": 12304, "nailBoxes": 2},
+    },
+]
+
+
+def reference_measure(request):
+    """Same rules as the server: whole-roof squares with waste, rounded up once per material"""
+    planes = request["planes"]
+    roof_area = sum(p["footprintArea"] * math.sqrt(1 + (p["pitch"] / 12) ** 2) for p in planes)
+    style = request.get("roofStyle") or ("gable" if len(planes) <= 2 else "hip" if len(planes) <= 4 else "complex")
+    waste = request.get("wastePercent", {"gable": 10, "hip": 15, "complex": 20}[style])
+    squares_with_waste = roof_area * (1 + waste / 100) / 100
+    nails = math.ceil(squares_with_waste * 320 - 1e-9)
+    return roof_area, squares_with_waste, {
+        "shingleBundles": math.ceil(squares_with_waste * 3 - 1e-9),
+        "underlaymentRolls": math.ceil(squares_with_waste / 10 - 1e-9),
+        "nails": nails,
+        "nailBoxes": math.ceil(nails / 7200),
+    }
+
+
+def test_roof_measurement_golden():
+    timeout = 30
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"roof_measure_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Roof Measure User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+
+    # Requires a session
+    r = requests.post(f"{BASE_URL}/api/roof/measure", json=GOLDEN_ROOFS[0]["request"], timeout=timeout)
+    assert r.status_code == 401
+
+    # -> Golden roofs
+    for roof in GOLDEN_ROOFS:
+        r = session.post(f"{BASE_URL}/api/roof/measure", json=roof["request"], timeout=timeout)
+        assert r.status_code == 200, f"{roof['name']}: {r.text}"
+        body = r.json()
+        assert body["totals"] == roof["totals"], (roof["name"], body["totals"])
+        assert body["materials"] == roof["materials"], (roof["name"], body["materials"])
+        assert body["warnings"] == []
+
+    # Per-plane multipliers from the lookup table
+    r = session.post(f"{BASE_URL}/api/roof/measure", json=GOLDEN_ROOFS[2]["request"], timeout=timeout)
+    multipliers = [plane["pitchMultiplier"] for plane in r.json()["planes"]]
+    assert multipliers == [1.0541, 1.0541, 1.4142, 1.4142, 1.1792, 1.1792], multipliers
+
+    # -> Line items are valid estimate items and price the materials
+    request = dict(GOLDEN_ROOFS[0]["request"], prices={"shingleBundle": 41.5, "nailBox": 60})
+    r = session.post(f"{BASE_URL}/api/roof/measure", json=request, timeout=timeout)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [(item["quantity"], item["unitPrice"], item["type"]) for item in body["lineItems"]] == [
+        (74, 41.5, "material"), (3, 95, "material"), (2, 60, "material")
+    ]
+    assert body["materialsCost"] == 3476.0  # 74 x 41.50 + 3 x 95 + 2 x 60
+
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/estimates",
+        json={"title": "Measured roof", "clientName": "Golden Client", "items": body["lineItems"]},
+        timeout=timeout
+    )
+    assert r.status_code == 201, f"Line items should be accepted by createEstimateSchema: {r.text}"
+    assert r.json()["estimate"]["total"] == 347600
+
+    # -> Overrides, warnings and validation
+    r = session.post(
+        f"{BASE_URL}/api/roof/measure",
+        json={"planes": [{"footprintArea": 1200, "pitch": 1, "label": "Porch"}], "roofStyle": "hip", "wastePercent": 0},
+        timeout=timeout
+    )
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["totals"]["roofStyle"] == "hip"
+    assert body["totals"]["wastePercent"] == 0
+    assert body["totals"]["roofArea"] == 1204.16
+    assert len(body["warnings"]) == 1 and body["warnings"][0].startswith("Porch:")
+
+    r = session.post(
+        f"{BASE_URL}/api/roof/measure",
+        json={"planes": [{"footprintArea": 500, "pitch": 6}, {"footprintArea": 0, "pitch": 6}, {"footprintArea": 500, "pitch": 25}]},
+        timeout=timeout
+    )
+    assert r.status_code == 400, r.text
+    paths = [issue["path"] for issue in r.json()["details"]]
+    assert paths == [["planes", 1, "footprintArea"], ["planes", 2, "pitch"]], paths
+    r = session.post(f"{BASE_URL}/api/roof/measure", json={"planes": []}, timeout=timeout)
+    assert r.status_code == 400
+    r = session.post(f"{BASE_URL}/api/roof/measure", json={"planes": [{"footprintArea": 10, "pitch": 4}] * 1001}, timeout=timeout)
+    assert r.status_code == 400
+
+    # Line items stay within the estimate item bounds: total area and prices are capped
+    r = session.post(
+        f"{BASE_URL}/api/roof/measure",
+        json={"planes": [{"footprintArea": 100_000, "pitch": 24}] * 1000, "wastePercent": 50},
+        timeout=timeout
+    )
+    assert r.status_code == 400, r.text
+    assert [issue["path"] for issue in r.json()["details"]] == [["planes"]]
+    r = session.post(
+        f"{BASE_URL}/api/roof/measure",
+        json={"planes": [{"footprintArea": 100_000, "pitch": 24}] * 50, "wastePercent": 50},
+        timeout=timeout
+    )
+    assert r.status_code == 200, r.text
+    assert all(item["quantity"] <= 1_000_000 for item in r.json()["lineItems"])
+    r = session.post(
+        f"{BASE_URL}/api/roof/measure",
+        json={"planes": [{"footprintArea": 500, "pitch": 6}], "prices": {"nailBox": 1e12}},
+        timeout=timeout
+    )
+    assert r.status_code == 400, r.text
+
+    # -> Batch: hundreds of facets in one call
+    rng = random.Random(44)
+    planes = [
+        {"footprintArea": rng.randint(20, 60_000) / 100, "pitch": rng.choice([3, 4, 5, 6, 7, 8, 9, 10, 12, 6.5, 7.25, 9.1])}
+        for _ in range(FACETS)
+    ]
+    started = time.perf_counter()
+    r = session.post(f"{BASE_URL}/api/roof/measure", json={"planes": planes}, timeout=timeout)
+    elapsed = time.perf_counter() - started
+    assert r.status_code == 200, r.text[:500]
+    body = r.json()
+    assert len(body["planes"]) == FACETS
+
+    roof_area, squares_with_waste, materials = reference_measure({"planes": planes})
+    assert abs(body["totals"]["roofArea"] - roof_area) < 0.01, (body["totals"]["roofArea"], roof_area)
+    assert abs(body["totals"]["squaresWithWaste"] - squares_with_waste) < 0.01
+    assert body["materials"] == materials, (body["materials"], materials)
+    for plane, measured in zip(planes, body["planes"]):
+        expected = plane["footprintArea"] * math.sqrt(1 + (plane["pitch"] / 12) ** 2)
+        assert abs(measured["roofArea"] - expected) < 0.006, (plane, measured)
+
+    print(f"Measured {FACETS} facets in {elapsed * 1000:.0f} ms: "
+          f"{body['totals']['squaresWithWaste']} squares, {materials['shingleBundles']} bundles")
+    assert elapsed <= MAX_CALL_SECONDS, f"{FACETS} facets took {elapsed:.2f}s"
+
+
+test_roof_measurement_golden()
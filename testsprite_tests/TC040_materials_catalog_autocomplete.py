@@ -0,0 +1,190 @@
+import statistics
+import time
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+# Per keystroke, measured at the client (round trip to a local server)
+MAX_KEYSTROKE_P95_MS = 20
+
+CATALOG = [
+    {"name": "Architectural shingles (bundle)", "type": "material", "unitPrice": 38.5},
+    {"name": "Synthetic underlayment roll", "type": "material", "unitPrice": 95},
+    {"name": "Step flashing 4x4", "type": "material", "unitPrice": 0.85},
+    {"name": "Drip edge 10ft", "type": "material", "unitPrice": 9.25},
+    {"name": "Shingle removal", "type": "labor", "unitPrice": 65},
+    {"name": "Dumpster rental", "type": "equipment", "unitPrice": 425},
+]
+
+
+def autocomplete(session, query, timeout, **params):
+    r = session.get(f"{BASE_URL}/api/materials/autocomplete", params={"q": query, **params}, timeout=timeout)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_materials_catalog_autocomplete():
+    timeout = 30
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"materials_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Materials Catalog User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    # Requires a session
+    r = requests.get(f"{BASE_URL}/api/materials/autocomplete", params={"q": "sh"}, timeout=timeout)
+    assert r.status_code == 401
+
+    # -> Build the catalog
+    for material in CATALOG:
+        r = session.post(f"{BASE_URL}/api/materials", json=material, timeout=timeout)
+        assert r.status_code == 201, r.text
+        saved = r.json()["material"]
+        assert saved["name"] == material["name"]
+        assert saved["unitPrice"] == material["unitPrice"]
+        assert saved["type"] == material["type"]
+
+    r = session.post(f"{BASE_URL}/api/materials", json={"name": " ", "type": "material", "unitPrice": 1}, timeout=timeout)
+    assert r.status_code == 400
+    r = session.post(f"{BASE_URL}/api/materials", json={"name": "Nails", "type": "supplies", "unitPrice": 1}, timeout=timeout)
+    assert r.status_code == 400
+    r = session.post(f"{BASE_URL}/api/materials", json={"name": "Nails", "type": "material", "unitPrice": -1}, timeout=timeout)
+    assert r.status_code == 400
+
+    # -> Ranking: name prefix first, then word prefix; picks carry price and type
+    body = autocomplete(session, "shingle", timeout)
+    assert body["source"] == "cache"
+    names = [m["name"] for m in body["materials"]]
+    assert names[0] == "Shingle removal", names
+    assert "Architectural shingles (bundle)" in names
+    assert body["materials"][0]["unitPrice"] == 65 and body["materials"][0]["type"] == "labor"
+
+    assert [m["name"] for m in autocomplete(session, "FLASH", timeout)["materials"]] == ["Step flashing 4x4"]
+    assert [m["name"] for m in autocomplete(session, "drip  edge", timeout)["materials"]] == ["Drip edge 10ft"]
+    # Typos still match through trigrams
+    assert "Synthetic underlayment roll" in [m["name"] for m in autocomplete(session, "underlayemnt", timeout)["materials"]]
+    assert autocomplete(session, "zzzz", timeout)["materials"] == []
+    assert len(autocomplete(session, "", timeout, limit=3)["materials"]) == 3
+    r = session.get(f"{BASE_URL}/api/materials/autocomplete", params={"q": "a", "limit": 500}, timeout=timeout)
+    assert r.status_code == 400
+
+    # -> Same name in another case updates the entry instead of duplicating it
+    r = session.post(
+        f"{BASE_URL}/api/materials",
+        json={"name": "step FLASHING 4x4", "type": "material", "unitPrice": 0.95},
+        timeout=timeout
+    )
+    assert r.status_code == 201, r.text
+    matches = autocomplete(session, "step", timeout)["materials"]
+    assert len(matches) == 1 and matches[0]["unitPrice"] == 0.95, matches
+
+    # -> Saved estimates teach the catalog their latest prices
+    r = session.post(
+        f"{BASE_URL}/api/estimates",
+        json={
+            "title": "Catalog learning",
+            "clientName": "Autocomplete Client",
+            "items": [
+                {"description": "Ice and water shield", "quantity": 2, "unitPrice": 112.4, "type": "material"},
+                {"description": "Drip edge 10ft", "quantity": 12, "unitPrice": 9.75, "type": "material"},
+            ],
+        },
+        timeout=timeout
+    )
+    assert r.status_code == 201, r.text
+    learned = autocomplete(session, "ice", timeout)["materials"]
+    assert learned and learned[0]["name"] == "Ice and water shield", learned
+    assert learned[0]["unitPrice"] == 112.4 and learned[0]["type"] == "material"
+    drip = autocomplete(session, "drip", timeout)["materials"][0]
+    assert drip["unitPrice"] == 9.75 and drip["useCount"] == 1, drip
+
+    # -> Batch creates and item updates teach it too; updates that leave the items alone don't
+    r = session.post(
+        f"{BASE_URL}/api/estimates/batch",
+        json={"operations": [{"op": "create", "clientId": "learn", "data": {
+            "title": "Batch learning",
+            "clientName": "Autocomplete Client",
+            "items": [{"description": "Ridge vent 4ft", "quantity": 5, "unitPrice": 21.3, "type": "material"}],
+        }}]},
+        timeout=timeout
+    )
+    assert r.status_code == 200 and r.json()["results"][0]["status"] == "created", r.text
+    batch_estimate = r.json()["results"][0]["estimate"]
+    assert autocomplete(session, "ridge", timeout)["materials"][0]["unitPrice"] == 21.3
+    r = session.post(
+        f"{BASE_URL}/api/estimates/batch",
+        json={"operations": [{
+            "op": "update", "id": batch_estimate["id"], "baseUpdatedAt": batch_estimate["updatedAt"], "data": {"title": "Renamed"}
+        }]},
+        timeout=timeout
+    )
+    assert r.status_code == 200 and r.json()["results"][0]["status"] == "updated", r.text
+    batch_estimate = r.json()["results"][0]["estimate"]
+    assert autocomplete(session, "ridge", timeout)["materials"][0]["useCount"] == 1
+    r = session.post(
+        f"{BASE_URL}/api/estimates/batch",
+        json={"operations": [{
+            "op": "update", "id": batch_estimate["id"], "baseUpdatedAt": batch_estimate["updatedAt"],
+            "data": {"items": [{"description": "Ridge vent 4ft", "quantity": 5, "unitPrice": 23.8, "type": "material"}]}
+        }]},
+        timeout=timeout
+    )
+    assert r.status_code == 200 and r.json()["results"][0]["status"] == "updated", r.text
+    ridge = autocomplete(session, "ridge", timeout)["materials"][0]
+    assert ridge["unitPrice"] == 23.8 and ridge["useCount"] == 2, ridge
+
+    # -> So do imported estimates
+    r = session.post(
+        f"{BASE_URL}/api/estimates/import",
+        data=(
+            "title,client_name,item_description,item_quantity,item_unit_price,item_type\n"
+            "Imported job,Autocomplete Client,Starter strip bundle,3,31.5,material\n"
+        ).encode(),
+        headers={"Content-Type": "text/csv"},
+        timeout=timeout
+    )
+    assert r.status_code == 200, r.text
+    starter = autocomplete(session, "starter", timeout)["materials"]
+    assert starter and starter[0]["unitPrice"] == 31.5, starter
+
+    # -> Delete
+    r = session.delete(f"{BASE_URL}/api/materials/{learned[0]['id']}", timeout=timeout)
+    assert r.status_code == 200, r.text
+    assert autocomplete(session, "ice and", timeout)["materials"] == []
+    r = session.delete(f"{BASE_URL}/api/materials/{learned[0]['id']}", timeout=timeout)
+    assert r.status_code == 404
+
+    # -> Latency: type a description one keystroke at a time against a warm cache
+    autocomplete(session, "a", timeout)
+    durations = []
+    for _ in range(5):
+        text = ""
+        for char in "architectural shingles":
+            text += char
+            started = time.perf_counter()
+            body = autocomplete(session, text, timeout)
+            durations.append((time.perf_counter() - started) * 1000)
+            assert body["source"] == "cache"
+        assert body["materials"][0]["name"] == "Architectural shingles (bundle)"
+
+    durations.sort()
+    p95 = durations[int(len(durations) * 0.95)]
+    print(f"Autocomplete over {len(durations)} keystrokes: median {statistics.median(durations):.1f} ms, p95 {p95:.1f} ms")
+    assert p95 <= MAX_KEYSTROKE_P95_MS, f"p95 {p95:.1f} ms per keystroke, budget {MAX_KEYSTROKE_P95_MS} ms"
+
+
+test_materials_catalog_autocomplete()
@@ -0,0 +1,168 @@
+import copy
+import time
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+ITEMS = 40
+EDITS = 36
+SNAPSHOT_INTERVAL = 10
+# All revisions together may use at most this share of storing every version in full
+MAX_STORAGE_RATIO = 0.35
+
+DOCUMENT_FIELDS = ["title", "clientName", "clientPhone", "clientAddress", "items", "total"]
+
+
+def document_of(estimate):
+    return {field: estimate.get(field) for field in DOCUMENT_FIELDS}
+
+
+def apply_patch(document, patch):
+    """Minimal RFC 6902 add/remove/replace, independent of the server's implementation"""
+    result = copy.deepcopy(document)
+    for op in patch:
+        tokens = [t.replace("~1", "/").replace("~0", "~") for t in op["path"].split("/")[1:]]
+        parent = result
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = op["value"]
+        elif op["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = op["value"]
+    return result
+
+
+def test_estimate_revisions_delta_storage():
+    timeout = 30
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"revisions_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Revisions User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    items = [
+        {"description": f"Roof section {n + 1} - architectural shingles", "quantity": 1 + n % 4, "unitPrice": 120 + n, "type": "material"}
+        for n in range(ITEMS)
+    ]
+    r = session.post(
+        f"{BASE_URL}/api/estimates",
+        json={"title": "Full replacement", "clientName": "Revision Client", "clientAddress": "7 Gable Court", "items": items},
+        timeout=timeout
+    )
+    assert r.status_code == 201, r.text
+    estimate = r.json()["estimate"]
+    estimate_id = estimate["id"]
+    versions = [document_of(estimate)]  # versions[n - 1] is revision n
+
+    # -> Dozens of small edits: one price at a time, plus a title change, an added and a removed item
+    for edit in range(EDITS):
+        if edit == 10:
+            body = {"title": "Full replacement (revised)"}
+        elif edit == 20:
+            items = items + [{"description": "Ridge vent", "quantity": 3, "unitPrice": 45.5, "type": "material"}]
+            body = {"items": items}
+        elif edit == 30:
+            items = items[:-2]
+            body = {"items": items}
+        else:
+            items = copy.deepcopy(items)
+            items[edit % ITEMS]["unitPrice"] += 2.5
+            body = {"items": items}
+        r = session.put(f"{BASE_URL}/api/estimates/{estimate_id}", json=body, timeout=timeout)
+        assert r.status_code == 200, r.text
+        versions.append(document_of(r.json()["estimate"]))
+
+    # Saving without changes doesn't add a revision
+    r = session.put(f"{BASE_URL}/api/estimates/{estimate_id}", json={"items": items}, timeout=timeout)
+    assert r.status_code == 200, r.text
+
+    r = session.get(f"{BASE_URL}/api/estimates/{estimate_id}/revisions", timeout=timeout)
+    assert r.status_code == 200, r.text
+    revisions = r.json()["revisions"]
+    assert [rev["revision"] for rev in revisions] == list(range(1, len(versions) + 1))
+    snapshots = [rev["revision"] for rev in revisions if rev["kind"] == "snapshot"]
+    assert snapshots[:4] == [1, 11, 21, 31], snapshots
+    assert all(b - a <= SNAPSHOT_INTERVAL for a, b in zip(snapshots, snapshots[1:] + [len(versions) + 1]))
+
+    # -> Storage stays small compared with keeping every version
+    snapshot_size = revisions[0]["size"]
+    stored = sum(rev["size"] for rev in revisions)
+    full_copies = snapshot_size * len(revisions)
+    delta_sizes = sorted(rev["size"] for rev in revisions if rev["kind"] == "delta")
+    print(f"{len(revisions)} revisions: {stored} bytes stored vs {full_copies} for full copies "
+          f"({stored / full_copies:.0%}); median delta {delta_sizes[len(delta_sizes) // 2]} bytes, snapshot {snapshot_size} bytes")
+    assert stored <= full_copies * MAX_STORAGE_RATIO, f"{stored} bytes stored for {len(revisions)} revisions"
+
+    # -> Every revision rebuilds exactly
+    for number, expected in enumerate(versions, start=1):
+        r = session.get(f"{BASE_URL}/api/estimates/{estimate_id}/revisions/{number}", timeout=timeout)
+        assert r.status_code == 200, r.text
+        assert r.json()["revision"] == number
+        assert r.json()["estimate"] == expected, f"Revision {number} differs"
+
+    # -> Diffs: a one-price edit is a single field replace, and any diff replays to its target
+    r = session.get(f"{BASE_URL}/api/estimates/{estimate_id}/revisions/diff", params={"from": 1, "to": 2}, timeout=timeout)
+    assert r.status_code == 200, r.text
+    assert r.json()["patch"] == [
+        {"op": "replace", "path": "/items/0/unitPrice", "value": versions[1]["items"][0]["unitPrice"]},
+        {"op": "replace", "path": "/total", "value": versions[1]["total"]},
+    ] or r.json()["patch"] == [
+        {"op": "replace", "path": "/total", "value": versions[1]["total"]},
+        {"op": "replace", "path": "/items/0/unitPrice", "value": versions[1]["items"][0]["unitPrice"]},
+    ], r.json()["patch"]
+
+    for start, end in [(1, len(versions)), (5, 27), (33, 9), (12, 12)]:
+        r = session.get(f"{BASE_URL}/api/estimates/{estimate_id}/revisions/diff", params={"from": start, "to": end}, timeout=timeout)
+        assert r.status_code == 200, r.text
+        patch = r.json()["patch"]
+        assert apply_patch(versions[start - 1], patch) == versions[end - 1], f"Diff {start} -> {end} doesn't replay"
+        if start == end:
+            assert patch == []
+
+    # -> Errors and ownership
+    r = session.get(f"{BASE_URL}/api/estimates/{estimate_id}/revisions/{len(versions) + 1}", timeout=timeout)
+    assert r.status_code == 404
+    r = session.get(f"{BASE_URL}/api/estimates/{estimate_id}/revisions/abc", timeout=timeout)
+    assert r.status_code == 400
+    r = session.get(f"{BASE_URL}/api/estimates/{estimate_id}/revisions/diff", params={"from": 1}, timeout=timeout)
+    assert r.status_code == 400
+    r = session.get(f"{BASE_URL}/api/estimates/{estimate_id}/revisions/diff", params={"from": 1, "to": 999}, timeout=timeout)
+    assert r.status_code == 404
+
+    other = requests.Session()
+    other_user = {"email": f"revisions_other_{timestamp_suffix}@example.com", "password": "Password123!", "name": "Other User"}
+    assert other.post(f"{BASE_URL}/api/auth/sign-up/email", json=other_user, timeout=timeout).status_code == 200
+    assert other.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout).status_code == 200
+    r = other.get(f"{BASE_URL}/api/estimates/{estimate_id}/revisions/1", timeout=timeout)
+    assert r.status_code == 404
+
+    r = session.delete(f"{BASE_URL}/api/estimates/{estimate_id}", timeout=timeout)
+    assert r.status_code == 200
+    r = session.get(f"{BASE_URL}/api/estimates/{estimate_id}/revisions", timeout=timeout)
+    assert r.status_code == 404
+
+
+test_estimate_revisions_delta_storage()
@@ -0,0 +1,206 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+# Mirrors RATE_LIMIT_POLICIES in server/lib/rate-limit.ts
+AUTH_IP_CAPACITY = 20
+PDF_USER_CAPACITY = 20
+SETTINGS_USER_CAPACITY = 20
+IMPORT_USER_CAPACITY = 5
+QUOTES_USER_CAPACITY = 10
+# Tokens that may refill while a burst is being sent
+REFILL_SLACK = 6
+
+
+def fresh_ip():
+    # With RATE_LIMIT_TRUST_PROXY=true the server reads the client address from
+    # X-Forwarded-For, so each part of the test gets buckets of its own
+    return f"10.{random.randrange(256)}.{random.randrange(256)}.{random.randrange(1, 255)}"
+
+
+def retry_after(response):
+    assert "Retry-After" in response.headers, f"429 without Retry-After: {response.headers}"
+    seconds = int(response.headers["Retry-After"])
+    assert 1 <= seconds <= 60, seconds
+    return seconds
+
+
+def signed_in_session(ip, label, timeout):
+    session = requests.Session()
+    session.headers["X-Forwarded-For"] = ip
+    user = {
+        "email": f"ratelimit_{label}_{int(time.time() * 1000)}_{random.randrange(10**6)}@example.com",
+        "password": "Password123!",
+        "name": f"Rate Limit {label}"
+    }
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+    return session
+
+
+def burst(send, count):
+    """Send requests back to back; returns the responses in order"""
+    return [send() for _ in range(count)]
+
+
+def test_rate_limiting_bursts_and_fair_sharing():
+    timeout = 30
+
+    # -> Sign-in burst from one address: the first AUTH_IP_CAPACITY get through, then 429
+    attacker_ip = fresh_ip()
+    responses = burst(
+        lambda: requests.post(
+            f"{BASE_URL}/api/auth/sign-in/email",
+            json={"email": "nobody@example.com", "password": "WrongPassword1!"},
+            headers={"X-Forwarded-For": attacker_ip},
+            timeout=timeout
+        ),
+        AUTH_IP_CAPACITY + 15
+    )
+    statuses = [r.status_code for r in responses]
+    allowed = sum(1 for status in statuses if status != 429)
+    assert all(status != 429 for status in statuses[:AUTH_IP_CAPACITY]), statuses
+    assert AUTH_IP_CAPACITY <= allowed <= AUTH_IP_CAPACITY + REFILL_SLACK, statuses
+    limited = next(r for r in responses if r.status_code == 429)
+    wait = retry_after(limited)
+    assert limited.json()["error"] == "Too many requests"
+
+    # Other addresses are unaffected
+    r = requests.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": "nobody@example.com", "password": "WrongPassword1!"},
+        headers={"X-Forwarded-For": fresh_ip()},
+        timeout=timeout
+    )
+    assert r.status_code != 429
+
+    # Tokens come back by the time Retry-After says
+    time.sleep(wait)
+    r = requests.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": "nobody@example.com", "password": "WrongPassword1!"},
+        headers={"X-Forwarded-For": attacker_ip},
+        timeout=timeout
+    )
+    assert r.status_code != 429, f"Still limited after Retry-After: {r.text}"
+
+    # -> PDF burst: one user is limited, another user behind the same address is not
+    shared_ip = fresh_ip()
+    heavy = signed_in_session(shared_ip, "heavy", timeout)
+    light = signed_in_session(shared_ip, "light", timeout)
+    estimate_ids = {}
+    for name, session in (("heavy", heavy), ("light", light)):
+        r = session.post(
+            f"{BASE_URL}/api/estimates",
+            json={
+                "title": "Rate limited PDF",
+                "clientName": "Burst Client",
+                "items": [{"description": "Shingles", "quantity": 10, "unitPrice": 38, "type": "material"}],
+            },
+            timeout=timeout
+        )
+        assert r.status_code == 201, r.text
+        estimate_ids[name] = r.json()["estimate"]["id"]
+
+    responses = burst(
+        lambda: heavy.post(f"{BASE_URL}/api/pdf/generate", json={"estimateId": estimate_ids["heavy"]}, timeout=timeout),
+        PDF_USER_CAPACITY + 10
+    )
+    statuses = [r.status_code for r in responses]
+    assert all(status == 200 for status in statuses[:PDF_USER_CAPACITY]), statuses
+    assert 429 in statuses, statuses
+    assert set(statuses) <= {200, 429}, statuses
+    assert sum(1 for status in statuses if status == 200) <= PDF_USER_CAPACITY + REFILL_SLACK, statuses
+    remaining = [int(r.headers["RateLimit-Remaining"]) for r in responses[:PDF_USER_CAPACITY]]
+    assert remaining == sorted(remaining, reverse=True) and remaining[-1] <= 2, remaining
+    retry_after(next(r for r in responses if r.status_code == 429))
+
+    for _ in range(5):
+        r = light.post(f"{BASE_URL}/api/pdf/generate", json={"estimateId": estimate_ids["light"]}, timeout=timeout)
+        assert r.status_code == 200, f"Second user on the same address was limited: {r.status_code}"
+        assert r.headers["Content-Type"].startswith("application/pdf")
+
+    # -> Settings uploads are limited per user too
+    statuses = [
+        r.status_code
+        for r in burst(
+            lambda: heavy.put(f"{BASE_URL}/api/settings", json={"companyName": "Burst Roofing"}, timeout=timeout),
+            SETTINGS_USER_CAPACITY + 10
+        )
+    ]
+    assert all(status != 429 for status in statuses[:SETTINGS_USER_CAPACITY]), statuses
+    assert 429 in statuses, statuses
+
+    # Cheap routes aren't rate limited
+    for _ in range(30):
+        r = heavy.get(f"{BASE_URL}/api/estimates/{estimate_ids['heavy']}", timeout=timeout)
+        assert r.status_code == 200, r.status_code
+
+    # -> Bulk endpoints (CSV import, batch quoting) have per-user buckets of their own
+    bulk = signed_in_session(fresh_ip(), "bulk", timeout)
+    statuses = [r.status_code for r in burst(
+        lambda: bulk.post(
+            f"{BASE_URL}/api/estimates/import",
+            data=b"title,client_name,item_description,item_type,item_quantity,item_unit_price\nBurst,Client,Lift,equipment,1,200\n",
+            headers={"Content-Type": "text/csv"},
+            timeout=timeout
+        ),
+        IMPORT_USER_CAPACITY + 3
+    )]
+    assert statuses[:IMPORT_USER_CAPACITY] == [200] * IMPORT_USER_CAPACITY, statuses
+    assert statuses[-1] == 429, statuses
+    statuses = [r.status_code for r in burst(
+        lambda: bulk.post(f"{BASE_URL}/api/quotes/batch", json={"scenarios": [{"laborHours": 1}]}, timeout=timeout),
+        QUOTES_USER_CAPACITY + 5
+    )]
+    assert statuses[:QUOTES_USER_CAPACITY] == [200] * QUOTES_USER_CAPACITY, statuses
+    assert statuses[-1] == 429, statuses
+
+    # -> Load shedding: a flood of low-priority exports either completes or is shed with 503,
+    # while health checks keep answering
+    flood_ip = fresh_ip()
+    flood = signed_in_session(flood_ip, "flood", timeout)
+    health_statuses = []
+    stop = threading.Event()
+
+    def probe_health():
+        while not stop.is_set():
+            health_statuses.append(requests.get(f"{BASE_URL}/api/health", timeout=timeout).status_code)
+
+    def export(_):
+        return flood.get(f"{BASE_URL}/api/estimates/export", params={"format": "ndjson"}, timeout=timeout)
+
+    prober = threading.Thread(target=probe_health)
+    prober.start()
+    try:
+        with ThreadPoolExecutor(max_workers=80) as pool:
+            results = list(pool.map(export, range(160)))
+    finally:
+        stop.set()
+        prober.join()
+
+    statuses = [r.status_code for r in results]
+    shed = [r for r in results if r.status_code == 503]
+    print(f"Export flood: {statuses.count(200)} served, {len(shed)} shed; {len(health_statuses)} health checks")
+    assert set(statuses) <= {200, 503}, set(statuses)
+    assert statuses.count(200) > 0
+    for r in shed:
+        retry_after(r)
+        assert r.json()["error"] == "Server busy"
+    assert health_statuses and all(status == 200 for status in health_statuses), set(health_statuses)
+
+
+test_rate_limiting_bursts_and_fair_sharing()
@@ -0,0 +1,182 @@
+import gzip
+import json
+import time
+import zlib
+
+import requests
+
+try:
+    import brotli
+except ImportError:  # Brotli responses are still checked, just not decoded
+    brotli = None
+
+
+BASE_URL = "http://localhost:3001"
+ESTIMATES = 25
+ITEMS_PER_ESTIMATE = 20
+# Compressed estimate lists must be at most this share of the identity size
+MAX_COMPRESSED_RATIO = 0.3
+
+
+def fetch_raw(session, method, path, accept_encoding, timeout, **kwargs):
+    """Response plus the body exactly as sent, before any content decoding"""
+    r = session.request(
+        method,
+        f"{BASE_URL}{path}",
+        headers={"Accept-Encoding": accept_encoding},
+        stream=True,
+        timeout=timeout,
+        **kwargs
+    )
+    raw = r.raw.read(decode_content=False)
+    return r, raw
+
+
+def decode(encoding, raw):
+    if encoding == "gzip":
+        return gzip.decompress(raw)
+    if encoding == "br":
+        return brotli.decompress(raw) if brotli else None
+    return raw
+
+
+def test_response_compression():
+    timeout = 30
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"compression_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Compression User"
+    }
+
+    session = requests.Session()
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    estimate_id = None
+    for n in range(ESTIMATES):
+        r = session.post(
+            f"{BASE_URL}/api/estimates",
+            json={
+                "title": f"Compression estimate {n}",
+                "clientName": f"Client {n}",
+                "clientAddress": f"{100 + n} Ridge Road",
+                "items": [
+                    {"description": f"Architectural shingles, section {i}", "quantity": 1 + i % 5, "unitPrice": 38.5 + i, "type": "material"}
+                    for i in range(ITEMS_PER_ESTIMATE)
+                ],
+            },
+            timeout=timeout
+        )
+        assert r.status_code == 201, r.text
+        estimate_id = r.json()["estimate"]["id"]
+
+    # -> Estimate list: identity, gzip and brotli carry the same JSON
+    r, identity = fetch_raw(session, "GET", "/api/estimates", "identity", timeout)
+    assert r.status_code == 200
+    assert "Content-Encoding" not in r.headers
+    assert "Accept-Encoding" in r.headers.get("Vary", "")
+    expected = json.loads(identity)
+    assert len(expected["estimates"]) == ESTIMATES
+
+    for encoding in ("gzip", "br"):
+        r, raw = fetch_raw(session, "GET", "/api/estimates", encoding, timeout)
+        assert r.status_code == 200
+        assert r.headers.get("Content-Encoding") == encoding, r.headers
+        assert "Accept-Encoding" in r.headers.get("Vary", "")
+        print(f"/api/estimates {encoding}: {len(raw)} bytes vs {len(identity)} identity ({len(raw) / len(identity):.0%})")
+        assert len(raw) <= len(identity) * MAX_COMPRESSED_RATIO, f"{encoding}: {len(raw)} of {len(identity)} bytes"
+        decoded = decode(encoding, raw)
+        if decoded is not None:
+            assert json.loads(decoded) == expected
+
+    # Negotiation follows q-values; brotli wins ties
+    for header, chosen in [
+        ("gzip, deflate, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("gzip;q=0.8, br;q=0.8", "br"),
+        ("*", "br"),
+        ("deflate", None),
+        ("br;q=0, gzip;q=0", None),
+    ]:
+        r, raw = fetch_raw(session, "GET", "/api/estimates", header, timeout)
+        assert r.headers.get("Content-Encoding") == chosen, f"{header!r}: {r.headers.get('Content-Encoding')}"
+
+    # -> Small responses are sent as they are
+    r, raw = fetch_raw(session, "GET", "/api/health", "gzip, br", timeout)
+    assert r.status_code == 200
+    assert "Content-Encoding" not in r.headers
+    assert json.loads(raw)["status"] == "ok"
+
+    # -> Streamed exports are compressed as they stream and decode to the same lines
+    for export_format in ("csv", "ndjson"):
+        path = f"/api/estimates/export?format={export_format}"
+        r, identity = fetch_raw(session, "GET", path, "identity", timeout)
+        assert r.status_code == 200 and "Content-Encoding" not in r.headers
+        r, raw = fetch_raw(session, "GET", path, "gzip", timeout)
+        assert r.status_code == 200
+        assert r.headers.get("Content-Encoding") == "gzip"
+        assert "Content-Length" not in r.headers
+        assert gzip.decompress(raw) == identity, f"{export_format} export decodes differently"
+        assert len(raw) < len(identity) / 2
+
+    # -> Import progress is compressed from the first event: one small NDJSON event
+    # decodes on its own, without waiting for THRESHOLD_BYTES of output
+    csv = "title,client_name,item_description,item_type,item_quantity,item_unit_price\n" + "".join(
+        f"Imported {n},Client {n},Ridge cap,material,2,19.5\n" for n in range(600)
+    )
+    r = session.post(
+        f"{BASE_URL}/api/estimates/import",
+        data=csv.encode(),
+        headers={"Content-Type": "text/csv", "Accept-Encoding": "gzip"},
+        stream=True,
+        timeout=timeout
+    )
+    assert r.status_code == 200, r.text
+    assert r.headers.get("Content-Encoding") == "gzip"
+    assert "Content-Length" not in r.headers
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    chunks = r.raw.stream(1 << 16, decode_content=False)
+    first_text = ""
+    while not first_text:
+        first_text = decoder.decompress(next(chunks)).decode()
+    assert first_text.endswith("\n") and len(first_text) < 1024, f"First flush held back output: {len(first_text)} bytes"
+    assert json.loads(first_text.splitlines()[0])["type"] in ("progress", "error", "done")
+    rest = decoder.decompress(b"".join(chunks)).decode()
+    events = [json.loads(line) for line in (first_text + rest).splitlines()]
+    assert events[-1]["type"] == "done" and events[-1]["imported"] == 600, events[-1]
+
+    # -> PDFs from pdf-lib already use compressed object streams and aren't compressed again
+    r, raw = fetch_raw(session, "POST", "/api/pdf/generate", "gzip, br", timeout, json={"estimateId": estimate_id})
+    assert r.status_code == 200, r.text
+    assert r.headers["Content-Type"].startswith("application/pdf")
+    assert "Content-Encoding" not in r.headers
+    assert raw.startswith(b"%PDF") and b"/ObjStm" in raw
+    assert int(r.headers["Content-Length"]) == len(raw)
+
+    # -> Server-sent events are never compressed, so each event arrives as it's sent
+    r = session.get(
+        f"{BASE_URL}/api/subscription/events",
+        headers={"Accept-Encoding": "gzip, br", "Accept": "text/event-stream"},
+        stream=True,
+        timeout=timeout
+    )
+    try:
+        assert r.status_code == 200
+        assert r.headers["Content-Type"].startswith("text/event-stream")
+        assert "Content-Encoding" not in r.headers
+        first = next(r.iter_lines(decode_unicode=True))
+        assert first.startswith(("retry:", "event:", "data:", "id:", ":")), first
+    finally:
+        r.close()
+
+
+test_response_compression()
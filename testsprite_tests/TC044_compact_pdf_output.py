@@ -0,0 +1,178 @@
+import io
+import time
+import uuid
+
+import requests
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+
+BASE_URL = "http://localhost:3001"
+ITEMS = 60
+WATERMARK = "Created with Roofing Estimate Pro"
+# Compact multi-page template PDFs must be at most this share of the standard output
+MAX_COMPACT_RATIO = 0.5
+
+
+def build_template(marker):
+    """Letter-size template with an uncompressed, vector-heavy content stream, like a traced letterhead"""
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=612, height=792)
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    page[NameObject("/Resources")] = DictionaryObject({
+        NameObject("/Font"): DictionaryObject({NameObject("/F1"): writer._add_object(font)})
+    })
+    dots = "".join(f"{20 + (i % 40) * 14} {100 + (i // 40) * 14} 3 3 re f\n" for i in range(1600))
+    content = DecodedStreamObject()
+    content.set_data(f"0.95 0.95 0.97 rg\n{dots}0 g\nBT /F1 12 Tf 72 40 Td ({marker}) Tj ET".encode())
+    page[NameObject("/Contents")] = writer._add_object(content)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def new_session(label, timeout, activate):
+    session = requests.Session()
+    user = {
+        "email": f"compact_pdf_{label}_{int(time.time() * 1000)}@example.com",
+        "password": "Password123!",
+        "name": f"Compact PDF {label}"
+    }
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    if activate:
+        r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+        assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+    return session
+
+
+def create_estimate(session, timeout):
+    items = [
+        {"description": f"Shingle bundle {i}", "quantity": 2, "unitPrice": 45.5, "type": "material"}
+        for i in range(ITEMS)
+    ]
+    r = session.post(f"{BASE_URL}/api/estimates", json={
+        "title": "Compact Roof Job", "clientName": "Morgan Compact", "clientPhone": "555-0199", "items": items
+    }, timeout=timeout)
+    assert r.status_code == 201, r.text
+    return r.json()["estimate"]["id"]
+
+
+def generate(session, estimate_id, timeout, **options):
+    r = session.post(f"{BASE_URL}/api/pdf/generate", json={"estimateId": estimate_id, **options}, timeout=timeout)
+    assert r.status_code == 200, f"PDF generation failed: {r.text}"
+    assert r.content.startswith(b"%PDF")
+    return r.content
+
+
+def xobject_ids(reader):
+    """Object numbers of the XObjects each page draws"""
+    ids = []
+    for page in reader.pages:
+        resources = page["/Resources"].get_object()
+        xobjects = resources.get("/XObject")
+        ids.append({ref.idnum for ref in xobjects.get_object().values()} if xobjects else set())
+    return ids
+
+
+def font_ids(resources):
+    fonts = resources.get("/Font")
+    return {ref.idnum for ref in fonts.get_object().values()} if fonts else set()
+
+
+def test_compact_pdf_output():
+    timeout = 60
+    marker = f"TEMPLATE-{uuid.uuid4().hex[:8]}"
+
+    # -> Paid user with a template: compact output draws one embedded copy of the template
+    paid = new_session("paid", timeout, activate=True)
+    r = paid.put(
+        f"{BASE_URL}/api/settings",
+        files={"pdfTemplate": ("template.pdf", build_template(marker), "application/pdf")},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Template upload failed: {r.text}"
+    estimate_id = create_estimate(paid, timeout)
+
+    standard_bytes = generate(paid, estimate_id, timeout, compact=False)
+    compact_bytes = generate(paid, estimate_id, timeout)
+    standard, compact = PdfReader(io.BytesIO(standard_bytes)), PdfReader(io.BytesIO(compact_bytes))
+    print(f"Template PDF, {len(compact.pages)} pages: compact {len(compact_bytes)} bytes, "
+          f"standard {len(standard_bytes)} bytes ({len(compact_bytes) / len(standard_bytes):.0%})")
+
+    assert len(compact.pages) == len(standard.pages) >= 3
+    # Both modes use object streams, so the saving comes from the shared XObjects alone
+    assert b"/ObjStm" in compact_bytes and b"/ObjStm" in standard_bytes
+    assert len(compact_bytes) <= len(standard_bytes) * MAX_COMPACT_RATIO
+    # One template XObject shared by every page
+    ids = xobject_ids(compact)
+    assert all(len(page_ids) == 1 for page_ids in ids) and len(set().union(*ids)) == 1, ids
+
+    # Text extraction sees the same content in both modes
+    for reader in (standard, compact):
+        pages = [page.extract_text() for page in reader.pages]
+        assert all(marker in text for text in pages), "Template text missing from a page"
+        assert "Compact Roof Job" in pages[0] and "Morgan Compact" in pages[0]
+        assert "Shingle bundle 0" in pages[0]
+        assert f"Shingle bundle {ITEMS - 1}" in pages[-1]
+        assert "Total: $5,460.00" in pages[-1]
+        assert all(WATERMARK not in text for text in pages), "Paid PDFs must not be watermarked"
+        assert all(reader.pages[0].mediabox[2:] == page.mediabox[2:] for page in reader.pages)
+
+    # -> Free tier: the watermark is on every page, drawn from one shared XObject in compact mode
+    free = new_session("free", timeout, activate=False)
+    r = free.put(
+        f"{BASE_URL}/api/settings",
+        files={"pdfTemplate": ("template.pdf", build_template(marker), "application/pdf")},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Template upload failed: {r.text}"
+    free_estimate_id = create_estimate(free, timeout)
+
+    free_standard = PdfReader(io.BytesIO(generate(free, free_estimate_id, timeout, compact=False)))
+    free_compact_bytes = generate(free, free_estimate_id, timeout)
+    free_compact = PdfReader(io.BytesIO(free_compact_bytes))
+    for reader in (free_standard, free_compact):
+        assert all(WATERMARK in page.extract_text() for page in reader.pages), "Watermark missing from a page"
+    ids = xobject_ids(free_compact)
+    assert all(len(page_ids) == 2 for page_ids in ids), ids
+    assert len(set().union(*ids)) == 2, f"Expected one template and one watermark XObject, got {ids}"
+    # The watermark form draws with the document's Helvetica, not a second embedded copy
+    for page in free_compact.pages:
+        resources = page["/Resources"].get_object()
+        forms = [ref.get_object() for ref in resources["/XObject"].get_object().values()]
+        [stamp] = [form for form in forms if float(form["/BBox"][3]) < 50]
+        assert font_ids(stamp["/Resources"].get_object()) <= font_ids(resources)
+
+    # -> The default layout (no template) carries the free watermark in both modes too.
+    # It is a single page, so compact mode draws the text directly: no XObject and
+    # no second Helvetica, and the file is no larger than the standard one
+    plain = new_session("plain", timeout, activate=False)
+    plain_estimate_id = create_estimate(plain, timeout)
+    sizes = {}
+    for options in ({"compact": False}, {"compact": True}):
+        data = generate(plain, plain_estimate_id, timeout, **options)
+        sizes[options["compact"]] = len(data)
+        reader = PdfReader(io.BytesIO(data))
+        assert len(reader.pages) == 1
+        text = reader.pages[0].extract_text()
+        assert "ESTIMATE" in text and "Compact Roof Job" in text
+        assert WATERMARK in text, f"Watermark missing with {options}"
+        assert xobject_ids(reader) == [set()], f"Unexpected XObject with {options}"
+        fonts = reader.pages[0]["/Resources"].get_object()["/Font"].get_object()
+        base_fonts = [font.get_object()["/BaseFont"] for font in fonts.values()]
+        assert len(base_fonts) == len(set(base_fonts)), f"Font embedded twice with {options}: {base_fonts}"
+    assert sizes[True] <= sizes[False], sizes
+
+
+test_compact_pdf_output()
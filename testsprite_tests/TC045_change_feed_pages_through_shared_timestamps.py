@@ -0,0 +1,126 @@
+import base64
+import time
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+PAGE_SIZE = 500
+# One batch insert gives every created row the same microsecond NOW()
+BATCH_SIZE = 500
+
+
+def decode_cursor(cursor):
+    return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+
+
+def synced_at(cursor):
+    return int(decode_cursor(cursor).rsplit(":", 1)[1])
+
+
+def make_cursor(updated_at, estimate_id, synced_at_ms):
+    return base64.urlsafe_b64encode(f"{updated_at}:{estimate_id}:{synced_at_ms}".encode()).decode().rstrip("=")
+
+
+def test_change_feed_pages_through_shared_timestamps():
+    session = requests.Session()
+    timeout = 60
+
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"changefeed_shared_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Shared Timestamp User"
+    }
+    estimate_payload = {
+        "title": "Shared timestamp estimate",
+        "clientName": "Client S",
+        "items": [{"description": "Shingles", "quantity": 10, "unitPrice": 35, "type": "material"}]
+    }
+
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    # Snapshot after one estimate
+    r = session.post(f"{BASE_URL}/api/estimates", json=estimate_payload, timeout=timeout)
+    assert r.status_code == 201, r.text
+    r = session.get(f"{BASE_URL}/api/estimates", timeout=timeout)
+    assert r.status_code == 200
+    cursor = r.json()["cursor"]
+
+    # One more estimate, then a batch whose rows share one timestamp, so the first
+    # page ends part-way through the shared timestamp
+    r = session.post(f"{BASE_URL}/api/estimates", json={**estimate_payload, "title": "Before batch"}, timeout=timeout)
+    assert r.status_code == 201, r.text
+    expected = {r.json()["estimate"]["id"]}
+
+    r = session.post(
+        f"{BASE_URL}/api/estimates/batch",
+        json={"operations": [
+            {"op": "create", "clientId": f"c{i}", "data": {**estimate_payload, "title": f"Batch {i}"}}
+            for i in range(BATCH_SIZE)
+        ]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, r.text
+    created = [result["estimate"] for result in r.json()["results"]]
+    assert all(result["status"] == "created" for result in r.json()["results"])
+    assert len({estimate["updatedAt"] for estimate in created}) == 1, "Batch rows should share one timestamp"
+    expected |= {estimate["id"] for estimate in created}
+
+    # Page through the feed: every change exactly once, and the feed ends
+    seen = []
+    pages = 0
+    has_more = True
+    while has_more:
+        pages += 1
+        assert pages <= 3, "Change feed did not advance past the shared timestamp"
+        r = session.get(f"{BASE_URL}/api/estimates/changes", params={"since": cursor}, timeout=timeout)
+        assert r.status_code == 200, r.text
+        feed = r.json()
+        assert feed["resync"] is False
+        assert len(feed["changes"]) <= PAGE_SIZE
+        seen.extend(estimate["id"] for estimate in feed["changes"])
+        assert feed["cursor"] != cursor or not feed["hasMore"]
+        cursor = feed["cursor"]
+        has_more = feed["hasMore"]
+
+    assert pages == 2, f"Expected two pages, got {pages}"
+    assert len(seen) == len(set(seen)), f"{len(seen) - len(set(seen))} changes were returned twice"
+    assert set(seen) == expected
+
+    # Caught up: nothing more, even though the last rows share a timestamp
+    time.sleep(0.05)
+    r = session.get(f"{BASE_URL}/api/estimates/changes", params={"since": cursor}, timeout=timeout)
+    assert r.status_code == 200
+    assert r.json()["changes"] == [] and r.json()["hasMore"] is False
+    # An idle poll still renews when the client last synced, so the cursor doesn't age out
+    assert synced_at(r.json()["cursor"]) > synced_at(cursor)
+
+    # The tombstone horizon is checked against when the client last synced, not
+    # against when its data last changed
+    day_ms = 24 * 60 * 60 * 1000
+    now_ms = int(time.time() * 1000)
+    stale_data = make_cursor("2000-01-01 00:00:00", 0, now_ms - day_ms)
+    r = session.get(f"{BASE_URL}/api/estimates/changes", params={"since": stale_data}, timeout=timeout)
+    assert r.status_code == 200 and r.json()["resync"] is False, r.text
+    stale_sync = make_cursor("2000-01-01 00:00:00", 0, now_ms - 40 * day_ms)
+    r = session.get(f"{BASE_URL}/api/estimates/changes", params={"since": stale_sync}, timeout=timeout)
+    assert r.status_code == 200 and r.json()["resync"] is True, r.text
+
+    # Cursors issued before microsecond precision (epoch milliseconds) are still accepted
+    legacy = base64.urlsafe_b64encode(f"{int(time.time() * 1000) - 60_000}:0".encode()).decode().rstrip("=")
+    r = session.get(f"{BASE_URL}/api/estimates/changes", params={"since": legacy}, timeout=timeout)
+    assert r.status_code == 200, r.text
+    assert r.json()["resync"] is False
+
+
+test_change_feed_pages_through_shared_timestamps()
@@ -0,0 +1,73 @@
+import time
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+FREE_TIER_LIMIT = 3
+
+
+def test_batch_creates_count_against_free_tier_limit():
+    session = requests.Session()
+    timeout = 30
+
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"batch_free_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Batch Free User"
+    }
+    estimate_payload = {
+        "title": "Free batch estimate",
+        "clientName": "Client F",
+        "items": [{"description": "Shingles", "quantity": 10, "unitPrice": 35, "type": "material"}]
+    }
+
+    # Free tier user (no subscription activated)
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+
+    # Only the remaining monthly estimates are created, in request order
+    r = session.post(
+        f"{BASE_URL}/api/estimates/batch",
+        json={"operations": [
+            {"op": "create", "clientId": f"c{i}", "data": {**estimate_payload, "title": f"Batch {i}"}}
+            for i in range(FREE_TIER_LIMIT + 2)
+        ]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, r.text
+    statuses = [result["status"] for result in r.json()["results"]]
+    assert statuses == ["created"] * FREE_TIER_LIMIT + ["invalid"] * 2, statuses
+    assert "limit" in str(r.json()["results"][-1]["details"]).lower()
+    first = r.json()["results"][0]["estimate"]
+
+    # The created estimates were counted
+    r = session.get(f"{BASE_URL}/api/usage/check", timeout=timeout)
+    assert r.status_code == 200
+    usage = r.json()
+    assert usage["currentUsage"] == FREE_TIER_LIMIT and usage["allowed"] is False, usage
+
+    # At the limit: creates are refused, updates in the same batch still apply
+    r = session.post(
+        f"{BASE_URL}/api/estimates/batch",
+        json={"operations": [
+            {"op": "create", "clientId": "over", "data": estimate_payload},
+            {"op": "update", "id": first["id"], "baseUpdatedAt": first["updatedAt"], "data": {"title": "Edited"}},
+        ]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, r.text
+    assert [result["status"] for result in r.json()["results"]] == ["invalid", "updated"]
+
+    r = session.get(f"{BASE_URL}/api/estimates", timeout=timeout)
+    assert len(r.json()["estimates"]) == FREE_TIER_LIMIT
+
+
+test_batch_creates_count_against_free_tier_limit()
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+import time
+
+import requests
+
+
+BASE_URL = "http://localhost:3001"
+FORMULA_TITLE = '=HYPERLINK("http://example.com","Open")'
+FORMULA_CLIENT = "@SUM(1+1)"
+FORMULA_DESCRIPTION = "-2+3"
+PHONE = "+1 555 0100"
+
+
+def test_export_csv_neutralises_formulas():
+    session = requests.Session()
+    timeout = 30
+
+    timestamp_suffix = str(int(time.time() * 1000))
+    user = {
+        "email": f"export_formula_{timestamp_suffix}@example.com",
+        "password": "Password123!",
+        "name": "Export Formula User"
+    }
+    r = session.post(f"{BASE_URL}/api/auth/sign-up/email", json=user, timeout=timeout)
+    assert r.status_code == 200, f"Sign up failed: {r.text}"
+    r = session.post(
+        f"{BASE_URL}/api/auth/sign-in/email",
+        json={"email": user["email"], "password": user["password"]},
+        timeout=timeout
+    )
+    assert r.status_code == 200, f"Sign in failed: {r.text}"
+    r = session.post(f"{BASE_URL}/api/test/activate-subscription", timeout=timeout)
+    assert r.status_code == 200, f"Activate subscription failed: {r.text}"
+
+    # Only csv and ndjson are formats, not inherited object keys
+    for bad_format in ("constructor", "toString", "__proto__", "xlsx"):
+        r = session.get(f"{BASE_URL}/api/estimates/export", params={"format": bad_format}, timeout=timeout)
+        assert r.status_code == 400, f"{bad_format}: {r.status_code} {r.text}"
+
+    r = session.post(f"{BASE_URL}/api/estimates", json={
+        "title": FORMULA_TITLE,
+        "clientName": FORMULA_CLIENT,
+        "clientPhone": PHONE,
+        "items": [{"description": FORMULA_DESCRIPTION, "quantity": 2, "unitPrice": 10, "type": "material"}]
+    }, timeout=timeout)
+    assert r.status_code == 201, r.text
+
+    # CSV: text cells that a spreadsheet would evaluate start with '
+    r = session.get(f"{BASE_URL}/api/estimates/export", params={"format": "csv"}, timeout=timeout)
+    assert r.status_code == 200
+    csv_text = r.text
+    [row] = list(csv.DictReader(io.StringIO(csv_text)))
+    assert row["title"] == "'" + FORMULA_TITLE
+    assert row["client_name"] == "'" + FORMULA_CLIENT
+    assert row["client_phone"] == "'" + PHONE
+    assert row["item_description"] == "'" + FORMULA_DESCRIPTION
+    # Numbers are left alone
+    assert row["item_quantity"] == "2" and row["item_unit_price"] == "10"
+
+    # NDJSON is data, not a spreadsheet: values are unchanged
+    r = session.get(f"{BASE_URL}/api/estimates/export", params={"format": "ndjson"}, timeout=timeout)
+    [estimate] = [json.loads(line) for line in r.text.splitlines() if line]
+    assert estimate["title"] == FORMULA_TITLE and estimate["clientName"] == FORMULA_CLIENT
+
+    # Importing the exported CSV gives back the original text
+    r = session.post(
+        f"{BASE_URL}/api/estimates/import",
+        data=csv_text.encode(),
+        headers={"Content-Type": "text/csv"},
+        timeout=timeout
+    )
+    assert r.status_code == 200, r.text
+    events = [json.loads(line) for line in r.text.splitlines() if line]
+    assert events[-1]["type"] == "done" and events[-1]["imported"] == 1, events[-1]
+    r = session.get(f"{BASE_URL}/api/estimates", timeout=timeout)
+    imported = r.json()["estimates"][0]
+    assert imported["title"] == FORMULA_TITLE
+    assert imported["clientName"] == FORMULA_CLIENT
+    assert imported["clientPhone"] == PHONE
+    assert imported["items"][0]["description"] == FORMULA_DESCRIPTION
+
+
+test_export_csv_neutralises_formulas()
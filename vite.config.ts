@@ -1,8 +1,25 @@
-import { defineConfig } from "vite";
+import { defineConfig, type Plugin } from "vite";
 import react from "@vitejs/plugin-react-swc";
 import path from "path";
+import { existsSync } from "fs";
 import { componentTagger } from "lovable-tagger";
 
+// `vite preview` serves the build the way Netlify does: prerendered pages from their
+// own index.html, every other route from the unrendered shell (scripts/prerender.js)
+const previewShellFallback = (): Plugin => ({
+  name: "preview-shell-fallback",
+  configurePreviewServer(server) {
+    server.middlewares.use((req, _res, next) => {
+      const pathname = (req.url ?? "/").split("?")[0];
+      const prerendered = existsSync(path.join(__dirname, "dist", pathname, "index.html"));
+      if (req.headers.accept?.includes("text/html") && !pathname.includes(".") && !prerendered) {
+        req.url = "/app.html";
+      }
+      next();
+    });
+  },
+});
+
 // https://vitejs.dev/config/
 export default defineConfig(({ mode }) => ({
   server: {
@@ -16,7 +33,19 @@ export default defineConfig(({ mode }) => ({
       },
     },
   },
-  plugins: [react(), mode === "development" && componentTagger()].filter(Boolean),
+  plugins: [react(), mode === "development" && componentTagger(), previewShellFallback()].filter(Boolean),
+  build: {
+    rollupOptions: {
+      output: {
+        // Named so the bundle budget check and tests can tell it apart; loaded on first PDF export
+        manualChunks(id) {
+          if (id.includes("node_modules/@react-pdf/")) {
+            return "react-pdf";
+          }
+        },
+      },
+    },
+  },
   resolve: {
     alias: {
       "@": path.resolve(__dirname, "./src"),